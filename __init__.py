@@ -42,6 +42,9 @@ def reload_sollumz_modules():
     for name in module_names:
         if name.startswith(sz_module_prefix):
             del sys.modules[name]
+            # `from . import <submodule>` gets the submodule from the package attributes if it exists, remove it so
+            # the new module is imported instead
+            globals().pop(name[len(sz_module_prefix):], None)
 
 
 if "auto_load" in locals():
@@ -0,0 +1,63 @@
+"""Command-line entry point of the batch converter, see ``batch_convert.py``.
+
+    blender --background --python <Sollumz directory>/__main__.py -- <arguments>
+    python -m <Sollumz package> <arguments>
+"""
+
+import sys
+
+
+def _enable_sollumz() -> str:
+    """Enables the add-on this file belongs to. Returns its module name."""
+    import os
+    import addon_utils
+
+    if __package__:
+        module_name = __package__
+        # Already imported by `python -m`, without the modification time Blender thinks the module changed on disk and
+        # reloads it
+        package = sys.modules[module_name]
+        package.__time__ = os.path.getmtime(package.__file__)
+    else:
+        # Run as a script, find the installed add-on in this directory
+        addon_dir = os.path.dirname(os.path.realpath(__file__))
+        module_name = next(
+            (
+                mod.__name__ for mod in addon_utils.modules()
+                if os.path.dirname(os.path.realpath(mod.__file__)) == addon_dir
+            ),
+            None
+        )
+        if module_name is None:
+            sys.exit(f"Sollumz add-on in '{addon_dir}' is not installed in Blender")
+
+    if addon_utils.enable(module_name, default_set=True) is None:
+        sys.exit(f"Failed to enable Sollumz add-on '{module_name}'")
+
+    return module_name
+
+
+def _exit(exit_code: int):
+    import os
+    import bpy
+
+    if not bpy.app.binary_path:
+        # The `bpy` module may crash while shutting down after enabling add-ons, which would replace the exit code
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(exit_code)
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    import importlib
+
+    batch_convert = importlib.import_module(f"{_enable_sollumz()}.batch_convert")
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    try:
+        exit_code = batch_convert.main(argv)
+    except SystemExit as e:
+        # Invalid arguments
+        exit_code = e.code if isinstance(e.code, int) else 1
+    _exit(exit_code)
@@ -63,6 +63,8 @@ def iter_submodules(path, package_name):
 
 def iter_submodule_names(path, root=""):
     for _, module_name, is_package in pkgutil.iter_modules([str(path)]):
+        if module_name == "__main__":
+            continue  # command-line entry point, only runs when executed
         yield root + module_name
         if is_package:
             if module_name == "tests":
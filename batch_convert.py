@@ -0,0 +1,542 @@
+"""Headless batch conversion of CodeWalker XML files.
+
+Every file found in the input folders is imported and the created objects are exported again to the output folder,
+optionally applying a preferences preset first. Files are distributed among a pool of background worker processes,
+which pull them from a shared job queue. A JSON summary with the timing, warnings and errors of each file is written
+once all files are processed.
+
+Usage:
+    blender --background --python <Sollumz directory>/__main__.py -- <inputs...> -o <output directory> [options]
+    python -m <Sollumz package> <inputs...> -o <output directory> [options]    (with the ``bpy`` module)
+
+Workers are started the same way the batch converter itself was started.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import filecmp
+import tempfile
+import threading
+import traceback
+import subprocess
+from collections import deque
+from typing import Optional, Callable
+import bpy
+
+from . import logger
+from .meta import sollumz_version
+from .sollumz_preferences import get_export_settings, load_preferences_preset
+from .sollumz_operators import EXPORT_FUNCTIONS
+from .cwxml.drawable import YDR, YDD
+from .cwxml.fragment import YFT
+from .cwxml.bound import YBN
+from .cwxml.navmesh import YNV
+from .cwxml.clipdictionary import YCD
+from .cwxml.ytyp import YTYP
+from .cwxml.ymap import YMAP
+from .ydr.ydrimport import import_ydr
+from .ydd.yddimport import import_ydd
+from .yft.yftimport import import_yft
+from .ybn.ybnimport import import_ybn
+from .ynv.ynvimport import import_ynv
+from .ycd.ycdimport import import_ycd
+from .ymap.ymapimport import import_ymap
+from .ytyp.ytypimport import import_ytyp
+from .ytyp.ytypexport import selected_ytyp_to_xml
+from .tools.blenderhelper import remove_number_suffix
+from .tools.ytyphelper import ytyp_from_objects
+from .shared.texture_copier import use_texture_copier
+
+IMPORT_FUNCTIONS = {
+    YDR.file_extension: import_ydr,
+    YDD.file_extension: import_ydd,
+    YFT.file_extension: import_yft,
+    YBN.file_extension: import_ybn,
+    YNV.file_extension: import_ynv,
+    YCD.file_extension: import_ycd,
+    YMAP.file_extension: import_ymap,
+    YTYP.file_extension: import_ytyp,
+}
+"""Import function of each file extension supported by the batch converter."""
+
+READY_MARKER = "SOLLUMZ_BATCH_READY"
+"""Output line through which workers notify that they are ready to receive jobs."""
+RESULT_MARKER = "SOLLUMZ_BATCH_RESULT "
+"""Prefix of the output lines through which workers send the result of each job, any other output is just logging."""
+
+SUMMARY_FILE_NAME = "batch_summary.json"
+
+
+class BatchWorkerError(Exception):
+    """The worker process stopped before finishing a job."""
+
+
+def get_file_extension(filepath: str) -> Optional[str]:
+    """Gets the supported extension of ``filepath``, or ``None`` if the file is not supported."""
+    filepath = filepath.lower()
+    return next((ext for ext in IMPORT_FUNCTIONS.keys() if filepath.endswith(ext)), None)
+
+
+def find_input_files(paths: list[str], recursive: bool = False) -> list[tuple[str, str]]:
+    """Finds the supported files in ``paths``, which can be files or folders. Returns a list of tuples with the file
+    path and its folder relative to the input folder where it was found, used to keep the same folder structure in the
+    output.
+    """
+    files = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isfile(path):
+            if get_file_extension(path) is not None:
+                files.append((path, ""))
+            continue
+
+        for directory, subdirectories, filenames in os.walk(path):
+            if recursive:
+                subdirectories.sort()
+            else:
+                subdirectories.clear()
+
+            relative_directory = os.path.relpath(directory, path)
+            if relative_directory == os.curdir:
+                relative_directory = ""
+
+            filenames = sorted(f for f in filenames if get_file_extension(f) is not None)
+            # Importing a non-hi .yft.xml already imports its _hi.yft.xml, skip it to not convert the same model twice
+            filenames_lower = {f.lower() for f in filenames}
+            filenames = [
+                f for f in filenames
+                if not f.lower().endswith("_hi.yft.xml") or f"{f[:-11].lower()}.yft.xml" not in filenames_lower
+            ]
+            files.extend((os.path.join(directory, f), relative_directory) for f in filenames)
+
+    return files
+
+
+def _reset_scene():
+    bpy.ops.wm.read_homefile(use_empty=True)
+
+
+def _import_file(filepath: str):
+    IMPORT_FUNCTIONS[get_file_extension(filepath)](filepath)
+
+
+def _export_scene(output_dir: str) -> list[str]:
+    """Exports the Sollumz objects and .ytyps in the scene to ``output_dir``. Returns the paths of the exported
+    files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    export_settings = get_export_settings()
+    scene = bpy.context.scene
+
+    outputs = []
+    objs = [obj for obj in scene.objects if obj.parent is None and obj.sollum_type in EXPORT_FUNCTIONS]
+    with use_texture_copier():
+        for obj in objs:
+            file_extension, export_func = EXPORT_FUNCTIONS[obj.sollum_type]
+            filepath = os.path.join(output_dir, remove_number_suffix(obj.name.lower()) + file_extension)
+            if export_func(obj, filepath):
+                outputs.append(filepath)
+            else:
+                logger.error(f"Failed to export '{obj.name}'")
+
+    for ytyp_index, ytyp in enumerate(scene.ytyps):
+        scene.ytyp_index = ytyp_index
+        filepath = os.path.join(output_dir, ytyp.name + YTYP.file_extension)
+        selected_ytyp_to_xml(export_settings.apply_transforms).write_xml(filepath)
+        outputs.append(filepath)
+
+    if export_settings.export_with_ytyp and objs:
+        ytyp = ytyp_from_objects(objs)
+        filepath = os.path.join(output_dir, ytyp.name + YTYP.file_extension)
+        ytyp.write_xml(filepath)
+        outputs.append(filepath)
+
+    return outputs
+
+
+def _find_roundtrip_mismatches(outputs: list[str]) -> list[str]:
+    """Imports the exported files and exports them again. Returns the files whose second export differs from the
+    first one.
+    """
+    mismatches = []
+    with tempfile.TemporaryDirectory(prefix="sollumz_roundtrip_") as tmp_dir:
+        for filepath in outputs:
+            _reset_scene()
+            _import_file(filepath)
+            reexported_filepath = os.path.join(tmp_dir, os.path.basename(filepath))
+            reexported = _export_scene(tmp_dir)
+            if reexported_filepath not in reexported or not filecmp.cmp(filepath, reexported_filepath, shallow=False):
+                mismatches.append(filepath)
+
+    return mismatches
+
+
+def convert_file(filepath: str, output_dir: str, roundtrip: bool = False) -> dict:
+    """Imports ``filepath`` in an empty scene and exports the result to ``output_dir``. With ``roundtrip``, the
+    exported files are also imported and exported again to check that the second export doesn't change them.
+
+    Returns a dictionary with the exported files, the timing and the warnings and errors logged during the conversion.
+    """
+    result = {
+        "input": filepath,
+        "outputs": [],
+        "success": False,
+        "time": 0.0,
+        "import_time": 0.0,
+        "export_time": 0.0,
+        "warnings": [],
+        "errors": [],
+    }
+    recorder = logger.RecordingLogger()
+    start = time.perf_counter()
+    with logger.use_logger(recorder):
+        try:
+            _reset_scene()
+            _import_file(filepath)
+            import_end = time.perf_counter()
+            outputs = _export_scene(output_dir)
+            export_end = time.perf_counter()
+            result["outputs"] = outputs
+            result["import_time"] = import_end - start
+            result["export_time"] = export_end - import_end
+            result["success"] = len(outputs) > 0
+            if not outputs:
+                logger.error(f"Nothing exported from '{filepath}'")
+
+            if roundtrip:
+                mismatches = _find_roundtrip_mismatches(outputs)
+                for mismatch in mismatches:
+                    logger.error(f"'{mismatch}' changed after importing and exporting it again")
+                result["roundtrip_mismatches"] = mismatches
+                result["success"] = result["success"] and not mismatches
+        except Exception:
+            result["success"] = False
+            logger.error(f"Error converting '{filepath}':\n{traceback.format_exc()}")
+
+    result["time"] = time.perf_counter() - start
+    result["warnings"] = list(recorder.warnings)
+    result["errors"] = list(recorder.errors)
+    return result
+
+
+def run_worker(preset: Optional[str] = None):
+    """Converts the jobs received through the standard input until it is closed. Each job is a line with a JSON object,
+    the result is written to the standard output as a JSON object in a line starting with ``RESULT_MARKER``.
+    """
+    if preset:
+        load_preferences_preset(preset)
+
+    sys.stdout.write(READY_MARKER + "\n")
+    sys.stdout.flush()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+
+        job = json.loads(line)
+        result = convert_file(job["input"], job["output_dir"], job["roundtrip"])
+        result["id"] = job["id"]
+        sys.stdout.write(RESULT_MARKER + json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+def get_worker_command(blender: Optional[str] = None) -> tuple[list[str], dict[str, str]]:
+    """Gets the command line and environment variables to start a worker process. Workers run the Blender executable
+    in ``blender`` or the current Blender executable. When running from the ``bpy`` Python module, which has no Blender
+    executable, the current Python interpreter is used instead.
+    """
+    env = dict(os.environ)
+    blender = blender or bpy.app.binary_path
+    if blender:
+        main_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__main__.py")
+        command = [blender, "--background", "--python-exit-code", "1", "--python", main_script, "--"]
+    else:
+        # The directory that contains the add-on package needs to be in the path to run it as a module
+        packages_dir = os.path.dirname(os.path.abspath(__file__))
+        for _ in __package__.split("."):
+            packages_dir = os.path.dirname(packages_dir)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in (packages_dir, env.get("PYTHONPATH", None)) if p)
+        command = [sys.executable, "-m", __package__]
+
+    return command + ["--worker"], env
+
+
+class BatchWorker:
+    """Worker process that converts the jobs it receives."""
+
+    def __init__(self, index: int, command: list[str], env: dict[str, str], verbose: bool = False):
+        self.index = index
+        self.verbose = verbose
+        # Last output lines, included in the error when the process stops unexpectedly
+        self._last_output = deque(maxlen=20)
+        self._process = subprocess.Popen(
+            command,
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+        # Wait until started, so the start-up time is not included in the timeout of the first job
+        if self._read_until(READY_MARKER) is None:
+            self._raise_stopped("Worker process failed to start")
+
+    def convert(self, job: dict, timeout: Optional[float] = None) -> dict:
+        """Sends ``job`` to the process and waits for its result. Raises ``BatchWorkerError`` if the process stops
+        before finishing it or it takes longer than ``timeout`` seconds, the process can't be used afterwards.
+        """
+        process = self._process
+        timed_out = threading.Event()
+
+        def _kill_on_timeout():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(timeout, _kill_on_timeout) if timeout else None
+        try:
+            process.stdin.write(json.dumps(job) + "\n")
+            process.stdin.flush()
+            if timer is not None:
+                timer.start()
+
+            result_line = self._read_until(RESULT_MARKER)
+        except OSError:
+            # Broken pipe, the process is no longer running
+            result_line = None
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        if result_line is None:
+            self._raise_stopped(f"Timed out after {timeout} seconds" if timed_out.is_set() else None)
+
+        return json.loads(result_line[len(RESULT_MARKER):])
+
+    def _read_until(self, marker: str) -> Optional[str]:
+        """Reads the output of the process until a line starting with ``marker``. Returns ``None`` if the output ends
+        before.
+        """
+        for line in self._process.stdout:
+            if line.startswith(marker):
+                return line
+
+            self._last_output.append(line)
+            if self.verbose:
+                print(f"[worker {self.index}] {line}", end="", flush=True)
+
+        return None
+
+    def _raise_stopped(self, reason: Optional[str] = None):
+        process = self._process
+        process.kill()
+        returncode = process.wait()
+        reason = reason or f"Worker process exited with code {returncode}"
+        raise BatchWorkerError(f"{reason}. Last output:\n{''.join(self._last_output)}")
+
+    def close(self):
+        process = self._process
+        if process.poll() is None:
+            try:
+                # Closes the input, the worker exits once it reaches the end of it
+                process.communicate(timeout=30)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+                process.wait()
+
+
+def _failed_result(job: dict, error: str) -> dict:
+    return {
+        "id": job["id"],
+        "input": job["input"],
+        "outputs": [],
+        "success": False,
+        "time": 0.0,
+        "import_time": 0.0,
+        "export_time": 0.0,
+        "warnings": [],
+        "errors": [error],
+    }
+
+
+def run_batch(
+    files: list[tuple[str, str]],
+    output_dir: str,
+    num_workers: int,
+    preset: Optional[str] = None,
+    roundtrip: bool = False,
+    blender: Optional[str] = None,
+    timeout: Optional[float] = None,
+    verbose: bool = False,
+    on_result: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """Converts ``files``, as returned by ``find_input_files``, with ``num_workers`` worker processes. ``on_result``
+    is called from the worker threads after each file is converted. Returns the summary of the batch.
+    """
+    start = time.perf_counter()
+    output_dir = os.path.abspath(output_dir)
+    preset = os.path.abspath(preset) if preset else None
+
+    jobs = queue.Queue()
+    # Largest files first, so the slowest conversions don't end up running alone at the end of the batch
+    for file_index in sorted(range(len(files)), key=lambda i: os.path.getsize(files[i][0]), reverse=True):
+        filepath, relative_directory = files[file_index]
+        jobs.put({
+            "id": file_index,
+            "input": filepath,
+            "output_dir": os.path.join(output_dir, relative_directory),
+            "roundtrip": roundtrip,
+        })
+
+    command, env = get_worker_command(blender)
+    if preset:
+        command += ["--preset", preset]
+
+    results: list[Optional[dict]] = [None] * len(files)
+
+    def _process_jobs(worker_index: int):
+        worker = None
+        try:
+            while True:
+                try:
+                    job = jobs.get_nowait()
+                except queue.Empty:
+                    return
+
+                try:
+                    if worker is None:
+                        worker = BatchWorker(worker_index, command, env, verbose)
+                    result = worker.convert(job, timeout)
+                except Exception as e:
+                    # Restart the worker for the next job
+                    result = _failed_result(job, str(e) or type(e).__name__)
+                    if worker is not None:
+                        worker.close()
+                        worker = None
+
+                result["worker"] = worker_index
+                results[job["id"]] = result
+                if on_result is not None:
+                    on_result(result)
+        finally:
+            if worker is not None:
+                worker.close()
+
+    num_workers = max(1, min(num_workers, len(files)))
+    threads = [threading.Thread(target=_process_jobs, args=(i,), daemon=True) for i in range(num_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Jobs not finished by a worker thread that stopped unexpectedly
+    for job_id, result in enumerate(results):
+        if result is None:
+            results[job_id] = _failed_result({"id": job_id, "input": files[job_id][0]}, "File was not converted")
+
+    return {
+        "sollumz_version": sollumz_version(),
+        "mode": "roundtrip" if roundtrip else "export",
+        "preset": preset,
+        "output_dir": output_dir,
+        "num_workers": num_workers,
+        "time": time.perf_counter() - start,
+        "num_files": len(results),
+        "num_succeeded": sum(1 for r in results if r["success"]),
+        "num_failed": sum(1 for r in results if not r["success"]),
+        "num_warnings": sum(len(r["warnings"]) for r in results),
+        "files": results,
+    }
+
+
+def _parse_args(argv: Optional[list[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="sollumz-batch",
+        description="Converts CodeWalker XML files (.ydr, .ydd, .yft, .ybn, .ynv, .ycd, .ymap and .ytyp) by importing "
+                    "and exporting them again with Sollumz.",
+    )
+    parser.add_argument("inputs", nargs="*", help="Files or folders to convert")
+    parser.add_argument("-o", "--output", help="Folder where the converted files are written")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Search the input folders recursively")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=max(1, (os.cpu_count() or 1) // 2),
+        help="Number of worker processes (default: half the CPU count, each worker is a Blender instance)"
+    )
+    parser.add_argument(
+        "--preset",
+        help="Preferences preset applied by the workers, a file with the same format as sollumz_prefs.ini. The user "
+             "preferences are used if not specified"
+    )
+    parser.add_argument(
+        "--roundtrip", action="store_true",
+        help="Import and export the converted files again, files that change are reported as failures"
+    )
+    parser.add_argument("--summary", help=f"Path of the JSON summary (default: <output>/{SUMMARY_FILE_NAME})")
+    parser.add_argument("--timeout", type=float, help="Maximum time in seconds to convert a single file")
+    parser.add_argument("--blender", help="Blender executable used to run the workers")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print the output of the workers")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+
+    args = parser.parse_args(argv)
+    if not args.worker:
+        if not args.inputs:
+            parser.error("at least one input file or folder is required")
+        if not args.output:
+            parser.error("the following arguments are required: -o/--output")
+        for path in args.inputs:
+            if not os.path.exists(path):
+                parser.error(f"input '{path}' not found")
+        if args.preset and not os.path.isfile(args.preset):
+            parser.error(f"preset '{args.preset}' not found")
+
+    return args
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = _parse_args(argv)
+    if args.worker:
+        run_worker(args.preset)
+        return 0
+
+    files = find_input_files(args.inputs, args.recursive)
+    if not files:
+        print("No supported files found")
+        return 1
+
+    num_done = 0
+    num_done_lock = threading.Lock()
+
+    def _print_result(result: dict):
+        nonlocal num_done
+        with num_done_lock:
+            num_done += 1
+            status = "OK" if result["success"] else "FAILED"
+            if result["success"] and result["warnings"]:
+                status = f"OK ({len(result['warnings'])} warnings)"
+            print(f"[{num_done}/{len(files)}] {status} {result['input']} ({result['time']:.2f}s)", flush=True)
+
+    summary = run_batch(
+        files, args.output, args.jobs,
+        preset=args.preset,
+        roundtrip=args.roundtrip,
+        blender=args.blender,
+        timeout=args.timeout,
+        verbose=args.verbose,
+        on_result=_print_result,
+    )
+
+    summary_path = args.summary or os.path.join(args.output, SUMMARY_FILE_NAME)
+    os.makedirs(os.path.dirname(os.path.abspath(summary_path)), exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    print(
+        f"Converted {summary['num_succeeded']}/{summary['num_files']} files in {summary['time']:.2f}s "
+        f"with {summary['num_workers']} workers, {summary['num_failed']} failed. Summary written to '{summary_path}'"
+    )
+    return 0 if summary["num_failed"] == 0 else 1
@@ -1,5 +1,10 @@
+import numpy as np
+from numpy.typing import NDArray
 from abc import ABC as AbstractClass, abstractmethod
 from collections import defaultdict
+from enum import IntEnum
+from operator import itemgetter
+from typing import Any, Optional
 from mathutils import Vector
 from xml.etree import ElementTree as ET
 from .element import (
@@ -10,7 +15,9 @@ from .element import (
     ListProperty,
     MatrixProperty,
     ValueProperty,
-    VectorProperty
+    VectorProperty,
+    parse_array_rows,
+    format_array_rows,
 )
 
 
@@ -114,44 +121,26 @@ class BoundPlane(BoundChild):
 
 
 class VerticesProperty(ElementProperty):
-    value_types = (list)
+    """List of vertices stored in an array of shape (N, 3)."""
+    value_types = (np.ndarray)
 
     def __init__(self, tag_name: str = "Vertices", value=None):
-        super().__init__(tag_name, value or [])
+        super().__init__(tag_name, value if value is not None else np.empty((0, 3), dtype=np.float32))
 
     @staticmethod
     def from_xml(element: ET.Element):
-        new = VerticesProperty(element.tag, [])
-        text = element.text.strip().split("\n")
-        if len(text) > 0:
-            for line in text:
-                coords = line.strip().split(",")
-                if not len(coords) == 3:
-                    return VerticesProperty.read_value_error(element)
+        vertices = parse_array_rows(element.text, 3, np.float32)
+        if vertices is None:
+            return VerticesProperty.read_value_error(element)
 
-                new.value.append(
-                    Vector((float(coords[0]), float(coords[1]), float(coords[2]))))
-
-        return new
+        return VerticesProperty(element.tag, vertices)
 
     def to_xml(self):
-        element = ET.Element(self.tag_name)
-        text = ["\n"]
-
-        if not self.value:
+        if self.value is None or len(self.value) == 0:
             return
 
-        for vertex in self.value:
-            if not isinstance(vertex, Vector):
-                raise TypeError(
-                    f"VerticesProperty can only contain Vector objects, not '{type(self.value)}'!")
-            for index, component in enumerate(vertex):
-                text.append(str(component))
-                if index < len(vertex) - 1:
-                    text.append(", ")
-            text.append("\n")
-
-        element.text = "".join(text)
+        element = ET.Element(self.tag_name)
+        element.text = "\n" + format_array_rows(np.asarray(self.value, dtype=np.float32)) + "\n"
 
         return element
 
@@ -238,38 +227,26 @@ class MaterialsList(ListProperty):
 
 
 class VertexColorProperty(ElementProperty):
-    value_types = (list[tuple[int, int, int, int]])
+    """List of RGBA vertex colors stored in an array of shape (N, 4)."""
+    value_types = (np.ndarray)
 
     def __init__(self, tag_name: str = "VertexColours", value=None):
-        super().__init__(tag_name, value or [])
+        super().__init__(tag_name, value if value is not None else np.empty((0, 4), dtype=np.uint8))
 
     @staticmethod
     def from_xml(element: ET.Element):
-        new = VertexColorProperty(element.tag, [])
-        text = element.text.strip().split("\n")
-        if len(text) > 0:
-            for line in text:
-                colors = line.strip().split(",")
-                if len(colors) != 4:
-                    return VertexColorProperty.read_value_error(element)
-
-                new.value.append((int(colors[0]), int(colors[1]), int(colors[2]), int(colors[3])))
+        colors = parse_array_rows(element.text, 4, np.uint8)
+        if colors is None:
+            return VertexColorProperty.read_value_error(element)
 
-        return new
+        return VertexColorProperty(element.tag, colors)
 
     def to_xml(self):
-        element = ET.Element(self.tag_name)
-        element.text = "\n"
-
-        if len(self.value) == 0:
+        if self.value is None or len(self.value) == 0:
             return None
 
-        for color in self.value:
-            for index, component in enumerate(color):
-                element.text += str(int(component))
-                if index < len(color) - 1:
-                    element.text += ", "
-            element.text += "\n"
+        element = ET.Element(self.tag_name)
+        element.text = "\n" + format_array_rows(np.asarray(self.value).astype(np.uint8)) + "\n"
 
         return element
 
@@ -280,29 +257,6 @@ class Polygon(ElementTree, AbstractClass):
         self.material_index = AttributeProperty("m", 0)
 
 
-class Polygons(ListProperty):
-    list_type = Polygon
-    tag_name = "Polygons"
-
-    @staticmethod
-    def from_xml(element: ET.Element):
-        new = Polygons()
-
-        for child in element.iter():
-            if child.tag == "Box":
-                new.value.append(PolyBox.from_xml(child))
-            elif child.tag == "Sphere":
-                new.value.append(PolySphere.from_xml(child))
-            elif child.tag == "Capsule":
-                new.value.append(PolyCapsule.from_xml(child))
-            elif child.tag == "Cylinder":
-                new.value.append(PolyCylinder.from_xml(child))
-            elif child.tag == "Triangle":
-                new.value.append(PolyTriangle.from_xml(child))
-
-        return new
-
-
 class PolyTriangle(Polygon):
     tag_name = "Triangle"
 
@@ -354,3 +308,199 @@ class PolyCylinder(Polygon):
         self.v1 = AttributeProperty("v1", 0)
         self.v2 = AttributeProperty("v2", 1)
         self.radius = AttributeProperty("radius", 0)
+
+
+class PolygonType(IntEnum):
+    TRIANGLE = 0
+    SPHERE = 1
+    CAPSULE = 2
+    BOX = 3
+    CYLINDER = 4
+
+
+POLYGON_DTYPE = np.dtype([
+    ("type", np.uint8),
+    ("material_index", np.int32),
+    ("vertices", np.int32, 4),
+    ("neighbours", np.int32, 3),
+    ("radius", np.float64),
+])
+"""Structured dtype with the values of any polygon type. ``vertices`` holds v1-v4 (or v for spheres) and
+``neighbours`` holds f1-f3 of triangles, unused components are 0.
+"""
+
+POLYGON_CLASSES: dict[PolygonType, type[Polygon]] = {
+    PolygonType.TRIANGLE: PolyTriangle,
+    PolygonType.SPHERE: PolySphere,
+    PolygonType.CAPSULE: PolyCapsule,
+    PolygonType.BOX: PolyBox,
+    PolygonType.CYLINDER: PolyCylinder,
+}
+
+_POLYGON_TYPE_BY_TAG = {cls.tag_name: poly_type for poly_type, cls in POLYGON_CLASSES.items()}
+_POLYGON_TYPE_BY_CLASS = {cls: poly_type for poly_type, cls in POLYGON_CLASSES.items()}
+
+# XML attribute name -> (POLYGON_DTYPE field, component)
+_POLYGON_FIELD_BY_ATTR = {
+    "m": ("material_index", None),
+    "v": ("vertices", 0),
+    "v1": ("vertices", 0),
+    "v2": ("vertices", 1),
+    "v3": ("vertices", 2),
+    "v4": ("vertices", 3),
+    "f1": ("neighbours", 0),
+    "f2": ("neighbours", 1),
+    "f3": ("neighbours", 2),
+    "radius": ("radius", None),
+}
+
+
+def _get_polygon_attrs(cls: type[Polygon]) -> list[tuple[str, str, Optional[int], Any]]:
+    """Get the XML attributes of a polygon class, in the order they are written, as tuples of
+    (attribute name, field, component, default value)."""
+    return [
+        (prop.name, *_POLYGON_FIELD_BY_ATTR[prop.name], prop.value)
+        for prop in vars(cls()).values() if isinstance(prop, AttributeProperty)
+    ]
+
+
+_POLYGON_ATTRS = {poly_type: _get_polygon_attrs(cls) for poly_type, cls in POLYGON_CLASSES.items()}
+
+
+def _format_float(value: float) -> str:
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+class BoundPolygons:
+    """Polygons of a bound geometry, stored in a structured array with ``POLYGON_DTYPE``. Geometries can have hundreds
+    of thousands of triangles, so they are not stored as ``Polygon`` objects. Iterating or indexing returns
+    ``Polygon`` objects created from the array, changes to them are not stored back.
+    """
+
+    def __init__(self, data: Optional[NDArray] = None):
+        self.data = data if data is not None else np.zeros(0, dtype=POLYGON_DTYPE)
+
+    @staticmethod
+    def empty(num_polygons: int, poly_type: PolygonType) -> "BoundPolygons":
+        """Create ``num_polygons`` polygons of ``poly_type`` with all values set to 0."""
+        data = np.zeros(num_polygons, dtype=POLYGON_DTYPE)
+        data["type"] = poly_type
+        return BoundPolygons(data)
+
+    @property
+    def triangles(self) -> NDArray:
+        """Array with the triangles only."""
+        return self.data[self.data["type"] == PolygonType.TRIANGLE]
+
+    def primitives(self) -> list[Polygon]:
+        """Get all polygons other than triangles as ``Polygon`` objects."""
+        indices = np.flatnonzero(self.data["type"] != PolygonType.TRIANGLE)
+        return [self[i] for i in indices]
+
+    def append(self, poly: Polygon):
+        poly_type = _POLYGON_TYPE_BY_CLASS[type(poly)]
+        row = np.zeros(1, dtype=POLYGON_DTYPE)
+        row["type"] = poly_type
+        for attr_name, field, component, _ in _POLYGON_ATTRS[poly_type]:
+            value = getattr(poly, "material_index" if attr_name == "m" else attr_name)
+            if component is None:
+                row[field] = value
+            else:
+                row[field][:, component] = value
+        self.data = np.concatenate((self.data, row))
+
+    def extend(self, polys: "BoundPolygons | list[Polygon]"):
+        if isinstance(polys, BoundPolygons):
+            self.data = np.concatenate((self.data, polys.data))
+        else:
+            for poly in polys:
+                self.append(poly)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index: int) -> Polygon:
+        row = self.data[index]
+        poly_type = PolygonType(row["type"])
+        poly = POLYGON_CLASSES[poly_type]()
+        for attr_name, field, component, _ in _POLYGON_ATTRS[poly_type]:
+            value = row[field] if component is None else row[field][component]
+            setattr(poly, "material_index" if attr_name == "m" else attr_name, value.item())
+        return poly
+
+    def __iter__(self):
+        for i in range(len(self.data)):
+            yield self[i]
+
+
+class Polygons(ElementProperty):
+    value_types = (BoundPolygons)
+
+    def __init__(self, tag_name: str = "Polygons", value=None):
+        super().__init__(tag_name, value or BoundPolygons())
+
+    @staticmethod
+    def from_xml(element: ET.Element):
+        children = [child for child in element if child.tag in _POLYGON_TYPE_BY_TAG]
+        types = np.fromiter((_POLYGON_TYPE_BY_TAG[child.tag] for child in children), dtype=np.uint8, count=len(children))
+        data = np.zeros(len(children), dtype=POLYGON_DTYPE)
+        data["type"] = types
+
+        for poly_type, attrs in _POLYGON_ATTRS.items():
+            indices = np.flatnonzero(types == poly_type)
+            if len(indices) == 0:
+                continue
+
+            # Join the attributes of all polygons of this type and parse them at once
+            attribs = [children[i].attrib for i in indices]
+            names = [attr_name for attr_name, _, _, _ in attrs]
+            get_values = itemgetter(*names)
+            try:
+                text = " ".join([" ".join(get_values(attrib)) for attrib in attribs])
+            except KeyError:
+                defaults = [str(default) for _, _, _, default in attrs]
+                text = " ".join([" ".join(map(attrib.get, names, defaults)) for attrib in attribs])
+
+            values = np.fromstring(text, dtype=np.float64, sep=" ")
+            if values.size != len(indices) * len(attrs):
+                return Polygons.read_value_error(element)
+
+            values = values.reshape((len(indices), len(attrs)))
+            for column, (_, field, component, _) in enumerate(attrs):
+                if component is None:
+                    data[field][indices] = values[:, column]
+                else:
+                    data[field][indices, component] = values[:, column]
+
+        return Polygons(element.tag, BoundPolygons(data))
+
+    def to_xml(self):
+        data = self.value.data
+        if len(data) == 0:
+            return None
+
+        element = ET.Element(self.tag_name)
+        types = data["type"]
+        attribs = [None] * len(data)
+        for poly_type, attrs in _POLYGON_ATTRS.items():
+            indices = np.flatnonzero(types == poly_type)
+            if len(indices) == 0:
+                continue
+
+            # Convert to Python numbers once, formatting numpy scalars is much slower
+            rows = data[indices]
+            columns = []
+            for _, field, component, _ in attrs:
+                values = rows[field] if component is None else rows[field][:, component]
+                format_value = _format_float if field == "radius" else str
+                columns.append(list(map(format_value, values.tolist())))
+
+            names = [attr_name for attr_name, _, _, _ in attrs]
+            for i, row in zip(indices.tolist(), zip(*columns)):
+                attribs[i] = dict(zip(names, row))
+
+        tags = [POLYGON_CLASSES[poly_type].tag_name for poly_type in PolygonType]
+        for poly_type, attrib in zip(types.tolist(), attribs):
+            ET.SubElement(element, tags[poly_type], attrib)
+
+        return element
@@ -15,6 +15,8 @@ from .element import (
 from xml.etree import ElementTree as ET
 from inspect import isclass
 from math import sqrt
+import numpy as np
+from numpy.typing import NDArray
 
 
 class YCD:
@@ -126,73 +128,44 @@ class AttributesList(ItemTypeList):
 
 
 class ValuesBuffer(ElementProperty):
-    value_types = (list)
+    """Values of a channel, stored in an array. Written with ``columns`` values per line."""
+    value_types = (np.ndarray)
+    dtype = np.float64
+    columns = 10
 
     def __init__(self):
-        super().__init__(tag_name="Values", value=[])
+        super().__init__(tag_name="Values", value=np.empty(0, dtype=self.dtype))
 
     @classmethod
     def from_xml(cls, element: ET.Element):
         new = cls()
-        text = element.text.strip().split("\n")
-        if len(text) > 0:
-            for line in text:
-                items = line.strip().split(" ")
-                for item in items:
-                    new.value.append(float(item))
+        if element.text:
+            new.value = np.fromstring(element.text, dtype=cls.dtype, sep=" ")
 
         return new
 
     def to_xml(self):
         element = ET.Element(self.tag_name)
-        columns = 10
-        text = []
+        # Convert to Python numbers once, formatting numpy scalars is much slower
+        items = list(map(str, np.asarray(self.value, dtype=self.dtype).tolist()))
+        columns = self.columns
+        lines = [" ".join(items[i:i + columns]) for i in range(0, len(items), columns)]
+        text = " \n".join(lines)
+        if items and len(items) % columns == 0:
+            text += "\n"
 
-        for index, value in enumerate(self.value):
-            text.append(str(value))
-            if index < len(self.value) - 1:
-                text.append(" ")
-            if (index + 1) % columns == 0:
-                text.append("\n")
-
-        element.text = "".join(text)
+        element.text = text
 
         return element
 
 
-class FramesBuffer(ElementProperty):
-    value_types = (list)
+class FramesBuffer(ValuesBuffer):
+    """Indices into the values of a channel for each frame, stored in an array."""
+    dtype = np.uint32
 
     def __init__(self):
-        super().__init__(tag_name="Frames", value=[])
-
-    @classmethod
-    def from_xml(cls, element: ET.Element):
-        new = cls()
-        text = element.text.strip().split("\n")
-        if len(text) > 0:
-            for line in text:
-                items = line.strip().split(" ")
-                for item in items:
-                    new.value.append(int(item))
-
-        return new
-
-    def to_xml(self):
-        element = ET.Element(self.tag_name)
-        columns = 10
-        text = []
-
-        for index, value in enumerate(self.value):
-            text.append(str(value))
-            if index < len(self.value) - 1:
-                text.append(" ")
-            if (index + 1) % columns == 0:
-                text.append("\n")
-
-        element.text = "".join(text)
-
-        return element
+        super().__init__()
+        self.tag_name = "Frames"
 
 
 class ChannelsList(ItemTypeList):
@@ -211,6 +184,13 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             raise NotImplementedError
 
+        def get_values(self, frame_ids: NDArray[np.int64], channel_values: list[NDArray]) -> NDArray:
+            """Decodes the channel for all frames in ``frame_ids`` at once. ``channel_values`` contains the arrays
+            returned by the previous channels in the sequence data. Returns an array of shape (N,), or (N, 3) and
+            (N, 4) for static vectors and quaternions (quaternions in WXYZ order).
+            """
+            raise NotImplementedError
+
     class StaticQuaternion(Channel):
         type = "StaticQuaternion"
 
@@ -222,6 +202,9 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             return self.value
 
+        def get_values(self, frame_ids, channel_values):
+            return np.tile(np.array(self.value, dtype=np.float64), (len(frame_ids), 1))
+
     class StaticVector3(Channel):
         type = "StaticVector3"
 
@@ -233,6 +216,9 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             return self.value
 
+        def get_values(self, frame_ids, channel_values):
+            return np.tile(np.array(self.value, dtype=np.float64), (len(frame_ids), 1))
+
     class StaticFloat(Channel):
         type = "StaticFloat"
 
@@ -244,6 +230,9 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             return self.value
 
+        def get_values(self, frame_ids, channel_values):
+            return np.full(len(frame_ids), self.value, dtype=np.float64)
+
     class RawFloat(Channel):
         type = "RawFloat"
 
@@ -255,6 +244,9 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             return self.values[frame_id % len(self.values)]
 
+        def get_values(self, frame_ids, channel_values):
+            return self.values[frame_ids % len(self.values)]
+
     class QuantizeFloat(Channel):
         type = "QuantizeFloat"
 
@@ -268,6 +260,9 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             return self.values[frame_id % len(self.values)]
 
+        def get_values(self, frame_ids, channel_values):
+            return self.values[frame_ids % len(self.values)]
+
     class IndirectQuantizeFloat(QuantizeFloat):
         type = "IndirectQuantizeFloat"
 
@@ -279,6 +274,10 @@ class ChannelsList(ItemTypeList):
         def get_value(self, frame_id, channel_values):
             return self.values[(self.frames[frame_id % len(self.frames)]) % len(self.values)]
 
+        def get_values(self, frame_ids, channel_values):
+            frames = self.frames[frame_ids % len(self.frames)]
+            return self.values[frames % len(self.values)]
+
     class LinearFloat(QuantizeFloat):
         type = "LinearFloat"
 
@@ -302,6 +301,15 @@ class ChannelsList(ItemTypeList):
 
             return sqrt(max(1.0 - vec_len * vec_len, 0))
 
+        def get_values(self, frame_ids, channel_values):
+            # Same operations as `get_value`, including the conversion to single precision done by `Vector` and the
+            # order in which it accumulates the squared length, so the decoded quaternions are identical
+            xyz = np.column_stack(channel_values[:3]).astype(np.float32)
+            xyz_sq = xyz * xyz
+            vec_len_sq = xyz_sq[:, 2].astype(np.float64) + xyz_sq[:, 1] + xyz_sq[:, 0]
+            vec_len = np.sqrt(vec_len_sq)
+            return np.sqrt(np.maximum(1.0 - vec_len * vec_len, 0.0))
+
     class CachedQuaternion2(CachedQuaternion1):
         type = "CachedQuaternion2"
 
@@ -1,4 +1,5 @@
 
+import numpy as np
 from abc import ABC as AbstractClass, abstractmethod
 from collections.abc import MutableSequence, Sequence
 from collections import defaultdict
@@ -19,6 +20,8 @@ from .element import (
     TextListProperty,
     InlineValueListProperty,
     Vector4ListProperty,
+    parse_array_rows,
+    format_array_rows,
 )
 from .drawable import Drawable
 from .bound import BoundComposite
@@ -157,41 +160,30 @@ class MorphController(ElementTree):
 
 
 class VerletClothVerticesProperty(ElementProperty):
-    """List of Vector3s including a padding NaN component"""
-    value_types = (list)
+    """List of Vector3s including a padding NaN component, stored in an array of shape (N, 3) without the padding."""
+    value_types = (np.ndarray)
 
     def __init__(self, tag_name: str = "Vertices", value=None):
-        super().__init__(tag_name, value or [])
+        super().__init__(tag_name, value if value is not None else np.empty((0, 3), dtype=np.float32))
 
     @staticmethod
     def from_xml(element: ET.Element):
-        new = VerletClothVerticesProperty(element.tag, [])
-        text = element.text.strip().split("\n")
-        if len(text) > 0:
-            for line in text:
-                coords = line.strip().split(",")
-                if not len(coords) == 4:
-                    return VerletClothVerticesProperty.read_value_error(element)
+        vertices = parse_array_rows(element.text, 4, np.float32)
+        if vertices is None:
+            return VerletClothVerticesProperty.read_value_error(element)
 
-                new.value.append(Vector((float(coords[0]), float(coords[1]), float(coords[2]))))  # coords[3] is padding
-
-        return new
+        return VerletClothVerticesProperty(element.tag, vertices[:, :3].copy())  # [:, 3] is padding
 
     def to_xml(self):
-        element = ET.Element(self.tag_name)
-        text = ["\n"]
-
-        if not self.value:
+        if self.value is None or len(self.value) == 0:
             return
 
-        for vertex in self.value:
-            if not isinstance(vertex, Vector):
-                raise TypeError(
-                    f"VerletClothVerticesProperty can only contain Vector objects, not '{type(self.value)}'!")
-            # text.append(f"{vertex.x}, {vertex.y}, {vertex.z}, NaN\n")  # padding component exported by CW
-            text.append(f"{vertex.x}, {vertex.y}, {vertex.z}, 0.0\n")  # set padding to 0.0 for now, not all arrays have NaN here
+        vertices = np.asarray(self.value, dtype=np.float32)
+        # padding component exported by CW is NaN, set padding to 0.0 for now, not all arrays have NaN here
+        vertices = np.column_stack((vertices, np.zeros(len(vertices), dtype=np.float32)))
 
-        element.text = "".join(text)
+        element = ET.Element(self.tag_name)
+        element.text = "\n" + format_array_rows(vertices) + "\n"
 
         return element
 
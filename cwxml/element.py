@@ -2,9 +2,12 @@
 from mathutils import Vector, Quaternion, Matrix
 from abc import abstractmethod, ABC as AbstractClass, abstractclassmethod
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
 from xml.etree import ElementTree as ET
+import numpy as np
 from numpy import float32
+from numpy.typing import NDArray, DTypeLike
+from .. import profiler
 
 
 def indent(elem: ET.Element, level=0):
@@ -53,6 +56,32 @@ def get_str_type(value: str):
     return value
 
 
+def parse_array_rows(text: Optional[str], num_columns: int, dtype: DTypeLike) -> Optional[NDArray]:
+    """Parse text with one row per line, with the values separated by commas or whitespace, into an array of shape
+    (N, ``num_columns``). Returns ``None`` if the lines don't have ``num_columns`` values.
+    """
+    text = text.strip() if text else ""
+    if not text:
+        return np.empty((0, num_columns), dtype=dtype)
+
+    num_rows = text.count("\n") + 1
+    values = np.fromstring(text.replace(",", " "), dtype=dtype, sep=" ")
+    if values.size != num_rows * num_columns:
+        return None
+
+    return values.reshape((num_rows, num_columns))
+
+
+def format_array_rows(values: NDArray, separator: str = ", ") -> str:
+    """Format each row of the 2D array ``values`` in its own line, with the values separated by ``separator``. Values
+    are formatted as the Python number they convert to, so float32 values give the same text as ``str(float(v))``.
+    """
+    num_rows, num_columns = values.shape
+    line = separator.join(["{}"] * num_columns)
+    # Single format call for all the values, formatting them one by one is much slower
+    return "\n".join([line] * num_rows).format(*values.ravel().tolist())
+
+
 class Element(AbstractClass):
     """Abstract XML element to base all other XML elements off of"""
     @property
@@ -78,20 +107,145 @@ class Element(AbstractClass):
     @classmethod
     def from_xml_file(cls, filepath):
         """Read XML from filepath"""
-        element_tree = ET.ElementTree()
-        element_tree.parse(filepath)
-        return cls.from_xml(element_tree.getroot())
+        with profiler.span("parse_xml"):
+            element_tree = ET.ElementTree()
+            element_tree.parse(filepath)
+        with profiler.span("read_xml"):
+            return cls.from_xml(element_tree.getroot())
 
     def write_xml(self, filepath):
         """Write object as XML to filepath"""
-        element = self.to_xml()
-        indent(element)
-        elementTree = ET.ElementTree(element)
-        elementTree.write(filepath, encoding="UTF-8", xml_declaration=True)
+        with profiler.span("build_xml"):
+            element = self.to_xml()
+            indent(element)
+        with profiler.span("write_xml"):
+            elementTree = ET.ElementTree(element)
+            elementTree.write(filepath, encoding="UTF-8", xml_declaration=True)
+
+
+_is_property_type: dict[type, bool] = {}
+_is_element_type: dict[type, bool] = {}
+
+
+def _is_property(obj) -> bool:
+    """Same as ``isinstance(obj, (ElementProperty, AttributeProperty))``. Results are cached by type because
+    ``isinstance`` with abstract classes is slow.
+    """
+    obj_type = type(obj)
+    is_property = _is_property_type.get(obj_type, None)
+    if is_property is None:
+        is_property = _is_property_type[obj_type] = issubclass(obj_type, (ElementProperty, AttributeProperty))
+    return is_property
+
+
+def _is_element(obj) -> bool:
+    """Same as ``isinstance(obj, Element)``, cached by type."""
+    obj_type = type(obj)
+    is_element = _is_element_type.get(obj_type, None)
+    if is_element is None:
+        is_element = _is_element_type[obj_type] = issubclass(obj_type, Element)
+    return is_element
+
+
+_NO_DEFAULT = object()
+
+
+class ElementPropertyDescriptor:
+    """Data descriptor that gives access to the value of an ``ElementProperty`` or ``AttributeProperty`` stored in the
+    instance dictionary, so reading the attribute returns the property value and assigning to it sets the property
+    value. Attributes that don't hold a property are read and assigned as is.
+    """
+
+    __slots__ = ("name", "default")
+
+    def __init__(self, name: str, default: Any = _NO_DEFAULT):
+        self.name = name
+        self.default = default
+        """Class attribute shadowed by this descriptor, used when the instance doesn't have the attribute yet."""
+
+    def _get_default(self, instance, owner):
+        default = self.default
+        if default is _NO_DEFAULT:
+            raise AttributeError(self.name)
+        if hasattr(type(default), "__get__"):
+            return default.__get__(instance, owner)
+        return default
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self._get_default(None, owner)
+
+        try:
+            obj = instance.__dict__[self.name]
+        except KeyError:
+            return self._get_default(instance, owner)
+
+        if _is_property(obj):
+            return obj.value
+        return obj
+
+    def __set__(self, instance, value):
+        d = instance.__dict__
+        obj = d.get(self.name, None)
+        if obj is not None and _is_property(obj) and not _is_property(value):
+            obj.value = value
+        else:
+            d[self.name] = value
+
+    def __delete__(self, instance):
+        try:
+            del instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+
+def _learn_property_setattr(self, name: str, value):
+    if _is_property(value):
+        type(self)._install_property_descriptor(name)
+    object.__setattr__(self, name, value)
+
 
+class ElementTreeMeta(type(Element)):
+    """Installs an ``ElementPropertyDescriptor`` in the class for each attribute that is assigned a property. Properties
+    are defined in ``__init__``, so they are found while the first instance of each class is initialized. Later
+    instances don't go through any hook.
+    """
 
-class ElementTree(Element):
-    """XML element that contains children defined by it's properties"""
+    def __call__(cls, *args, **kwargs):
+        if "_properties_found" in cls.__dict__:
+            return super().__call__(*args, **kwargs)
+
+        type.__setattr__(cls, "_properties_found", True)
+        type.__setattr__(cls, "__setattr__", _learn_property_setattr)
+        try:
+            return super().__call__(*args, **kwargs)
+        except BaseException:
+            type.__delattr__(cls, "_properties_found")
+            raise
+        finally:
+            type.__delattr__(cls, "__setattr__")
+
+    def _install_property_descriptor(cls, name: str):
+        for base in cls.__mro__:
+            if name in base.__dict__:
+                attr = base.__dict__[name]
+                if isinstance(attr, ElementPropertyDescriptor) or hasattr(type(attr), "__set__"):
+                    # Already installed, or a descriptor that handles assignments itself
+                    return
+                # Shadowed class attribute, such as the `type` of bound children
+                type.__setattr__(cls, name, ElementPropertyDescriptor(name, attr))
+                return
+
+        type.__setattr__(cls, name, ElementPropertyDescriptor(name))
+
+
+class ElementTree(Element, metaclass=ElementTreeMeta):
+    """XML element that contains children defined by it's properties.
+
+    Reading an attribute that holds an ``ElementProperty`` or ``AttributeProperty`` returns the property value and
+    assigning to it sets the property value (see ``ElementPropertyDescriptor``). Use ``get_element`` to get the
+    property object. Reading an attribute that doesn't exist returns ``None``.
+    """
 
     @classmethod
     def from_xml(cls: Element, element: ET.Element):
@@ -100,10 +254,18 @@ class ElementTree(Element):
         if new.tag_name != element.tag:
             new.tag_name = element.tag
 
+        children = None
         for prop_name, obj_element in vars(new).items():
-            if isinstance(obj_element, Element):
-                child = element.find(obj_element.tag_name)
-                if child is not None and obj_element.tag_name == child.tag:
+            if _is_element(obj_element):
+                if children is None:
+                    # First child of each tag, same as `element.find(tag)` but without searching all children for
+                    # each property
+                    children = {}
+                    for child in element:
+                        children.setdefault(child.tag, child)
+
+                child = children.get(obj_element.tag_name, None)
+                if child is not None:
                     # Add element to object if tag is defined in class definition
                     setattr(new, prop_name, type(obj_element).from_xml(child))
             elif isinstance(obj_element, AttributeProperty):
@@ -117,7 +279,7 @@ class ElementTree(Element):
         """Convert ElementTree to ET.Element object"""
         root = ET.Element(self.tag_name)
         for child in vars(self).values():
-            if isinstance(child, Element):
+            if _is_element(child):
                 element = child.to_xml()
                 if element is not None:
                     root.append(element)
@@ -128,32 +290,12 @@ class ElementTree(Element):
 
         return root
 
-    def __getattribute__(self, key: str, onlyValue: bool = True):
-        obj = None
-        # Try and see if key exists
-        try:
-            obj = object.__getattribute__(self, key)
-            if isinstance(obj, (ElementProperty, AttributeProperty)) and onlyValue:
-                # If the property is an ElementProperty or AttributeProperty, and onlyValue is true, return just the value of the Element property
-                return obj.value
-            else:
-                return obj
-        except AttributeError:
-            # Key doesn't exist, return None
-            return None
-
-    def __setattr__(self, name: str, value) -> None:
-        # Get the full object
-        obj = self.__getattribute__(name, False)
-        if obj is not None and isinstance(obj, (ElementProperty, AttributeProperty)) and not isinstance(value, (ElementProperty, AttributeProperty)):
-            # If the object is an ElementProperty or AttributeProperty, set it's value
-            obj.value = value
-            super().__setattr__(name, obj)
-        else:
-            super().__setattr__(name, value)
+    def __getattr__(self, key: str):
+        # Only called when the attribute doesn't exist, return None
+        return None
 
     def get_element(self, key):
-        obj = self.__getattribute__(key, False)
+        obj = self.__dict__.get(key, None)
 
         if isinstance(obj, ElementProperty):
             return obj
@@ -184,7 +326,8 @@ class ElementProperty(Element, AbstractClass):
     def __init__(self, tag_name, value):
         super().__init__()
         self.tag_name = tag_name
-        if value and not isinstance(value, self.value_types):
+        # Check the type first, arrays can't be used as a bool
+        if not isinstance(value, self.value_types) and value:
             raise TypeError(
                 f"Value of {type(self).__name__} must be one of {self.value_types}, not {type(value)}!")
         self.value = value
@@ -398,36 +541,33 @@ class QuaternionProperty(ElementProperty):
         return ET.Element(self.tag_name, attrib={"x": x, "y": y, "z": z, "w": w})
 
 
+def parse_matrix_rows(text: Optional[str], matrix: Matrix) -> Matrix:
+    """Set the rows of ``matrix`` from text with one row per line. Rows or columns not in the text are not changed."""
+    lines = text.strip().splitlines() if text else []
+    values = np.fromstring(" ".join(lines), dtype=np.float64, sep=" ")
+    if lines:
+        rows = values.reshape((len(lines), -1)).tolist()
+        for row_index, row in enumerate(rows):
+            matrix[row_index][:len(row)] = row
+    return matrix
+
+
 class MatrixProperty(ElementProperty):
     value_types = (Matrix)
 
     def __init__(self, tag_name: str, value=None):
         super().__init__(tag_name, value or Matrix())
 
-    @staticmethod
-    def from_xml(element: ET.Element):
-        s_mtx = element.text.strip().replace("\n", "").split("   ")
-        s_mtx = [s for s in s_mtx if s]  # removes empty strings
-        m = Matrix()
-        r_idx = 0
-        for item in s_mtx:
-            v_idx = 0
-            for value in item.strip().split(" "):
-                m[r_idx][v_idx] = float(value)
-                v_idx += 1
-            r_idx += 1
-        return MatrixProperty(element.tag, m)
+    @classmethod
+    def from_xml(cls, element: ET.Element):
+        return cls(element.tag, parse_matrix_rows(element.text, Matrix()))
 
     def to_xml(self):
         if self.value is None:
             return
 
-        matrix: Matrix = self.value
-
-        lines = [" ".join([str(x) for x in row]) for row in matrix]
-
         element = ET.Element(self.tag_name)
-        element.text = "\n".join(lines)
+        element.text = format_array_rows(np.array(self.value, dtype=np.float32), " ")
 
         return element
 
@@ -438,30 +578,16 @@ class Matrix33Property(ElementProperty):
     def __init__(self, tag_name: str, value=None):
         super().__init__(tag_name, value or Matrix.Diagonal((0, 0, 0)))
 
-    @staticmethod
-    def from_xml(element: ET.Element):
-        s_mtx = element.text.strip().replace("\n", "").split("   ")
-        s_mtx = [s for s in s_mtx if s]  # removes empty strings
-        m = Matrix.Diagonal((0, 0, 0))
-        r_idx = 0
-        for item in s_mtx:
-            v_idx = 0
-            for value in item.strip().split(" "):
-                m[r_idx][v_idx] = float(value)
-                v_idx += 1
-            r_idx += 1
-        return MatrixProperty(element.tag, m)
+    @classmethod
+    def from_xml(cls, element: ET.Element):
+        return cls(element.tag, parse_matrix_rows(element.text, Matrix.Diagonal((0, 0, 0))))
 
     def to_xml(self):
         if self.value is None:
             return
 
-        matrix: Matrix = self.value
-
-        lines = [" ".join([str(x) for x in row]) for row in matrix]
-
         element = ET.Element(self.tag_name)
-        element.text = "\n".join(lines)
+        element.text = format_array_rows(np.array(self.value, dtype=np.float32), " ")
 
         return element
 
@@ -586,41 +712,25 @@ class InlineValueListProperty(ElementProperty):
 
 
 class Vector4ListProperty(ElementProperty):
-    value_types = (list)
+    """List of Vector4s stored in an array of shape (N, 4)."""
+    value_types = (np.ndarray)
 
     def __init__(self, tag_name: str, value=None):
-        super().__init__(tag_name, value or [])
+        super().__init__(tag_name, value if value is not None else np.empty((0, 4), dtype=np.float32))
 
     @staticmethod
     def from_xml(element: ET.Element):
-        new = Vector4ListProperty(element.tag, [])
-        text = element.text.strip().split("\n")
-        if len(text) > 0:
-            for line in text:
-                coords = line.strip().split(",")
-                if not len(coords) == 4:
-                    return Vector4ListProperty.read_value_error(element)
-
-                new.value.append(Vector((float(coords[0]), float(coords[1]), float(coords[2]), float(coords[3]))))
+        values = parse_array_rows(element.text, 4, np.float32)
+        if values is None:
+            return Vector4ListProperty.read_value_error(element)
 
-        return new
+        return Vector4ListProperty(element.tag, values)
 
     def to_xml(self):
-        element = ET.Element(self.tag_name)
-        text = ["\n"]
-
-        if not self.value:
+        if self.value is None or len(self.value) == 0:
             return
 
-        for vec in self.value:
-            if not isinstance(vec, Vector):
-                raise TypeError(f"Vector4ListProperty can only contain Vector objects, not '{type(vec)}'!")
-            for index, component in enumerate(vec):
-                text.append(str(component))
-                if index < len(vec) - 1:
-                    text.append(", ")
-            text.append("\n")
-
-        element.text = "".join(text)
+        element = ET.Element(self.tag_name)
+        element.text = "\n" + format_array_rows(np.asarray(self.value, dtype=np.float32)) + "\n"
 
         return element
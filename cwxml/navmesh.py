@@ -1,4 +1,8 @@
+import numpy as np
+from numpy.typing import NDArray
+from typing import NamedTuple
 from .element import (
+    ElementProperty,
     ElementTree,
     ListProperty,
     TextProperty,
@@ -6,7 +10,6 @@ from .element import (
     VectorProperty
 )
 from xml.etree import ElementTree as ET
-from mathutils import Vector
 
 
 class YNV:
@@ -55,44 +58,88 @@ class NavPortalList(ListProperty):
     tag_name = "Portals"
 
 
-class NavPolygonVertices(ListProperty):
-    list_type = Vector
-    tag_name = "Vertices"
-
-    def __init__(self, tag_name=None, value=None):
-        super().__init__(tag_name=tag_name, value=value)
-
-    @classmethod
-    def from_xml(cls, element: ET.Element):
-        new = cls()
-        verts = []
-        if element.text:
-            txts = element.text.strip().split("\n")
-            for txt in txts:
-                txt = txt.strip()
-            for txt in txts:
-                nums = txt.split(", ")
-                v0 = float(nums[0])
-                v1 = float(nums[1])
-                v2 = float(nums[2])
-                verts.append(Vector((v0, v1, v2)))
-        new.value = verts
-        return new
-
-
-class NavPolygon(ElementTree):
-    tag_name = "Item"
+NAVMESH_NUM_POLY_FLAGS = 6
+"""Number of values in the flags of the navmesh polygons."""
 
-    def __init__(self):
-        super().__init__()
-        self.flags = TextProperty("Flags")
-        self.vertices = NavPolygonVertices("Vertices")
-        self.edges = TextProperty("Edges")
 
+class NavPolygons(NamedTuple):
+    """Polygons of a navmesh, stored in arrays."""
+    flags: NDArray[np.int64]
+    """Array of shape (N, NAVMESH_NUM_POLY_FLAGS)."""
+    vertices: NDArray[np.float64]
+    """Array of shape (M, 3), with the vertices of all polygons one after the other."""
+    sizes: NDArray[np.int64]
+    """Array of shape (N,), with the number of vertices of each polygon."""
+    edges: list[str]
+    """Edges data of each polygon, as in the XML."""
+
+    @property
+    def num_polygons(self) -> int:
+        return len(self.sizes)
+
+    @staticmethod
+    def empty() -> "NavPolygons":
+        return NavPolygons(
+            flags=np.zeros((0, NAVMESH_NUM_POLY_FLAGS), dtype=np.int64),
+            vertices=np.zeros((0, 3), dtype=np.float64),
+            sizes=np.zeros(0, dtype=np.int64),
+            edges=[],
+        )
+
+
+class NavPolygonList(ElementProperty):
+    """List of navmesh polygons. Navmeshes contain thousands of polygons, so instead of an ``ElementTree`` per polygon
+    the values of all polygons are read into and written from the arrays of a ``NavPolygons``.
+    """
+    value_types = (NavPolygons)
 
-class NavPolygonList(ListProperty):
-    list_type = NavPolygon
-    tag_name = "Polygons"
+    def __init__(self, tag_name: str = "Polygons", value=None):
+        super().__init__(tag_name, value or NavPolygons.empty())
+
+    @staticmethod
+    def from_xml(element: ET.Element):
+        items = element.findall("Item")
+        num_polys = len(items)
+        flags_texts = [item.findtext("Flags", "") for item in items]
+        vertices_texts = [item.findtext("Vertices", "") for item in items]
+
+        flags = np.fromstring(" ".join(flags_texts), dtype=np.int64, sep=" ")
+        if flags.size == num_polys * NAVMESH_NUM_POLY_FLAGS:
+            flags = flags.reshape((num_polys, NAVMESH_NUM_POLY_FLAGS))
+        else:
+            # Some polygons have an unexpected number of flags, parse them one by one
+            flags = np.zeros((num_polys, NAVMESH_NUM_POLY_FLAGS), dtype=np.int64)
+            for poly_index, text in enumerate(flags_texts):
+                poly_flags = [int(f) for f in text.split()][:NAVMESH_NUM_POLY_FLAGS]
+                flags[poly_index, :len(poly_flags)] = poly_flags
+
+        # One vertex per line, with components separated by commas
+        vertices_text = " ".join(vertices_texts).replace(",", " ")
+        vertices = np.fromstring(vertices_text, dtype=np.float64, sep=" ").reshape((-1, 3))
+        sizes = np.fromiter((text.count(",") // 2 for text in vertices_texts), dtype=np.int64, count=num_polys)
+
+        edges = [(item.findtext("Edges", "") or "").strip() for item in items]
+        return NavPolygonList(element.tag, NavPolygons(flags, vertices, sizes, edges))
+
+    def to_xml(self):
+        element = ET.Element(self.tag_name)
+        polygons = self.value
+        if polygons.num_polygons == 0:
+            return element
+
+        vertices = polygons.vertices.astype(np.float32).tolist()
+        poly_starts = np.cumsum(polygons.sizes) - polygons.sizes
+        rows = zip(polygons.flags.tolist(), poly_starts.tolist(), polygons.sizes.tolist(), polygons.edges)
+        for flags, start, size, edges in rows:
+            item = ET.SubElement(element, "Item")
+            ET.SubElement(item, "Flags").text = " ".join(map(str, flags))
+            ET.SubElement(item, "Vertices").text = "\n" + "\n".join(
+                f"{x}, {y}, {z}" for x, y, z in vertices[start:start + size]
+            )
+            if edges:
+                ET.SubElement(item, "Edges").text = "\n" + "\n".join(line.strip() for line in edges.splitlines())
+
+        return element
 
 
 class Navmesh(ElementTree):
@@ -1,5 +1,7 @@
+import numpy as np
+from numpy.typing import NDArray
 from abc import ABC as AbstractClass, abstractmethod
-from typing import Union, Type
+from typing import NamedTuple, Union, Type
 from xml.etree import ElementTree as ET
 from .element import (
     AttributeProperty,
@@ -540,7 +542,131 @@ class PhysicsDictionariesList(ListProperty):
         return element
 
 
-# TODO: InstancedData
+class GrassInstanceData(NamedTuple):
+    """Instances of a grass batch, one row per instance."""
+    position: NDArray[np.uint16]
+    """Array of shape (N, 3). Positions quantized within the AABB of the batch."""
+    normal: NDArray[np.uint8]
+    """Array of shape (N, 2). X and Y components of the normals quantized from [-1, 1], Z is always positive."""
+    color: NDArray[np.uint8]
+    """Array of shape (N, 3)."""
+    scale: NDArray[np.uint8]
+    """Array of shape (N,). Scale within the scale range of the batch."""
+    ao: NDArray[np.uint8]
+    """Array of shape (N,)."""
+
+    @property
+    def num_instances(self) -> int:
+        return len(self.scale)
+
+    @staticmethod
+    def empty(num_instances: int = 0) -> "GrassInstanceData":
+        return GrassInstanceData(
+            position=np.zeros((num_instances, 3), dtype=np.uint16),
+            normal=np.zeros((num_instances, 2), dtype=np.uint8),
+            color=np.zeros((num_instances, 3), dtype=np.uint8),
+            scale=np.zeros(num_instances, dtype=np.uint8),
+            ao=np.zeros(num_instances, dtype=np.uint8),
+        )
+
+
+class GrassInstanceBatch(ElementTree):
+    class BatchAABB(ElementTree):
+        tag_name = "BatchAABB"
+
+        def __init__(self):
+            super().__init__()
+            self.min = Vector4Property("min")
+            self.max = Vector4Property("max")
+
+    class InstanceListProperty(ElementProperty):
+        """List of grass instances. Batches contain thousands of instances, so instead of an ``ElementTree`` per
+        instance the values of all instances are read into and written from the arrays of a ``GrassInstanceData``.
+        """
+        value_types = (GrassInstanceData)
+
+        def __init__(self, tag_name: str = "InstanceList", value=None):
+            super().__init__(tag_name, value or GrassInstanceData.empty())
+
+        @staticmethod
+        def from_xml(element: ET.Element):
+            items = element.findall("Item")
+            # Join the values of all instances and parse them at once. Arrays may be separated by whitespace or commas
+            position = " ".join(item.findtext("Position", "0 0 0") for item in items).replace(",", " ")
+            color = " ".join(item.findtext("Color", "0 0 0") for item in items).replace(",", " ")
+
+            def _value(item: ET.Element, tag: str) -> str:
+                value_element = item.find(tag)
+                return "0" if value_element is None else value_element.get("value", "0")
+
+            def _values(tag: str) -> str:
+                return " ".join(_value(item, tag) for item in items)
+
+            num_instances = len(items)
+            data = GrassInstanceData(
+                position=np.fromstring(position, dtype=np.uint16, sep=" ").reshape((num_instances, 3)),
+                normal=np.fromstring(f"{_values('NormalX')} {_values('NormalY')}", dtype=np.uint8, sep=" ")
+                .reshape((2, num_instances)).T.copy(),
+                color=np.fromstring(color, dtype=np.uint8, sep=" ").reshape((num_instances, 3)),
+                scale=np.fromstring(_values("Scale"), dtype=np.uint8, sep=" "),
+                ao=np.fromstring(_values("Ao"), dtype=np.uint8, sep=" "),
+            )
+            return GrassInstanceBatch.InstanceListProperty(element.tag, data)
+
+        def to_xml(self):
+            element = ET.Element(self.tag_name, attrib={"itemType": "rage__fwGrassInstanceListDef__InstanceData"})
+            data = self.value
+            if data.num_instances == 0:
+                return element
+
+            # Convert to Python ints once, formatting numpy scalars is much slower
+            rows = zip(data.position.tolist(), data.normal.tolist(), data.color.tolist(),
+                       data.scale.tolist(), data.ao.tolist())
+            for position, normal, color, scale, ao in rows:
+                item = ET.SubElement(element, "Item")
+                ET.SubElement(item, "Position", attrib={"content": "short_array"}).text = "{} {} {}".format(*position)
+                ET.SubElement(item, "NormalX", attrib={"value": str(normal[0])})
+                ET.SubElement(item, "NormalY", attrib={"value": str(normal[1])})
+                ET.SubElement(item, "Color", attrib={"content": "char_array"}).text = "{} {} {}".format(*color)
+                ET.SubElement(item, "Scale", attrib={"value": str(scale)})
+                ET.SubElement(item, "Ao", attrib={"value": str(ao)})
+                ET.SubElement(item, "Pad", attrib={"content": "char_array"}).text = "0 0 0"
+
+            return element
+
+    tag_name = "Item"
+
+    def __init__(self):
+        super().__init__()
+        self.batch_aabb = GrassInstanceBatch.BatchAABB()
+        self.scale_range = VectorProperty("ScaleRange")
+        self.archetype_name = TextPropertyRequired("archetypeName")
+        self.lod_dist = ValueProperty("lodDist", 0)
+        self.lod_fade_start_dist = ValueProperty("LodFadeStartDist", 0)
+        self.lod_inst_fade_range = ValueProperty("LodInstFadeRange", 0)
+        self.orient_to_terrain = ValueProperty("OrientToTerrain", 0)
+        self.instances = GrassInstanceBatch.InstanceListProperty("InstanceList")
+
+
+class GrassInstanceBatchesList(ListPropertyRequired):
+    list_type = GrassInstanceBatch
+    tag_name = "GrassInstanceList"
+
+    def __init__(self, tag_name=None, value=None):
+        super().__init__(tag_name, value)
+        self.item_type = AttributeProperty("itemType", "rage__fwGrassInstanceListDef")
+
+
+class InstancedData(ElementTree):
+    tag_name = "instancedData"
+
+    def __init__(self):
+        super().__init__()
+        self.imap_link = TextPropertyRequired("ImapLink")
+        # Prop instance lists are not read by the game and no vanilla ymap has any items in them. Only the grass
+        # batches are imported to Blender, so there is nothing to export back and the list is always written empty
+        self.prop_instance_list = TextPropertyRequired("PropInstanceList")
+        self.grass_instance_list = GrassInstanceBatchesList()
 
 
 class TimeCycleModifier(ElementTree):
@@ -631,7 +757,7 @@ class CMapData(ElementTree, AbstractClass):
         self.box_occluders = BoxOccludersList()
         self.occlude_models = OccludeModelsList()
         self.physics_dictionaries = PhysicsDictionariesList()
-        # self.instanced_data = InstancedDataProperty()
+        self.instanced_data = InstancedData()
         self.time_cycle_modifiers = TimeCycleModifiersList()
         self.car_generators = CarGeneratorsList()
         # self.lod_lights = LODLightsSOAProperty()
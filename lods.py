@@ -1,5 +1,6 @@
 """LOD Management system."""
 import bpy
+import functools
 from bpy.types import (
     Context,
     Mesh,
@@ -363,6 +364,7 @@ def operates_on_lod_level(func: Callable):
     """Decorator for functions that operate on a particular LOD level of an object.
     Will automatically set the LOD level to ``lod_level`` at the beginning of execution
     and will set it back to the original LOD level at the end."""
+    @functools.wraps(func)
     def wrapper(model_obj: bpy.types.Object, lod_level: LODLevel, *args, **kwargs):
         current_lod_level = model_obj.sz_lods.active_lod_level
 
@@ -38,6 +38,27 @@ class OperatorLogger(LoggerBase):
         self._num_logs.clear()
 
 
+class RecordingLogger(LoggerBase):
+    """Keeps the logged messages in memory, grouped by level."""
+
+    def __init__(self):
+        self.messages: dict[str, list[str]] = defaultdict(list)
+
+    def do_log(self, msg: str, level: str):
+        self.messages[level].append(msg)
+
+    @property
+    def warnings(self) -> list[str]:
+        return self.messages["WARNING"]
+
+    @property
+    def errors(self) -> list[str]:
+        return self.messages["ERROR"]
+
+    def clear(self):
+        self.messages.clear()
+
+
 class MultiLogger(LoggerBase):
     def __init__(self, loggers: Sequence[LoggerBase]):
         self._loggers: list[LoggerBase] = list(loggers)
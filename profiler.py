@@ -0,0 +1,242 @@
+"""
+Profiling of the stages of import and export operations.
+
+Stages are marked with the ``profiled`` decorator or the ``span`` context manager, and sizes of the processed data are
+recorded with ``count``. All of them do nothing unless a ``Profiler`` is active (see ``use_profiler``), so they can be
+used in any function that is not called in tight loops.
+"""
+
+import os
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+
+class Span:
+    """A timed section of code."""
+
+    __slots__ = ("name", "parent", "thread_id", "start", "end", "counters")
+
+    def __init__(self, name: str, parent: Optional["Span"], thread_id: int, start: float):
+        self.name = name
+        self.parent = parent
+        self.thread_id = thread_id
+        self.start = start
+        self.end: Optional[float] = None
+        self.counters: dict[str, float] = {}
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    @property
+    def path(self) -> tuple[str, ...]:
+        """Names of this span and its parents, starting from the outermost span."""
+        names = []
+        span = self
+        while span is not None:
+            names.append(span.name)
+            span = span.parent
+        return tuple(reversed(names))
+
+
+class SpanSummary:
+    """Total time and counters of all the spans with the same path."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.time = 0.0
+        self.counters: dict[str, float] = {}
+        self.children: dict[str, SpanSummary] = {}
+
+
+class Profiler:
+    """Collects nested spans and counters. Spans can be opened from multiple threads, each thread nests its own
+    spans.
+    """
+
+    def __init__(self):
+        self.spans: list[Span] = []
+        self.counters: dict[str, float] = {}
+        """Counters recorded outside of any span."""
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+
+    def _get_stack(self) -> list[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def begin(self, name: str) -> Span:
+        stack = self._get_stack()
+        span = Span(name, stack[-1] if stack else None, threading.get_ident(), time.perf_counter())
+        stack.append(span)
+        self.spans.append(span)
+        return span
+
+    def end(self, span: Span):
+        span.end = time.perf_counter()
+        stack = self._get_stack()
+        while stack:
+            if stack.pop() is span:
+                break
+
+    def count(self, name: str, value: float = 1):
+        """Adds ``value`` to the counter ``name`` of the innermost open span of the current thread."""
+        stack = self._get_stack()
+        counters = stack[-1].counters if stack else self.counters
+        counters[name] = counters.get(name, 0) + value
+
+    def summarize(self) -> list[SpanSummary]:
+        """Merges the spans with the same path. Returns the summaries of the outermost spans, in order of appearance."""
+        roots: dict[str, SpanSummary] = {}
+        summaries: dict[tuple[str, ...], SpanSummary] = {}
+        for span in self.spans:
+            path = span.path
+            summary = summaries.get(path, None)
+            if summary is None:
+                siblings = summaries[path[:-1]].children if len(path) > 1 else roots
+                summary = summaries[path] = siblings[span.name] = SpanSummary(span.name)
+
+            summary.calls += 1
+            summary.time += span.duration
+            for name, value in span.counters.items():
+                summary.counters[name] = summary.counters.get(name, 0) + value
+
+        return list(roots.values())
+
+    def total_counters(self) -> dict[str, float]:
+        counters = dict(self.counters)
+        for span in self.spans:
+            for name, value in span.counters.items():
+                counters[name] = counters.get(name, 0) + value
+        return counters
+
+    def format_report(self) -> str:
+        """Formats the summary of the spans as an indented tree, one line per span path."""
+        lines = []
+
+        def _format_counters(counters: dict[str, float]) -> str:
+            return ", ".join(f"{name}: {value:g}" for name, value in counters.items())
+
+        def _add_lines(summary: SpanSummary, depth: int):
+            line = f"{'    ' * depth}{summary.name}: {summary.time:.3f}s"
+            if summary.calls > 1:
+                line += f" ({summary.calls} calls)"
+            if summary.counters:
+                line += f" [{_format_counters(summary.counters)}]"
+            lines.append(line)
+            for child in summary.children.values():
+                _add_lines(child, depth + 1)
+
+        for summary in self.summarize():
+            _add_lines(summary, 1)
+
+        total_counters = self.total_counters()
+        if total_counters:
+            lines.append(f"    Total: {_format_counters(total_counters)}")
+
+        return "\n".join(lines)
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Gets the spans in the Chrome trace event format, viewable in chrome://tracing or https://ui.perfetto.dev."""
+        pid = os.getpid()
+        events = []
+        for span in self.spans:
+            event = {
+                "name": span.name,
+                "cat": "sollumz",
+                "ph": "X",
+                "ts": (span.start - self.origin) * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": span.thread_id,
+            }
+            if span.counters:
+                event["args"] = span.counters
+            events.append(event)
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, filepath: str):
+        with open(filepath, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+_active_profiler: Optional[Profiler] = None
+
+
+def get_active_profiler() -> Optional[Profiler]:
+    return _active_profiler
+
+
+@contextmanager
+def use_profiler(profiler: Profiler) -> Iterator[Profiler]:
+    global _active_profiler
+    prev_profiler = _active_profiler
+    _active_profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _active_profiler = prev_profiler
+
+
+class _SpanContext:
+    __slots__ = ("_profiler", "_name", "_span")
+
+    def __init__(self, profiler: Profiler, name: str):
+        self._profiler = profiler
+        self._name = name
+        self._span = None
+
+    def __enter__(self) -> Span:
+        self._span = self._profiler.begin(self._name)
+        return self._span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profiler.end(self._span)
+
+
+_NULL_SPAN = nullcontext()
+
+
+def span(name: str):
+    """Context manager that times its body as a span named ``name``."""
+    profiler = _active_profiler
+    if profiler is None:
+        return _NULL_SPAN
+
+    return _SpanContext(profiler, name)
+
+
+def count(name: str, value: float = 1):
+    """Adds ``value`` to the counter ``name`` of the current span."""
+    profiler = _active_profiler
+    if profiler is not None:
+        profiler.count(name, value)
+
+
+def profiled(func: F) -> F:
+    """Decorator that times each call to ``func`` as a span named after it."""
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def _wrapper(*args, **kwargs):
+        profiler = _active_profiler
+        if profiler is None:
+            return func(*args, **kwargs)
+
+        span = profiler.begin(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.end(span)
+
+    return _wrapper
@@ -0,0 +1,312 @@
+"""Content fingerprints of exported objects, used to skip the export of objects that haven't changed since they were
+last exported to the same file.
+
+The fingerprint of an object covers its whole hierarchy: transforms, evaluated mesh data, materials and images, the
+Sollumz properties and custom properties of every object, any data-block these properties point to, the export
+settings and the Sollumz version. Data only reachable from outside the hierarchy is not included.
+"""
+
+import os
+import hashlib
+import bpy
+import numpy as np
+from bpy.types import (
+    ID,
+    Object,
+    Mesh,
+    Material,
+    Image,
+    Action,
+    Armature,
+    bpy_struct,
+)
+from typing import Optional
+from ..meta import sollumz_version
+from ..tools.blenderhelper import get_object_with_children
+
+FINGERPRINT_VERSION = 1
+"""Increment when the data included in the fingerprint changes, so files exported by previous versions are exported
+again.
+"""
+EXPORT_STATE_PROP = "_sollumz_export_state"
+"""Custom property where the fingerprint and output file of the last export of an object is stored. Properties starting
+with an underscore are not shown in the UI.
+"""
+
+_ATTRIBUTE_VALUE_PROPS = {
+    "FLOAT": ("value", 1, np.float32),
+    "INT": ("value", 1, np.int32),
+    "INT8": ("value", 1, np.int32),
+    "BOOLEAN": ("value", 1, bool),
+    "FLOAT2": ("vector", 2, np.float32),
+    "INT32_2D": ("value", 2, np.int32),
+    "FLOAT_VECTOR": ("vector", 3, np.float32),
+    "FLOAT_COLOR": ("color", 4, np.float32),
+    "BYTE_COLOR": ("color", 4, np.float32),
+    "QUATERNION": ("value", 4, np.float32),
+    "FLOAT4X4": ("value", 16, np.float32),
+}
+
+
+class ExportFingerprint:
+    """Incremental hash of the data exported from an object."""
+
+    def __init__(self, depsgraph: bpy.types.Depsgraph):
+        self.depsgraph = depsgraph
+        self._hash = hashlib.blake2b(digest_size=20)
+        self._visited_ids: set[int] = set()
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+    def add_value(self, *values):
+        self._hash.update(repr(values).encode())
+
+    def add_foreach(self, collection: bpy.types.bpy_prop_collection, prop: str, size: int, dtype):
+        values = np.empty(len(collection) * size, dtype=dtype)
+        collection.foreach_get(prop, values)
+        self._hash.update(values.tobytes())
+
+    def add_struct(self, struct: bpy_struct, runtime_only: bool):
+        """Adds the RNA properties of ``struct``. With ``runtime_only``, only the properties registered by add-ons, such
+        as the Sollumz properties of objects and materials, are included. Pointed data-blocks are added too.
+        """
+        for prop in struct.bl_rna.properties:
+            identifier = prop.identifier
+            if identifier == "rna_type" or (runtime_only and not prop.is_runtime):
+                continue
+
+            if prop.type == "ENUM" and len(prop.enum_items) == 0:
+                # Enum with dynamic items, use the stored value, the current items may not include it
+                self.add_value(identifier, struct.get(identifier, None) if hasattr(struct, "get") else None)
+                continue
+
+            try:
+                value = getattr(struct, identifier, None)
+                if getattr(prop, "is_array", False):
+                    value = tuple(value)
+            except Exception:
+                # Computed properties may not be available, e.g. shader node properties for sockets the node doesn't
+                # have. Their source data is included separately.
+                continue
+
+            if prop.type == "POINTER":
+                if value is None or isinstance(value, ID):
+                    self.add_id(value)
+                else:
+                    self.add_struct(value, runtime_only=False)
+            elif prop.type == "COLLECTION":
+                self.add_value(identifier, len(value))
+                for item in value:
+                    self.add_struct(item, runtime_only=False)
+            elif prop.type == "ENUM" and prop.is_enum_flag:
+                self.add_value(identifier, sorted(value))
+            else:
+                self.add_value(identifier, value)
+
+    def add_custom_properties(self, id_block: ID):
+        for key in sorted(id_block.keys()):
+            if key == EXPORT_STATE_PROP:
+                continue
+            value = id_block[key]
+            self.add_value(key, value.to_dict() if hasattr(value, "to_dict") else
+                           value.to_list() if hasattr(value, "to_list") else value)
+
+    def add_id(self, id_block: Optional[ID]):
+        if id_block is None:
+            self.add_value(None)
+            return
+
+        self.add_value(type(id_block).__name__, id_block.name_full)
+        key = id_block.session_uid
+        if key in self._visited_ids:
+            return
+        self._visited_ids.add(key)
+
+        if isinstance(id_block, Object):
+            self.add_object(id_block)
+        elif isinstance(id_block, Mesh):
+            self.add_mesh(id_block)
+        elif isinstance(id_block, Material):
+            self.add_material(id_block)
+        elif isinstance(id_block, Image):
+            self.add_image(id_block)
+        elif isinstance(id_block, Action):
+            self.add_action(id_block)
+        elif isinstance(id_block, Armature):
+            self.add_armature(id_block)
+        elif isinstance(id_block, bpy.types.Light):
+            self.add_struct(id_block, runtime_only=False)
+        else:
+            self.add_struct(id_block, runtime_only=True)
+            self.add_custom_properties(id_block)
+
+    def add_object(self, obj: Object):
+        self.add_value(obj.type, tuple(v for row in obj.matrix_world for v in row))
+        self.add_value(obj.parent.name_full if obj.parent else None, obj.parent_type, obj.parent_bone)
+        self.add_value([vg.name for vg in obj.vertex_groups])
+        self.add_struct(obj, runtime_only=True)
+        self.add_custom_properties(obj)
+
+        for slot in obj.material_slots:
+            self.add_id(slot.material)
+
+        if obj.animation_data is not None:
+            self.add_id(obj.animation_data.action)
+
+        if obj.pose is not None:
+            for pose_bone in obj.pose.bones:
+                self.add_value(pose_bone.name, tuple(v for row in pose_bone.matrix_basis for v in row))
+                self.add_struct(pose_bone, runtime_only=True)
+
+        if obj.type == "MESH":
+            # Modifiers are applied on export, use the evaluated mesh
+            self.add_mesh(obj.evaluated_get(self.depsgraph).data, has_vertex_groups=len(obj.vertex_groups) > 0)
+            self.add_struct(obj.data, runtime_only=True)
+        elif obj.data is not None:
+            self.add_id(obj.data)
+
+    def add_mesh(self, mesh: Mesh, has_vertex_groups: bool = True):
+        self.add_value(len(mesh.vertices), len(mesh.loops), len(mesh.polygons))
+        self.add_foreach(mesh.vertices, "co", 3, np.float32)
+        self.add_foreach(mesh.loops, "vertex_index", 1, np.int32)
+        self.add_foreach(mesh.polygons, "loop_start", 1, np.int32)
+        self.add_foreach(mesh.polygons, "material_index", 1, np.int32)
+        for attribute in mesh.attributes:
+            self.add_value(attribute.name, attribute.domain, attribute.data_type)
+            if value_props := _ATTRIBUTE_VALUE_PROPS.get(attribute.data_type, None):
+                self.add_foreach(attribute.data, *value_props)
+
+        if has_vertex_groups:
+            self.add_vertex_group_weights(mesh)
+
+    def add_vertex_group_weights(self, mesh: Mesh):
+        """Adds the vertex group weights, which are not stored in mesh attributes. There is no bulk access to them, so
+        the groups and weights of each vertex are read with ``foreach_get`` into slices of a single array.
+        """
+        vertex_groups = [v.groups for v in mesh.vertices]
+        counts = np.fromiter(map(len, vertex_groups), dtype=np.int32, count=len(vertex_groups))
+        ends = np.cumsum(counts)
+        num_elements = int(ends[-1]) if len(ends) > 0 else 0
+        groups = np.empty(num_elements, dtype=np.int32)
+        weights = np.empty(num_elements, dtype=np.float32)
+        start = 0
+        for elements, end in zip(vertex_groups, ends.tolist()):
+            if end != start:
+                elements.foreach_get("group", groups[start:end])
+                elements.foreach_get("weight", weights[start:end])
+                start = end
+
+        self._hash.update(counts.tobytes())
+        self._hash.update(groups.tobytes())
+        self._hash.update(weights.tobytes())
+
+    def add_material(self, material: Material):
+        self.add_value(material.blend_method, material.use_backface_culling)
+        self.add_struct(material, runtime_only=True)
+        self.add_custom_properties(material)
+        if material.node_tree is None:
+            return
+
+        for node in material.node_tree.nodes:
+            self.add_value(node.bl_idname, node.name)
+            self.add_struct(node, runtime_only=True)
+            for socket in node.inputs:
+                default_value = getattr(socket, "default_value", None)
+                if default_value is not None and not isinstance(default_value, (int, float, bool, str)):
+                    default_value = tuple(default_value)
+                self.add_value(socket.identifier, default_value)
+            if isinstance(node, bpy.types.ShaderNodeTexImage):
+                self.add_id(node.image)
+
+        for link in material.node_tree.links:
+            self.add_value(
+                link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier
+            )
+
+    def add_image(self, image: Image):
+        filepath = bpy.path.abspath(image.filepath, library=image.library)
+        self.add_value(image.source, filepath, image.colorspace_settings.name, image.alpha_mode)
+        if os.path.isfile(filepath):
+            # Textures may be copied or embedded, detect changes to the file
+            stat = os.stat(filepath)
+            self.add_value(stat.st_size, stat.st_mtime_ns)
+        self.add_struct(image, runtime_only=True)
+
+    def add_action(self, action: Action):
+        self.add_struct(action, runtime_only=True)
+        for fcurve in action.fcurves:
+            self.add_value(fcurve.data_path, fcurve.array_index, len(fcurve.keyframe_points))
+            self.add_foreach(fcurve.keyframe_points, "co", 2, np.float32)
+            self.add_foreach(fcurve.keyframe_points, "interpolation", 1, np.int32)
+
+    def add_armature(self, armature: Armature):
+        self.add_struct(armature, runtime_only=True)
+        for bone in armature.bones:
+            self.add_value(
+                bone.name,
+                bone.parent.name if bone.parent else None,
+                tuple(bone.head_local),
+                tuple(bone.tail_local),
+                tuple(v for row in bone.matrix_local for v in row),
+            )
+            self.add_struct(bone, runtime_only=True)
+
+
+def compute_export_fingerprint(obj: Object, export_settings, depsgraph: bpy.types.Depsgraph) -> str:
+    """Computes the fingerprint of the data exported from ``obj`` and its children with the given export settings."""
+    fingerprint = ExportFingerprint(depsgraph)
+    fingerprint.add_value(FINGERPRINT_VERSION, sollumz_version())
+    scene = depsgraph.scene
+    fingerprint.add_value(scene.render.fps, scene.render.fps_base)
+    fingerprint.add_struct(export_settings, runtime_only=False)
+    for o in get_object_with_children(obj):
+        fingerprint.add_id(o)
+    return fingerprint.hexdigest()
+
+
+def _get_file_stat(filepath: str) -> Optional[tuple[int, float]]:
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime
+
+
+def is_export_up_to_date(obj: Object, filepath: str, fingerprint: str) -> bool:
+    """Checks whether ``obj`` was last exported to ``filepath`` with the same fingerprint, and the file hasn't been
+    modified or deleted since.
+    """
+    state = obj.get(EXPORT_STATE_PROP, None)
+    if state is None:
+        return False
+
+    file_stat = _get_file_stat(filepath)
+    return (
+        file_stat is not None and
+        state.get("fingerprint", None) == fingerprint and
+        state.get("filepath", None) == os.path.abspath(filepath) and
+        state.get("size", None) == str(file_stat[0]) and
+        state.get("mtime", None) == file_stat[1]
+    )
+
+
+def store_export_state(obj: Object, filepath: str, fingerprint: str):
+    """Records that ``obj`` has been exported to ``filepath`` with the given fingerprint."""
+    file_stat = _get_file_stat(filepath)
+    if file_stat is None:
+        clear_export_state(obj)
+        return
+
+    obj[EXPORT_STATE_PROP] = {
+        "fingerprint": fingerprint,
+        "filepath": os.path.abspath(filepath),
+        # Stored as string, ID properties can't hold integers larger than 32 bits
+        "size": str(file_stat[0]),
+        "mtime": file_stat[1],
+    }
+
+
+def clear_export_state(obj: Object):
+    if EXPORT_STATE_PROP in obj:
+        del obj[EXPORT_STATE_PROP]
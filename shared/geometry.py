@@ -6,6 +6,7 @@ from numpy.typing import NDArray
 from mathutils import Vector
 from typing import NamedTuple
 from collections.abc import Sequence
+from .. import profiler
 
 
 class Centroid(NamedTuple):
@@ -171,6 +172,7 @@ def get_centroid_of_mesh(mesh_vertices) -> Centroid:
     return Centroid(centroid, radius_around_centroid)
 
 
+@profiler.profiled
 def get_mass_properties_of_mesh(mesh_vertices, mesh_faces):
     triangles = mesh_vertices[mesh_faces]
 
@@ -566,15 +568,17 @@ def tris_areas(tris_array: NDArray) -> NDArray:
 
 
 def tris_areas_from_verts(v0: NDArray, v1: NDArray, v2: NDArray) -> NDArray:
-    """Calculate the area of each triangle in the arrays. Triangle vertices passed as separate arrays."""
-    assert v0.ndim == 2 and v0.shape[1] == 3, \
-        f"Expected shape (N, 3) for 'v0', got: {v0.shape}"
-    assert v1.ndim == 2 and v1.shape[1] == 3, \
-        f"Expected shape (N, 3) for 'v1', got: {v1.shape}"
-    assert v2.ndim == 2 and v2.shape[1] == 3, \
-        f"Expected shape (N, 3) for 'v2', got: {v2.shape}"
-
-    areas = np.linalg.norm(np.cross(v0 - v1, v2 - v1, axis=1), axis=1) / 2
+    """Calculate the area of each triangle in the arrays. Triangle vertices passed as separate arrays, with shape
+    (..., 3) and broadcastable to each other.
+    """
+    assert v0.ndim >= 2 and v0.shape[-1] == 3, \
+        f"Expected shape (..., N, 3) for 'v0', got: {v0.shape}"
+    assert v1.ndim >= 2 and v1.shape[-1] == 3, \
+        f"Expected shape (..., N, 3) for 'v1', got: {v1.shape}"
+    assert v2.ndim >= 2 and v2.shape[-1] == 3, \
+        f"Expected shape (..., N, 3) for 'v2', got: {v2.shape}"
+
+    areas = np.linalg.norm(np.cross(v0 - v1, v2 - v1, axis=-1), axis=-1) / 2
     return areas
 
 
@@ -0,0 +1,550 @@
+"""
+Mesh simplification by quadric error edge collapses, used to generate LOD meshes.
+
+Collapses are half-edge collapses: a vertex is merged into one of its neighbours, which keeps its position and
+attributes, so no attribute needs to be interpolated and bone weights are preserved as-is. Vertices on mesh
+boundaries, non-manifold edges and attribute seams (UVs, colours, normals...) are never removed, so seams stay intact.
+
+Independent collapses are applied in batches with numpy instead of one at a time with a priority queue, which keeps the
+number of Python-level iterations low on large meshes.
+"""
+import bpy
+import bmesh
+import numpy as np
+from numpy.typing import NDArray
+from typing import NamedTuple, Optional
+
+FLIP_COS_THRESHOLD = 0.2
+"""Collapses that rotate the normal of an adjacent triangle more than this (cosine of the angle) are rejected."""
+MIN_TRIANGLE_QUALITY = 0.02
+"""Collapses that create triangles with lower quality than this, and less than half the quality the triangle had
+before, are rejected."""
+SEAM_TOLERANCE = 1e-4
+"""Corner attributes that differ more than this on each side of an edge make the edge a seam."""
+BATCH_FRACTION = 0.25
+"""Fraction of the vertices, with the cheapest collapses, considered for collapsing in each batch."""
+VERTEX_ATTR_PENALTY = 1.0
+"""Weight of the difference in vertex attributes (e.g. bone weights) in the cost of a collapse, relative to the
+squared edge length."""
+
+_ATTRIBUTE_VALUE_PROPS = {
+    "FLOAT": ("value", 1),
+    "INT": ("value", 1),
+    "INT8": ("value", 1),
+    "BOOLEAN": ("value", 1),
+    "FLOAT2": ("vector", 2),
+    "INT32_2D": ("value", 2),
+    "FLOAT_VECTOR": ("vector", 3),
+    "FLOAT_COLOR": ("color", 4),
+    "BYTE_COLOR": ("color", 4),
+    "QUATERNION": ("value", 4),
+}
+
+
+class SimplifyResult(NamedTuple):
+    num_tris: int
+    error: float
+    """Largest root mean square distance between a simplified vertex and the original triangles merged into it."""
+
+
+def _triangle_normals(positions: NDArray[np.float64], tris: NDArray[np.int64]) -> NDArray[np.float64]:
+    p0, p1, p2 = positions[tris[:, 0]], positions[tris[:, 1]], positions[tris[:, 2]]
+    return np.cross(p1 - p0, p2 - p0)
+
+
+def _triangle_quality(
+    positions: NDArray[np.float64], tris: NDArray[np.int64], normal_lengths: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    """Gets the quality of each triangle, from 1 for equilateral triangles to 0 for degenerate triangles."""
+    p0, p1, p2 = positions[tris[:, 0]], positions[tris[:, 1]], positions[tris[:, 2]]
+    edge_lengths_sq = ((p1 - p0) ** 2).sum(axis=1) + ((p2 - p1) ** 2).sum(axis=1) + ((p0 - p2) ** 2).sum(axis=1)
+    # 4 * sqrt(3) * area / sum of squared edge lengths, with the area being half the normal length
+    return 2.0 * np.sqrt(3.0) * normal_lengths / np.where(edge_lengths_sq > 0.0, edge_lengths_sq, 1.0)
+
+
+def _half_edges(tris: NDArray[np.int64]) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+    """Start and end vertex of the half-edges of each triangle. Half-edge ``i`` starts at corner ``i`` of the
+    triangle ``i // 3``."""
+    return tris.ravel(), tris[:, [1, 2, 0]].ravel()
+
+
+def find_locked_vertices(
+    num_verts: int, tris: NDArray[np.int64], corner_attrs: NDArray[np.float64]
+) -> NDArray[np.bool_]:
+    """Finds the vertices that can't be removed: vertices on boundary or non-manifold edges, on edges where the
+    triangles have inconsistent winding order, on attribute seams, or in degenerate triangles.
+    """
+    locked = np.zeros(num_verts, dtype=bool)
+    a, b = _half_edges(tris)
+    keys = np.minimum(a, b) * num_verts + np.maximum(a, b)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    counts = np.diff(np.r_[starts, len(sorted_keys)])
+
+    not_manifold = order[np.repeat(counts != 2, counts)]
+    locked[a[not_manifold]] = True
+    locked[b[not_manifold]] = True
+
+    pairs = starts[counts == 2]
+    h0, h1 = order[pairs], order[pairs + 1]
+    invalid = a[h0] == a[h1]
+    if corner_attrs.shape[-1] > 0:
+        flat_attrs = corner_attrs.reshape((-1, corner_attrs.shape[-1]))
+
+        def _end_corner(h):
+            return h - h % 3 + (h % 3 + 1) % 3
+
+        # Opposite half-edges, the start corner of one matches the end corner of the other
+        diff_start = np.abs(flat_attrs[h0] - flat_attrs[_end_corner(h1)]).max(axis=1)
+        diff_end = np.abs(flat_attrs[_end_corner(h0)] - flat_attrs[h1]).max(axis=1)
+        invalid |= (diff_start > SEAM_TOLERANCE) | (diff_end > SEAM_TOLERANCE)
+    locked[a[h0[invalid]]] = True
+    locked[b[h0[invalid]]] = True
+
+    degenerate = (tris[:, 0] == tris[:, 1]) | (tris[:, 1] == tris[:, 2]) | (tris[:, 2] == tris[:, 0])
+    locked[tris[degenerate].ravel()] = True
+    return locked
+
+
+class MeshSimplifier:
+    """Simplifies a triangle mesh. ``simplify`` can be called multiple times with decreasing targets to build a LOD
+    chain, each call continues from the result of the previous one.
+
+    :param positions: Vertex positions.
+    :param tris: Vertex indices of each triangle.
+    :param corner_attrs: Attributes of each triangle corner, shape ``(num_tris, 3, num_attrs)``.
+    :param vertex_attrs: Attributes of each vertex whose difference is penalized when collapsing, e.g. bone weights.
+    :param face_attrs: Attributes of each triangle, e.g. material index. Boundaries between different values are kept.
+    :param locked: Additional vertices that can't be removed.
+    """
+
+    def __init__(
+        self,
+        positions: NDArray[np.float64],
+        tris: NDArray[np.int64],
+        corner_attrs: Optional[NDArray[np.float64]] = None,
+        vertex_attrs: Optional[NDArray[np.float64]] = None,
+        face_attrs: Optional[NDArray[np.float64]] = None,
+        locked: Optional[NDArray[np.bool_]] = None,
+    ):
+        num_verts = len(positions)
+        self.positions = np.asarray(positions, dtype=np.float64)
+        self.tris = np.asarray(tris, dtype=np.int64).reshape((-1, 3))
+        self.corner_attrs = (
+            np.zeros((len(self.tris), 3, 0)) if corner_attrs is None else np.asarray(corner_attrs, dtype=np.float64)
+        )
+        self.vertex_attrs = vertex_attrs
+        self.tri_indices = np.arange(len(self.tris))
+        """Index in the original mesh of each remaining triangle."""
+        seam_attrs = self.corner_attrs
+        if face_attrs is not None:
+            face_attrs = np.asarray(face_attrs, dtype=np.float64).reshape((len(self.tris), 1, -1))
+            seam_attrs = np.concatenate((seam_attrs, np.repeat(face_attrs, 3, axis=1)), axis=2)
+        self.locked = find_locked_vertices(num_verts, self.tris, seam_attrs)
+        if locked is not None:
+            self.locked |= locked
+        self.quadrics, self.quadric_areas = self._vertex_quadrics()
+        self.error = 0.0
+        self._rng = np.random.default_rng(0)
+
+    @property
+    def num_tris(self) -> int:
+        return len(self.tris)
+
+    def _vertex_quadrics(self) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Gets the area-weighted sum of the plane quadrics of the triangles around each vertex, and the sum of the
+        weights."""
+        normals = _triangle_normals(self.positions, self.tris)
+        lengths = np.linalg.norm(normals, axis=1)
+        valid = lengths > 0.0
+        normals[valid] /= lengths[valid, None]
+        normals[~valid] = 0.0
+        planes = np.empty((len(normals), 4))
+        planes[:, :3] = normals
+        planes[:, 3] = -np.einsum("ij,ij->i", normals, self.positions[self.tris[:, 0]])
+        areas = lengths * 0.5
+        tri_quadrics = (planes[:, :, None] * planes[:, None, :]).reshape((-1, 16)) * areas[:, None]
+
+        num_verts = len(self.positions)
+        corner_verts = self.tris.ravel()
+        quadrics = np.empty((num_verts, 16))
+        for i in range(16):
+            quadrics[:, i] = np.bincount(corner_verts, weights=np.repeat(tri_quadrics[:, i], 3), minlength=num_verts)
+        quadric_areas = np.bincount(corner_verts, weights=np.repeat(areas, 3), minlength=num_verts)
+        return quadrics.reshape((num_verts, 4, 4)), quadric_areas
+
+    def _collapse_costs(
+        self, u: NDArray[np.int64], v: NDArray[np.int64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Gets the squared error and total cost of collapsing each vertex ``u`` into ``v``. The error is the mean
+        squared distance from the new position to the planes of the original triangles merged into ``v``."""
+        p = np.ones((len(v), 4))
+        p[:, :3] = self.positions[v]
+        quadrics = self.quadrics[u] + self.quadrics[v]
+        cost = np.maximum(np.einsum("ei,eij,ej->e", p, quadrics, p), 0.0)
+        areas = self.quadric_areas[u] + self.quadric_areas[v]
+        error = cost / np.where(areas > 0.0, areas, 1.0)
+        if self.vertex_attrs is not None:
+            # Penalize as if the vertex moved the length of the edge times the attribute difference
+            edge = self.positions[u] - self.positions[v]
+            edge_length_sq = np.einsum("ij,ij->i", edge, edge)
+            attr_diff = np.abs(self.vertex_attrs[u] - self.vertex_attrs[v]).sum(axis=1)
+            cost = cost + VERTEX_ATTR_PENALTY * attr_diff * edge_length_sq * areas
+        return error, cost
+
+    def _select_independent(self, u: NDArray[np.int64], v: NDArray[np.int64]) -> NDArray[np.int64]:
+        """Selects a set of collapses where no triangle is modified by more than one collapse. Collapses are picked
+        when they have the highest random priority in their neighbourhood, which gives large independent sets even
+        when the costs change smoothly over the mesh."""
+        num_verts = len(self.positions)
+        no_rank = len(u)
+        rank = self._rng.permutation(len(u))
+        order = np.argsort(rank)
+
+        # With repeated indices the last assignment wins, assign from highest to lowest rank to keep the minimum
+        desc = order[::-1]
+        vertex_min = np.full(num_verts, no_rank, dtype=np.int64)
+        vertex_min[np.stack((u[desc], v[desc]), axis=1).ravel()] = np.repeat(rank[desc], 2)
+        tri_min = vertex_min[self.tris].min(axis=1)
+        tri_desc = np.argsort(tri_min, kind="stable")[::-1]
+        ring_min = np.full(num_verts, no_rank, dtype=np.int64)
+        ring_min[self.tris[tri_desc].ravel()] = np.repeat(tri_min[tri_desc], 3)
+
+        return np.flatnonzero((rank == ring_min[u]) & (rank == ring_min[v]))
+
+    def _check_link_condition(
+        self, su: NDArray[np.int64], sv: NDArray[np.int64], edge_u: NDArray[np.int64], edge_v: NDArray[np.int64]
+    ) -> NDArray[np.bool_]:
+        """Checks that each collapse keeps the mesh manifold: the endpoints of the edge must only share the two
+        vertices opposite to the edge. ``edge_u`` and ``edge_v`` are all the directed edges of the mesh, sorted."""
+        num_verts = len(self.positions)
+        offsets = np.searchsorted(edge_u, np.arange(num_verts + 1))
+        counts = offsets[su + 1] - offsets[su]
+        edge_of_neighbour = np.repeat(np.arange(len(su)), counts)
+        neighbour_index = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        neighbours = edge_v[offsets[su][edge_of_neighbour] + neighbour_index]
+
+        keys = edge_u * num_verts + edge_v
+        query = sv[edge_of_neighbour] * num_verts + neighbours
+        found = keys[np.minimum(np.searchsorted(keys, query), len(keys) - 1)] == query
+        num_common = np.bincount(edge_of_neighbour, weights=found, minlength=len(su))
+        return num_common == 2
+
+    def _check_flips(self, su: NDArray[np.int64], sv: NDArray[np.int64]) -> NDArray[np.bool_]:
+        """Checks that no triangle adjacent to the removed vertex flips or degenerates after each collapse."""
+        num_verts = len(self.positions)
+        target = np.arange(num_verts)
+        target[su] = sv
+        collapse_of_vertex = np.full(num_verts, -1, dtype=np.int64)
+        collapse_of_vertex[su] = np.arange(len(su))
+
+        affected = np.flatnonzero((collapse_of_vertex[self.tris] >= 0).any(axis=1))
+        old_tris = self.tris[affected]
+        new_tris = target[old_tris]
+        remaining = (
+            (new_tris[:, 0] != new_tris[:, 1]) & (new_tris[:, 1] != new_tris[:, 2]) & (new_tris[:, 2] != new_tris[:, 0])
+        )
+        old_tris = old_tris[remaining]
+        new_tris = new_tris[remaining]
+
+        old_normals = _triangle_normals(self.positions, old_tris)
+        new_normals = _triangle_normals(self.positions, new_tris)
+        old_lengths = np.linalg.norm(old_normals, axis=1)
+        new_lengths = np.linalg.norm(new_normals, axis=1)
+        dot = np.einsum("ij,ij->i", old_normals, new_normals)
+        flipped = (dot <= FLIP_COS_THRESHOLD * old_lengths * new_lengths) & (old_lengths > 0.0)
+        # Also reject collapses that turn triangles into slivers
+        new_quality = _triangle_quality(self.positions, new_tris, new_lengths)
+        old_quality = _triangle_quality(self.positions, old_tris, old_lengths)
+        flipped |= (new_quality < MIN_TRIANGLE_QUALITY) & (new_quality < old_quality * 0.5)
+
+        ok = np.ones(len(su), dtype=bool)
+        ok[collapse_of_vertex[old_tris[flipped]].max(axis=1)] = False
+        return ok
+
+    def _apply_collapses(self, su: NDArray[np.int64], sv: NDArray[np.int64]):
+        num_verts = len(self.positions)
+        target = np.arange(num_verts)
+        target[su] = sv
+        collapse_of_vertex = np.full(num_verts, -1, dtype=np.int64)
+        collapse_of_vertex[su] = np.arange(len(su))
+
+        tris = self.tris
+        new_tris = target[tris]
+        removed = (
+            (new_tris[:, 0] == new_tris[:, 1]) | (new_tris[:, 1] == new_tris[:, 2]) | (new_tris[:, 2] == new_tris[:, 0])
+        )
+
+        if self.corner_attrs.shape[-1] > 0:
+            # The triangles around the removed vertex take the corner attributes of the kept vertex from the removed
+            # triangles. The removed vertex is not on a seam, so both removed triangles have the same values.
+            removed_tris = np.flatnonzero(removed)
+            removed_collapses = collapse_of_vertex[tris[removed_tris]]
+            u_corner = removed_collapses.argmax(axis=1)
+            collapse = removed_collapses[np.arange(len(removed_tris)), u_corner]
+            v_corner = (tris[removed_tris] == sv[collapse, None]).argmax(axis=1)
+            collapse_attrs = np.zeros((len(su), self.corner_attrs.shape[-1]))
+            collapse_attrs[collapse] = self.corner_attrs[removed_tris, v_corner]
+
+            corner_collapses = collapse_of_vertex[tris]
+            updated = (corner_collapses >= 0) & ~removed[:, None]
+            self.corner_attrs[updated] = collapse_attrs[corner_collapses[updated]]
+
+        self.quadrics[sv] += self.quadrics[su]
+        self.quadric_areas[sv] += self.quadric_areas[su]
+        self.tris = new_tris[~removed]
+        self.corner_attrs = self.corner_attrs[~removed]
+        self.tri_indices = self.tri_indices[~removed]
+
+    def simplify(self, target_tris: int = 0, max_error: float = np.inf) -> SimplifyResult:
+        """Collapses edges until the mesh has ``target_tris`` triangles or any further collapse would have an error
+        larger than ``max_error``."""
+        num_verts = len(self.positions)
+        max_error_sq = max_error * max_error
+        blocked = np.empty(0, dtype=np.int64)
+        while len(self.tris) > target_tris:
+            a, b = _half_edges(self.tris)
+            keys = np.unique(np.concatenate((a * num_verts + b, b * num_verts + a)))
+            edge_u, edge_v = np.divmod(keys, num_verts)
+
+            candidates = ~self.locked[edge_u]
+            if len(blocked) > 0:
+                candidates &= ~np.isin(keys, blocked)
+            candidates = np.flatnonzero(candidates)
+            error, cost = self._collapse_costs(edge_u[candidates], edge_v[candidates])
+            within_error = error <= max_error_sq
+            candidates, error, cost = candidates[within_error], error[within_error], cost[within_error]
+            if len(candidates) == 0:
+                break
+
+            # Only consider the cheapest collapse of each vertex, and the cheapest fraction of those in this batch
+            by_vertex = np.lexsort((cost, edge_u[candidates]))
+            sorted_u = edge_u[candidates[by_vertex]]
+            best = by_vertex[np.r_[True, sorted_u[1:] != sorted_u[:-1]]]
+            num_considered = max(1, int(len(best) * BATCH_FRACTION))
+            best = best[np.argsort(cost[best], kind="stable")[:num_considered]]
+            candidates, error, cost = candidates[best], error[best], cost[best]
+
+            selected = self._select_independent(edge_u[candidates], edge_v[candidates])
+            # Each collapse removes two triangles, don't go below the target
+            max_collapses = (len(self.tris) - target_tris + 1) // 2
+            if len(selected) > max_collapses:
+                selected = selected[np.argsort(cost[selected], kind="stable")[:max_collapses]]
+
+            su, sv = edge_u[candidates[selected]], edge_v[candidates[selected]]
+            ok = self._check_link_condition(su, sv, edge_u, edge_v) & self._check_flips(su, sv)
+            if not ok.all():
+                blocked = np.concatenate((blocked, keys[candidates[selected[~ok]]]))
+            if not ok.any():
+                continue
+
+            self._apply_collapses(su[ok], sv[ok])
+            self.error = max(self.error, float(np.sqrt(error[selected[ok]].max())))
+            if len(blocked) > 0:
+                # Blocked collapses around the modified triangles may be valid now
+                modified = np.zeros(num_verts, dtype=bool)
+                modified[sv[ok]] = True
+                modified[self.tris[modified[self.tris].any(axis=1)].ravel()] = True
+                blocked_u, blocked_v = np.divmod(blocked, num_verts)
+                blocked = blocked[~(modified[blocked_u] | modified[blocked_v])]
+
+        return SimplifyResult(len(self.tris), self.error)
+
+
+class BlenderMeshSimplifier:
+    """Simplifies a Blender mesh, keeping its attributes, custom normals, materials and vertex group weights."""
+
+    def __init__(self, mesh: bpy.types.Mesh):
+        self.mesh = mesh
+        num_verts = len(mesh.vertices)
+
+        positions = np.empty(num_verts * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", positions)
+
+        mesh.calc_loop_triangles()
+        num_tris = len(mesh.loop_triangles)
+        tri_loops = np.empty(num_tris * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("loops", tri_loops)
+        tri_verts = np.empty(num_tris * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", tri_verts)
+        self.tri_polygons = np.empty(num_tris, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("polygon_index", self.tri_polygons)
+
+        self.point_attrs: dict[str, tuple[str, NDArray]] = {}
+        self.face_attrs: dict[str, tuple[str, NDArray]] = {}
+        self.corner_attr_slices: dict[str, tuple[str, slice]] = {}
+        corner_values = []
+        num_corner_values = 0
+        sharp_edges = None
+        for attr in mesh.attributes:
+            value_props = _ATTRIBUTE_VALUE_PROPS.get(attr.data_type, None)
+            if attr.name.startswith(".") or attr.name == "position" or value_props is None:
+                continue
+
+            prop, size = value_props
+            if attr.data_type == "BOOLEAN":
+                dtype = bool
+            elif attr.data_type.startswith("INT"):
+                dtype = np.int32
+            else:
+                dtype = np.float32
+            values = np.empty(len(attr.data) * size, dtype=dtype)
+            attr.data.foreach_get(prop, values)
+            values = values.reshape((-1, size))
+            if attr.domain == "POINT":
+                self.point_attrs[attr.name] = (attr.data_type, values)
+            elif attr.domain == "FACE":
+                self.face_attrs[attr.name] = (attr.data_type, values)
+            elif attr.domain == "CORNER":
+                attr_slice = slice(num_corner_values, num_corner_values + size)
+                self.corner_attr_slices[attr.name] = (attr.data_type, attr_slice)
+                corner_values.append(values)
+                num_corner_values += size
+            elif attr.domain == "EDGE" and attr.name == "sharp_edge":
+                sharp_edges = values.ravel()
+
+        if mesh.has_custom_normals:
+            # Custom normals are kept as a corner attribute, other normals are recalculated from the sharp edges and
+            # faces of the simplified mesh
+            corner_normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+            if bpy.app.version < (4, 1, 0):
+                # needed to fill mesh loops normals with custom split normals pre-4.1
+                mesh.calc_normals_split()
+                mesh.loops.foreach_get("normal", corner_normals)
+            else:
+                mesh.corner_normals.foreach_get("vector", corner_normals)
+            self.normals_slice = slice(num_corner_values, num_corner_values + 3)
+            corner_values.append(corner_normals.reshape((-1, 3)))
+        corner_attrs = np.concatenate(corner_values, axis=1) if corner_values else np.zeros((len(mesh.loops), 0))
+        corner_attrs = corner_attrs[tri_loops].reshape((num_tris, 3, -1))
+        face_attrs = [values[self.tri_polygons] for _, values in self.face_attrs.values()]
+        face_attrs = np.concatenate(face_attrs, axis=1) if face_attrs else None
+
+        locked = np.zeros(num_verts, dtype=bool)
+        self.sharp_edge_keys = None
+        if sharp_edges is not None:
+            edge_verts = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+            mesh.edges.foreach_get("vertices", edge_verts)
+            edge_verts = edge_verts.reshape((-1, 2))[sharp_edges]
+            self.sharp_edge_keys = np.sort(edge_verts.min(axis=1).astype(np.int64) * num_verts + edge_verts.max(axis=1))
+            locked[edge_verts.ravel()] = True
+
+        self.vertex_groups = self._read_vertex_groups()
+        self.simplifier = MeshSimplifier(
+            positions.reshape((-1, 3)),
+            tri_verts.reshape((-1, 3)),
+            corner_attrs,
+            self.vertex_groups[1] if self.vertex_groups is not None else None,
+            face_attrs,
+            locked,
+        )
+
+    def _read_vertex_groups(self) -> Optional[tuple[NDArray[np.bool_], NDArray[np.float32]]]:
+        """Gets the vertex group membership and weights of each vertex, or ``None`` if the mesh has no weights."""
+        groups = [[(g.group, g.weight) for g in v.groups] for v in self.mesh.vertices]
+        num_groups = max((group for vert_groups in groups for group, _ in vert_groups), default=-1) + 1
+        if num_groups == 0:
+            return None
+
+        membership = np.zeros((len(groups), num_groups), dtype=bool)
+        weights = np.zeros((len(groups), num_groups), dtype=np.float32)
+        for vert_index, vert_groups in enumerate(groups):
+            for group, weight in vert_groups:
+                membership[vert_index, group] = True
+                weights[vert_index, group] = weight
+        return membership, weights
+
+    @property
+    def num_tris(self) -> int:
+        return self.simplifier.num_tris
+
+    def simplify(self, target_tris: int = 0, max_error: float = np.inf) -> SimplifyResult:
+        return self.simplifier.simplify(target_tris, max_error)
+
+    def create_mesh(self, name: str) -> bpy.types.Mesh:
+        """Creates a mesh from the current simplified triangles."""
+        simplifier = self.simplifier
+        used_verts, corner_verts = np.unique(simplifier.tris, return_inverse=True)
+        num_tris = len(simplifier.tris)
+        face_polygons = self.tri_polygons[simplifier.tri_indices]
+
+        mesh = bpy.data.meshes.new(name)
+        mesh.vertices.add(len(used_verts))
+        mesh.vertices.foreach_set("co", simplifier.positions[used_verts].astype(np.float32).ravel())
+        mesh.loops.add(num_tris * 3)
+        mesh.loops.foreach_set("vertex_index", corner_verts.astype(np.int32).ravel())
+        mesh.polygons.add(num_tris)
+        mesh.polygons.foreach_set("loop_start", np.arange(0, num_tris * 3, 3, dtype=np.int32))
+        mesh.update(calc_edges=True)
+
+        for material in self.mesh.materials:
+            mesh.materials.append(material)
+
+        def _add_attribute(name: str, data_type: str, domain: str, values: NDArray):
+            attr = mesh.attributes.get(name, None) or mesh.attributes.new(name, data_type, domain)
+            attr.data.foreach_set(_ATTRIBUTE_VALUE_PROPS[data_type][0], values.ravel())
+
+        for attr_name, (data_type, values) in self.point_attrs.items():
+            _add_attribute(attr_name, data_type, "POINT", values[used_verts])
+        for attr_name, (data_type, values) in self.face_attrs.items():
+            _add_attribute(attr_name, data_type, "FACE", values[face_polygons])
+        corner_attrs = simplifier.corner_attrs.reshape((num_tris * 3, -1))
+        for attr_name, (data_type, attr_slice) in self.corner_attr_slices.items():
+            values = corner_attrs[:, attr_slice]
+            if data_type == "BOOLEAN":
+                values = values != 0.0
+            elif data_type.startswith("INT"):
+                values = np.rint(values).astype(np.int32)
+            else:
+                values = values.astype(np.float32)
+            _add_attribute(attr_name, data_type, "CORNER", values)
+
+        self._copy_active_layers(mesh)
+
+        if self.sharp_edge_keys is not None and len(self.sharp_edge_keys) > 0:
+            edge_verts = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+            mesh.edges.foreach_get("vertices", edge_verts)
+            edge_verts = used_verts[edge_verts].reshape((-1, 2))
+            keys = edge_verts.min(axis=1) * len(self.mesh.vertices) + edge_verts.max(axis=1)
+            _add_attribute("sharp_edge", "BOOLEAN", "EDGE", np.isin(keys, self.sharp_edge_keys))
+
+        if self.vertex_groups is not None:
+            self._write_vertex_groups(mesh, used_verts)
+
+        if bpy.app.version < (4, 1, 0) and (self.mesh.use_auto_smooth or self.mesh.has_custom_normals):
+            # needed to use custom split normals and sharp edges pre-4.1
+            mesh.use_auto_smooth = True
+            mesh.auto_smooth_angle = self.mesh.auto_smooth_angle
+
+        if self.mesh.has_custom_normals:
+            mesh.normals_split_custom_set(corner_attrs[:, self.normals_slice].astype(np.float32))
+
+        return mesh
+
+    def _copy_active_layers(self, mesh: bpy.types.Mesh):
+        src = self.mesh
+        for uv_layer in src.uv_layers:
+            if uv_layer.active_render and uv_layer.name in mesh.uv_layers:
+                mesh.uv_layers[uv_layer.name].active_render = True
+        if src.uv_layers.active is not None and src.uv_layers.active.name in mesh.uv_layers:
+            mesh.uv_layers.active = mesh.uv_layers[src.uv_layers.active.name]
+        if src.color_attributes.active_color_name in mesh.color_attributes:
+            mesh.color_attributes.active_color_name = src.color_attributes.active_color_name
+        if src.color_attributes.default_color_name in mesh.color_attributes:
+            mesh.color_attributes.default_color_name = src.color_attributes.default_color_name
+
+    def _write_vertex_groups(self, mesh: bpy.types.Mesh, used_verts: NDArray[np.int64]):
+        membership, weights = self.vertex_groups
+        membership = membership[used_verts]
+        weights = weights[used_verts]
+
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        deform_layer = bm.verts.layers.deform.verify()
+        for vert, vert_membership, vert_weights in zip(bm.verts, membership, weights):
+            deform = vert[deform_layer]
+            for group in np.flatnonzero(vert_membership):
+                deform[int(group)] = float(vert_weights[group])
+        bm.to_mesh(mesh)
+        bm.free()
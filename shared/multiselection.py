@@ -356,6 +356,9 @@ class MultiSelectCollection(Generic[TItem, TItemAccess]):
     def __getitem__(self, index: int) -> TItem:
         return self.collection[index]
 
+    def __iter__(self) -> Iterator[TItem]:
+        return iter(self.collection)
+
     @property
     def has_multiple_selection(self) -> bool:
         return len(self.selection_indices) > 1
@@ -0,0 +1,201 @@
+"""Copying of the embedded textures of exported drawables to their texture folders.
+
+Copies run on a thread pool. A source file is identified by its path, size and modification time. During an export
+operation (see ``use_texture_copier``) each source file is read at most once: the first copy of a texture reads the
+source, and the other texture folders that need it are filled from that first copy. Destination files that are already
+up to date are not copied again.
+"""
+
+import os
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, NamedTuple, Optional
+from .. import logger, profiler
+
+
+class SourceKey(NamedTuple):
+    path: str
+    size: int
+    mtime_ns: int
+
+
+class CopyResult(NamedTuple):
+    src_key: SourceKey
+    dst_path: str
+    copied: bool
+    """``False`` if the destination was already up to date."""
+
+
+def is_up_to_date(src_key: SourceKey, dst_path: str) -> bool:
+    """Checks whether ``dst_path`` already has the contents of the source file. Copied files keep the modification time
+    of the source, so the destination is up to date only if it has the same size and the exact same modification time.
+    Textures of the same format and dimensions have the same size, so a newer destination is not assumed to be a copy.
+    """
+    try:
+        dst_stat = os.stat(dst_path)
+    except OSError:
+        return False
+
+    return dst_stat.st_size == src_key.size and dst_stat.st_mtime_ns == src_key.mtime_ns
+
+
+def _copy_file(src_key: SourceKey, dst_path: str) -> CopyResult:
+    # Also true when the destination is the source file itself, which ``shutil.copy2`` would fail to copy
+    if is_up_to_date(src_key, dst_path):
+        return CopyResult(src_key, dst_path, False)
+
+    shutil.copy2(src_key.path, dst_path)
+    return CopyResult(src_key, dst_path, True)
+
+
+def _copy_from_first_copy(first_copy: Future, src_key: SourceKey, dst_path: str) -> CopyResult:
+    """Copies a texture already copied to another destination from that copy instead of from the source. The first copy
+    was queued earlier, so it has already started in another thread.
+    """
+    if is_up_to_date(src_key, dst_path):
+        return CopyResult(src_key, dst_path, False)
+
+    try:
+        local_path = first_copy.result().dst_path
+    except OSError:
+        # The first copy failed, try to read the source again
+        local_path = src_key.path
+
+    shutil.copy2(local_path, dst_path)
+    return CopyResult(src_key, dst_path, True)
+
+
+class TextureCopier:
+    """Copies files to directories on a thread pool. Each source file is read at most once, and each destination file is
+    written at most once.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self.num_copied = 0
+        self.num_skipped = 0
+        self.bytes_copied = 0
+        self.bytes_skipped = 0
+        self.num_failed = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: list[Future] = []
+        self._first_copies: dict[SourceKey, Future] = {}
+        self._destinations: dict[str, SourceKey] = {}
+        self._created_dirs: set[str] = set()
+
+    def copy(self, src_path: str, dst_directory: str) -> bool:
+        """Queues the copy of ``src_path`` to ``dst_directory``, keeping the file name. Returns ``False`` if the source
+        file does not exist.
+        """
+        if not os.path.isfile(src_path):
+            return False
+
+        src_stat = os.stat(src_path)
+
+        src_key = SourceKey(os.path.normcase(os.path.abspath(src_path)), src_stat.st_size, src_stat.st_mtime_ns)
+        dst_path = os.path.normcase(os.path.abspath(os.path.join(dst_directory, os.path.basename(src_path))))
+        queued_src_key = self._destinations.get(dst_path, None)
+        if queued_src_key == src_key:
+            self.num_skipped += 1
+            self.bytes_skipped += src_key.size
+            return True
+        elif queued_src_key is not None:
+            # Only one writer per destination file, the first texture queued with this name is kept
+            logger.warning(
+                f"Texture '{src_path}' has the same name as texture '{queued_src_key.path}' in '{dst_directory}'! "
+                "Skipping texture..."
+            )
+            return True
+
+        self._destinations[dst_path] = src_key
+        if dst_directory not in self._created_dirs:
+            os.makedirs(dst_directory, exist_ok=True)
+            self._created_dirs.add(dst_directory)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="SollumzTextureCopy")
+
+        first_copy = self._first_copies.get(src_key, None)
+        if first_copy is None:
+            future = self._first_copies[src_key] = self._executor.submit(_copy_file, src_key, dst_path)
+        else:
+            future = self._executor.submit(_copy_from_first_copy, first_copy, src_key, dst_path)
+        self._pending.append(future)
+        return True
+
+    def wait(self):
+        """Waits for the queued copies to finish. Copies that failed are logged as errors."""
+        if not self._pending:
+            return
+
+        num_copied, num_skipped = self.num_copied, self.num_skipped
+        with profiler.span("copy_textures"):
+            for future in self._pending:
+                try:
+                    result = future.result()
+                except OSError as e:
+                    self.num_failed += 1
+                    logger.error(f"Failed to copy texture: {e}")
+                    continue
+
+                if result.copied:
+                    self.num_copied += 1
+                    self.bytes_copied += result.src_key.size
+                else:
+                    self.num_skipped += 1
+                    self.bytes_skipped += result.src_key.size
+
+            self._pending.clear()
+            profiler.count("textures_copied", self.num_copied - num_copied)
+            profiler.count("textures_skipped", self.num_skipped - num_skipped)
+
+    def close(self):
+        """Waits for the queued copies and stops the worker threads."""
+        try:
+            self.wait()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def format_summary(self) -> str:
+        return (
+            f"Copied {self.num_copied} texture(s) ({_format_size(self.bytes_copied)}), "
+            f"skipped {self.num_skipped} up to date texture(s) ({_format_size(self.bytes_skipped)})"
+        )
+
+
+def _format_size(num_bytes: int) -> str:
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
+
+    size = num_bytes / 1024
+    for unit in ("KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+_active_copier: Optional[TextureCopier] = None
+
+
+def get_active_texture_copier() -> Optional[TextureCopier]:
+    return _active_copier
+
+
+@contextmanager
+def use_texture_copier(copier: Optional[TextureCopier] = None) -> Iterator[TextureCopier]:
+    """Shares ``copier`` with all the exports done in the body, so textures used by multiple drawables are only copied
+    once. The queued copies are finished when the body exits.
+    """
+    global _active_copier
+    copier = copier or TextureCopier()
+    prev_copier = _active_copier
+    _active_copier = copier
+    try:
+        yield copier
+    finally:
+        _active_copier = prev_copier
+        copier.close()
@@ -1,4 +1,5 @@
 import bpy
+import itertools
 import traceback
 import time
 from typing import Optional
@@ -10,7 +11,7 @@ from .tools.blenderhelper import get_bone_pose_matrix
 
 
 from .sollumz_preferences import get_export_settings
-from .tools.blenderhelper import get_children_recursive, get_object_with_children
+from .tools.blenderhelper import get_children_recursive
 from .sollumz_properties import BOUND_TYPES, SollumType, MaterialType, LODLevel
 
 
@@ -62,10 +63,21 @@ class SOLLUMZ_OT_base:
 
 def set_object_collection(obj):
     target = bpy.context.view_layer.active_layer_collection.collection
-    objs = get_object_with_children(obj)
+    objs = [obj, *obj.children_recursive]
+
+    # Find the first collection of each object in a single pass, `Object.users_collection` goes through every
+    # collection each time it is accessed, which is too slow for hierarchies with thousands of objects
+    objs_set = set(objs)
+    first_collections = {}
+    all_collections = itertools.chain(bpy.data.collections, (scene.collection for scene in bpy.data.scenes))
+    for collection in all_collections:
+        for collection_obj in collection.objects:
+            if collection_obj in objs_set:
+                first_collections.setdefault(collection_obj, collection)
+
     for obj in objs:
-        if len(obj.users_collection) > 0:
-            collection = obj.users_collection[0]
+        collection = first_collections.get(obj, None)
+        if collection is not None:
             collection.objects.unlink(obj)
         target.objects.link(obj)
 
@@ -99,28 +111,30 @@ def has_collision(obj):
 
 
 def duplicate_object_with_children(obj):
-    objs = get_object_with_children(obj)
+    objs = [obj, *obj.children_recursive]
     new_objs = []
+    copies = {}
     for o in objs:
         new_obj = o.copy()
         new_obj.animation_data_clear()
         new_objs.append(new_obj)
+        copies[o] = new_obj
     new_objs[0].parent = None
     for i in range(1, len(objs)):
         if objs[i].parent:
-            new_objs[i].parent = new_objs[objs.index(objs[i].parent)]
+            new_objs[i].parent = copies[objs[i].parent]
     for new_obj in new_objs:
         bpy.context.scene.collection.objects.link(new_obj)
         for constraint in new_obj.constraints:
-            if hasattr(constraint, "target") and constraint.target in objs:
-                constraint.target = new_objs[objs.index(constraint.target)]
+            if hasattr(constraint, "target") and constraint.target in copies:
+                constraint.target = copies[constraint.target]
     return new_objs[0]
 
 
 def find_sollumz_parent(obj: bpy.types.Object, parent_type: Optional[SollumType] = None) -> bpy.types.Object | None:
     """Find parent Fragment or Drawable if one exists. Returns None otherwise."""
     parent_types = [SollumType.FRAGMENT, SollumType.DRAWABLE, SollumType.DRAWABLE_DICTIONARY,
-                    SollumType.CLIP_DICTIONARY, SollumType.YMAP, SollumType.BOUND_COMPOSITE]
+                    SollumType.CLIP_DICTIONARY, SollumType.YMAP, SollumType.BOUND_COMPOSITE, SollumType.NAVMESH]
 
     if parent_type is not None and obj.parent is not None and obj.parent.sollum_type == parent_type:
         return obj.parent
@@ -9,7 +9,12 @@ from bpy_extras.io_utils import ImportHelper
 from mathutils import Matrix, Quaternion
 from .sollumz_helper import SOLLUMZ_OT_base, find_sollumz_parent
 from .sollumz_properties import SollumType, SOLLUMZ_UI_NAMES, BOUND_TYPES, TimeFlagsMixin, ArchetypeType, LODLevel
-from .sollumz_preferences import get_export_settings
+from .sollumz_preferences import (
+    get_export_settings,
+    get_import_settings,
+    SollumzExportSettings,
+    SollumzImportSettings,
+)
 from .cwxml.drawable import YDR, YDD
 from .cwxml.fragment import YFT
 from .cwxml.bound import YBN
@@ -26,6 +31,7 @@ from .yft.yftexport import export_yft
 from .ybn.ybnimport import import_ybn
 from .ybn.ybnexport import export_ybn
 from .ynv.ynvimport import import_ynv
+from .ynv.ynvexport import export_ynv
 from .ycd.ycdimport import import_ycd
 from .ycd.ycdexport import export_ycd
 from .ymap.ymapimport import import_ymap
@@ -33,12 +39,34 @@ from .ymap.ymapexport import export_ymap
 from .ytyp.ytypimport import import_ytyp
 from .tools.blenderhelper import add_child_of_bone_constraint, get_child_of_pose_bone, apply_terrain_brush_setting_to_current_brush, remove_number_suffix, create_blender_object, join_objects
 from .tools.ytyphelper import ytyp_from_objects
+from .shared.export_fingerprint import (
+    compute_export_fingerprint,
+    is_export_up_to_date,
+    store_export_state,
+    clear_export_state,
+)
+from .shared.texture_copier import use_texture_copier
 from .ybn.properties import BoundFlags
 
-from . import logger
+from . import logger, profiler
+
+
+EXPORT_FUNCTIONS = {
+    SollumType.DRAWABLE: (YDR.file_extension, export_ydr),
+    SollumType.DRAWABLE_DICTIONARY: (YDD.file_extension, export_ydd),
+    SollumType.FRAGMENT: (YFT.file_extension, export_yft),
+    SollumType.CLIP_DICTIONARY: (YCD.file_extension, export_ycd),
+    SollumType.BOUND_COMPOSITE: (YBN.file_extension, export_ybn),
+    SollumType.YMAP: (YMAP.file_extension, export_ymap),
+    SollumType.NAVMESH: (YNV.file_extension, export_ynv),
+}
+"""File extension and export function of each Sollumz type that can be exported to a file."""
 
 
 class TimedOperator:
+    trace_file_name = "sollumz_trace.json"
+    """Name of the profile trace file written to ``self.directory``."""
+
     @property
     def time_elapsed(self) -> float:
         """Get time elapsed since execution"""
@@ -50,11 +78,39 @@ class TimedOperator:
 
     def execute(self, context: bpy.types.Context):
         self._start = time.time()
-        return self.execute_timed(context)
+        settings = self.get_profile_settings(context)
+        if settings is None or not settings.profile:
+            return self.execute_timed(context)
+
+        with profiler.use_profiler(profiler.Profiler()) as prof:
+            result = self.execute_timed(context)
+
+        with logger.use_operator_logger(self):
+            logger.info(f"Profile:\n{prof.format_report()}")
+            if settings.profile_trace:
+                trace_filepath = self.get_trace_filepath()
+                try:
+                    prof.write_chrome_trace(trace_filepath)
+                    logger.info(f"Profile trace written to '{trace_filepath}'")
+                except OSError as e:
+                    logger.error(f"Failed to write profile trace to '{trace_filepath}': {e}")
+
+        return result
 
     def execute_timed(self, context: bpy.types.Context):
         ...
 
+    def get_profile_settings(
+        self, context: bpy.types.Context
+    ) -> Optional[SollumzImportSettings | SollumzExportSettings]:
+        """Settings with the ``profile`` and ``profile_trace`` options of this operator. ``None`` if it can't be
+        profiled.
+        """
+        return None
+
+    def get_trace_filepath(self) -> str:
+        return os.path.join(self.directory, self.trace_file_name)
+
 
 class SOLLUMZ_OT_import_assets(bpy.types.Operator, ImportHelper, TimedOperator):
     """Import XML files exported by CodeWalker"""
@@ -62,6 +118,8 @@ class SOLLUMZ_OT_import_assets(bpy.types.Operator, ImportHelper, TimedOperator):
     bl_label = "Import CodeWalker XML"
     bl_options = {"UNDO"}
 
+    trace_file_name = "sollumz_import_trace.json"
+
     directory: bpy.props.StringProperty(subtype="FILE_PATH", options={"HIDDEN", "SKIP_SAVE"})
     files: bpy.props.CollectionProperty(
         name="File Path",
@@ -112,6 +170,7 @@ class SOLLUMZ_OT_import_assets(bpy.types.Operator, ImportHelper, TimedOperator):
                     else:
                         continue
 
+                    profiler.count("files")
                     logger.info(f"Successfully imported '{filepath}'")
                 except:
                     logger.error(f"Error importing: {filepath} \n {traceback.format_exc()}")
@@ -123,6 +182,7 @@ class SOLLUMZ_OT_import_assets(bpy.types.Operator, ImportHelper, TimedOperator):
                 filepath = os.path.join(self.directory, filename)
                 try:
                     import_ytyp(filepath)
+                    profiler.count("files")
                     logger.info(f"Successfully imported '{filepath}'")
                 except:
                     logger.error(f"Error importing: {filepath} \n {traceback.format_exc()}")
@@ -131,6 +191,9 @@ class SOLLUMZ_OT_import_assets(bpy.types.Operator, ImportHelper, TimedOperator):
             logger.info(f"Imported in {self.time_elapsed} seconds")
             return {"FINISHED"}
 
+    def get_profile_settings(self, context):
+        return get_import_settings(context)
+
     def invoke(self, context, event):
         if self.directory and len(self.files) > 0 and self.files[0].name != "":
             # Already have a list of files, don't open the import window and do the import directly.
@@ -176,8 +239,10 @@ class SOLLUMZ_OT_export_assets(bpy.types.Operator, TimedOperator):
     bl_idname = "sollumz.export_assets"
     bl_label = "Export CodeWalker XML"
 
+    trace_file_name = "sollumz_export_trace.json"
+
     filter_glob: bpy.props.StringProperty(
-        default=f"*{YDR.file_extension};*{YDD.file_extension};*{YFT.file_extension};*{YBN.file_extension};*{YCD.file_extension};*{YMAP.file_extension};",
+        default=f"*{YDR.file_extension};*{YDD.file_extension};*{YFT.file_extension};*{YBN.file_extension};*{YCD.file_extension};*{YMAP.file_extension};*{YNV.file_extension};",
         options={"HIDDEN", "SKIP_SAVE"},
         maxlen=255,
     )
@@ -221,46 +286,60 @@ class SOLLUMZ_OT_export_assets(bpy.types.Operator, TimedOperator):
                 return {"CANCELLED"}
 
             any_warnings_or_errors = False
-            for obj in objs:
-                op_log.clear_log_counts()
-                filepath = None
-                try:
-                    success = False
-                    if obj.sollum_type == SollumType.DRAWABLE:
-                        filepath = self.get_filepath(obj, YDR.file_extension)
-                        success = export_ydr(obj, filepath)
-                    elif obj.sollum_type == SollumType.DRAWABLE_DICTIONARY:
-                        filepath = self.get_filepath(obj, YDD.file_extension)
-                        success = export_ydd(obj, filepath)
-                    elif obj.sollum_type == SollumType.FRAGMENT:
-                        filepath = self.get_filepath(obj, YFT.file_extension)
-                        success = export_yft(obj, filepath)
-                    elif obj.sollum_type == SollumType.CLIP_DICTIONARY:
-                        filepath = self.get_filepath(obj, YCD.file_extension)
-                        success = export_ycd(obj, filepath)
-                    elif obj.sollum_type == SollumType.BOUND_COMPOSITE:
-                        filepath = self.get_filepath(obj, YBN.file_extension)
-                        success = export_ybn(obj, filepath)
-                    elif obj.sollum_type == SollumType.YMAP:
-                        filepath = self.get_filepath(obj, YMAP.file_extension)
-                        success = export_ymap(obj, filepath)
-                    else:
+            depsgraph = context.evaluated_depsgraph_get() if export_settings.skip_unchanged else None
+            num_exported = 0
+            num_skipped = 0
+            with use_texture_copier() as texture_copier:
+                for obj in objs:
+                    op_log.clear_log_counts()
+                    export_target = EXPORT_FUNCTIONS.get(obj.sollum_type, None)
+                    if export_target is None:
                         continue
 
-                    if success:
-                        if op_log.has_warnings_or_errors:
-                            logger.info(f"Exported '{filepath}' with WARNINGS or ERRORS! Please check the Info Log for details.")
-                            any_warnings_or_errors = True
+                    file_extension, export_func = export_target
+                    filepath = None
+                    try:
+                        filepath = self.get_filepath(obj, file_extension)
+                        fingerprint = None
+                        if export_settings.skip_unchanged:
+                            fingerprint = compute_export_fingerprint(obj, export_settings, depsgraph)
+                            if is_export_up_to_date(obj, filepath, fingerprint):
+                                num_skipped += 1
+                                continue
+
+                        success = export_func(obj, filepath)
+
+                        if success:
+                            num_exported += 1
+                            profiler.count("files")
+                            if fingerprint is not None:
+                                store_export_state(obj, filepath, fingerprint)
+                            if op_log.has_warnings_or_errors:
+                                logger.info(f"Exported '{filepath}' with WARNINGS or ERRORS! Please check the Info Log for details.")
+                                any_warnings_or_errors = True
+                            else:
+                                logger.info(f"Successfully exported '{filepath}'")
                         else:
-                            logger.info(f"Successfully exported '{filepath}'")
-                    else:
-                        if op_log.has_warnings_or_errors:
-                            logger.info(f"Failed to export '{obj.name}', ERRORS found! Please check the Info Log for details.")
-                            any_warnings_or_errors = True
-                except:
-                    logger.error(f"Error exporting: {filepath or obj.name} \n {traceback.format_exc()}")
+                            clear_export_state(obj)
+                            if op_log.has_warnings_or_errors:
+                                logger.info(f"Failed to export '{obj.name}', ERRORS found! Please check the Info Log for details.")
+                                any_warnings_or_errors = True
+                    except:
+                        clear_export_state(obj)
+                        logger.error(f"Error exporting: {filepath or obj.name} \n {traceback.format_exc()}")
+                        any_warnings_or_errors = True
+                        return {"CANCELLED"}
+
+                op_log.clear_log_counts()
+                texture_copier.wait()
+                if op_log.has_warnings_or_errors:
                     any_warnings_or_errors = True
-                    return {"CANCELLED"}
+
+            if texture_copier.num_copied or texture_copier.num_skipped:
+                logger.info(texture_copier.format_summary())
+
+            if export_settings.skip_unchanged:
+                logger.info(f"Skipped {num_skipped} unchanged object(s), exported {num_exported} object(s)")
 
             if export_settings.export_with_ytyp:
                 ytyp = ytyp_from_objects(objs)
@@ -274,6 +353,9 @@ class SOLLUMZ_OT_export_assets(bpy.types.Operator, TimedOperator):
                 bpy.ops.screen.info_log_show()
             return {"FINISHED"}
 
+    def get_profile_settings(self, context):
+        return get_export_settings(context)
+
     def collect_objects(self, context: bpy.types.Context) -> list[bpy.types.Object]:
         export_settings = get_export_settings()
 
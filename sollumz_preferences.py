@@ -29,8 +29,13 @@ from typing import Optional
 
 PREFS_FILE_NAME = "sollumz_prefs.ini"
 
+_save_preferences_suppressed = False
+
 
 def _save_preferences_on_update(self, context):
+    if _save_preferences_suppressed:
+        return
+
     _save_preferences()
 
 
@@ -42,6 +47,16 @@ class SollumzExportSettings(PropertyGroup):
         update=_save_preferences_on_update
     )
 
+    skip_unchanged: BoolProperty(
+        name="Skip Unchanged Objects",
+        description=(
+            "Don't export objects that haven't changed since they were last exported to the same file. Changes are "
+            "detected on the object hierarchy, its meshes, materials and textures, and the export settings"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
     exclude_skeleton: BoolProperty(
         name="Exclude Skeleton",
         description="Exclude skeleton from export. Usually done with mp ped components",
@@ -84,6 +99,13 @@ class SollumzExportSettings(PropertyGroup):
         update=_save_preferences_on_update
     )
 
+    ymap_grass: BoolProperty(
+        name="Exclude Grass",
+        description="If enabled, ignore all grass batches from the selected ymap(s)",
+        default=False,
+        update=_save_preferences_on_update
+    )
+
     export_lods: EnumProperty(
         name="Toggle LODs",
         description="Toggle LODs to export",
@@ -103,6 +125,16 @@ class SollumzExportSettings(PropertyGroup):
         update=_save_preferences_on_update
     )
 
+    split_geometry_spatially: BoolProperty(
+        name="Spatial Geometry Splitting",
+        description=(
+            "When a geometry has too many vertices and has to be split, group nearby triangles in the same split "
+            "geometry to reduce the number of duplicated vertices. Changes the order in which triangles are drawn"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
     mesh_domain: EnumProperty(
         name="Mesh Domain",
         description="Domain considered for exporting meshes",
@@ -126,6 +158,66 @@ class SollumzExportSettings(PropertyGroup):
         update=_save_preferences_on_update
     )
 
+    ycd_compress_animations: BoolProperty(
+        name="Compress Animations",
+        description=(
+            "Choose the smallest encoding for each animation track whose values stay within the tolerances below. "
+            "The size and maximum error of each animation are reported after exporting"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
+    ycd_position_tolerance: FloatProperty(
+        name="Position Tolerance",
+        description="Maximum error allowed in the position tracks, in meters",
+        default=0.0005,
+        min=0.0,
+        max=1.0,
+        precision=5,
+        step=0.01,
+        update=_save_preferences_on_update
+    )
+
+    ycd_rotation_tolerance: FloatProperty(
+        name="Rotation Tolerance",
+        description="Maximum error allowed in each component of the rotation quaternions",
+        default=0.0005,
+        min=0.0,
+        max=1.0,
+        precision=5,
+        step=0.01,
+        update=_save_preferences_on_update
+    )
+
+    ycd_other_tolerance: FloatProperty(
+        name="Other Tolerance",
+        description="Maximum error allowed in the other tracks, such as scale, UVs and camera properties",
+        default=0.001,
+        min=0.0,
+        max=1.0,
+        precision=5,
+        step=0.01,
+        update=_save_preferences_on_update
+    )
+
+    profile: BoolProperty(
+        name="Profile",
+        description="Measure the time spent in each stage of the export and show it in the Info Log",
+        default=False,
+        update=_save_preferences_on_update
+    )
+
+    profile_trace: BoolProperty(
+        name="Write Trace File",
+        description=(
+            "Also write the measured times to a JSON file in the Chrome trace format, in the output directory. It "
+            "can be viewed in chrome://tracing or https://ui.perfetto.dev"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
     @property
     def export_hi(self) -> bool:
         return "sollumz_export_very_high" in self.export_lods
@@ -192,6 +284,13 @@ class SollumzImportSettings(PropertyGroup):
         update=_save_preferences_on_update
     )
 
+    ymap_grass: BoolProperty(
+        name="Exclude Grass",
+        description="If enabled, ignore all grass batches from the selected ymap(s)",
+        default=False,
+        update=_save_preferences_on_update
+    )
+
     ymap_instance_entities: BoolProperty(
         name="Instance Entities",
         description="If enabled, instance all entities from the selected ymap(s)",
@@ -199,6 +298,25 @@ class SollumzImportSettings(PropertyGroup):
         update=_save_preferences_on_update
     )
 
+    ymap_instance_entities_type: EnumProperty(
+        name="Instance Type",
+        description="How the entities are instanced",
+        default="LINKED_DUPLICATES",
+        items=(
+            (
+                "LINKED_DUPLICATES", "Linked Duplicates",
+                "Copy the archetype object and its children for each entity. The mesh data is shared, but each entity "
+                "copies the whole object hierarchy"
+            ),
+            (
+                "COLLECTION_INSTANCES", "Collection Instances",
+                "Place each entity as an empty instancing a collection with the archetype object and its children. "
+                "Recommended for large ymaps, as each entity only adds a single object"
+            ),
+        ),
+        update=_save_preferences_on_update
+    )
+
     ytyp_mlo_instance_entities: BoolProperty(
         name="Instance MLO Entities",
         description=(
@@ -209,6 +327,23 @@ class SollumzImportSettings(PropertyGroup):
         update=_save_preferences_on_update
     )
 
+    profile: BoolProperty(
+        name="Profile",
+        description="Measure the time spent in each stage of the import and show it in the Info Log",
+        default=False,
+        update=_save_preferences_on_update
+    )
+
+    profile_trace: BoolProperty(
+        name="Write Trace File",
+        description=(
+            "Also write the measured times to a JSON file in the Chrome trace format, in the directory of the "
+            "imported files. It can be viewed in chrome://tracing or https://ui.perfetto.dev"
+        ),
+        default=False,
+        update=_save_preferences_on_update
+    )
+
 
 class SollumzThemeSettings(PropertyGroup):
     def RGBAProperty(name: str, default: tuple[float, float, float]):
@@ -634,9 +769,19 @@ class SollumzAddonPreferences(AddonPreferences):
         box.prop(settings, "ymap_skip_missing_entities")
         box.prop(settings, "ymap_exclude_entities")
         box.prop(settings, "ymap_instance_entities")
+        row = box.row()
+        row.active = settings.ymap_instance_entities
+        row.prop(settings, "ymap_instance_entities_type", expand=True)
         box.prop(settings, "ymap_box_occluders")
         box.prop(settings, "ymap_model_occluders")
         box.prop(settings, "ymap_car_generators")
+        box.prop(settings, "ymap_grass")
+
+        _section_header(box, "Profiling")
+        box.prop(settings, "profile")
+        col = box.column()
+        col.active = settings.profile
+        col.prop(settings, "profile_trace")
 
         # Export settings
         box = layout.box()
@@ -645,10 +790,12 @@ class SollumzAddonPreferences(AddonPreferences):
 
         row = box.row(heading="Limit To")
         row.prop(settings, "limit_to_selected", text="Selected Objects")
+        box.prop(settings, "skip_unchanged")
 
         _section_header(box, "Drawable")
         box.prop(settings, "apply_transforms")
         box.prop(settings, "export_with_ytyp")
+        box.prop(settings, "split_geometry_spatially")
         box.prop(settings, "mesh_domain", expand=True)
 
         _section_header(box, "Fragment")
@@ -662,6 +809,21 @@ class SollumzAddonPreferences(AddonPreferences):
         box.prop(settings, "ymap_box_occluders")
         box.prop(settings, "ymap_model_occluders")
         box.prop(settings, "ymap_car_generators")
+        box.prop(settings, "ymap_grass")
+
+        _section_header(box, "Clip Dictionary")
+        box.prop(settings, "ycd_compress_animations")
+        col = box.column()
+        col.active = settings.ycd_compress_animations
+        col.prop(settings, "ycd_position_tolerance")
+        col.prop(settings, "ycd_rotation_tolerance")
+        col.prop(settings, "ycd_other_tolerance")
+
+        _section_header(box, "Profiling")
+        box.prop(settings, "profile")
+        col = box.column()
+        col.active = settings.profile
+        col.prop(settings, "profile_trace")
 
     def draw_keymap(self, context, layout: UILayout):
         wm = bpy.context.window_manager
@@ -853,16 +1015,31 @@ def _save_preferences():
 
 def _load_preferences():
     # Preferences are loaded via an ini file in <user_blender_path>/<version>/config/sollumz_prefs.ini
+    _load_preferences_file(get_prefs_path())
+
+
+def load_preferences_preset(filepath: str):
+    """Applies the preferences stored in ``filepath``, an ini file with the same format as ``sollumz_prefs.ini``.
+    Settings missing from the file are left unchanged. The preset is not saved to the user preferences.
+    """
+    if not os.path.isfile(filepath):
+        raise FileNotFoundError(f"Preferences preset '{filepath}' not found")
+
+    _load_preferences_file(filepath)
+
+
+def _load_preferences_file(filepath: str):
+    global _save_preferences_suppressed
+
     addon_prefs = get_addon_preferences(bpy.context)
     if addon_prefs is None:
         return
 
-    prefs_path = get_prefs_path()
-    if not os.path.isfile(prefs_path):
+    if not os.path.isfile(filepath):
         return
 
     config = ConfigParser()
-    config.read(prefs_path)
+    config.read(filepath)
     config_dict = {}
     for section in config.keys():
         if section == "DEFAULT":
@@ -873,7 +1050,12 @@ def _load_preferences():
         else:
             config_dict[section] = dict(config[section])
 
-    _update_bpy_struct_from_dict(addon_prefs, config_dict, eval_strings=True)
+    # Each property update would save the preferences file again, only the values read from it are being applied
+    _save_preferences_suppressed = True
+    try:
+        _update_bpy_struct_from_dict(addon_prefs, config_dict, eval_strings=True)
+    finally:
+        _save_preferences_suppressed = False
 
 
 def _get_bpy_struct_as_dict(struct: bpy_struct) -> dict:
@@ -60,6 +60,10 @@ class SollumType(str, Enum):
 
     CHARACTER_CLOTH_MESH = "sollumz_character_cloth_mesh"
 
+    # Added after the other types to keep the indices of the stored enum values in existing .blend files
+    YMAP_GRASS_GROUP = "sollumz_ymap_grass_group"
+    YMAP_GRASS_BATCH = "sollumz_ymap_grass_batch"
+
 
 class LightType(str, Enum):
     NONE = "sollumz_light_none"
@@ -206,9 +210,11 @@ YMAP_GROUP_TYPES = [
     SollumType.YMAP_BOX_OCCLUDER_GROUP,
     SollumType.YMAP_MODEL_OCCLUDER_GROUP,
     SollumType.YMAP_CAR_GENERATOR_GROUP,
+    SollumType.YMAP_GRASS_GROUP,
     SollumType.YMAP_BOX_OCCLUDER,
     SollumType.YMAP_MODEL_OCCLUDER,
     SollumType.YMAP_CAR_GENERATOR,
+    SollumType.YMAP_GRASS_BATCH,
 ]
 
 
@@ -260,9 +266,11 @@ SOLLUMZ_UI_NAMES = {
     SollumType.YMAP_BOX_OCCLUDER_GROUP: "Box Occluder Group",
     SollumType.YMAP_MODEL_OCCLUDER_GROUP: "Model Occluder Group",
     SollumType.YMAP_CAR_GENERATOR_GROUP: "Car Generator Group",
+    SollumType.YMAP_GRASS_GROUP: "Grass Group",
     SollumType.YMAP_BOX_OCCLUDER: "Box Occluder",
     SollumType.YMAP_MODEL_OCCLUDER: "Model Occluder",
     SollumType.YMAP_CAR_GENERATOR: "Car Generator",
+    SollumType.YMAP_GRASS_BATCH: "Grass Batch",
 
     MaterialType.NONE: "None",
     MaterialType.SHADER: "Sollumz Material",
@@ -130,6 +130,13 @@ class SollumzFileSettingsPanel:
         ...
 
 
+def draw_profiling_settings(layout: bpy.types.UILayout, settings: SollumzImportSettings | SollumzExportSettings):
+    layout.prop(settings, "profile")
+    col = layout.column()
+    col.active = settings.profile
+    col.prop(settings, "profile_trace")
+
+
 class SollumzImportSettingsPanel(SollumzFileSettingsPanel):
     operator_id = "SOLLUMZ_OT_import_assets"
 
@@ -182,9 +189,22 @@ class SOLLUMZ_PT_import_ymap(bpy.types.Panel, SollumzImportSettingsPanel):
         layout.prop(settings, "ymap_skip_missing_entities")
         layout.prop(settings, "ymap_exclude_entities")
         layout.prop(settings, "ymap_instance_entities")
+        row = layout.row()
+        row.active = settings.ymap_instance_entities
+        row.prop(settings, "ymap_instance_entities_type", expand=True)
         layout.prop(settings, "ymap_box_occluders")
         layout.prop(settings, "ymap_model_occluders")
         layout.prop(settings, "ymap_car_generators")
+        layout.prop(settings, "ymap_grass")
+
+
+class SOLLUMZ_PT_import_profiling(bpy.types.Panel, SollumzImportSettingsPanel):
+    bl_label = "Profiling"
+    bl_order = 4
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzImportSettings):
+        draw_profiling_settings(layout, settings)
 
 
 class SOLLUMZ_PT_export_include(bpy.types.Panel, SollumzExportSettingsPanel):
@@ -194,6 +214,7 @@ class SOLLUMZ_PT_export_include(bpy.types.Panel, SollumzExportSettingsPanel):
     def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzExportSettings):
         row = layout.row(heading="Limit To")
         row.prop(settings, "limit_to_selected", text="Selected Objects")
+        layout.prop(settings, "skip_unchanged")
 
 
 class SOLLUMZ_PT_export_drawable(bpy.types.Panel, SollumzExportSettingsPanel):
@@ -203,6 +224,7 @@ class SOLLUMZ_PT_export_drawable(bpy.types.Panel, SollumzExportSettingsPanel):
     def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzExportSettings):
         layout.prop(settings, "apply_transforms")
         layout.prop(settings, "export_with_ytyp")
+        layout.prop(settings, "split_geometry_spatially")
         layout.prop(settings, "mesh_domain", expand=True)
 
 
@@ -240,6 +262,29 @@ class SOLLUMZ_PT_export_ymap(bpy.types.Panel, SollumzExportSettingsPanel):
         layout.prop(settings, "ymap_box_occluders")
         layout.prop(settings, "ymap_model_occluders")
         layout.prop(settings, "ymap_car_generators")
+        layout.prop(settings, "ymap_grass")
+
+
+class SOLLUMZ_PT_export_ycd(bpy.types.Panel, SollumzExportSettingsPanel):
+    bl_label = "Clip Dictionary"
+    bl_order = 6
+
+    def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzExportSettings):
+        layout.prop(settings, "ycd_compress_animations")
+        col = layout.column()
+        col.active = settings.ycd_compress_animations
+        col.prop(settings, "ycd_position_tolerance")
+        col.prop(settings, "ycd_rotation_tolerance")
+        col.prop(settings, "ycd_other_tolerance")
+
+
+class SOLLUMZ_PT_export_profiling(bpy.types.Panel, SollumzExportSettingsPanel):
+    bl_label = "Profiling"
+    bl_order = 7
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw_settings(self, layout: bpy.types.UILayout, settings: SollumzExportSettings):
+        draw_profiling_settings(layout, settings)
 
 
 class SOLLUMZ_PT_TOOL_PANEL(bpy.types.Panel):
@@ -0,0 +1,26 @@
+import pytest
+from .shared import BenchmarkSession, SOLLUMZ_TEST_BENCH_UPDATE_BASELINE, snapshot_data, remove_new_data
+
+
+@pytest.fixture(scope="session")
+def benchmark_session():
+    session = BenchmarkSession()
+    if session.baseline_environment is not None and not session.is_baseline_comparable:
+        print(f"Benchmark baseline '{session.baseline_path}' is from a different environment, not comparing results.\n"
+              f"  Baseline: {session.baseline_environment}\n"
+              f"  Current:  {session.environment}")
+
+    yield session
+
+    session.save(update_baseline=SOLLUMZ_TEST_BENCH_UPDATE_BASELINE)
+
+
+@pytest.fixture()
+def benchmark(request, benchmark_session):
+    """Benchmark named after the test. Data-blocks created during the test are removed afterwards."""
+    snapshot = snapshot_data()
+    name = request.node.name.removeprefix("test_bench_")
+
+    yield benchmark_session.create_benchmark(name)
+
+    remove_new_data(snapshot)
@@ -0,0 +1,310 @@
+"""Procedural generation of large assets for the benchmarks."""
+
+import bpy
+import numpy as np
+from numpy.typing import NDArray
+from mathutils import Quaternion, Vector
+from ...sollumz_properties import SollumType
+from ...cwxml.drawable import Bone, Skeleton
+from ...cwxml.ymap import CMapData, Entity, BoxOccluder, CarGenerator, GrassInstanceBatch, GrassInstanceData
+from ...ydr.shader_materials import create_shader
+from ...ydr.ydrimport import create_armature_obj_from_skel
+from ...ybn.collision_materials import create_collision_material_from_index
+from ...tools.drawablehelper import convert_obj_to_model
+from ...tools.blenderhelper import create_blender_object, create_empty_object, add_armature_modifier
+from ...tools.meshhelper import get_uv_map_name, get_color_attr_name
+
+
+def _rng() -> np.random.Generator:
+    # Same assets on every run
+    return np.random.default_rng(1234)
+
+
+def grid_mesh_data(size: int, extent: float = 50.0) -> tuple[NDArray[np.float32], NDArray[np.int32]]:
+    """Generates a wavy grid of ``size`` x ``size`` vertices. Returns the vertex positions and the quad faces."""
+    coords = np.linspace(-extent, extent, size, dtype=np.float32)
+    xs, ys = np.meshgrid(coords, coords)
+    zs = np.sin(xs * 0.3) * np.cos(ys * 0.2) * 2.0
+    positions = np.stack((xs.ravel(), ys.ravel(), zs.ravel()), axis=1)
+    quads = (np.arange(size - 1)[None, :] + np.arange(size - 1)[:, None] * size).ravel()
+    faces = np.stack((quads, quads + 1, quads + size + 1, quads + size), axis=1).astype(np.int32)
+    return positions, faces
+
+
+def create_grid_mesh(name: str, size: int, extent: float = 50.0) -> bpy.types.Mesh:
+    """Creates a smooth shaded grid mesh with two UV maps and two color attributes, split in two material slots."""
+    positions, faces = grid_mesh_data(size, extent)
+    num_faces = len(faces)
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(positions))
+    mesh.vertices.foreach_set("co", positions.ravel())
+    mesh.loops.add(num_faces * 4)
+    mesh.loops.foreach_set("vertex_index", faces.ravel())
+    mesh.polygons.add(num_faces)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, num_faces * 4, 4, dtype=np.int32))
+    mesh.polygons.foreach_set("use_smooth", np.ones(num_faces, dtype=bool))
+    mesh.polygons.foreach_set("material_index", (np.arange(num_faces) >= num_faces // 2).astype(np.int32))
+    mesh.update(calc_edges=True)
+
+    loop_positions = positions[faces.ravel()]
+    uvs = (loop_positions[:, :2] / extent + 1.0) * 0.5
+    rng = _rng()
+    for i in range(2):
+        mesh.uv_layers.new(name=get_uv_map_name(i)).data.foreach_set("uv", (uvs * (i + 1)).ravel())
+        colors = rng.random((len(positions), 4), dtype=np.float32)[faces.ravel()]
+        color_attr = mesh.color_attributes.new(get_color_attr_name(i), "BYTE_COLOR", "CORNER")
+        color_attr.data.foreach_set("color", colors.ravel())
+    return mesh
+
+
+def create_model_obj(name: str, mesh: bpy.types.Mesh, shader: str, parent: bpy.types.Object) -> bpy.types.Object:
+    for _ in range(2):
+        mesh.materials.append(create_shader(shader))
+
+    model_obj = create_blender_object(SollumType.DRAWABLE_MODEL, f"{name}.model", mesh)
+    convert_obj_to_model(model_obj)
+    model_obj.parent = parent
+    return model_obj
+
+
+def create_drawable(name: str, size: int) -> bpy.types.Object:
+    """Creates a drawable with a single model of ``size`` x ``size`` vertices."""
+    drawable_obj = create_empty_object(SollumType.DRAWABLE, name)
+    create_model_obj(name, create_grid_mesh(f"{name}.mesh", size), "default.sps", drawable_obj)
+    return drawable_obj
+
+
+def create_skeleton_xml(num_bones: int) -> Skeleton:
+    """Creates a skeleton with chains of 8 bones branching from a root bone."""
+    skeleton = Skeleton()
+    for bone_index in range(num_bones):
+        bone = Bone()
+        bone.name = f"bone_{bone_index}"
+        bone.tag = bone_index
+        bone.index = bone_index
+        if bone_index == 0:
+            bone.parent_index = -1
+            bone.translation = Vector((0.0, 0.0, 0.0))
+        elif bone_index % 8 == 1:
+            bone.parent_index = 0
+            bone.translation = Vector((bone_index * 0.1, 0.0, 1.0))
+        else:
+            bone.parent_index = bone_index - 1
+            bone.translation = Vector((0.0, 0.0, 0.2))
+        bone.rotation = Quaternion()
+        bone.scale = Vector((1.0, 1.0, 1.0))
+        skeleton.bones.append(bone)
+
+    return skeleton
+
+
+def create_skinned_drawable(name: str, num_bones: int, size: int) -> bpy.types.Object:
+    """Creates a drawable with an armature of ``num_bones`` bones and a skinned model of ``size`` x ``size`` vertices,
+    each vertex weighted to 4 bones.
+    """
+    drawable_obj = create_armature_obj_from_skel(create_skeleton_xml(num_bones), name, SollumType.DRAWABLE)
+
+    mesh = create_grid_mesh(f"{name}.mesh", size, extent=1.0)
+    model_obj = create_model_obj(name, mesh, "ped.sps", drawable_obj)
+    add_armature_modifier(model_obj, drawable_obj)
+
+    num_verts = len(mesh.vertices)
+    rng = _rng()
+    bone_indices = rng.integers(0, num_bones, (num_verts, 4))
+    # Quantized weights, so vertices can be added to the vertex groups in a few calls
+    weights = rng.integers(1, 5, (num_verts, 4)) / 4.0
+    for bone_index in range(num_bones):
+        vertex_group = model_obj.vertex_groups.new(name=f"bone_{bone_index}")
+        vert_indices, weight_slots = np.nonzero(bone_indices == bone_index)
+        vert_weights = weights[vert_indices, weight_slots]
+        for weight in np.unique(vert_weights):
+            vertex_group.add(vert_indices[vert_weights == weight].tolist(), float(weight), "ADD")
+
+    return drawable_obj
+
+
+def create_bvh_composite(name: str, size: int) -> bpy.types.Object:
+    """Creates a bound composite with a BVH of ``size`` x ``size`` vertices, triangulated, using several collision
+    materials.
+    """
+    composite_obj = create_empty_object(SollumType.BOUND_COMPOSITE, name)
+    bvh_obj = create_empty_object(SollumType.BOUND_GEOMETRYBVH)
+    bvh_obj.parent = composite_obj
+
+    positions, faces = grid_mesh_data(size)
+    tris = np.concatenate((faces[:, [0, 1, 2]], faces[:, [0, 2, 3]])).astype(np.int32)
+    num_tris = len(tris)
+    mesh = bpy.data.meshes.new(f"{name}.mesh")
+    mesh.vertices.add(len(positions))
+    mesh.vertices.foreach_set("co", positions.ravel())
+    mesh.loops.add(num_tris * 3)
+    mesh.loops.foreach_set("vertex_index", tris.ravel())
+    mesh.polygons.add(num_tris)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, num_tris * 3, 3, dtype=np.int32))
+    mesh.polygons.foreach_set("material_index", _rng().integers(0, 4, num_tris, dtype=np.int32))
+    mesh.update(calc_edges=True)
+    for material_index in (1, 2, 3, 4):
+        mesh.materials.append(create_collision_material_from_index(material_index))
+
+    poly_obj = create_blender_object(SollumType.BOUND_POLY_TRIANGLE, f"{name}.poly", mesh)
+    poly_obj.parent = bvh_obj
+    return composite_obj
+
+
+def create_clip_dictionary_xml_text(name: str, num_bones: int, num_frames: int) -> str:
+    """Generates the XML of a clip dictionary with an animation of ``num_frames`` frames, with position and rotation
+    tracks for ``num_bones`` bones.
+    """
+    rng = _rng()
+    fps = 30.0
+    duration = (num_frames - 1) / fps
+    frames = np.arange(num_frames)
+
+    def _channel(values: NDArray) -> str:
+        return f"""
+         <Item>
+          <Type value="RawFloat" />
+          <Values>{" ".join(f"{v:.6g}" for v in values.tolist())}</Values>
+         </Item>"""
+
+    bone_ids = []
+    sequence_data = []
+    for bone_index in range(num_bones):
+        phase = rng.random(4) * np.pi
+        position = [np.sin(frames * 0.05 + phase[i]) * 0.1 for i in range(3)]
+        angle = np.sin(frames * 0.03 + phase[3]) * 0.5
+        rotation = [np.sin(angle * 0.5), np.zeros(num_frames), np.zeros(num_frames), np.cos(angle * 0.5)]
+        for track, channels in ((0, position), (1, rotation)):
+            bone_ids.append(f"""
+    <Item>
+     <BoneId value="{bone_index}" />
+     <Track value="{track}" />
+     <Unk0 value="{0 if track == 0 else 1}" />
+    </Item>""")
+            sequence_data.append(f"""
+      <Item>
+       <Channels>{"".join(_channel(values) for values in channels)}
+       </Channels>
+      </Item>""")
+
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<ClipDictionary>
+ <Clips>
+  <Item>
+   <Hash>{name}_clip</Hash>
+   <Name>pack:/{name}_clip.clip</Name>
+   <Type value="Animation" />
+   <Unknown30 value="0" />
+   <Tags />
+   <Properties />
+   <AnimationHash>{name}_anim</AnimationHash>
+   <StartTime value="0" />
+   <EndTime value="{duration}" />
+   <Rate value="1" />
+  </Item>
+ </Clips>
+ <Animations>
+  <Item>
+   <Hash>{name}_anim</Hash>
+   <Unknown10 value="0" />
+   <FrameCount value="{num_frames}" />
+   <SequenceFrameLimit value="{num_frames + 30}" />
+   <Duration value="{duration}" />
+   <Unknown1C>hash_1234ABCD</Unknown1C>
+   <BoneIds>{"".join(bone_ids)}
+   </BoneIds>
+   <Sequences>
+    <Item>
+     <Hash>hash_ABCD1234</Hash>
+     <FrameCount value="{num_frames}" />
+     <SequenceData>{"".join(sequence_data)}
+     </SequenceData>
+    </Item>
+   </Sequences>
+  </Item>
+ </Animations>
+</ClipDictionary>
+"""
+
+
+def create_archetype_objs(num_archetypes: int) -> list[bpy.types.Object]:
+    """Creates empty drawables used as archetypes of the ymap entities."""
+    return [create_empty_object(SollumType.DRAWABLE, f"bench_archetype_{i}") for i in range(num_archetypes)]
+
+
+def create_ymap_xml(
+    name: str,
+    num_entities: int,
+    num_archetypes: int,
+    num_grass_batches: int,
+    num_grass_instances: int,
+    num_occluders: int,
+    num_car_generators: int,
+) -> CMapData:
+    """Creates a ymap with entities spread over a 2 km square, grass batches, box occluders and car generators."""
+    rng = _rng()
+    ymap = CMapData()
+    ymap.name = name
+    ymap.streaming_extents_min = Vector((-1100.0, -1100.0, -100.0))
+    ymap.streaming_extents_max = Vector((1100.0, 1100.0, 100.0))
+    ymap.entities_extents_min = Vector((-1000.0, -1000.0, -50.0))
+    ymap.entities_extents_max = Vector((1000.0, 1000.0, 50.0))
+
+    positions = rng.uniform(-1000.0, 1000.0, (num_entities, 3))
+    positions[:, 2] *= 0.05
+    angles = rng.uniform(0.0, np.pi * 2.0, num_entities)
+    for i in range(num_entities):
+        entity = Entity()
+        entity.archetype_name = f"bench_archetype_{i % num_archetypes}"
+        entity.guid = i + 1
+        entity.position = Vector(positions[i])
+        entity.rotation = Quaternion((0.0, 0.0, 1.0), angles[i])
+        entity.scale_xy = 1.0
+        entity.scale_z = 1.0
+        entity.lod_dist = 100.0
+        entity.child_lod_dist = 0.0
+        entity.lod_level = "LODTYPES_DEPTH_ORPHANHD"
+        entity.priority_level = "PRI_REQUIRED"
+        entity.ambient_occlusion_multiplier = 255
+        entity.artificial_ambient_occlusion = 255
+        ymap.entities.append(entity)
+
+    for _ in range(num_occluders):
+        occluder = BoxOccluder()
+        occluder.center_x, occluder.center_y, occluder.center_z = rng.integers(-4000, 4000, 3).tolist()
+        occluder.cos_z, occluder.sin_z = 127, 0
+        occluder.length, occluder.width, occluder.height = rng.integers(4, 200, 3).tolist()
+        ymap.box_occluders.append(occluder)
+
+    for i in range(num_car_generators):
+        car_generator = CarGenerator()
+        car_generator.position = Vector(positions[i % num_entities] + (5.0, 0.0, 0.0))
+        car_generator.orient_x, car_generator.orient_y = 1.0, 0.0
+        car_generator.perpendicular_length = 2.5
+        car_generator.car_model = ""
+        car_generator.flags = 3680
+        car_generator.pop_group = ""
+        ymap.car_generators.append(car_generator)
+
+    for i in range(num_grass_batches):
+        batch = GrassInstanceBatch()
+        center = rng.uniform(-900.0, 900.0, 2)
+        batch.batch_aabb.min = Vector((center[0] - 50.0, center[1] - 50.0, 0.0, 0.0))
+        batch.batch_aabb.max = Vector((center[0] + 50.0, center[1] + 50.0, 10.0, 0.0))
+        batch.scale_range = Vector((0.5, 1.5, 0.5))
+        batch.archetype_name = f"proc_grass_{i % 4}"
+        batch.lod_dist = 120
+        batch.lod_fade_start_dist = 15.0
+        batch.lod_inst_fade_range = 0.75
+        batch.orient_to_terrain = 1.0
+        batch.instances = GrassInstanceData(
+            position=rng.integers(0, 65536, (num_grass_instances, 3), dtype=np.uint16),
+            normal=rng.integers(64, 192, (num_grass_instances, 2), dtype=np.uint8),
+            color=rng.integers(0, 256, (num_grass_instances, 3), dtype=np.uint8),
+            scale=rng.integers(0, 256, num_grass_instances, dtype=np.uint8),
+            ao=rng.integers(0, 256, num_grass_instances, dtype=np.uint8),
+        )
+        ymap.instanced_data.grass_instance_list.append(batch)
+
+    return ymap
@@ -0,0 +1,196 @@
+import os
+import gc
+import sys
+import json
+import time
+import platform
+import bpy
+import pytest
+from pathlib import Path
+from typing import Callable, Optional, TypeVar
+from ...meta import sollumz_version
+
+T = TypeVar("T")
+
+
+def get_env_flag(name: str) -> bool:
+    return os.getenv(name, default="").lower() in {"1", "true", "yes", "on"}
+
+
+def get_env_float(name: str, default: float) -> float:
+    value = os.getenv(name, default=None)
+    return float(value) if value else default
+
+
+SOLLUMZ_TEST_BENCH = get_env_flag("SOLLUMZ_TEST_BENCH")
+"""Benchmarks are slow, they only run when this environment variable is set."""
+SOLLUMZ_TEST_BENCH_DIR = Path(__file__).parent
+SOLLUMZ_TEST_BENCH_BASELINE = Path(os.getenv("SOLLUMZ_TEST_BENCH_BASELINE", SOLLUMZ_TEST_BENCH_DIR / "baseline.json"))
+"""Results the benchmarks are compared against. Timings depend on the machine, so it is not in the repository."""
+SOLLUMZ_TEST_BENCH_RESULTS = Path(os.getenv("SOLLUMZ_TEST_BENCH_RESULTS", SOLLUMZ_TEST_BENCH_DIR / "results.json"))
+SOLLUMZ_TEST_BENCH_UPDATE_BASELINE = get_env_flag("SOLLUMZ_TEST_BENCH_UPDATE_BASELINE")
+"""Store the results as the new baseline. The baseline is also created if it doesn't exist yet."""
+SOLLUMZ_TEST_BENCH_THRESHOLD = get_env_float("SOLLUMZ_TEST_BENCH_THRESHOLD", 0.2)
+"""Relative slowdown from the baseline after which a stage is reported as a regression."""
+SOLLUMZ_TEST_BENCH_MIN_SLOWDOWN = get_env_float("SOLLUMZ_TEST_BENCH_MIN_SLOWDOWN", 0.01)
+"""Slowdowns smaller than this many seconds are ignored, short stages are too noisy."""
+SOLLUMZ_TEST_BENCH_REPEAT = int(get_env_float("SOLLUMZ_TEST_BENCH_REPEAT", 3))
+"""Times each stage is run, the fastest run is kept."""
+SOLLUMZ_TEST_BENCH_SCALE = get_env_float("SOLLUMZ_TEST_BENCH_SCALE", 1.0)
+"""Multiplier of the size of the generated assets."""
+
+requires_bench = pytest.mark.skipif(not SOLLUMZ_TEST_BENCH, reason="SOLLUMZ_TEST_BENCH environment variable not set")
+
+
+def scaled(count: int) -> int:
+    """Scales ``count`` by ``SOLLUMZ_TEST_BENCH_SCALE``."""
+    return max(1, round(count * SOLLUMZ_TEST_BENCH_SCALE))
+
+
+def scaled_side(count: int) -> int:
+    """Scales the side length of a grid so its area is scaled by ``SOLLUMZ_TEST_BENCH_SCALE``."""
+    return max(2, round(count * SOLLUMZ_TEST_BENCH_SCALE ** 0.5))
+
+
+def get_environment() -> dict:
+    """Describes where the benchmarks run. Results from different environments are not comparable."""
+    return {
+        "blender": bpy.app.version_string,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "scale": SOLLUMZ_TEST_BENCH_SCALE,
+    }
+
+
+_DATA_COLLECTIONS = ("objects", "meshes", "materials", "images", "armatures", "actions", "collections", "node_groups")
+
+
+def snapshot_data() -> dict[str, set[int]]:
+    """Gets the data-blocks that currently exist, to remove any new data-block with ``remove_new_data``."""
+    return {name: {id_block.session_uid for id_block in getattr(bpy.data, name)} for name in _DATA_COLLECTIONS}
+
+
+def remove_new_data(snapshot: dict[str, set[int]]):
+    new_data = [
+        id_block
+        for name in _DATA_COLLECTIONS
+        for id_block in getattr(bpy.data, name)
+        if id_block.session_uid not in snapshot[name]
+    ]
+    bpy.data.batch_remove(new_data)
+
+
+class Benchmark:
+    """Times the stages of a benchmark."""
+
+    def __init__(self, name: str, baseline: Optional[dict[str, float]], repeat: int = SOLLUMZ_TEST_BENCH_REPEAT):
+        self.name = name
+        self.baseline = baseline
+        self.repeat = max(1, repeat)
+        self.timings: dict[str, list[float]] = {}
+        self.info: dict[str, int] = {}
+
+    def measure(self, stage: str, func: Callable[[], T], keep_data: bool = True) -> T:
+        """Runs ``func`` ``repeat`` times and records its fastest run as the time of ``stage``. The data-blocks created
+        by the previous runs are removed before running it again, and after the last run unless ``keep_data`` is set.
+        Returns the result of the last run.
+        """
+        timings = []
+        for i in range(self.repeat):
+            is_last = i == self.repeat - 1
+            snapshot = snapshot_data()
+            gc.collect()
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+            if not is_last or not keep_data:
+                if not is_last:
+                    result = None
+                remove_new_data(snapshot)
+
+        self.timings[stage] = timings
+        print(f"{self.name}.{stage}: {min(timings):.3f}s", file=sys.stderr)
+        return result
+
+    def add_info(self, **info: int):
+        """Records information about the benchmark, such as the size of the generated asset."""
+        self.info.update(info)
+
+    @property
+    def results(self) -> dict[str, float]:
+        return {stage: min(timings) for stage, timings in self.timings.items()}
+
+    def find_regressions(self) -> list[str]:
+        """Gets the stages that are slower than in the baseline."""
+        if self.baseline is None:
+            return []
+
+        regressions = []
+        for stage, result in self.results.items():
+            baseline = self.baseline.get(stage, None)
+            if baseline is None:
+                continue
+
+            slowdown = result - baseline
+            if slowdown > SOLLUMZ_TEST_BENCH_MIN_SLOWDOWN and result > baseline * (1.0 + SOLLUMZ_TEST_BENCH_THRESHOLD):
+                regressions.append(f"{self.name}.{stage}: {result:.3f}s, baseline {baseline:.3f}s "
+                                   f"({(result / baseline - 1.0) * 100.0:+.0f}%)")
+        return regressions
+
+    def check_regressions(self):
+        regressions = self.find_regressions()
+        assert not regressions, "Performance regressions:\n" + "\n".join(regressions)
+
+
+class BenchmarkSession:
+    """Results of all the benchmarks, compared against and stored as baseline."""
+
+    def __init__(self, baseline_path: Path = SOLLUMZ_TEST_BENCH_BASELINE):
+        self.baseline_path = baseline_path
+        self.environment = get_environment()
+        self.baseline_environment = None
+        self.baseline: dict[str, dict[str, float]] = {}
+        if baseline_path.is_file():
+            baseline = json.loads(baseline_path.read_text())
+            self.baseline_environment = baseline["environment"]
+            self.baseline = baseline["benchmarks"]
+        self.benchmarks: list[Benchmark] = []
+
+    @property
+    def is_baseline_comparable(self) -> bool:
+        """Results can only be compared with a baseline from the same environment."""
+        return self.baseline_environment == self.environment
+
+    def create_benchmark(self, name: str) -> Benchmark:
+        benchmark = Benchmark(name, self.baseline.get(name, None) if self.is_baseline_comparable else None)
+        self.benchmarks.append(benchmark)
+        return benchmark
+
+    def to_dict(self) -> dict:
+        return {
+            "sollumz_version": sollumz_version(),
+            "environment": self.environment,
+            "benchmarks": {b.name: b.results for b in self.benchmarks},
+            "timings": {b.name: b.timings for b in self.benchmarks},
+            "info": {b.name: b.info for b in self.benchmarks},
+            "baseline": self.baseline if self.is_baseline_comparable else None,
+        }
+
+    def save(self, results_path: Path = SOLLUMZ_TEST_BENCH_RESULTS, update_baseline: bool = False):
+        if not self.benchmarks:
+            return
+
+        results = self.to_dict()
+        results_path.write_text(json.dumps(results, indent=2))
+
+        if update_baseline or not self.baseline_path.is_file():
+            # Keep baselines of benchmarks that didn't run this time
+            benchmarks = dict(self.baseline) if self.is_baseline_comparable else {}
+            benchmarks.update(results["benchmarks"])
+            self.baseline_path.write_text(json.dumps({
+                "sollumz_version": results["sollumz_version"],
+                "environment": self.environment,
+                "benchmarks": benchmarks,
+            }, indent=2))
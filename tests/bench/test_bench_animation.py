@@ -0,0 +1,27 @@
+from ...ycd.ycdimport import clip_dictionary_to_obj
+from ...ycd.ycdexport import clip_dictionary_from_object
+from ...ycd.compression import CompressionTolerances
+from ...cwxml.clipdictionary import YCD
+from .shared import requires_bench, scaled
+from .generators import create_clip_dictionary_xml_text
+
+pytestmark = requires_bench
+
+
+def test_bench_animation(benchmark, tmp_path):
+    num_bones = scaled(150)
+    num_frames = scaled(2000)
+    benchmark.add_info(bones=num_bones, frames=num_frames)
+
+    filepath = tmp_path / "bench_anim.ycd.xml"
+    filepath.write_text(create_clip_dictionary_xml_text("bench_anim", num_bones, num_frames))
+    filepath = str(filepath)
+
+    clip_dict_xml = benchmark.measure("parse_xml", lambda: YCD.from_xml_file(filepath))
+    clip_dict_obj = benchmark.measure("import", lambda: clip_dictionary_to_obj(clip_dict_xml, "bench_anim"))
+    clip_dict_xml = benchmark.measure("export_xml", lambda: clip_dictionary_from_object(clip_dict_obj))
+    tolerances = CompressionTolerances(position=0.0005, rotation=0.0005, other=0.001)
+    benchmark.measure("export_xml_compressed", lambda: clip_dictionary_from_object(clip_dict_obj, tolerances))
+    benchmark.measure("write_xml", lambda: clip_dict_xml.write_xml(filepath))
+
+    benchmark.check_regressions()
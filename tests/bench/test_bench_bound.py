@@ -0,0 +1,25 @@
+from ...ybn.ybnexport import create_composite_xml
+from ...ybn.ybnimport import create_bound_composite
+from ...cwxml.bound import YBN, BoundFile
+from .shared import requires_bench, scaled_side
+from .generators import create_bvh_composite
+
+pytestmark = requires_bench
+
+
+def test_bench_bvh(benchmark, tmp_path):
+    # The centroid calculation on export (miniball) needs memory quadratic in the number of vertices, about 4 bytes
+    # per vertex squared: ~0.4 GB for the 10k vertices of the default size, ~16 GB at 62k vertices. Keep this in mind
+    # when increasing SOLLUMZ_TEST_BENCH_SCALE
+    composite_obj = create_bvh_composite("bench_bvh", scaled_side(100))
+    mesh = composite_obj.children[0].children[0].data
+    benchmark.add_info(vertices=len(mesh.vertices), triangles=len(mesh.polygons))
+
+    filepath = str(tmp_path / "bench_bvh.ybn.xml")
+    bound_file = BoundFile()
+    bound_file.composite = benchmark.measure("export_xml", lambda: create_composite_xml(composite_obj))
+    benchmark.measure("write_xml", lambda: bound_file.write_xml(filepath))
+    bound_file = benchmark.measure("parse_xml", lambda: YBN.from_xml_file(filepath))
+    benchmark.measure("import", lambda: create_bound_composite(bound_file.composite), keep_data=False)
+
+    benchmark.check_regressions()
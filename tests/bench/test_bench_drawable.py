@@ -0,0 +1,48 @@
+import numpy as np
+from ...ydr.ydrexport import create_drawable_xml, triangulate_mesh
+from ...ydr.ydrimport import create_drawable_obj
+from ...ydr.vertex_buffer_builder import VertexBufferBuilder, dedupe_and_get_indices
+from ...ydr.mesh_builder import MeshBuilder
+from ...cwxml.drawable import YDR
+from .shared import requires_bench, scaled, scaled_side
+from .generators import create_drawable, create_skinned_drawable
+
+pytestmark = requires_bench
+
+
+def test_bench_drawable(benchmark, tmp_path):
+    drawable_obj = create_drawable("bench_drawable", scaled_side(320))
+    mesh = drawable_obj.children[0].data
+    benchmark.add_info(vertices=len(mesh.vertices), faces=len(mesh.polygons))
+
+    tri_mesh = triangulate_mesh(mesh.copy())
+    vert_arr = benchmark.measure("vertex_buffer_builder", lambda: VertexBufferBuilder(tri_mesh).build())
+    vert_arr, ind_arr = benchmark.measure("dedupe_vertices", lambda: dedupe_and_get_indices(vert_arr))
+    mat_inds = np.empty(len(tri_mesh.polygons), dtype=np.uint32)
+    tri_mesh.polygons.foreach_get("material_index", mat_inds)
+    materials = list(tri_mesh.materials)
+    benchmark.measure(
+        "mesh_builder", lambda: MeshBuilder("bench_drawable.built", vert_arr, ind_arr, mat_inds, materials).build()
+    )
+
+    filepath = str(tmp_path / "bench_drawable.ydr.xml")
+    drawable_xml = benchmark.measure("export_xml", lambda: create_drawable_xml(drawable_obj))
+    benchmark.measure("write_xml", lambda: drawable_xml.write_xml(filepath))
+    drawable_xml = benchmark.measure("parse_xml", lambda: YDR.from_xml_file(filepath))
+    benchmark.measure("import", lambda: create_drawable_obj(drawable_xml, filepath), keep_data=False)
+
+    benchmark.check_regressions()
+
+
+def test_bench_skinned_ped(benchmark, tmp_path):
+    drawable_obj = create_skinned_drawable("bench_ped", scaled(120), scaled_side(200))
+    mesh = drawable_obj.children[0].data
+    benchmark.add_info(bones=len(drawable_obj.data.bones), vertices=len(mesh.vertices), faces=len(mesh.polygons))
+
+    filepath = str(tmp_path / "bench_ped.ydr.xml")
+    drawable_xml = benchmark.measure("export_xml", lambda: create_drawable_xml(drawable_obj))
+    benchmark.measure("write_xml", lambda: drawable_xml.write_xml(filepath))
+    drawable_xml = benchmark.measure("parse_xml", lambda: YDR.from_xml_file(filepath))
+    benchmark.measure("import", lambda: create_drawable_obj(drawable_xml, filepath), keep_data=False)
+
+    benchmark.check_regressions()
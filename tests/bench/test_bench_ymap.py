@@ -0,0 +1,74 @@
+from ...ymap.ymapimport import ymap_to_obj
+from ...ymap.ymapexport import ymap_from_object
+from ...cwxml.ymap import YMAP
+from ...sollumz_preferences import get_import_settings
+from .shared import requires_bench, scaled
+from .generators import create_archetype_objs, create_ymap_xml
+
+pytestmark = requires_bench
+
+
+def test_bench_ymap(benchmark, tmp_path):
+    num_archetypes = 20
+    create_archetype_objs(num_archetypes)
+    ymap_xml = create_ymap_xml(
+        "bench_ymap",
+        num_entities=scaled(2000),
+        num_archetypes=num_archetypes,
+        num_grass_batches=scaled(40),
+        num_grass_instances=5000,
+        num_occluders=scaled(500),
+        num_car_generators=scaled(500),
+    )
+    benchmark.add_info(
+        entities=len(ymap_xml.entities),
+        grass_instances=sum(b.instances.num_instances for b in ymap_xml.instanced_data.grass_instance_list),
+        occluders=len(ymap_xml.box_occluders),
+        car_generators=len(ymap_xml.car_generators),
+    )
+
+    filepath = str(tmp_path / "bench_ymap.ymap.xml")
+    benchmark.measure("write_xml", lambda: ymap_xml.write_xml(filepath))
+    ymap_xml = benchmark.measure("parse_xml", lambda: YMAP.from_xml_file(filepath))
+
+    import_settings = get_import_settings()
+    prev_instance_entities = import_settings.ymap_instance_entities
+    import_settings.ymap_instance_entities = True
+    try:
+        ymap_obj = benchmark.measure("import", lambda: ymap_to_obj(ymap_xml))
+    finally:
+        import_settings.ymap_instance_entities = prev_instance_entities
+
+    ymap_xml = benchmark.measure("export_xml", lambda: ymap_from_object(ymap_obj))
+    benchmark.measure("write_xml_exported", lambda: ymap_xml.write_xml(filepath))
+
+    benchmark.check_regressions()
+
+
+def test_bench_ymap_entities(benchmark, tmp_path):
+    """Reading and writing the XML of a ymap with many entities, mostly spent in the cwxml elements."""
+    ymap_xml = benchmark.measure("create", lambda: create_ymap_xml(
+        "bench_ymap_entities",
+        num_entities=scaled(20000),
+        num_archetypes=20,
+        num_grass_batches=0,
+        num_grass_instances=0,
+        num_occluders=0,
+        num_car_generators=0,
+    ))
+    benchmark.add_info(entities=len(ymap_xml.entities))
+
+    filepath = str(tmp_path / "bench_ymap_entities.ymap.xml")
+    benchmark.measure("write_xml", lambda: ymap_xml.write_xml(filepath))
+    ymap_xml = benchmark.measure("parse_xml", lambda: YMAP.from_xml_file(filepath))
+
+    def _read_entities():
+        return [
+            (e.archetype_name, e.flags, e.guid, e.position, e.rotation, e.scale_xy, e.scale_z, e.parent_index,
+             e.lod_dist, e.child_lod_dist, e.lod_level, e.num_children, e.priority_level, e.extensions)
+            for e in ymap_xml.entities
+        ]
+
+    benchmark.measure("read_entities", _read_entities)
+
+    benchmark.check_regressions()
@@ -0,0 +1,75 @@
+import os
+import shutil
+from ..batch_convert import find_input_files, run_batch
+from ..sollumz_preferences import get_export_settings, get_prefs_path, load_preferences_preset
+from .shared import asset_path
+
+
+def test_find_input_files(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in (
+        "a.ydr.xml", "b.ybn.xml", "c.txt", "d.ydr", "car.yft.xml", "car_hi.yft.xml", "other_hi.yft.xml",
+        "sub/e.ycd.xml", "sub/f.ytyp.xml",
+    ):
+        (tmp_path / name).touch()
+
+    root = str(tmp_path)
+    expected = [
+        (os.path.join(root, "a.ydr.xml"), ""),
+        (os.path.join(root, "b.ybn.xml"), ""),
+        (os.path.join(root, "car.yft.xml"), ""),
+        (os.path.join(root, "other_hi.yft.xml"), ""),
+    ]
+    assert find_input_files([root]) == expected
+    assert find_input_files([root], recursive=True) == expected + [
+        (os.path.join(root, "sub", "e.ycd.xml"), "sub"),
+        (os.path.join(root, "sub", "f.ytyp.xml"), "sub"),
+    ]
+    assert find_input_files([os.path.join(root, "sub", "e.ycd.xml"), os.path.join(root, "c.txt")]) == [
+        (os.path.join(root, "sub", "e.ycd.xml"), ""),
+    ]
+
+
+def test_load_preferences_preset(tmp_path):
+    export_settings = get_export_settings()
+    prev_apply_transforms = export_settings.apply_transforms
+    prefs_path = get_prefs_path()
+    prefs_mtime = os.path.getmtime(prefs_path) if os.path.isfile(prefs_path) else None
+
+    preset_path = tmp_path / "preset.ini"
+    preset_path.write_text(f"[export_settings]\napply_transforms = {not prev_apply_transforms}\n")
+    try:
+        load_preferences_preset(str(preset_path))
+        assert export_settings.apply_transforms == (not prev_apply_transforms)
+        # The preset is not saved to the user preferences
+        assert (os.path.getmtime(prefs_path) if os.path.isfile(prefs_path) else None) == prefs_mtime
+    finally:
+        export_settings.apply_transforms = prev_apply_transforms
+
+
+def test_run_batch(tmp_path):
+    input_dir = tmp_path / "input"
+    (input_dir / "sub").mkdir(parents=True)
+    shutil.copy(asset_path("navmesh.ynv.xml"), input_dir)
+    shutil.copy(asset_path("roundtrip_anim.ycd.xml"), input_dir / "sub")
+    (input_dir / "broken.ydr.xml").write_text("<Drawable")
+    files = find_input_files([str(input_dir)], recursive=True)
+    output_dir = tmp_path / "output"
+
+    summary = run_batch(files, str(output_dir), num_workers=2, roundtrip=True, timeout=120.0)
+
+    assert summary["num_files"] == 3
+    assert summary["num_succeeded"] == 2
+    assert summary["num_failed"] == 1
+    results = {os.path.basename(r["input"]): r for r in summary["files"]}
+    broken = results["broken.ydr.xml"]
+    assert not broken["success"] and not broken["outputs"]
+    assert "ParseError" in broken["errors"][0]
+
+    navmesh = results["navmesh.ynv.xml"]
+    assert navmesh["success"]
+    assert navmesh["outputs"] == [str(output_dir / "navmesh.ynv.xml")]
+    assert navmesh["roundtrip_mismatches"] == []
+    assert navmesh["warnings"] == ["Skipped 1 degenerate navmesh polygon(s)."]
+    assert results["roundtrip_anim.ycd.xml"]["success"]
+    assert (output_dir / "sub" / "roundtrip_anim.ycd.xml").is_file()
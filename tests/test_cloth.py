@@ -0,0 +1,115 @@
+import pytest
+import numpy as np
+from mathutils import Vector
+from ..cwxml.cloth import CharacterCloth, VerletClothEdge
+from ..ydr.cloth_char import cloth_char_get_mesh_to_cloth_bindings
+from ..ydr.cloth_env import (
+    CLOTH_VERLET_EDGES_BATCH_SIZE,
+    cloth_schedule_verlet_edges,
+    _cloth_sort_verlet_edges,
+)
+from .shared import SOLLUMZ_TEST_ASSETS_DIR
+
+
+def read_cloth_char_bindings_test_data(file_path):
+    with open(file_path) as f:
+        cloth_vertices = np.fromstring(f.readline(), dtype=np.float32, sep=" ").reshape((-1, 3))
+        cloth_indices = np.fromstring(f.readline(), dtype=np.uint32, sep=" ")
+        mesh_vertices = np.fromstring(f.readline(), dtype=np.float32, sep=" ").reshape((-1, 3))
+        mesh_normals = np.fromstring(f.readline(), dtype=np.float32, sep=" ").reshape((-1, 3))
+        centroid = Vector(np.fromstring(f.readline(), dtype=np.float32, sep=" "))
+        expected_weights = np.fromstring(f.readline(), dtype=np.float32, sep=" ").reshape((-1, 4))
+        expected_indices = np.fromstring(f.readline(), dtype=np.uint32, sep=" ").reshape((-1, 4))
+        expected_errors = f.readline().split()
+
+        return (
+            cloth_vertices, cloth_indices, mesh_vertices, mesh_normals, centroid,
+            expected_weights, expected_indices, expected_errors
+        )
+
+
+@pytest.mark.parametrize("test_data_file_name", (
+    "cloth_char_bindings_test_data_000.txt",
+    "cloth_char_bindings_test_data_001.txt",
+))
+def test_cloth_char_get_mesh_to_cloth_bindings(test_data_file_name):
+    test_data_file_path = SOLLUMZ_TEST_ASSETS_DIR.joinpath(test_data_file_name)
+    (
+        cloth_vertices, cloth_indices, mesh_vertices, mesh_normals, centroid,
+        expected_weights, expected_indices, expected_errors
+    ) = read_cloth_char_bindings_test_data(test_data_file_path)
+
+    cloth = CharacterCloth()
+    cloth.controller.vertices = cloth_vertices
+    cloth.controller.indices = list(cloth_indices)
+
+    weights, indices, errors = cloth_char_get_mesh_to_cloth_bindings(cloth, mesh_vertices, mesh_normals, centroid)
+
+    errors_str = [f"{int(e.error_projection)}{int(e.error_distance)}" for e in errors]
+    assert errors_str == expected_errors
+
+    # Vertices that failed to bind have undefined bindings, only compare the bound ones
+    error_positions = {tuple(e.co) for e in errors}
+    bound_mask = np.array([tuple(Vector(v)) not in error_positions for v in mesh_vertices])
+    assert len(errors) == np.sum(~bound_mask)
+    assert np.array_equal(indices[bound_mask], expected_indices[bound_mask])
+    assert np.array_equal(weights[bound_mask], expected_weights[bound_mask])
+
+
+def create_grid_edges(rows: int, cols: int) -> list[tuple[int, int]]:
+    """Edges of a triangulated grid, in the order the cloth exporter would find them."""
+    edges = []
+    edges_added = set()
+    for i in range(rows - 1):
+        for j in range(cols - 1):
+            v00, v01, v10, v11 = i * cols + j, i * cols + j + 1, (i + 1) * cols + j, (i + 1) * cols + j + 1
+            for v0, v1, v2 in ((v00, v01, v11), (v00, v11, v10)):
+                for edge_v0, edge_v1 in ((v0, v1), (v1, v2), (v2, v0)):
+                    if (edge_v0, edge_v1) in edges_added or (edge_v1, edge_v0) in edges_added:
+                        continue
+
+                    edges.append((edge_v0, edge_v1))
+                    edges_added.add((edge_v0, edge_v1))
+    return edges
+
+
+@pytest.mark.parametrize("rows, cols, prev_num_padding_edges", (
+    (10, 10, 11),
+    (20, 20, 15),
+    (30, 33, 19),
+    (12, 80, 15),
+))
+def test_cloth_schedule_verlet_edges(rows, cols, prev_num_padding_edges):
+    edges = create_grid_edges(rows, cols)
+
+    schedule = cloth_schedule_verlet_edges(edges)
+
+    assert schedule.num_edges == len(edges)
+    assert sorted(edge_idx for batch in schedule.batches for edge_idx in batch) == list(range(len(edges)))
+    for batch in schedule.batches:
+        assert 0 < len(batch) <= CLOTH_VERLET_EDGES_BATCH_SIZE
+        batch_vertices = [v for edge_idx in batch for v in edges[edge_idx]]
+        assert len(batch_vertices) == len(set(batch_vertices)), "Vertex repeated within a batch"
+
+    # Less padding than the previous greedy algorithm, and the minimum number of batches possible
+    assert schedule.num_padding_edges < prev_num_padding_edges
+    assert schedule.num_batches == -(-len(edges) // CLOTH_VERLET_EDGES_BATCH_SIZE)
+    assert schedule.fill_ratio == len(edges) / (schedule.num_batches * CLOTH_VERLET_EDGES_BATCH_SIZE)
+
+
+def test_cloth_sort_verlet_edges_pads_batches():
+    edges = []
+    for v0, v1 in ((0, 1), (1, 2), (2, 0)):
+        edge = VerletClothEdge()
+        edge.vertex0 = v0
+        edge.vertex1 = v1
+        edges.append(edge)
+
+    sorted_edges = _cloth_sort_verlet_edges(edges)
+
+    # A triangle needs 3 batches, each with a single edge and 7 dummy edges
+    assert len(sorted_edges) == 3 * CLOTH_VERLET_EDGES_BATCH_SIZE
+    assert {id(e) for e in sorted_edges[::CLOTH_VERLET_EDGES_BATCH_SIZE]} == {id(e) for e in edges}
+    for i, edge in enumerate(sorted_edges):
+        if i % CLOTH_VERLET_EDGES_BATCH_SIZE != 0:
+            assert edge.vertex0 == 0 and edge.vertex1 == 0 and edge.length_sqr == 1e8
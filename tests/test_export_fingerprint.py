@@ -0,0 +1,94 @@
+import os
+import bpy
+from ..ynv.ynvimport import import_ynv
+from ..ynv.ynvexport import export_ynv
+from ..sollumz_preferences import get_export_settings
+from ..shared.export_fingerprint import (
+    compute_export_fingerprint,
+    is_export_up_to_date,
+    store_export_state,
+    EXPORT_STATE_PROP,
+)
+from .shared import asset_path
+
+
+def _fingerprint(context, obj) -> str:
+    return compute_export_fingerprint(obj, get_export_settings(), context.evaluated_depsgraph_get())
+
+
+def test_export_fingerprint_detects_changes(context):
+    obj = import_ynv(str(asset_path("navmesh.ynv.xml")))
+    poly_obj = next(child for child in obj.children if child.type == "MESH" and len(child.data.polygons) > 0)
+    fingerprint = _fingerprint(context, obj)
+    assert _fingerprint(context, obj) == fingerprint
+
+    # Storing the export state doesn't change the fingerprint
+    obj[EXPORT_STATE_PROP] = {"fingerprint": fingerprint}
+    assert _fingerprint(context, obj) == fingerprint
+
+    poly_obj.data.vertices[0].co.z += 1.0
+    poly_obj.data.update()
+    mesh_changed_fingerprint = _fingerprint(context, obj)
+    assert mesh_changed_fingerprint != fingerprint
+
+    obj.navmesh_properties.area_id += 1
+    assert _fingerprint(context, obj) != mesh_changed_fingerprint
+
+    poly_obj.location.x += 1.0
+    context.view_layer.update()
+    assert _fingerprint(context, obj) != mesh_changed_fingerprint
+
+
+def test_export_fingerprint_includes_export_settings(context):
+    obj = import_ynv(str(asset_path("navmesh.ynv.xml")))
+    export_settings = get_export_settings()
+    fingerprint = _fingerprint(context, obj)
+
+    export_settings.apply_transforms = not export_settings.apply_transforms
+    try:
+        assert _fingerprint(context, obj) != fingerprint
+    finally:
+        export_settings.apply_transforms = not export_settings.apply_transforms
+
+
+def test_export_up_to_date(context, tmp_path):
+    obj = import_ynv(str(asset_path("navmesh.ynv.xml")))
+    filepath = str(tmp_path / "navmesh.ynv.xml")
+    fingerprint = _fingerprint(context, obj)
+    assert not is_export_up_to_date(obj, filepath, fingerprint)
+
+    assert export_ynv(obj, filepath)
+    store_export_state(obj, filepath, fingerprint)
+    assert is_export_up_to_date(obj, filepath, fingerprint)
+    assert not is_export_up_to_date(obj, str(tmp_path / "other.ynv.xml"), fingerprint)
+    assert not is_export_up_to_date(obj, filepath, "changed")
+
+    # Modified output files are exported again
+    stat = os.stat(filepath)
+    os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not is_export_up_to_date(obj, filepath, fingerprint)
+
+    os.remove(filepath)
+    assert not is_export_up_to_date(obj, filepath, fingerprint)
+
+
+def test_export_fingerprint_detects_vertex_group_changes(context):
+    mesh = bpy.data.meshes.new("fingerprint_weights")
+    mesh.from_pydata([(0, 0, 0), (1, 0, 0), (0, 1, 0)], [], [(0, 1, 2)])
+    obj = bpy.data.objects.new("fingerprint_weights", mesh)
+    context.collection.objects.link(obj)
+    group_a = obj.vertex_groups.new(name="a")
+    group_b = obj.vertex_groups.new(name="b")
+    group_a.add([0, 1], 1.0, "REPLACE")
+    group_b.add([1], 0.5, "REPLACE")
+    fingerprint = _fingerprint(context, obj)
+    assert _fingerprint(context, obj) == fingerprint
+
+    group_b.add([1], 0.25, "REPLACE")
+    mesh.update()
+    weight_changed_fingerprint = _fingerprint(context, obj)
+    assert weight_changed_fingerprint != fingerprint
+
+    group_b.add([2], 0.25, "REPLACE")
+    mesh.update()
+    assert _fingerprint(context, obj) != weight_changed_fingerprint
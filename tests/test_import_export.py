@@ -12,6 +12,9 @@ from ..ybn.ybnimport import import_ybn
 from ..ybn.ybnexport import export_ybn
 from ..ycd.ycdimport import import_ycd
 from ..ycd.ycdexport import export_ycd
+from ..ymap.ymapimport import import_ymap
+from ..ymap.ymapexport import export_ymap
+from ..cwxml.ymap import YMAP
 
 
 if is_tmp_dir_available():
@@ -58,6 +61,35 @@ if is_tmp_dir_available():
         assert success
         assert out_path.exists()
 
+    def test_import_export_ymap_grass_roundtrip():
+        ymap_path = asset_path("grass.ymap.xml")
+        obj = import_ymap(str(ymap_path))
+        assert obj is not None
+
+        out_path = tmp_path(ymap_path.name)
+        success = export_ymap(obj, str(out_path))
+        assert success
+        assert out_path.exists()
+
+        ymap = YMAP.from_xml_file(str(ymap_path))
+        out_ymap = YMAP.from_xml_file(str(out_path))
+        batches = ymap.instanced_data.grass_instance_list
+        out_batches = out_ymap.instanced_data.grass_instance_list
+        assert len(out_batches) == len(batches)
+        for batch, out_batch in zip(batches, out_batches):
+            assert out_batch.archetype_name == batch.archetype_name
+            assert out_batch.lod_dist == batch.lod_dist
+            assert_allclose(out_batch.scale_range, batch.scale_range, rtol=1e-6)
+            assert_allclose(out_batch.batch_aabb.min, batch.batch_aabb.min, atol=1e-5)
+            assert_allclose(out_batch.batch_aabb.max, batch.batch_aabb.max, atol=1e-5)
+            for name in batch.instances._fields:
+                assert_equal(getattr(out_batch.instances, name), getattr(batch.instances, name), err_msg=name)
+
+        assert_allclose(out_ymap.entities_extents_min, ymap.entities_extents_min, atol=1e-5)
+        assert_allclose(out_ymap.entities_extents_max, ymap.entities_extents_max, atol=1e-5)
+        assert_allclose(out_ymap.streaming_extents_min, ymap.streaming_extents_min, atol=1e-5)
+        assert_allclose(out_ymap.streaming_extents_max, ymap.streaming_extents_max, atol=1e-5)
+
     # FPS settings equal or greater may output more frames than the original input file had.
     # This is expected because the created action will be longer (more frames) to reach
     # the defined duration at the given FPS. Tests will skip some checks in those cases.
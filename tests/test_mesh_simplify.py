@@ -0,0 +1,154 @@
+import bpy
+import pytest
+import numpy as np
+from numpy.testing import assert_array_equal
+from ..shared.mesh_simplify import MeshSimplifier, BlenderMeshSimplifier, find_locked_vertices
+from ..sollumz_properties import LODLevel, SollumType
+from ..tools.blenderhelper import create_empty_object, create_blender_object
+
+
+def _grid(size: int, height=None):
+    xs, ys = np.meshgrid(np.arange(size, dtype=np.float64), np.arange(size, dtype=np.float64))
+    positions = np.stack((xs.ravel(), ys.ravel(), np.zeros(size * size)), axis=1)
+    if height is not None:
+        positions[:, 2] = height(positions[:, 0], positions[:, 1])
+    quads = (np.arange(size - 1)[None, :] + np.arange(size - 1)[:, None] * size).ravel()
+    tris = np.stack((quads, quads + 1, quads + size + 1, quads, quads + size + 1, quads + size), axis=1)
+    tris = tris.reshape((-1, 3))
+    return positions, tris
+
+
+def test_find_locked_vertices_boundary_and_seams():
+    positions, tris = _grid(4)
+    corner_attrs = np.zeros((len(tris), 3, 1))
+    locked = find_locked_vertices(len(positions), tris, corner_attrs)
+    assert_array_equal(np.flatnonzero(~locked), [5, 6, 9, 10])
+
+    # Triangles on the left of x=1.5 get a different attribute value, the edges between x=1 and x=2 are a seam
+    left = positions[tris].mean(axis=1)[:, 0] < 1.5
+    corner_attrs[left] = 1.0
+    locked = find_locked_vertices(len(positions), tris, corner_attrs)
+    assert locked[[5, 6, 9, 10]].all()
+
+
+def test_simplify_flat_grid_without_error():
+    positions, tris = _grid(10)
+    simplifier = MeshSimplifier(positions, tris)
+
+    result = simplifier.simplify(max_error=0.0)
+
+    assert result.error == 0.0
+    # Only the boundary is needed to represent a flat grid
+    boundary = (positions[:, 0] % 9 == 0) | (positions[:, 1] % 9 == 0)
+    assert set(np.unique(simplifier.tris)) == set(np.flatnonzero(boundary))
+    assert result.num_tris == len(simplifier.tris) < len(tris)
+
+
+def test_simplify_to_target_tris():
+    positions, tris = _grid(30, height=lambda x, y: np.sin(x * 0.3) * np.cos(y * 0.2))
+    simplifier = MeshSimplifier(positions, tris)
+
+    result_high = simplifier.simplify(target_tris=800)
+    result_low = simplifier.simplify(target_tris=300)
+
+    assert result_high.num_tris <= 800
+    assert result_low.num_tris <= 300
+    assert 0.0 < result_high.error <= result_low.error
+    # Triangles keep their winding
+    normals = np.cross(
+        simplifier.positions[simplifier.tris[:, 1]] - simplifier.positions[simplifier.tris[:, 0]],
+        simplifier.positions[simplifier.tris[:, 2]] - simplifier.positions[simplifier.tris[:, 0]],
+    )
+    assert np.all(normals[:, 2] > 0.0)
+
+
+@pytest.fixture()
+def sphere_mesh(context):
+    bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16)
+    obj = context.object
+    bpy.ops.object.shade_smooth()
+    mesh = obj.data
+    half = len(mesh.vertices) // 2
+    obj.vertex_groups.new(name="a").add(list(range(half)), 1.0, "REPLACE")
+    obj.vertex_groups.new(name="b").add(list(range(half, len(mesh.vertices))), 0.5, "REPLACE")
+    mesh.materials.append(bpy.data.materials.new("simplify_material"))
+
+    yield mesh
+
+    bpy.data.objects.remove(obj)
+    bpy.data.meshes.remove(mesh)
+
+
+def test_blender_mesh_simplifier(sphere_mesh):
+    simplifier = BlenderMeshSimplifier(sphere_mesh)
+    num_tris = simplifier.num_tris
+
+    result = simplifier.simplify(target_tris=num_tris // 2)
+    mesh = simplifier.create_mesh("simplified")
+
+    assert len(mesh.polygons) == result.num_tris <= num_tris // 2
+    assert not mesh.validate()
+    assert mesh.uv_layers.active.name == sphere_mesh.uv_layers.active.name
+    assert list(mesh.materials) == list(sphere_mesh.materials)
+    # Bone weights are kept as they were
+    weights = {(g.group, g.weight) for v in mesh.vertices for g in v.groups}
+    assert weights == {(0, 1.0), (1, 0.5)}
+    assert all(len(v.groups) == 1 for v in mesh.vertices)
+    # UV seam vertices are not removed
+    uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    mesh.uv_layers.active.data.foreach_get("uv", uvs)
+    assert np.isclose(uvs[0::2], 1.0).any()
+
+    bpy.data.meshes.remove(mesh)
+
+
+def _corner_normals(mesh: bpy.types.Mesh):
+    normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    if bpy.app.version < (4, 1, 0):
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get("normal", normals)
+    else:
+        mesh.corner_normals.foreach_get("vector", normals)
+    return normals.reshape((-1, 3))
+
+
+def test_blender_mesh_simplifier_custom_normals(sphere_mesh):
+    # Custom normals pointing up, far from the normals of the sphere surface
+    if bpy.app.version < (4, 1, 0):
+        sphere_mesh.use_auto_smooth = True
+    sphere_mesh.normals_split_custom_set_from_vertices([(0.0, 0.0, 1.0)] * len(sphere_mesh.vertices))
+    assert sphere_mesh.has_custom_normals
+
+    simplifier = BlenderMeshSimplifier(sphere_mesh)
+    simplifier.simplify(target_tris=simplifier.num_tris // 2)
+    mesh = simplifier.create_mesh("simplified")
+
+    assert mesh.has_custom_normals
+    assert np.allclose(_corner_normals(mesh), (0.0, 0.0, 1.0), atol=1e-3)
+
+    bpy.data.meshes.remove(mesh)
+
+
+def test_auto_lod_screen_error(context, sphere_mesh):
+    drawable_obj = create_empty_object(SollumType.DRAWABLE)
+    drawable_obj.drawable_properties.lod_dist_high = 10.0
+    drawable_obj.drawable_properties.lod_dist_med = 100.0
+    model_obj = create_blender_object(SollumType.DRAWABLE_MODEL)
+    model_obj.parent = drawable_obj
+    context.view_layer.objects.active = model_obj
+
+    scene = context.scene
+    scene.sollumz_auto_lod_ref_mesh = sphere_mesh
+    scene.sollumz_auto_lod_levels = {LODLevel.HIGH, LODLevel.MEDIUM, LODLevel.LOW}
+    scene.sollumz_auto_lod_mode = "SCREEN_ERROR"
+    assert bpy.ops.sollumz.auto_lod() == {"FINISHED"}
+
+    lods = model_obj.sz_lods
+    num_tris = [len(lods.get_lod(level).mesh.polygons) for level in (LODLevel.HIGH, LODLevel.MEDIUM, LODLevel.LOW)]
+    # HIGH is displayed up close, only coplanar triangles can be merged
+    assert num_tris[0] == len(sphere_mesh.loop_triangles)
+    assert num_tris[0] > num_tris[1] > num_tris[2]
+
+    scene.sollumz_auto_lod_ref_mesh = None
+    for obj in (model_obj, drawable_obj):
+        bpy.data.objects.remove(obj)
@@ -0,0 +1,125 @@
+import json
+import threading
+from ..profiler import Profiler, use_profiler, get_active_profiler, span, count, profiled
+from ..ydr.ydrimport import import_ydr
+from ..ydr.ydrexport import export_ydr
+from .shared import asset_path
+
+
+@profiled
+def _profiled_func(n: int) -> int:
+    count("items", n)
+    return n * 2
+
+
+def test_profiler_disabled_is_noop():
+    assert get_active_profiler() is None
+    with span("stage"):
+        count("items")
+    assert _profiled_func(3) == 6
+
+
+def test_profiler_nested_spans():
+    profiler = Profiler()
+    with use_profiler(profiler):
+        assert get_active_profiler() is profiler
+        with span("outer"):
+            count("files")
+            for i in range(3):
+                assert _profiled_func(i + 1) == (i + 1) * 2
+        with span("other"):
+            pass
+        count("outside")
+    assert get_active_profiler() is None
+
+    assert [s.name for s in profiler.spans] == ["outer", "_profiled_func", "_profiled_func", "_profiled_func", "other"]
+    assert all(s.end is not None for s in profiler.spans)
+
+    summary = profiler.summarize()
+    assert [s.name for s in summary] == ["outer", "other"]
+    outer = summary[0]
+    assert outer.calls == 1
+    assert outer.counters == {"files": 1}
+    func = outer.children["_profiled_func"]
+    assert func.calls == 3
+    assert func.counters == {"items": 6}
+    assert func.time <= outer.time
+    assert profiler.total_counters() == {"outside": 1, "files": 1, "items": 6}
+
+    report = profiler.format_report().splitlines()
+    assert report[0].startswith("    outer: ")
+    assert report[1].startswith("        _profiled_func: ")
+    assert report[1].endswith("s (3 calls) [items: 6]")
+    assert report[2].startswith("    other: ")
+    assert report[3] == "    Total: outside: 1, files: 1, items: 6"
+
+
+def test_profiler_span_closed_on_exception():
+    profiler = Profiler()
+    with use_profiler(profiler):
+        try:
+            with span("outer"):
+                _profiled_func(None)  # raises TypeError
+        except TypeError:
+            pass
+        with span("after"):
+            pass
+
+    assert [s.path for s in profiler.spans] == [("outer",), ("outer", "_profiled_func"), ("after",)]
+    assert all(s.end is not None for s in profiler.spans)
+
+
+def test_profiler_threads():
+    profiler = Profiler()
+
+    def _worker():
+        with span("worker"):
+            count("items")
+
+    with use_profiler(profiler):
+        with span("main"):
+            threads = [threading.Thread(target=_worker) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+    # Spans of other threads are not nested in the spans of the main thread
+    summary = profiler.summarize()
+    assert [s.name for s in summary] == ["main", "worker"]
+    assert summary[1].calls == 4
+    assert summary[1].counters == {"items": 4}
+
+
+def test_profiler_chrome_trace(tmp_path):
+    profiler = Profiler()
+    with use_profiler(profiler):
+        with span("outer"):
+            _profiled_func(2)
+
+    trace_path = tmp_path / "trace.json"
+    profiler.write_chrome_trace(str(trace_path))
+    trace = json.loads(trace_path.read_text())
+    events = trace["traceEvents"]
+    assert [e["name"] for e in events] == ["outer", "_profiled_func"]
+    assert all(e["ph"] == "X" for e in events)
+    assert events[1]["args"] == {"items": 2}
+    assert events[0]["ts"] <= events[1]["ts"]
+    assert events[1]["ts"] + events[1]["dur"] <= events[0]["ts"] + events[0]["dur"]
+
+
+def test_profiler_import_export(tmp_path):
+    profiler = Profiler()
+    with use_profiler(profiler):
+        obj = import_ydr(str(asset_path("sollumz_cube.ydr.xml")))
+        export_ydr(obj, str(tmp_path / "sollumz_cube.ydr.xml"))
+
+    names = {s.name for s in profiler.spans}
+    assert {
+        "import_ydr", "parse_xml", "read_xml", "shadergroup_to_materials", "MeshBuilder.build",
+        "export_ydr", "create_drawable_xml", "evaluate_mesh", "VertexBufferBuilder.build", "build_xml", "write_xml",
+    } <= names
+    counters = profiler.total_counters()
+    assert counters["vertices"] > 0
+    assert counters["triangles"] > 0
+    assert counters["materials"] > 0
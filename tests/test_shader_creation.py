@@ -5,7 +5,7 @@ import random
 from .test_fixtures import BLENDER_LANGUAGES, SOLLUMZ_SHADERS, SOLLUMZ_COLLISION_MATERIALS
 from ..ydr.shader_materials import create_shader
 from ..ybn.collision_materials import create_collision_material_from_index
-from ..ynv.ynvimport import get_material as ynv_get_material
+from ..ynv.navmesh import get_navmesh_material
 from ..tools.ymaphelper import add_occluder_material
 from ..sollumz_properties import SollumType
 from ..tools.blenderhelper import find_bsdf_and_material_output, material_from_image
@@ -35,7 +35,7 @@ class TestAllLanguages:
         assert mat is not None
 
     def test_create_navmesh_material(self, use_every_language):
-        mat = ynv_get_material("0 204 0 255 161 107", {})
+        mat = get_navmesh_material()
         assert mat is not None
 
     @pytest.mark.parametrize("sollum_type", (SollumType.YMAP_MODEL_OCCLUDER, SollumType.YMAP_BOX_OCCLUDER))
@@ -0,0 +1,100 @@
+import os
+import shutil
+from ..shared.texture_copier import TextureCopier, use_texture_copier, get_active_texture_copier
+
+
+def _write_file(path, content: bytes):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_texture_copier_dedupes_and_skips_up_to_date(tmp_path):
+    src_a = _write_file(tmp_path / "a.dds", b"a" * 100)
+    src_b = _write_file(tmp_path / "b.dds", b"b" * 50)
+    dst_dir = str(tmp_path / "out")
+
+    copier = TextureCopier(max_workers=2)
+    assert copier.copy(src_a, dst_dir)
+    assert copier.copy(src_b, dst_dir)
+    assert copier.copy(src_a, dst_dir)  # queued again by another drawable
+    assert not copier.copy(str(tmp_path / "missing.dds"), dst_dir)
+    copier.close()
+
+    assert (copier.num_copied, copier.bytes_copied) == (2, 150)
+    assert (copier.num_skipped, copier.bytes_skipped) == (1, 100)
+    assert (tmp_path / "out" / "a.dds").read_bytes() == b"a" * 100
+    assert (tmp_path / "out" / "b.dds").read_bytes() == b"b" * 50
+
+    # Destination files are up to date in a new export operation
+    copier = TextureCopier()
+    copier.copy(src_a, dst_dir)
+    copier.copy(src_a, str(tmp_path))  # copy to itself
+    copier.close()
+    assert (copier.num_copied, copier.num_skipped) == (0, 2)
+
+    # Modified source files are copied again
+    _write_file(tmp_path / "a.dds", b"c" * 120)
+    stat = os.stat(src_a)
+    os.utime(src_a, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    copier = TextureCopier()
+    copier.copy(src_a, dst_dir)
+    copier.close()
+    assert (copier.num_copied, copier.bytes_copied) == (1, 120)
+    assert (tmp_path / "out" / "a.dds").read_bytes() == b"c" * 120
+
+
+def test_texture_copier_replaces_newer_destination(tmp_path):
+    src = _write_file(tmp_path / "a.dds", b"a" * 100)
+    (tmp_path / "out").mkdir()
+    dst = _write_file(tmp_path / "out" / "a.dds", b"b" * 100)
+    stat = os.stat(src)
+    os.utime(dst, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    copier = TextureCopier()
+    copier.copy(src, str(tmp_path / "out"))
+    copier.close()
+    assert (copier.num_copied, copier.num_skipped) == (1, 0)
+    assert (tmp_path / "out" / "a.dds").read_bytes() == b"a" * 100
+
+
+def test_texture_copier_skips_textures_with_same_name(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    src_a = _write_file(tmp_path / "a" / "tex.dds", b"a" * 100)
+    src_b = _write_file(tmp_path / "b" / "tex.dds", b"b" * 100)
+
+    copier = TextureCopier(max_workers=2)
+    copier.copy(src_a, str(tmp_path / "out"))
+    copier.copy(src_b, str(tmp_path / "out"))
+    copier.close()
+    assert (copier.num_copied, copier.num_skipped) == (1, 0)
+    assert (tmp_path / "out" / "tex.dds").read_bytes() == b"a" * 100
+
+
+def test_texture_copier_reads_source_once(tmp_path, monkeypatch):
+    src = _write_file(tmp_path / "a.dds", b"a" * 100)
+    copied_from = []
+    copy2 = shutil.copy2
+
+    def _copy2(src_path, dst_path):
+        copied_from.append(src_path)
+        return copy2(src_path, dst_path)
+
+    monkeypatch.setattr(shutil, "copy2", _copy2)
+    copier = TextureCopier(max_workers=4)
+    for name in ("d1", "d2", "d3"):
+        copier.copy(src, str(tmp_path / name))
+    copier.close()
+
+    assert (copier.num_copied, copier.bytes_copied) == (3, 300)
+    assert copied_from.count(os.path.normcase(src)) == 1
+    for name in ("d1", "d2", "d3"):
+        assert (tmp_path / name / "a.dds").read_bytes() == b"a" * 100
+        assert os.stat(tmp_path / name / "a.dds").st_mtime_ns == os.stat(src).st_mtime_ns
+
+
+def test_use_texture_copier():
+    assert get_active_texture_copier() is None
+    with use_texture_copier() as copier:
+        assert get_active_texture_copier() is copier
+    assert get_active_texture_copier() is None
@@ -2,6 +2,7 @@ import pytest
 import numpy as np
 from numpy.testing import assert_array_equal, assert_allclose
 from ..ydr.vertex_buffer_builder import dedupe_and_get_indices
+from ..ydr.ydrexport import split_vert_buffers
 from ..cwxml.drawable import VertexBuffer
 
 
@@ -93,3 +94,52 @@ def test_dedupe_repeated_but_with_rounding_errors():
     assert len(vertex_arr) == 2
     assert len(ind_arr) == 9
     assert_allclose(vertex_arr[ind_arr]["Normal"], input_vertex_arr["Normal"], atol=1e-6)
+
+
+def _grid_vertex_buffer(size: int):
+    xs, ys = np.meshgrid(np.arange(size), np.arange(size))
+    vert_arr = np.zeros(size * size, dtype=[VertexBuffer.VERT_ATTR_DTYPES["Position"]])
+    vert_arr["Position"][:, 0] = xs.ravel()
+    vert_arr["Position"][:, 1] = ys.ravel()
+
+    quads = (ys[:-1, :-1] * size + xs[:-1, :-1]).ravel()
+    tris = np.stack((quads, quads + 1, quads + size, quads + 1, quads + size + 1, quads + size), axis=1).reshape((-1, 3))
+    tris = tris[np.random.default_rng(0).permutation(len(tris))]
+    return vert_arr, tris.ravel().astype(np.uint32)
+
+
+def test_split_vert_buffers_small_geometry():
+    vert_arr, ind_arr = _grid_vertex_buffer(3)
+    vert_arr = np.concatenate((vert_arr, vert_arr[:1]))  # unused vertex is dropped
+
+    vert_arrs, ind_arrs = split_vert_buffers(vert_arr, ind_arr)
+
+    assert len(vert_arrs) == 1
+    assert len(vert_arrs[0]) == 9
+    assert ind_arrs[0].dtype == np.uint32
+    # Vertices in order of first use
+    first_use = np.unique(ind_arrs[0], return_index=True)[1]
+    assert np.all(np.diff(first_use) > 0)
+    assert_array_equal(vert_arrs[0]["Position"][ind_arrs[0]], vert_arr["Position"][ind_arr])
+
+
+@pytest.mark.parametrize("spatial", (False, True))
+def test_split_vert_buffers_large_geometry(spatial):
+    vert_arr, ind_arr = _grid_vertex_buffer(200)
+
+    vert_arrs, ind_arrs = split_vert_buffers(vert_arr, ind_arr, spatial)
+
+    assert len(vert_arrs) == 4
+    assert all(len(inds) <= 65535 and len(inds) % 3 == 0 for inds in ind_arrs)
+    assert all(inds.max() == len(verts) - 1 for verts, inds in zip(vert_arrs, ind_arrs))
+    split_tris = np.concatenate([verts["Position"][inds] for verts, inds in zip(vert_arrs, ind_arrs)]).reshape((-1, 9))
+    tris = vert_arr["Position"][ind_arr].reshape((-1, 9))
+    if spatial:
+        # Same triangles, in a different order
+        split_tris = np.unique(split_tris, axis=0)
+        tris = np.unique(tris, axis=0)
+    assert_array_equal(split_tris, tris)
+
+    num_split_verts = sum(len(verts) for verts in vert_arrs)
+    if spatial:
+        assert num_split_verts < len(vert_arr) * 1.1
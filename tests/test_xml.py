@@ -1,6 +1,21 @@
 import pytest
-from ..cwxml.element import get_str_type, ElementTree, ValueProperty
-from ..cwxml.ymap import HexColorProperty
+import numpy as np
+from numpy.testing import assert_array_equal
+from ..cwxml.element import (
+    get_str_type,
+    ElementTree,
+    ValueProperty,
+    TextProperty,
+    AttributeProperty,
+    MatrixProperty,
+    Vector4ListProperty,
+)
+from xml.etree import ElementTree as ET
+from ..cwxml.ymap import HexColorProperty, GrassInstanceBatch, YMAP
+from ..cwxml.clipdictionary import YCD, ValuesBuffer, FramesBuffer
+from ..cwxml.bound import Polygons, PolyBox, PolySphere, PolyTriangle, PolygonType, VerticesProperty, VertexColorProperty
+from ..cwxml.cloth import VerletClothVerticesProperty
+from .shared import asset_path
 
 
 @pytest.mark.parametrize("string, expected", (
@@ -32,6 +47,56 @@ def test_xml_bool_output(bool_value: bool, expected: str):
     assert xml.find("v").attrib["value"] == expected
 
 
+def test_xml_element_tree_properties():
+    class Base(ElementTree):
+        tag_name = "Item"
+        type = "Base"
+
+        def __init__(self):
+            self.type = AttributeProperty("type", self.type)
+            self.name = TextProperty("Name", "")
+            self.count = ValueProperty("Count", 0)
+            self.count = 5
+            self.other = None
+
+    class Derived(Base):
+        type = "Derived"
+
+        def __init__(self):
+            super().__init__()
+            self.flag = ValueProperty("Flag", False)
+
+    for _ in range(2):
+        # Same behaviour for the first instance, while the properties are found, and the later instances
+        for cls in (Base, Derived):
+            d = cls()
+            assert d.type == cls.type == cls.__name__
+            assert d.count == 5
+            assert d.get_element("count").value == 5
+            assert d.get_element("type") is None  # only ElementProperty
+            assert d.other is None
+            assert d.missing is None
+
+            d.name = "test"
+            prop = d.get_element("name")
+            assert isinstance(prop, TextProperty) and prop.value == "test"
+            d.name = TextProperty("Name", "replaced")
+            assert d.name == "replaced"
+            assert d.get_element("name") is not prop
+
+            d.other = [1]
+            assert d.other == [1]
+
+            element = ET.fromstring(ET.tostring(d.to_xml()))
+            assert element.get("type") == cls.__name__
+            new = cls.from_xml(element)
+            assert new.type == cls.__name__ and new.name == "replaced" and new.count == 5
+            assert new.other is None
+
+        assert Derived().flag is False
+        assert Base().flag is None
+
+
 @pytest.mark.parametrize("argb_hex, expected_rgba", (
     ("0x00FF0000", (1.0, 0.0, 0.0, 0.0)),
     ("0x0000FF00", (0.0, 1.0, 0.0, 0.0)),
@@ -52,3 +117,146 @@ def test_argb_hex_to_rgba(argb_hex, expected_rgba):
 ))
 def test_rgba_to_argb_hex(rgba, expected_argb_hex):
     assert HexColorProperty.rgba_to_argb_hex(rgba) == expected_argb_hex
+
+
+def test_ycd_channels_get_values_matches_get_value():
+    clip_dictionary = YCD.from_xml_file(str(asset_path("anim_channels.ycd.xml")))
+    animation = clip_dictionary.animations[0]
+    for sequence in animation.sequences:
+        frame_ids = np.arange(sequence.frame_count)
+        for sequence_data in sequence.sequence_data:
+            channel_values = []
+            for channel in sequence_data.channels:
+                values = channel.get_values(frame_ids, channel_values)
+                channel_values.append(values)
+
+                expected_values = []
+                for frame_id in frame_ids:
+                    frame_channel_values = [v[frame_id] for v in channel_values[:-1]]
+                    expected_values.append(np.array(channel.get_value(frame_id, frame_channel_values)))
+
+                assert_array_equal(values, expected_values, err_msg=f"Channel '{channel.type}' does not match")
+
+
+@pytest.mark.parametrize("buffer_type, text", (
+    (ValuesBuffer, "0.5 -1.0 2.25"),
+    (ValuesBuffer, " ".join(str(float(i)) for i in range(10)) + "\n"),
+    (FramesBuffer, " ".join(str(i) for i in range(10)) + " \n10 11"),
+))
+def test_ycd_buffers_roundtrip(buffer_type, text):
+    element = ET.Element("Values")
+    element.text = text
+    buffer = buffer_type.from_xml(element)
+    assert buffer.value.dtype == buffer_type.dtype
+    assert_array_equal(buffer.value, np.fromstring(text, sep=" "))
+    assert buffer.to_xml().text == text
+
+
+def test_ymap_grass_instances_roundtrip():
+    ymap = YMAP.from_xml_file(str(asset_path("grass.ymap.xml")))
+    batches = ymap.instanced_data.grass_instance_list
+    assert len(batches) == 2
+
+    instances = batches[0].instances
+    assert instances.num_instances == 3
+    assert_array_equal(instances.position, [[0, 65535, 0], [65535, 0, 0], [31234, 12000, 0]])
+    assert_array_equal(instances.normal, [[127, 128], [160, 90], [100, 150]])
+    assert_array_equal(instances.color, [[94, 104, 72], [120, 130, 80], [255, 0, 17]])
+    assert_array_equal(instances.scale, [209, 0, 255])
+    assert_array_equal(instances.ao, [255, 128, 3])
+
+    for batch in batches:
+        element = ET.fromstring(ET.tostring(batch.get_element("instances").to_xml()))
+        roundtrip_instances = GrassInstanceBatch.InstanceListProperty.from_xml(element).value
+        for name in instances._fields:
+            assert_array_equal(getattr(roundtrip_instances, name), getattr(batch.instances, name), err_msg=name)
+
+
+def test_ymap_grass_instances_missing_values():
+    element = ET.fromstring(
+        "<InstanceList>"
+        "<Item><Position>1 2 3</Position><NormalX value=\"5\" /><Scale value=\"7\" /></Item>"
+        "</InstanceList>"
+    )
+    instances = GrassInstanceBatch.InstanceListProperty.from_xml(element).value
+    assert_array_equal(instances.position, [[1, 2, 3]])
+    assert_array_equal(instances.normal, [[5, 0]])
+    assert_array_equal(instances.color, [[0, 0, 0]])
+    assert_array_equal(instances.scale, [7])
+    assert_array_equal(instances.ao, [0])
+
+
+def test_bound_polygons_roundtrip():
+    polygons_xml = """<Polygons>
+  <Triangle m="1" v1="0" v2="1" v3="2" f1="-1" f2="5" f3="3" />
+  <Box m="0" v1="3" v2="4" v3="5" v4="6" />
+  <Triangle m="2" v1="2" v2="1" v3="7" f1="0" f2="-1" f3="65535" />
+  <Sphere m="3" v="8" radius="0.3" />
+  <Capsule m="3" v1="8" v2="9" radius="1" />
+</Polygons>"""
+    element = ET.fromstring(polygons_xml)
+    polygons = Polygons.from_xml(element).value
+    assert len(polygons) == 5
+
+    triangles = polygons.triangles
+    assert_array_equal(triangles["material_index"], [1, 2])
+    assert_array_equal(triangles["vertices"][:, :3], [[0, 1, 2], [2, 1, 7]])
+    assert_array_equal(triangles["neighbours"], [[-1, 5, 3], [0, -1, 65535]])
+
+    primitives = polygons.primitives()
+    assert [type(p).__name__ for p in primitives] == ["PolyBox", "PolySphere", "PolyCapsule"]
+    assert (primitives[0].v1, primitives[0].v4) == (3, 6)
+    assert (primitives[1].material_index, primitives[1].v, primitives[1].radius) == (3, 8, 0.3)
+
+    roundtrip_element = Polygons("Polygons", polygons).to_xml()
+    assert [(e.tag, e.attrib) for e in roundtrip_element] == [(e.tag, e.attrib) for e in element]
+
+
+def test_bound_polygons_append():
+    polygons = Polygons().value
+    sphere = PolySphere()
+    sphere.v = 4
+    sphere.radius = 1.5
+    polygons.append(sphere)
+    polygons.extend(polygons.empty(2, PolygonType.TRIANGLE))
+    box = PolyBox()
+    polygons.append(box)
+
+    assert [type(p) for p in polygons] == [PolySphere, PolyTriangle, PolyTriangle, PolyBox]
+    assert (polygons[0].v, polygons[0].radius) == (4, 1.5)
+    assert (polygons[3].v1, polygons[3].v2, polygons[3].v3, polygons[3].v4) == (0, 1, 2, 3)
+
+
+@pytest.mark.parametrize("prop_type, text, expected", (
+    (VerticesProperty, "\n1.5, -2.0, 0.30000001192092896\n4.0, 5.0, 6.0\n", [[1.5, -2.0, 0.3], [4.0, 5.0, 6.0]]),
+    (VertexColorProperty, "\n255, 0, 12, 255\n1, 2, 3, 4\n", [[255, 0, 12, 255], [1, 2, 3, 4]]),
+    (Vector4ListProperty, "\n0.0, 1.0, 2.0, 3.0\n", [[0.0, 1.0, 2.0, 3.0]]),
+    (VerletClothVerticesProperty, "\n0.5, 1.0, 2.0, 0.0\n", [[0.5, 1.0, 2.0]]),
+))
+def test_array_properties_roundtrip(prop_type, text, expected):
+    element = ET.Element("Values")
+    element.text = text
+    prop = prop_type.from_xml(element)
+    assert_array_equal(prop.value, np.array(expected, dtype=prop.value.dtype))
+    assert prop.to_xml().text == text
+
+
+def test_array_properties_invalid_rows():
+    element = ET.Element("Vertices")
+    element.text = "\n1.0, 2.0, 3.0\n4.0, 5.0\n"
+    with pytest.raises(ValueError):
+        VerticesProperty.from_xml(element)
+
+
+def test_matrix_property_roundtrip():
+    element = ET.Element("Transform")
+    element.text = "1.0 0.0 0.0 0.0\n0.0 1.0 0.0 0.0\n0.0 0.0 1.0 0.0\n0.5 -2.0 3.0 1.0"
+    prop = MatrixProperty.from_xml(element)
+    assert tuple(prop.value[3]) == (0.5, -2.0, 3.0, 1.0)
+    assert prop.to_xml().text == element.text
+
+    # Missing rows are left as identity
+    element.text = "\n      1.0 0.0 0.0 0.0\n      0.0 1.0 0.0 0.0\n      0.0 0.0 1.0 2.0\n    "
+    prop = MatrixProperty.from_xml(element)
+    assert tuple(prop.value[2]) == (0.0, 0.0, 1.0, 2.0)
+    assert tuple(prop.value[3]) == (0.0, 0.0, 0.0, 1.0)
@@ -0,0 +1,81 @@
+import pytest
+import numpy as np
+from numpy.testing import assert_array_less
+from xml.etree import ElementTree as ET
+from ..cwxml.clipdictionary import ClipDictionary
+from ..tools.animationhelper import Track, TrackFormat, TrackFormatMap
+from ..ycd.ycdimport import import_ycd, combine_sequences_and_build_action_data, get_frames_data_from_sequence_data
+from ..ycd.ycdexport import clip_dictionary_from_object
+from ..ycd.compression import CompressionTolerances, compress_track
+from .shared import asset_path
+
+
+def _random_walk(rng: np.random.Generator, num_frames: int, num_components: int, step: float) -> np.ndarray:
+    return np.cumsum(rng.normal(scale=step, size=(num_frames, num_components)), axis=0).astype(np.float32)
+
+
+def _smooth_rotations(rng: np.random.Generator, num_frames: int) -> np.ndarray:
+    quats = _random_walk(rng, num_frames, 4, 0.02) + np.array((1.0, 0.0, 0.0, 0.0), dtype=np.float32)
+    return (quats / np.linalg.norm(quats, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _max_error(track: Track, decoded: np.ndarray, frames_data: np.ndarray) -> float:
+    error = np.abs(decoded - frames_data).max()
+    if TrackFormatMap[track] == TrackFormat.Quaternion:
+        error = min(error, np.abs(decoded + frames_data).max())
+    return float(error)
+
+
+@pytest.mark.parametrize("track, make_frames_data, tolerance", (
+    (Track.BonePosition, lambda rng: _random_walk(rng, 200, 3, 0.01), 0.0005),
+    (Track.BonePosition, lambda rng: np.tile(np.float32((1.0, 2.0, 3.0)), (200, 1)), 0.0005),
+    (Track.BoneRotation, lambda rng: _smooth_rotations(rng, 200), 0.0005),
+    (Track.BoneRotation, lambda rng: _smooth_rotations(rng, 200), 0.00001),
+    (Track.BoneScale, lambda rng: np.repeat(rng.uniform(0.5, 2.0, size=(10, 3)), 20, axis=0).astype(np.float32), 0.001),
+    (Track.CameraFOV, lambda rng: _random_walk(rng, 200, 1, 0.5)[:, 0], 0.001),
+    (Track.CameraFOV, lambda rng: _random_walk(rng, 200, 1, 0.5)[:, 0], 0.0),
+))
+def test_compress_track_within_tolerance(track, make_frames_data, tolerance):
+    frames_data = make_frames_data(np.random.default_rng(0))
+
+    compressed_track = compress_track(track, frames_data, tolerance)
+
+    decoded = get_frames_data_from_sequence_data(
+        TrackFormatMap[track], compressed_track.sequence_data, np.arange(len(frames_data))
+    )
+    assert _max_error(track, decoded, frames_data) <= tolerance
+    assert compressed_track.max_error <= tolerance
+    assert compressed_track.size_bits <= compressed_track.raw_size_bits
+
+
+def test_compress_track_prefers_cached_quaternion():
+    frames_data = _smooth_rotations(np.random.default_rng(0), 200)
+
+    compressed_track = compress_track(Track.BoneRotation, frames_data, 0.0005)
+
+    channels = compressed_track.sequence_data.channels
+    assert len(channels) == 4
+    assert channels[-1].type == "CachedQuaternion1"
+
+
+def test_export_ycd_compressed_within_tolerances():
+    tolerances = CompressionTolerances(position=0.0005, rotation=0.0005, other=0.001)
+    obj = import_ycd(str(asset_path("anim_channels.ycd.xml")))
+    assert obj is not None
+
+    clip_dictionary = clip_dictionary_from_object(obj, None)
+    compressed_clip_dictionary = clip_dictionary_from_object(obj, tolerances)
+    # Go through XML to check that the compressed channels are written and read back correctly
+    compressed_clip_dictionary = ClipDictionary.from_xml(
+        ET.fromstring(ET.tostring(compressed_clip_dictionary.to_xml()))
+    )
+
+    for animation, compressed_animation in zip(clip_dictionary.animations, compressed_clip_dictionary.animations):
+        action_data = combine_sequences_and_build_action_data(animation)
+        compressed_action_data = combine_sequences_and_build_action_data(compressed_animation)
+        assert action_data.keys() == compressed_action_data.keys()
+        for bone_id, bone_data in action_data.items():
+            assert bone_data.keys() == compressed_action_data[bone_id].keys()
+            for track, frames_data in bone_data.items():
+                error = _max_error(track, compressed_action_data[bone_id][track], frames_data)
+                assert_array_less(error, tolerances.for_track(track) + 1e-7, err_msg=f"#{bone_id} {track}")
@@ -0,0 +1,190 @@
+import pytest
+import numpy as np
+from numpy.testing import assert_array_equal, assert_allclose
+from xml.etree import ElementTree as ET
+from ..cwxml.navmesh import YNV, Navmesh
+from ..ynv.ynvimport import import_ynv
+from ..ynv.ynvexport import navmesh_from_object, get_polygon_adjacency
+from ..ynv.navmesh import NO_ADJACENT_POLY, NavMeshAttr
+from ..sollumz_properties import SollumType
+from .shared import asset_path
+
+
+def _get_attribute_values(mesh, attr: NavMeshAttr) -> np.ndarray:
+    attribute = mesh.attributes[attr]
+    assert attribute.data_type == attr.type
+    assert attribute.domain == attr.domain
+    values = np.empty(len(attribute.data), dtype=np.int32 if attr.type == "INT" else np.float32)
+    attribute.data.foreach_get("value", values)
+    return values
+
+
+def test_import_ynv_welds_polygon_vertices():
+    obj = import_ynv(str(asset_path("navmesh.ynv.xml")))
+    assert obj is not None
+
+    poly_obj = next(c for c in obj.children if c.sollum_type == SollumType.NAVMESH_POLY_MESH)
+    mesh = poly_obj.data
+    # 2x2 grid of quads sharing their vertices, the degenerate triangle is skipped
+    assert len(mesh.polygons) == 4
+    assert len(mesh.vertices) == 9
+    assert len(mesh.edges) == 12
+    assert not mesh.validate()
+
+    ynv = YNV.from_xml_file(str(asset_path("navmesh.ynv.xml")))
+    corners = np.array([mesh.vertices[i].co for p in mesh.polygons for i in p.vertices])
+    assert_allclose(corners, ynv.polygons.vertices[:16], atol=1e-6)
+    for flags_index, attr in enumerate(NavMeshAttr.poly_flags()):
+        assert_array_equal(_get_attribute_values(mesh, attr), ynv.polygons.flags[:4, flags_index])
+
+
+def test_import_ynv_points_and_portals():
+    obj = import_ynv(str(asset_path("navmesh.ynv.xml")))
+    ynv = YNV.from_xml_file(str(asset_path("navmesh.ynv.xml")))
+
+    points_obj = next(c for c in obj.children if c.sollum_type == SollumType.NAVMESH_POINT)
+    points_mesh = points_obj.data
+    assert len(points_mesh.vertices) == len(ynv.points)
+    assert_allclose([v.co for v in points_mesh.vertices], [p.position for p in ynv.points], atol=1e-6)
+    assert_array_equal(_get_attribute_values(points_mesh, NavMeshAttr.POINT_TYPE), [p.type for p in ynv.points])
+    assert_allclose(_get_attribute_values(points_mesh, NavMeshAttr.POINT_ANGLE), [p.angle for p in ynv.points])
+
+    portals_obj = next(c for c in obj.children if c.sollum_type == SollumType.NAVMESH_PORTAL)
+    portals_mesh = portals_obj.data
+    assert len(portals_mesh.edges) == len(ynv.portals)
+    for edge, portal in zip(portals_mesh.edges, ynv.portals):
+        v0, v1 = edge.vertices
+        assert_allclose(portals_mesh.vertices[v0].co, portal.position_from, atol=1e-6)
+        assert_allclose(portals_mesh.vertices[v1].co, portal.position_to, atol=1e-6)
+    poly_from = _get_attribute_values(portals_mesh, NavMeshAttr.PORTAL_POLY_FROM)
+    poly_to = _get_attribute_values(portals_mesh, NavMeshAttr.PORTAL_POLY_TO)
+    assert_array_equal(poly_from, [p.poly_from for p in ynv.portals])
+    assert_array_equal(poly_to, [p.poly_to for p in ynv.portals])
+
+
+def test_import_ynv_remaps_polygon_indices(tmp_path):
+    # Move the degenerate triangle between the quads, so the indices of the following quads change
+    root = ET.parse(str(asset_path("navmesh.ynv.xml"))).getroot()
+    polygons = root.find("Polygons")
+    degenerate = polygons.findall("Item")[4]
+    polygons.remove(degenerate)
+    polygons.insert(1, degenerate)
+    portals = root.find("Portals").findall("Item")
+    portals[0].find("PolyTo").set("value", "2")
+    portals[1].find("PolyFrom").set("value", "2")
+    portals[1].find("PolyTo").set("value", "3")
+    linked_to_degenerate = ET.fromstring(ET.tostring(portals[0]))
+    linked_to_degenerate.find("PolyFrom").set("value", "1")
+    root.find("Portals").append(linked_to_degenerate)
+    filepath = tmp_path / "navmesh.ynv.xml"
+    ET.ElementTree(root).write(str(filepath))
+
+    obj = import_ynv(str(filepath))
+    ynv = YNV.from_xml_file(str(asset_path("navmesh.ynv.xml")))
+
+    poly_obj = next(c for c in obj.children if c.sollum_type == SollumType.NAVMESH_POLY_MESH)
+    mesh = poly_obj.data
+    assert len(mesh.polygons) == 4
+    for flags_index, attr in enumerate(NavMeshAttr.poly_flags()):
+        assert_array_equal(_get_attribute_values(mesh, attr), ynv.polygons.flags[:4, flags_index])
+
+    # The portal linked to the degenerate triangle is skipped, the others reference the same quads as in the asset
+    portals_mesh = next(c for c in obj.children if c.sollum_type == SollumType.NAVMESH_PORTAL).data
+    assert len(portals_mesh.edges) == len(ynv.portals)
+    poly_from = _get_attribute_values(portals_mesh, NavMeshAttr.PORTAL_POLY_FROM)
+    poly_to = _get_attribute_values(portals_mesh, NavMeshAttr.PORTAL_POLY_TO)
+    assert_array_equal(poly_from, [p.poly_from for p in ynv.portals])
+    assert_array_equal(poly_to, [p.poly_to for p in ynv.portals])
+
+
+def test_polygon_adjacency_of_quad_grid():
+    # 2x2 grid of quads with vertices indexed row by row
+    corner_verts = np.array((0, 1, 4, 3, 1, 2, 5, 4, 3, 4, 7, 6, 4, 5, 8, 7))
+    poly_sizes = np.array((4, 4, 4, 4))
+
+    adjacency = get_polygon_adjacency(corner_verts, poly_sizes)
+
+    assert_array_equal(adjacency, (
+        -1, 1, 2, -1,
+        -1, -1, 3, 0,
+        0, 3, -1, -1,
+        1, -1, -1, 2,
+    ))
+
+
+def test_export_ynv_roundtrip():
+    obj = import_ynv(str(asset_path("navmesh.ynv.xml")))
+    ynv = YNV.from_xml_file(str(asset_path("navmesh.ynv.xml")))
+
+    navmesh = navmesh_from_object(obj)
+    navmesh = Navmesh.from_xml(ET.fromstring(ET.tostring(navmesh.to_xml())))
+
+    assert navmesh.area_id == ynv.area_id
+    assert navmesh.content_flags == ynv.content_flags
+
+    def _polygons_by_vertices(polygons):
+        starts = np.cumsum(polygons.sizes) - polygons.sizes
+        return {
+            tuple(np.round(polygons.vertices[start:start + size], 4).ravel()): poly_index
+            for poly_index, (start, size) in enumerate(zip(starts, polygons.sizes))
+        }
+
+    # The degenerate triangle is skipped on import, the rest of polygons may be reordered by sector
+    expected_polys = _polygons_by_vertices(ynv.polygons)
+    exported_polys = _polygons_by_vertices(navmesh.polygons)
+    assert navmesh.polygons.num_polygons == 4
+    assert exported_polys.keys() <= expected_polys.keys()
+    for vertices, poly_index in exported_polys.items():
+        assert_array_equal(navmesh.polygons.flags[poly_index], ynv.polygons.flags[expected_polys[vertices]])
+
+    # Each quad of the grid shares two edges, the other edges keep the links of the asset
+    area_id = ynv.area_id
+    for edges in navmesh.polygons.edges:
+        neighbours = [line.split(",")[0].strip() for line in edges.splitlines()]
+        assert len(neighbours) == 4
+        assert sum(n != f"{area_id}:{NO_ADJACENT_POLY}" for n in neighbours) == 2
+    assert_allclose(navmesh.bb_min, (0.0, 0.0, 0.0), atol=1e-6)
+    assert_allclose(navmesh.bb_max, (2.0, 2.0, ynv.polygons.vertices[:16, 2].max()), atol=1e-6)
+
+    assert len(navmesh.points) == len(ynv.points)
+    for point, expected_point in zip(navmesh.points, ynv.points):
+        assert point.type == expected_point.type
+        assert point.angle == pytest.approx(expected_point.angle)
+        assert_allclose(point.position, expected_point.position, atol=1e-6)
+
+    # Portals keep referencing the same polygons after the reordering
+    expected_vertices = {i: v for v, i in expected_polys.items()}
+    exported_vertices = {i: v for v, i in exported_polys.items()}
+    assert len(navmesh.portals) == len(ynv.portals)
+    for portal, expected_portal in zip(navmesh.portals, ynv.portals):
+        assert portal.type == expected_portal.type
+        assert_allclose(portal.position_from, expected_portal.position_from, atol=1e-6)
+        assert_allclose(portal.position_to, expected_portal.position_to, atol=1e-6)
+        for poly, expected_poly in ((portal.poly_from, expected_portal.poly_from),
+                                    (portal.poly_to, expected_portal.poly_to)):
+            assert exported_vertices[poly] == expected_vertices[expected_poly]
+
+
+def test_export_ynv_keeps_links_to_other_navmeshes(tmp_path):
+    # Link the outer edges of the first quad to polygons of a neighbour navmesh
+    root = ET.parse(str(asset_path("navmesh.ynv.xml"))).getroot()
+    edges = root.find("Polygons").findall("Item")[0].find("Edges")
+    edges.text = "\n".join(("1235:7, 1235:8", "1234:65535, 1234:65535", "1234:65535, 1234:65535", "1236:3, 1236:3"))
+    filepath = tmp_path / "navmesh.ynv.xml"
+    ET.ElementTree(root).write(str(filepath))
+
+    obj = import_ynv(str(filepath))
+    mesh = next(c for c in obj.children if c.sollum_type == SollumType.NAVMESH_POLY_MESH).data
+    assert_array_equal(_get_attribute_values(mesh, NavMeshAttr.EDGE_AREA_0)[:4], (1235, 1234, 1234, 1236))
+    assert_array_equal(_get_attribute_values(mesh, NavMeshAttr.EDGE_POLY_0)[:4], (7, 65535, 65535, 3))
+    assert_array_equal(_get_attribute_values(mesh, NavMeshAttr.EDGE_POLY_1)[:4], (8, 65535, 65535, 3))
+
+    navmesh = navmesh_from_object(obj)
+    starts = np.cumsum(navmesh.polygons.sizes) - navmesh.polygons.sizes
+    first_quad = np.flatnonzero(np.all(np.isclose(navmesh.polygons.vertices[starts], 0.0), axis=1))[0]
+    lines = navmesh.polygons.edges[first_quad].splitlines()
+    # The two inner edges link to the adjacent quads of this navmesh
+    assert lines[0] == "1235:7, 1235:8"
+    assert lines[1].startswith("1234:") and lines[1] != "1234:65535, 1234:65535"
+    assert lines[2].startswith("1234:") and lines[2] != "1234:65535, 1234:65535"
+    assert lines[3] == "1236:3, 1236:3"
@@ -0,0 +1,143 @@
+import bpy
+import pytest
+from ..sollumz_properties import ArchetypeType
+from ..ytyp.mlo_index import MloArchetypeIndex
+from ..ytyp.ytypexport import create_archetype_xml
+from ..ytyp.ytypimport import organize_mlo_entities_in_collections
+from ..ytyp.selection_handler import sync_selection
+
+
+@pytest.fixture()
+def mlo_archetype(context):
+    scene = context.scene
+    ytyp = scene.ytyps.add()
+    scene.ytyp_index = len(scene.ytyps) - 1
+    archetype = ytyp.new_archetype(ArchetypeType.MLO)
+    archetype.asset_name = "test_mlo"
+    for _ in range(2):
+        archetype.new_room()
+    archetype.new_portal()
+    archetype.new_entity_set()
+
+    yield archetype
+
+    scene.ytyps.remove(len(scene.ytyps) - 1)
+    scene.ytyp_index = len(scene.ytyps) - 1
+
+
+def _add_entity(archetype, room: int = -1, portal: int = -1, entity_set: int = -1):
+    entity = archetype.new_entity()
+    if room != -1:
+        entity.attached_room_id = str(archetype.rooms[room].id)
+    if portal != -1:
+        entity.attached_portal_id = str(archetype.portals[portal].id)
+    if entity_set != -1:
+        entity.attached_entity_set_id = str(archetype.entity_sets[entity_set].id)
+    return entity
+
+
+def test_mlo_archetype_index(mlo_archetype):
+    _add_entity(mlo_archetype, room=1)
+    _add_entity(mlo_archetype, room=1, entity_set=0)
+    _add_entity(mlo_archetype, portal=0)
+    _add_entity(mlo_archetype, room=0)
+    _add_entity(mlo_archetype, portal=0, entity_set=0)
+
+    mlo_index = MloArchetypeIndex(mlo_archetype)
+
+    assert mlo_index.entity_room_index == [1, 1, -1, 0, -1]
+    assert mlo_index.entity_portal_index == [-1, -1, 0, -1, 0]
+    assert mlo_index.entity_set_index == [-1, 0, -1, -1, 0]
+    assert mlo_index.non_entity_set_entities == [0, 2, 3]
+    # Attached objects are indices in the exported entities, which don't include the entity set entities
+    assert mlo_index.room_attached_objects == [[2], [0]]
+    assert mlo_index.portal_attached_objects == [[1]]
+    assert mlo_index.entity_set_entities == [[1, 4]]
+    assert mlo_index.get_entity_location(1) == 1
+    assert mlo_index.get_entity_location(4) == (1 << 31)
+    assert mlo_index.get_entity_room_name(0) == mlo_archetype.rooms[1].name
+
+    archetype_xml = create_archetype_xml(mlo_archetype)
+    assert len(archetype_xml.entities) == 3
+    assert [room.attached_objects for room in archetype_xml.rooms] == [[2], [0]]
+    assert [portal.attached_objects for portal in archetype_xml.portals] == [[1]]
+    assert archetype_xml.entity_sets[0].locations == [1, 1 << 31]
+
+
+def test_mlo_archetype_index_entity_using_object(mlo_archetype):
+    obj = bpy.data.objects.new("entity_obj", None)
+    _add_entity(mlo_archetype)
+    _add_entity(mlo_archetype).linked_object = obj
+
+    mlo_index = MloArchetypeIndex(mlo_archetype)
+
+    assert mlo_index.get_entity_index_using_object(obj) == 1
+    bpy.data.objects.remove(obj)
+
+
+def test_new_item_id_fills_gaps(mlo_archetype):
+    for _ in range(3):
+        _add_entity(mlo_archetype)
+    assert [e.id for e in mlo_archetype.entities] == [1, 2, 3]
+
+    mlo_archetype.entities.remove(1)
+    assert _add_entity(mlo_archetype).id == 2
+    assert _add_entity(mlo_archetype).id == 4
+
+
+def test_organize_mlo_entities_in_collections(context, mlo_archetype):
+    room_obj = bpy.data.objects.new("room_entity", None)
+    child_obj = bpy.data.objects.new("room_entity_child", None)
+    child_obj.parent = room_obj
+    other_obj = bpy.data.objects.new("other_entity", None)
+    for obj in (room_obj, child_obj, other_obj):
+        context.collection.objects.link(obj)
+
+    _add_entity(mlo_archetype, room=1).linked_object = room_obj
+    _add_entity(mlo_archetype, portal=0).linked_object = other_obj
+
+    organize_mlo_entities_in_collections(mlo_archetype)
+
+    room_collection_name = f"test_mlo.{mlo_archetype.rooms[1].name}"
+    assert [c.name for c in room_obj.users_collection] == [room_collection_name]
+    assert [c.name for c in child_obj.users_collection] == [room_collection_name]
+    assert [c.name for c in other_obj.users_collection] == ["test_mlo.entities"]
+
+    for obj in (room_obj, child_obj, other_obj):
+        bpy.data.objects.remove(obj)
+    for name in (room_collection_name, "test_mlo.entities"):
+        bpy.data.collections.remove(bpy.data.collections[name])
+
+
+def test_sync_selection_selects_linked_entities(context, mlo_archetype):
+    scene = context.scene
+    scene.sz_sync_mlo_entities_selection = True
+    objs = [bpy.data.objects.new(f"entity_obj{i}", None) for i in range(3)]
+    for obj in objs:
+        _add_entity(mlo_archetype).linked_object = obj
+
+    sync_selection(scene, objs[2], [objs[0], objs[2]])
+    assert mlo_archetype.entities.selected_items_indices == [2, 0]
+
+    # Removing an entity shifts the indices of the next ones, the index is updated on lookup
+    mlo_archetype.entities.remove(0)
+    sync_selection(scene, objs[1], [objs[1]])
+    assert mlo_archetype.entities.selected_items_indices == [0]
+
+    for obj in objs:
+        bpy.data.objects.remove(obj)
+
+
+def test_sync_selection_selects_archetypes(context, mlo_archetype):
+    scene = context.scene
+    scene.sz_sync_archetypes_selection = True
+    ytyp = scene.ytyps[scene.ytyp_index]
+    asset_obj = bpy.data.objects.new("archetype_asset", None)
+    ytyp.new_archetype()
+    ytyp.archetypes[1].asset = asset_obj
+    ytyp.archetypes.select(0)
+
+    sync_selection(scene, asset_obj, [asset_obj])
+    assert ytyp.archetypes.active_index == 1
+
+    bpy.data.objects.remove(asset_obj)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import bpy
 import math
+import numpy as np
 from sys import float_info
 from mathutils import Quaternion, Vector, Euler, Matrix
 from enum import IntFlag, IntEnum
@@ -171,19 +172,14 @@ PropertyNameToTrackMap = {v: k for k, v in TrackToPropertyNameMap.items()}
 
 
 def get_quantum_and_min_val(nums):
-    min_val = float_info.max
-    max_val = float_info.min
-    min_delta = float_info.max
-    last_val = 0
+    nums = np.asarray(nums, dtype=np.float64)
 
-    for value in nums:
-        min_val = min(min_val, value)
-        max_val = max(max_val, value)
+    min_val = min(float_info.max, nums.min(initial=float_info.max))
+    max_val = max(float_info.min, nums.max(initial=float_info.min))
 
-        if value != last_val:
-            min_delta = min(min_delta, abs(value - last_val))
-
-        last_val = value
+    # Smallest difference between consecutive values, the first value is compared with 0
+    deltas = np.diff(nums, prepend=0.0)
+    min_delta = np.abs(deltas[deltas != 0.0]).min(initial=float_info.max)
 
     if min_delta == float_info.max:
         min_delta = 0
@@ -192,7 +188,7 @@ def get_quantum_and_min_val(nums):
     min_quant = range_value / 1048576
     quantum = max(min_delta, min_quant)
 
-    return min_val, quantum
+    return float(min_val), float(quantum)
 
 
 def decompose_uv_affine_matrix(
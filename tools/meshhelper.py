@@ -452,11 +452,21 @@ def get_total_bounds(obj):
     return corners
 
 
-def get_combined_bound_box(obj: bpy.types.Object, use_world: bool = False, matrix: Matrix = Matrix()):
-    """Adds the ``bound_box`` of ``obj`` and all of it's child mesh objects. Returhs bbmin, bbmax"""
+def get_combined_bound_box(
+    obj: bpy.types.Object,
+    use_world: bool = False,
+    matrix: Matrix = Matrix(),
+    children_recursive: Optional[list[bpy.types.Object]] = None
+):
+    """Adds the ``bound_box`` of ``obj`` and all of it's child mesh objects. Returhs bbmin, bbmax.
+    ``children_recursive`` can be passed when already known, ``Object.children_recursive`` goes through all objects.
+    """
     total_bounds: list[Vector] = []
 
-    for child in [obj, *obj.children_recursive]:
+    if children_recursive is None:
+        children_recursive = obj.children_recursive
+
+    for child in [obj, *children_recursive]:
         if child.type != "MESH":
             continue
 
@@ -1,10 +1,15 @@
 import bpy
+import itertools
+import numpy as np
+from numpy.typing import NDArray
 from pathlib import Path
-from mathutils import Vector
+from mathutils import Vector, Matrix
+from typing import Iterable, Optional
 from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType
-from ..tools.blenderhelper import find_bsdf_and_material_output, remove_number_suffix
+from ..tools.blenderhelper import find_bsdf_and_material_output, remove_number_suffix, get_object_with_children
 from ..shared.obj_reader import obj_read_from_file
 from ..tools.meshhelper import get_combined_bound_box, get_sphere_radius
+from ..tools import jenkhash
 
 # TODO: This is not a real flag calculation, definitely need to do better
 
@@ -96,6 +101,147 @@ def get_cargen_mesh() -> bpy.types.Mesh:
 
     return mesh
 
+
+GRASS_NORMAL_ATTRIBUTE = "grass_normal"
+GRASS_COLOR_ATTRIBUTE = "grass_color"
+GRASS_SCALE_ATTRIBUTE = "grass_scale"
+GRASS_AO_ATTRIBUTE = "grass_ao"
+GRASS_INSTANCER_NODE_GROUP_NAME = ".sollumz.grass_instancer"
+
+
+def get_grass_batch_positions(obj: bpy.types.Object) -> NDArray[np.float64]:
+    """Gets the world-space positions of the instances of a grass batch, the vertices of its point-cloud mesh, as an
+    array of shape (N, 3).
+    """
+    mesh = obj.data
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    return positions.reshape((-1, 3)) @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def get_grass_instancer_node_group() -> bpy.types.GeometryNodeTree:
+    """Get the geometry nodes group that places the instances of grass batches or create it if not exist. The instance
+    object, scale range and terrain orientation of the batch are inputs of the group.
+    """
+    node_group = bpy.data.node_groups.get(GRASS_INSTANCER_NODE_GROUP_NAME, None)
+    if node_group is not None:
+        return node_group
+
+    node_group = bpy.data.node_groups.new(GRASS_INSTANCER_NODE_GROUP_NAME, "GeometryNodeTree")
+    interface = node_group.interface
+    interface.new_socket("Geometry", in_out="INPUT", socket_type="NodeSocketGeometry")
+    interface.new_socket("Instance", in_out="INPUT", socket_type="NodeSocketObject")
+    interface.new_socket("Scale Min", in_out="INPUT", socket_type="NodeSocketFloat")
+    interface.new_socket("Scale Max", in_out="INPUT", socket_type="NodeSocketFloat")
+    interface.new_socket("Orient To Terrain", in_out="INPUT", socket_type="NodeSocketFloat")
+    interface.new_socket("Geometry", in_out="OUTPUT", socket_type="NodeSocketGeometry")
+
+    nodes = node_group.nodes
+    links = node_group.links
+    group_input = nodes.new("NodeGroupInput")
+    group_output = nodes.new("NodeGroupOutput")
+
+    object_info = nodes.new("GeometryNodeObjectInfo")
+    object_info.transform_space = "ORIGINAL"
+    object_info.inputs["As Instance"].default_value = True
+    links.new(group_input.outputs["Instance"], object_info.inputs["Object"])
+
+    # Rotation: align Z to the normal, blended with up by the terrain orientation factor
+    normal = nodes.new("GeometryNodeInputNamedAttribute")
+    normal.data_type = "FLOAT_VECTOR"
+    normal.inputs["Name"].default_value = GRASS_NORMAL_ATTRIBUTE
+    normal_offset = nodes.new("ShaderNodeVectorMath")
+    normal_offset.operation = "SUBTRACT"
+    normal_offset.inputs[1].default_value = (0.0, 0.0, 1.0)
+    links.new(normal.outputs["Attribute"], normal_offset.inputs[0])
+    up = nodes.new("ShaderNodeVectorMath")
+    up.operation = "MULTIPLY_ADD"
+    up.inputs[2].default_value = (0.0, 0.0, 1.0)
+    links.new(normal_offset.outputs["Vector"], up.inputs[0])
+    links.new(group_input.outputs["Orient To Terrain"], up.inputs[1])
+    align = nodes.new("FunctionNodeAlignEulerToVector")
+    align.axis = "Z"
+    links.new(up.outputs["Vector"], align.inputs["Vector"])
+
+    # Scale: the normalized scale of each instance mapped to the scale range
+    scale = nodes.new("GeometryNodeInputNamedAttribute")
+    scale.data_type = "FLOAT"
+    scale.inputs["Name"].default_value = GRASS_SCALE_ATTRIBUTE
+    scale_range = nodes.new("ShaderNodeMapRange")
+    links.new(scale.outputs["Attribute"], scale_range.inputs["Value"])
+    links.new(group_input.outputs["Scale Min"], scale_range.inputs["To Min"])
+    links.new(group_input.outputs["Scale Max"], scale_range.inputs["To Max"])
+
+    instance_on_points = nodes.new("GeometryNodeInstanceOnPoints")
+    links.new(group_input.outputs["Geometry"], instance_on_points.inputs["Points"])
+    links.new(object_info.outputs["Geometry"], instance_on_points.inputs["Instance"])
+    links.new(align.outputs["Rotation"], instance_on_points.inputs["Rotation"])
+    links.new(scale_range.outputs["Result"], instance_on_points.inputs["Scale"])
+    links.new(instance_on_points.outputs["Instances"], group_output.inputs["Geometry"])
+
+    return node_group
+
+
+def add_grass_instancer_modifier(obj: bpy.types.Object, instance_obj: bpy.types.Object) -> bpy.types.NodesModifier:
+    """Adds a geometry nodes modifier to the grass batch ``obj`` that places ``instance_obj`` on each of its points."""
+    node_group = get_grass_instancer_node_group()
+    modifier = obj.modifiers.new("Grass Instancer", "NODES")
+    modifier.node_group = node_group
+
+    inputs = {
+        item.name: item.identifier
+        for item in node_group.interface.items_tree
+        if item.item_type == "SOCKET" and item.in_out == "INPUT"
+    }
+    batch_props = obj.ymap_grass_batch_properties
+    modifier[inputs["Instance"]] = instance_obj
+    modifier[inputs["Scale Min"]] = batch_props.scale_range[0]
+    modifier[inputs["Scale Max"]] = batch_props.scale_range[1]
+    modifier[inputs["Orient To Terrain"]] = batch_props.orient_to_terrain
+    return modifier
+
+
+def build_archetype_objects_index(objects: Iterable[bpy.types.Object]) -> dict[str, bpy.types.Object]:
+    """Builds a map of lowercase object names to objects, to look up the objects of the entity archetypes. Archetype
+    names are case-insensitive. If multiple objects have the same lowercase name, the first one is kept.
+    """
+    index = {}
+    for obj in objects:
+        index.setdefault(obj.name.lower(), obj)
+    return index
+
+
+def get_archetype_instance_collection(obj: bpy.types.Object) -> Optional[bpy.types.Collection]:
+    """Gets the collection used to place ``obj`` and its children as collection instances, creating it if needed.
+    The collection is not linked to the scene, the objects stay in their current collections too.
+
+    The instance offset of a collection can only undo the location of ``obj``. Returns ``None`` if ``obj`` is rotated
+    or scaled, the entities would be placed differently from duplicates of ``obj``.
+    """
+    if not np.allclose(np.array(obj.matrix_world.to_3x3()), np.identity(3), atol=1e-6):
+        return None
+
+    collection_name = f"{obj.name} Instance"
+    for collection in obj.users_collection:
+        if collection.name == collection_name:
+            return collection
+
+    collection = bpy.data.collections.new(collection_name)
+    for child_obj in get_object_with_children(obj):
+        collection.objects.link(child_obj)
+    collection.instance_offset = obj.matrix_world.translation
+    return collection
+
+
+def get_instance_collection_root(collection: bpy.types.Collection) -> Optional[bpy.types.Object]:
+    """Gets the object at the top of the hierarchy instanced by ``collection``."""
+    for obj in collection.objects:
+        if obj.parent is None or obj.parent.name not in collection.objects:
+            return obj
+    return None
+
+
 class ExtentsData:
     def __init__(self, lod_dist, bb_min, bb_max, bs_radius, scale):
         self.lod_dist = lod_dist
@@ -103,147 +249,199 @@ class ExtentsData:
         self.bb_max = bb_max
         self.bs_radius = bs_radius
         self.scale = scale
-def get_extents_data(obj, entity_extents_data):
+
+
+def build_archetypes_extents_data(scene: bpy.types.Scene) -> dict[int, ExtentsData]:
+    """Builds a map of archetype name hashes to the extents data of the archetypes in all the ytyps of the scene. If
+    multiple archetypes have the same name, the first one is kept.
+    """
+    archetypes_extents_data = {}
+    for ytyp in scene.ytyps:
+        for archetype in ytyp.archetypes:
+            archetype_hash = jenkhash.name_to_hash(archetype.name)
+            if archetype_hash in archetypes_extents_data:
+                continue
+
+            archetypes_extents_data[archetype_hash] = ExtentsData(
+                lod_dist=archetype.lod_dist,
+                bb_min=Vector((archetype.bb_min[0], archetype.bb_min[1], archetype.bb_min[2])),
+                bb_max=Vector((archetype.bb_max[0], archetype.bb_max[1], archetype.bb_max[2])),
+                bs_radius=archetype.bs_radius,
+                scale=Vector((1, 1, 1))
+            )
+
+    return archetypes_extents_data
+
+
+def get_children_recursive_from_map(
+    obj: bpy.types.Object,
+    children_map: dict[bpy.types.Object, list[bpy.types.Object]]
+) -> list[bpy.types.Object]:
+    children_recursive = []
+    for child in children_map.get(obj, ()):
+        children_recursive.append(child)
+        children_recursive.extend(get_children_recursive_from_map(child, children_map))
+    return children_recursive
+
+
+def build_children_map() -> dict[bpy.types.Object, list[bpy.types.Object]]:
+    """Builds a map of objects to their direct children, going through all objects only once."""
+    children_map = {}
+    for obj in bpy.data.objects:
+        if obj.parent is not None:
+            children_map.setdefault(obj.parent, []).append(obj)
+    return children_map
+
+
+def get_extents_data(
+    obj,
+    entity_extents_data,
+    archetypes_extents_data: dict[int, ExtentsData],
+    children_map: dict[bpy.types.Object, list[bpy.types.Object]]
+):
     archetype_name = remove_number_suffix(obj.name)
 
     if archetype_name in entity_extents_data:
         return entity_extents_data[archetype_name]
 
-    def create_extents_data_from_archetype(archetype):
-        return ExtentsData(
-            lod_dist=archetype.lod_dist,
-            bb_min=Vector((archetype.bb_min[0], archetype.bb_min[1], archetype.bb_min[2])),
-            bb_max=Vector((archetype.bb_max[0], archetype.bb_max[1], archetype.bb_max[2])),
-            bs_radius=archetype.bs_radius,
-            scale=Vector((1, 1, 1))
-        )
-
-    # Search in all ytyps
-    for ytyp in bpy.context.scene.ytyps:
-        if ytyp.archetypes:
-            for archetype in ytyp.archetypes:
-                if archetype.name == archetype_name:
-                    entity_extents_data[archetype_name] = create_extents_data_from_archetype(archetype)
-                    return entity_extents_data[archetype_name]
+    extents_data = archetypes_extents_data.get(jenkhash.name_to_hash(archetype_name), None)
+    if extents_data is not None:
+        entity_extents_data[archetype_name] = extents_data
+        return extents_data
 
     # No ytyp so we calculate bb
-    bbmin, bbmax = get_combined_bound_box(obj, use_world=False)
+    if obj.instance_type == "COLLECTION" and obj.instance_collection is not None:
+        # Entities placed as collection instances have no geometry, use the instanced archetype object
+        obj = get_instance_collection_root(obj.instance_collection) or obj
+    bbmin, bbmax = get_combined_bound_box(
+        obj, use_world=False, children_recursive=get_children_recursive_from_map(obj, children_map)
+    )
     bs_radius = get_sphere_radius(bbmin, bbmax)
     entity_extents_data[archetype_name] = ExtentsData(lod_dist=60, bb_min=bbmin, bb_max=bbmax, bs_radius=bs_radius, scale=Vector((1, 1, 1)))
 
     return entity_extents_data[archetype_name]
 
+
+# Whether each of the 8 corners of a box uses the max (True) or min (False) bound in each axis
+_BOX_CORNERS_MASK = np.array([[(i >> 2) & 1, (i >> 1) & 1, i & 1] for i in range(8)], dtype=bool)
+
+
+def get_transformed_boxes_extents(
+    matrices: NDArray[np.float64],
+    bb_mins: NDArray[np.float64],
+    bb_maxs: NDArray[np.float64]
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Transforms the corners of N boxes by their matrices and returns the min and max of all the transformed corners.
+
+    :param matrices: Array of shape (N, 4, 4).
+    :param bb_mins: Array of shape (N, 3).
+    :param bb_maxs: Array of shape (N, 3).
+    """
+    corners = np.where(_BOX_CORNERS_MASK, bb_maxs[:, np.newaxis, :], bb_mins[:, np.newaxis, :])  # (N, 8, 3)
+    corners = corners @ matrices[:, :3, :3].transpose(0, 2, 1) + matrices[:, np.newaxis, :3, 3]
+    return corners.min(axis=(0, 1)), corners.max(axis=(0, 1))
+
+
 def generate_ymap_extents(selected_ymap=None):
-    emin = Vector((float('inf'), float('inf'), float('inf')))
-    emax = Vector((float('-inf'), float('-inf'), float('-inf')))
-    smin = Vector((float('inf'), float('inf'), float('inf')))
-    smax = Vector((float('-inf'), float('-inf'), float('-inf')))
+    # Lists of (min, max) arrays of shape (3,), reduced at the end
+    entities_bounds = []
+    streaming_bounds = []
 
     entity_extents_data = {}
+    archetypes_extents_data = build_archetypes_extents_data(bpy.context.scene)
+    children_map = build_children_map()
 
     # Clone of CodeWalker's ymap extents calculations
-    for child in selected_ymap.children:
+    for child in children_map.get(selected_ymap, ()):
         if child.sollum_type == SollumType.YMAP_ENTITY_GROUP:
-            for entity_obj in child.children:
+            entity_matrices = []
+            entity_bb_mins = []
+            entity_bb_maxs = []
+            entity_lod_dists = []
+            for entity_obj in children_map.get(child, ()):
                 if entity_obj.sollum_type == SollumType.DRAWABLE or entity_obj.sollum_type == SollumType.FRAGMENT:
-                    position = entity_obj.location
-                    orientation = entity_obj.rotation_euler.to_matrix()
-
-                    extents_data = get_extents_data(entity_obj, entity_extents_data)
+                    extents_data = get_extents_data(
+                        entity_obj, entity_extents_data, archetypes_extents_data, children_map
+                    )
                     lod_dist = (entity_obj.entity_properties.lod_dist
                                 if entity_obj.entity_properties.lod_dist > -1.0
                                 else extents_data.lod_dist)
 
-                    bbmin = extents_data.bb_min * extents_data.scale
-                    bbmax = extents_data.bb_max * extents_data.scale
-
-                    corners = [
-                        orientation @ Vector((bbmin.x, bbmin.y, bbmin.z)),
-                        orientation @ Vector((bbmin.x, bbmin.y, bbmax.z)),
-                        orientation @ Vector((bbmin.x, bbmax.y, bbmin.z)),
-                        orientation @ Vector((bbmin.x, bbmax.y, bbmax.z)),
-                        orientation @ Vector((bbmax.x, bbmin.y, bbmin.z)),
-                        orientation @ Vector((bbmax.x, bbmin.y, bbmax.z)),
-                        orientation @ Vector((bbmax.x, bbmax.y, bbmin.z)),
-                        orientation @ Vector((bbmax.x, bbmax.y, bbmax.z))
-                    ]
-
-                    stream_bbmin = bbmin - Vector((lod_dist, lod_dist, lod_dist))
-                    stream_bbmax = bbmax + Vector((lod_dist, lod_dist, lod_dist))
-
-                    stream_corners = [
-                        orientation @ Vector((stream_bbmin.x, stream_bbmin.y, stream_bbmin.z)),
-                        orientation @ Vector((stream_bbmin.x, stream_bbmin.y, stream_bbmax.z)),
-                        orientation @ Vector((stream_bbmin.x, stream_bbmax.y, stream_bbmin.z)),
-                        orientation @ Vector((stream_bbmin.x, stream_bbmax.y, stream_bbmax.z)),
-                        orientation @ Vector((stream_bbmax.x, stream_bbmin.y, stream_bbmin.z)),
-                        orientation @ Vector((stream_bbmax.x, stream_bbmin.y, stream_bbmax.z)),
-                        orientation @ Vector((stream_bbmax.x, stream_bbmax.y, stream_bbmin.z)),
-                        orientation @ Vector((stream_bbmax.x, stream_bbmax.y, stream_bbmax.z))
-                    ]
-
-                    for corner in corners:
-                        corner_world = position + corner
-                        emin = Vector(min(emin[i], corner_world[i]) for i in range(3))
-                        emax = Vector(max(emax[i], corner_world[i]) for i in range(3))
-
-                    for stream_corner in stream_corners:
-                        stream_corner_world = position + stream_corner
-                        smin = Vector(min(smin[i], stream_corner_world[i]) for i in range(3))
-                        smax = Vector(max(smax[i], stream_corner_world[i]) for i in range(3))
+                    # Flattened, converting lists of floats to arrays is much faster than lists of vectors or matrices
+                    matrix = Matrix.LocRotScale(entity_obj.location, entity_obj.rotation_euler, None)
+                    entity_matrices.extend(itertools.chain.from_iterable(matrix))
+                    entity_bb_mins.extend(extents_data.bb_min * extents_data.scale)
+                    entity_bb_maxs.extend(extents_data.bb_max * extents_data.scale)
+                    entity_lod_dists.append(lod_dist)
+
+            if not entity_matrices:
+                continue
+
+            matrices = np.array(entity_matrices, dtype=np.float64).reshape((-1, 4, 4))
+            bb_mins = np.array(entity_bb_mins, dtype=np.float64).reshape((-1, 3))
+            bb_maxs = np.array(entity_bb_maxs, dtype=np.float64).reshape((-1, 3))
+            lod_dists = np.array(entity_lod_dists, dtype=np.float64)[:, np.newaxis]
+
+            entities_bounds.append(get_transformed_boxes_extents(matrices, bb_mins, bb_maxs))
+            streaming_bounds.append(get_transformed_boxes_extents(matrices, bb_mins - lod_dists, bb_maxs + lod_dists))
 
         elif child.sollum_type == SollumType.YMAP_BOX_OCCLUDER_GROUP:
-            for box_obj in child.children:
+            for box_obj in children_map.get(child, ()):
                 if box_obj.sollum_type == SollumType.YMAP_BOX_OCCLUDER:
                     position = box_obj.location
                     size = box_obj.dimensions
 
-                    bbmin = position - size
-                    bbmax = position + size
-
-                    emin = Vector(min(emin[i], bbmin[i]) for i in range(3))
-                    emax = Vector(max(emax[i], bbmax[i]) for i in range(3))
-                    smin = Vector(min(smin[i], bbmin[i]) for i in range(3))
-                    smax = Vector(max(smax[i], bbmax[i]) for i in range(3))
+                    bounds = (np.array(position - size), np.array(position + size))
+                    entities_bounds.append(bounds)
+                    streaming_bounds.append(bounds)
 
         elif child.sollum_type == SollumType.YMAP_MODEL_OCCLUDER_GROUP:
-            for model_obj in child.children:
+            for model_obj in children_map.get(child, ()):
                 if model_obj.sollum_type == SollumType.YMAP_MODEL_OCCLUDER:
                     bbmin, bbmax = get_combined_bound_box(model_obj, use_world=True)
 
-                    emin = Vector(min(emin[i], bbmin[i]) for i in range(3))
-                    emax = Vector(max(emax[i], bbmax[i]) for i in range(3))
-                    smin = Vector(min(smin[i], bbmin[i]) for i in range(3))
-                    smax = Vector(max(smax[i], bbmax[i]) for i in range(3))
+                    bounds = (np.array(bbmin), np.array(bbmax))
+                    entities_bounds.append(bounds)
+                    streaming_bounds.append(bounds)
 
         elif child.sollum_type == SollumType.YMAP_CAR_GENERATOR_GROUP:
-            for cargen_obj in child.children:
+            for cargen_obj in children_map.get(child, ()):
                 if cargen_obj.sollum_type == SollumType.YMAP_CAR_GENERATOR:
-                    position = cargen_obj.location
-                    perpendicular_length = Vector((
-                        cargen_obj.ymap_cargen_properties.perpendicular_length,
-                        cargen_obj.ymap_cargen_properties.perpendicular_length,
-                        cargen_obj.ymap_cargen_properties.perpendicular_length
-                    ))
-
-                    bbmin = position - perpendicular_length
-                    bbmax = position + perpendicular_length
+                    position = np.array(cargen_obj.location)
+                    perpendicular_length = cargen_obj.ymap_cargen_properties.perpendicular_length
 
-                    emin = Vector(min(emin[i], bbmin[i]) for i in range(3))
-                    emax = Vector(max(emax[i], bbmax[i]) for i in range(3))
+                    entities_bounds.append((position - perpendicular_length, position + perpendicular_length))
+                    streaming_bounds.append((position - perpendicular_length * 2.0,
+                                             position + perpendicular_length * 2.0))
 
-                    sbmin = position - perpendicular_length * 2.0
-                    sbmax = position + perpendicular_length * 2.0
+        elif child.sollum_type == SollumType.YMAP_GRASS_GROUP:
+            for batch_obj in children_map.get(child, ()):
+                if batch_obj.sollum_type == SollumType.YMAP_GRASS_BATCH and batch_obj.type == "MESH":
+                    positions = get_grass_batch_positions(batch_obj)
+                    if len(positions) == 0:
+                        continue
 
-                    smin = Vector(min(smin[i], sbmin[i]) for i in range(3))
-                    smax = Vector(max(smax[i], sbmax[i]) for i in range(3))
+                    bb_min = positions.min(axis=0)
+                    bb_max = positions.max(axis=0)
+                    lod_dist = batch_obj.ymap_grass_batch_properties.lod_dist
 
-        # TODO: grass
+                    entities_bounds.append((bb_min, bb_max))
+                    streaming_bounds.append((bb_min - lod_dist, bb_max + lod_dist))
 
         # TODO: lod lights
 
         # TODO: distant lod lights
 
+    def _reduce_bounds(bounds: list[tuple[NDArray, NDArray]]) -> tuple[Vector, Vector]:
+        if not bounds:
+            return Vector((float("inf"),) * 3), Vector((float("-inf"),) * 3)
+
+        bounds_min, bounds_max = zip(*bounds)
+        return Vector(np.min(bounds_min, axis=0)), Vector(np.max(bounds_max, axis=0))
+
+    emin, emax = _reduce_bounds(entities_bounds)
+    smin, smax = _reduce_bounds(streaming_bounds)
+
     selected_ymap.ymap_properties.entities_extents_min = emin
     selected_ymap.ymap_properties.entities_extents_max = emax
     selected_ymap.ymap_properties.streaming_extents_min = smin
@@ -4,6 +4,7 @@ from ..sollumz_helper import has_embedded_textures, has_collision
 from ..cwxml.ytyp import BaseArchetype, CMapTypes
 from ..tools.meshhelper import get_extents, get_bound_center, get_sphere_radius
 from ..sollumz_properties import SollumType
+from .. import profiler
 
 
 def base_archetype_from_object(obj):
@@ -36,6 +37,7 @@ def base_archetype_from_object(obj):
     return arch
 
 
+@profiler.profiled
 def ytyp_from_objects(objs):
     ytyp = CMapTypes()
     ytyp.name = os.path.basename(
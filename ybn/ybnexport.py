@@ -2,6 +2,7 @@ import bpy
 from mathutils import Vector, Matrix
 from typing import Optional, TypeVar, Callable, Type
 import numpy as np
+from numpy.typing import NDArray
 
 from ..sollumz_helper import get_parent_inverse
 from ..tools.blenderhelper import get_pose_inverse, get_evaluated_obj
@@ -18,7 +19,8 @@ from ..cwxml.bound import (
     BoundCylinder,
     BoundDisc,
     BoundPlane,
-    PolyTriangle,
+    BoundPolygons,
+    PolygonType,
     PolyBox,
     PolySphere,
     PolyCapsule,
@@ -34,7 +36,7 @@ from ..tools.meshhelper import (
     get_color_attr_name,
 )
 from ..sollumz_properties import MaterialType, SOLLUMZ_UI_NAMES, SollumType, BOUND_POLYGON_TYPES
-from .. import logger
+from .. import logger, profiler
 from .properties import CollisionMatFlags, get_collision_mat_raw_flags, BoundFlags
 
 T_Bound = TypeVar("T_Bound", bound=Bound)
@@ -44,6 +46,7 @@ T_PolyCylCap = TypeVar("T_PolyCylCap", bound=PolyCylinder | PolyCapsule)
 MAX_VERTICES = 32767
 
 
+@profiler.profiled
 def export_ybn(obj: bpy.types.Object, filepath: str) -> bool:
     bounds = BoundFile()
     bounds.composite = create_composite_xml(obj)
@@ -51,6 +54,7 @@ def export_ybn(obj: bpy.types.Object, filepath: str) -> bool:
     return True
 
 
+@profiler.profiled
 def create_composite_xml(
     obj: bpy.types.Object,
     out_child_obj_to_index: dict[bpy.types.Object, int] = None,
@@ -232,12 +236,9 @@ def create_bound_xml(obj: bpy.types.Object, is_root: bool = False, allow_planes:
         case SollumType.BOUND_GEOMETRY:
             bound_xml = create_bound_geometry_xml(obj)
 
-            if bound_xml.vertices and bound_xml.polygons:
-                mesh_vertices = np.array([(v + bound_xml.geometry_center) for v in bound_xml.vertices])
-                mesh_faces = []
-                for poly in bound_xml.polygons:
-                    mesh_faces.append([poly.v1, poly.v2, poly.v3])
-                mesh_faces = np.array(mesh_faces)
+            if len(bound_xml.vertices) > 0 and len(bound_xml.polygons) > 0:
+                mesh_vertices = get_bound_geom_xml_mesh_vertices(bound_xml)
+                mesh_faces = bound_xml.polygons.triangles["vertices"][:, :3]
 
                 centroid, radius_around_centroid = get_centroid_of_mesh(mesh_vertices)
                 volume, cg, inertia = get_mass_properties_of_mesh(mesh_vertices, mesh_faces)
@@ -263,19 +264,14 @@ def create_bound_xml(obj: bpy.types.Object, is_root: bool = False, allow_planes:
             bound_xml = create_bvh_xml(obj)
 
             primitives = []
-            if bound_xml.vertices and bound_xml.polygons:
-                mesh_vertices = np.array([(v + bound_xml.geometry_center) for v in bound_xml.vertices])
-                mesh_faces = []
-                for poly in bound_xml.polygons:
-                    if not isinstance(poly, PolyTriangle):
-                        primitives.append(poly)
-                        continue
-                    mesh_faces.append([poly.v1, poly.v2, poly.v3])
+            if len(bound_xml.vertices) > 0 and len(bound_xml.polygons) > 0:
+                mesh_vertices = get_bound_geom_xml_mesh_vertices(bound_xml)
+                mesh_faces = bound_xml.polygons.triangles["vertices"][:, :3]
+                primitives = bound_xml.polygons.primitives()
 
                 centroid, radius_around_centroid = get_centroid_of_mesh(mesh_vertices)
                 if len(mesh_faces) > 0:
                     # If we have a mesh, calculate the center of gravity from the mesh
-                    mesh_faces = np.array(mesh_faces)
                     _, cg, _ = get_mass_properties_of_mesh(mesh_vertices, mesh_faces)
                 else:
                     # Otherwise, approximate with the centroid
@@ -447,6 +443,8 @@ def create_bound_geom_xml_data(geom_xml: BoundGeometry | BoundGeometryBVH, obj:
     geom_xml.geometry_center = center_verts_to_geometry(geom_xml)
 
     num_vertices = len(geom_xml.vertices)
+    profiler.count("vertices", num_vertices)
+    profiler.count("polygons", len(geom_xml.polygons))
 
     if num_vertices == 0:
         logger.warning(f"{SOLLUMZ_UI_NAMES[obj.sollum_type]} '{obj.name}' has no geometry!")
@@ -458,30 +456,39 @@ def create_bound_geom_xml_data(geom_xml: BoundGeometry | BoundGeometryBVH, obj:
         )
 
 
+def get_bound_geom_xml_mesh_vertices(geom_xml: BoundGeometry | BoundGeometryBVH) -> NDArray[np.float64]:
+    """Get the vertices of ``geom_xml`` positioned back around the bound origin."""
+    return (geom_xml.vertices + np.array(geom_xml.geometry_center, dtype=np.float32)).astype(np.float64)
+
+
 def center_verts_to_geometry(geom_xml: BoundGeometry | BoundGeometryBVH):
     """Position verts such that the origin is at their center of geometry. Returns the center of geometry."""
     # the center is really just the bounding-box center
     geom_center = get_bound_center_from_bounds(geom_xml.box_min, geom_xml.box_max)
-    geom_xml.vertices = [Vector(vert) - geom_center for vert in geom_xml.vertices]
+    geom_xml.vertices = geom_xml.vertices - np.array(geom_center, dtype=np.float32)
     return Vector(geom_center)
 
 
+@profiler.profiled
 def create_bound_xml_polys(geom_xml: BoundGeometry | BoundGeometryBVH, obj: bpy.types.Object):
     # Create mappings of vertices and materials by index to build the new geom_xml vertices
     ind_by_vert: dict[tuple, int] = {}
     ind_by_mat: dict[bpy.types.Material, int] = {}
+    # Gathered in lists and stored in the geom_xml arrays at the end
+    vertices: list[tuple[float, float, float]] = []
+    vertex_colors: list[tuple[int, int, int, int]] = []
 
     def get_vert_index(vert: Vector, vert_color: Optional[tuple[int, int, int, int]] = None):
         default_vert_color = (255, 255, 255, 255)
 
         # These are safety checks in case the user mixed poly primitives and poly meshes with color attributes
         # This doesn't occur in original .ybns, if they have vertex colors, only poly triangles (meshes) are used.
-        if vert_color is not None and len(geom_xml.vertex_colors) != len(geom_xml.vertices):
+        if vert_color is not None and len(vertex_colors) != len(vertices):
             # This vertex has color but previous ones didn't, assign a default color to all previous vertices
-            for _ in range(len(geom_xml.vertex_colors), len(geom_xml.vertices)):
-                geom_xml.vertex_colors.append(default_vert_color)
+            for _ in range(len(vertex_colors), len(vertices)):
+                vertex_colors.append(default_vert_color)
 
-        if vert_color is None and len(geom_xml.vertex_colors) != 0:
+        if vert_color is None and len(vertex_colors) != 0:
             # There are already vertex colors in this geometry, assign a default color
             vert_color = default_vert_color
 
@@ -494,9 +501,9 @@ def create_bound_xml_polys(geom_xml: BoundGeometry | BoundGeometryBVH, obj: bpy.
 
         vert_ind = len(ind_by_vert)
         ind_by_vert[vertex_id] = vert_ind
-        geom_xml.vertices.append(Vector(vert))
+        vertices.append(tuple(vert))
         if vert_color is not None:
-            geom_xml.vertex_colors.append(vert_color)
+            vertex_colors.append(vert_color)
 
         return vert_ind
 
@@ -512,21 +519,23 @@ def create_bound_xml_polys(geom_xml: BoundGeometry | BoundGeometryBVH, obj: bpy.
 
         return mat_ind
 
-    # If the bound object is a mesh, just convert its mesh data into triangles
     if not isinstance(geom_xml, BoundGeometryBVH):
+        # If the bound object is a mesh, just convert its mesh data into triangles
         create_bound_geom_xml_triangles(obj, geom_xml, get_vert_index, get_mat_index)
-        return
+    else:
+        # For empty bound objects with children, create the bound polygons from its children
+        for child in obj.children_recursive:
+            if child.sollum_type not in BOUND_POLYGON_TYPES:
+                logger.warning(
+                    f"'{child.name}' is being exported as bound poly but has no bound poly Sollumz type! Please, use "
+                    f"a bound poly type instead of '{SOLLUMZ_UI_NAMES[child.sollum_type]}'."
+                )
+                continue
 
-    # For empty bound objects with children, create the bound polygons from its children
-    for child in obj.children_recursive:
-        if child.sollum_type not in BOUND_POLYGON_TYPES:
-            logger.warning(
-                f"'{child.name}' is being exported as bound poly but has no bound poly Sollumz type! Please, use a "
-                f"bound poly type instead of '{SOLLUMZ_UI_NAMES[child.sollum_type]}'."
-            )
-            continue
+            create_bound_xml_poly_shape(child, geom_xml, get_vert_index, get_mat_index)
 
-        create_bound_xml_poly_shape(child, geom_xml, get_vert_index, get_mat_index)
+    geom_xml.vertices = np.array(vertices, dtype=np.float32).reshape((-1, 3))
+    geom_xml.vertex_colors = np.array(vertex_colors, dtype=np.float64).astype(np.uint8).reshape((-1, 4))
 
 
 def create_bound_geom_xml_triangles(obj: bpy.types.Object, geom_xml: BoundGeometry, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
@@ -598,37 +607,28 @@ def create_export_mesh(obj: bpy.types.Object):
 
 
 def create_poly_xml_triangles(mesh: bpy.types.Mesh, transforms: Matrix, get_vert_index: Callable[[Vector], int], get_mat_index: Callable[[bpy.types.Material], int]):
-    """Create all bound polygon triangle XML objects for this BoundGeometry/BVH."""
-    triangles: list[PolyTriangle] = []
+    """Create all bound polygon triangles for this BoundGeometry/BVH."""
+    triangles = BoundPolygons.empty(len(mesh.loop_triangles), PolygonType.TRIANGLE)
+    tri_materials = triangles.data["material_index"]
+    tri_verts = triangles.data["vertices"]
 
     color_attr_name = get_color_attr_name(0)
     color_attr = mesh.color_attributes.get(color_attr_name, None)
     if color_attr is not None and (color_attr.domain != "CORNER" or color_attr.data_type != "BYTE_COLOR"):
         color_attr = None
 
-    for tri in mesh.loop_triangles:
-        triangle = PolyTriangle()
+    for tri_index, tri in enumerate(mesh.loop_triangles):
         mat = mesh.materials[tri.material_index]
-        triangle.material_index = get_mat_index(mat)
-
-        tri_indices: list[int] = []
+        tri_materials[tri_index] = get_mat_index(mat)
 
-        for loop_idx in tri.loops:
+        for corner, loop_idx in enumerate(tri.loops):
             loop = mesh.loops[loop_idx]
 
             vert_pos = transforms @ mesh.vertices[loop.vertex_index].co
             vert_color = color_attr.data[loop_idx].color_srgb if color_attr is not None else None
             if vert_color is not None:
                 vert_color = (vert_color[0] * 255, vert_color[1] * 255, vert_color[2] * 255, vert_color[3] * 255)
-            vert_ind = get_vert_index(vert_pos, vert_color=vert_color)
-
-            tri_indices.append(vert_ind)
-
-        triangle.v1 = tri_indices[0]
-        triangle.v2 = tri_indices[1]
-        triangle.v3 = tri_indices[2]
-
-        triangles.append(triangle)
+            tri_verts[tri_index, corner] = get_vert_index(vert_pos, vert_color=vert_color)
 
     return triangles
 
@@ -16,9 +16,8 @@ from ..cwxml.bound import (
     PolySphere,
     PolyCapsule,
     PolyCylinder,
-    PolyTriangle,
     YBN,
-    Polygon,
+    BoundPolygons,
     Material as ColMaterial
 )
 from ..sollumz_properties import SollumType, SOLLUMZ_UI_NAMES
@@ -36,13 +35,16 @@ from ..tools.utils import get_direction_of_vectors, get_distance_of_vectors, abs
 from ..tools.blenderhelper import create_blender_object, create_empty_object
 from mathutils import Matrix, Vector
 from math import radians
+from .. import profiler
 
 
+@profiler.profiled
 def import_ybn(filepath):
     ybn_xml: BoundFile = YBN.from_xml_file(filepath)
     return create_bound_composite(ybn_xml.composite, os.path.basename(filepath.replace(YBN.file_extension, "")))
 
 
+@profiler.profiled
 def create_bound_composite(composite_xml: BoundComposite, name: Optional[str] = None):
     obj = create_empty_object(SollumType.BOUND_COMPOSITE, name)
 
@@ -165,6 +167,7 @@ def create_bound_plane(bound_xml: BoundPlane):
     return obj
 
 
+@profiler.profiled
 def create_bound_geometry(geom_xml: BoundGeometry):
     materials = create_geometry_materials(geom_xml)
     triangles = get_poly_triangles(geom_xml.polygons)
@@ -177,6 +180,7 @@ def create_bound_geometry(geom_xml: BoundGeometry):
     return geom_obj
 
 
+@profiler.profiled
 def create_bvh_obj(bvh_xml: BoundGeometryBVH):
     bvh_obj = create_empty_object(SollumType.BOUND_GEOMETRYBVH)
     set_bound_child_properties(bvh_xml, bvh_obj)
@@ -187,7 +191,7 @@ def create_bvh_obj(bvh_xml: BoundGeometryBVH):
 
     triangles = get_poly_triangles(bvh_xml.polygons)
 
-    if triangles:
+    if len(triangles) > 0:
         mesh = create_bound_mesh_data(bvh_xml.vertices, triangles, bvh_xml.vertex_colors, materials)
         bound_geom_obj = create_blender_object(SollumType.BOUND_POLY_TRIANGLE, object_data=mesh)
         bound_geom_obj.location = bvh_xml.geometry_center
@@ -230,10 +234,7 @@ def set_bound_col_material_properties(bound_xml: Bound, mat: bpy.types.Material)
 
 
 def create_bvh_polys(bvh: BoundGeometryBVH, materials: list[bpy.types.Material], bvh_obj: bpy.types.Object):
-    for poly in bvh.polygons:
-        if type(poly) is PolyTriangle:
-            continue
-
+    for poly in bvh.polygons.primitives():
         poly_obj = poly_to_obj(poly, materials, bvh.vertices)
         poly_obj.location += bvh.geometry_center
         poly_obj.parent = bvh_obj
@@ -252,10 +253,10 @@ def init_poly_obj(poly, sollum_type, materials):
 def create_poly_box(poly, materials, vertices):
     obj = init_poly_obj(poly, SollumType.BOUND_POLY_BOX, materials)
 
-    v1 = vertices[poly.v1]
-    v2 = vertices[poly.v2]
-    v3 = vertices[poly.v3]
-    v4 = vertices[poly.v4]
+    v1 = Vector(vertices[poly.v1])
+    v2 = Vector(vertices[poly.v2])
+    v3 = Vector(vertices[poly.v3])
+    v4 = Vector(vertices[poly.v4])
     center = (v1 + v2 + v3 + v4) * 0.25
 
     # Get edges from the 4 opposing corners of the box
@@ -325,14 +326,14 @@ def create_poly_box(poly, materials, vertices):
 def create_poly_sphere(poly, materials, vertices):
     sphere = init_poly_obj(poly, SollumType.BOUND_POLY_SPHERE, materials)
     create_sphere(sphere.data, poly.radius)
-    sphere.location = vertices[poly.v]
+    sphere.location = Vector(vertices[poly.v])
     return sphere
 
 
 def create_poly_capsule(poly, materials, vertices):
     capsule = init_poly_obj(poly, SollumType.BOUND_POLY_CAPSULE, materials)
-    v1 = vertices[poly.v1]
-    v2 = vertices[poly.v2]
+    v1 = Vector(vertices[poly.v1])
+    v2 = Vector(vertices[poly.v2])
     rot = get_direction_of_vectors(v1, v2)
     length = (v1 - v2).length
     create_capsule(capsule.data, radius=poly.radius, length=length, axis="Z")
@@ -345,8 +346,8 @@ def create_poly_capsule(poly, materials, vertices):
 
 def create_poly_cylinder(poly, materials, vertices):
     cylinder = init_poly_obj(poly, SollumType.BOUND_POLY_CYLINDER, materials)
-    v1 = vertices[poly.v1]
-    v2 = vertices[poly.v2]
+    v1 = Vector(vertices[poly.v1])
+    v2 = Vector(vertices[poly.v2])
 
     rot = get_direction_of_vectors(v1, v2)
 
@@ -374,21 +375,28 @@ def poly_to_obj(poly, materials, vertices) -> bpy.types.Object:
     return POLY_TO_OBJ_MAP[type(poly)](poly, materials, vertices)
 
 
-def get_poly_triangles(polys: list[Polygon]):
-    return [poly for poly in polys if isinstance(poly, PolyTriangle)]
+def get_poly_triangles(polys: BoundPolygons) -> NDArray:
+    return polys.triangles
 
 
 def create_bound_mesh_data(
-    vertices: list[Vector],
-    triangles: list[PolyTriangle],
-    vertex_colors: Optional[list[tuple[int, int, int, int]]],
+    vertices: NDArray[np.float32],
+    triangles: NDArray,
+    vertex_colors: Optional[NDArray[np.uint8]],
     materials: list[bpy.types.Material]
 ) -> bpy.types.Mesh:
     mesh = bpy.data.meshes.new(SOLLUMZ_UI_NAMES[SollumType.BOUND_GEOMETRY])
 
     verts, faces, colors = get_bound_geom_mesh_data(vertices, triangles, vertex_colors)
 
-    mesh.from_pydata(verts, [], faces)
+    num_tris = len(faces)
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", verts.astype(np.float32).ravel())
+    mesh.loops.add(num_tris * 3)
+    mesh.loops.foreach_set("vertex_index", faces.astype(np.int32).ravel())
+    mesh.polygons.add(num_tris)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, num_tris * 3, 3, dtype=np.int32))
+    mesh.update(calc_edges=True)
 
     if colors is not None:
         create_color_attr(mesh, 0, initial_values=colors)
@@ -400,41 +408,40 @@ def create_bound_mesh_data(
     return mesh
 
 
-def apply_bound_geom_materials(mesh: bpy.types.Mesh, triangles: list[PolyTriangle], materials: list[bpy.types.Material]):
+def apply_bound_geom_materials(mesh: bpy.types.Mesh, triangles: NDArray, materials: list[bpy.types.Material]):
     for mat in materials:
         mesh.materials.append(mat)
 
-    for i, poly_xml in enumerate(triangles):
-        mesh.polygons[i].material_index = poly_xml.material_index
+    mesh.polygons.foreach_set("material_index", triangles["material_index"].astype(np.int32))
 
 
 def get_bound_geom_mesh_data(
-    vertices: list[Vector],
-    triangles: list[PolyTriangle],
-    vertex_colors: Optional[list[tuple[int, int, int, int]]]
-) -> tuple[list, list, Optional[NDArray]]:
-    def _color_to_float(color_int: tuple[int, int, int, int]):
-        return (color_int[0] / 255, color_int[1] / 255, color_int[2] / 255, color_int[3] / 255)
-
-    verts = []
-    verts_dict = {}
-    faces = []
-    colors = [] if vertex_colors else None
-
-    for poly in triangles:
-        face = []
-        for v in [vertices[poly.v1], vertices[poly.v2], vertices[poly.v3]]:
-            v_tuple = tuple(v)
-            if v_tuple not in verts_dict:
-                verts_dict[v_tuple] = len(verts)
-                verts.append(v)
-            face.append(verts_dict[v_tuple])
-        faces.append(face)
-
-        if colors is not None:
-            colors.extend(_color_to_float(vertex_colors[v]) for v in [poly.v1, poly.v2, poly.v3])
-
-    return verts, faces, np.array(colors, dtype=np.float64) if colors is not None else None
+    vertices: NDArray[np.float32],
+    triangles: NDArray,
+    vertex_colors: Optional[NDArray[np.uint8]]
+) -> tuple[NDArray, NDArray, Optional[NDArray]]:
+    """Get the vertices, faces and corner colors of the mesh of ``triangles``. Vertices with the same position are
+    merged, the order they are first used in is kept.
+    """
+    corner_verts = triangles["vertices"][:, :3].ravel()
+    if len(corner_verts) == 0:
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.int32), None
+
+    positions = vertices[corner_verts]
+    unique_positions, first_corner, unique_inverse = np.unique(
+        positions, axis=0, return_index=True, return_inverse=True)
+    # np.unique sorts the positions, restore the order of first use
+    order = np.argsort(first_corner)
+    new_index = np.empty_like(order)
+    new_index[order] = np.arange(len(order))
+    verts = unique_positions[order]
+    faces = new_index[unique_inverse.ravel()].reshape((-1, 3))
+
+    colors = None
+    if vertex_colors is not None and len(vertex_colors) > 0:
+        colors = vertex_colors[corner_verts] / 255
+
+    return verts, faces, colors
 
 
 def set_bound_child_properties(bound_xml: BoundChild, bound_obj: bpy.types.Object):
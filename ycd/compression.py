@@ -0,0 +1,240 @@
+"""Error-budgeted compression of the animation tracks exported to .ycd files. For each track, the constant, quantized,
+indirect quantized and cached quaternion encodings are tried with varying bit widths, and the smallest one whose
+decoded values stay within the tolerance of the track is used.
+
+The XML files only store the values of the channels, CodeWalker packs them in bits when converting to the binary
+format. The sizes here are estimates of the binary sizes, used to compare the encodings and to report them.
+"""
+
+import math
+import numpy as np
+from numpy.typing import NDArray
+from typing import NamedTuple
+from mathutils import Vector, Quaternion
+from ..cwxml import clipdictionary as ycdxml
+from ..tools.animationhelper import Track, TrackFormat, TrackFormatMap
+from .ycdimport import get_frames_data_from_sequence_data
+
+CHANNEL_HEADER_BITS = 32
+"""Estimated size of the channel type, bit counts and other data stored in every channel."""
+FLOAT_BITS = 32
+MAX_QUANTIZE_BITS = 20
+"""Quantized channels needing more bits than this are stored as raw floats instead."""
+CACHED_QUATERNION_MAX_REFINEMENTS = 6
+"""How many times the tolerance of the stored components of a cached quaternion is halved to try to bring the error of
+the computed component within the tolerance of the track.
+"""
+
+POSITION_TRACKS = {Track.BonePosition, Track.MoverPosition, Track.CameraPosition}
+
+
+class CompressionTolerances(NamedTuple):
+    position: float
+    """Maximum error allowed in the position tracks, in meters."""
+    rotation: float
+    """Maximum error allowed in each component of the rotation quaternions."""
+    other: float
+    """Maximum error allowed in the values of any other track (scale, UVs, camera properties...)."""
+
+    def for_track(self, track: Track) -> float:
+        if track in POSITION_TRACKS:
+            return self.position
+        elif TrackFormatMap[track] == TrackFormat.Quaternion:
+            return self.rotation
+        else:
+            return self.other
+
+
+class EncodedChannel(NamedTuple):
+    channel: ycdxml.ChannelsList.Channel
+    size_bits: int
+
+
+class CompressedTrack(NamedTuple):
+    sequence_data: ycdxml.Animation.SequenceDataList.SequenceData
+    size_bits: int
+    """Estimated size of the encoded track."""
+    raw_size_bits: int
+    """Estimated size of the track if all values were stored as floats."""
+    max_error: float
+    """Maximum difference between the decoded values and the original values."""
+
+
+def encode_float_channel(values: NDArray[np.float32], tolerance: float) -> EncodedChannel:
+    """Encodes the values in the smallest float channel whose values differ from the original ones by at most
+    ``tolerance``.
+    """
+    values = values.astype(np.float32)
+    values64 = values.astype(np.float64)
+    num_values = len(values)
+    min_value = float(values64.min())
+    max_value = float(values64.max())
+    range_value = max_value - min_value
+
+    def _max_error(decoded: NDArray) -> float:
+        return float(np.abs(decoded.astype(np.float32).astype(np.float64) - values64).max())
+
+    if range_value <= 2.0 * tolerance:
+        mid_value = float(np.float32((min_value + max_value) * 0.5))
+        if _max_error(np.full(num_values, mid_value)) <= tolerance:
+            channel = ycdxml.ChannelsList.StaticFloat()
+            channel.value = mid_value
+            return EncodedChannel(channel, CHANNEL_HEADER_BITS + FLOAT_BITS)
+
+    # Start at the bit width that would keep the quantization error within tolerance with exact arithmetic, and
+    # increase it until the error of the values rounded to single precision is within tolerance too
+    if tolerance > 0.0:
+        min_bits = math.ceil(math.log2(range_value / (2.0 * tolerance) + 1.0))
+    else:
+        min_bits = MAX_QUANTIZE_BITS + 1
+    for bits in range(max(min_bits, 1), MAX_QUANTIZE_BITS + 1):
+        quantum = range_value / ((1 << bits) - 1)
+        ints = np.rint((values64 - min_value) / quantum).astype(np.int64)
+        uniq_ints, uniq_inverse = np.unique(ints, return_inverse=True)
+        uniq_decoded = (min_value + uniq_ints * quantum).astype(np.float32)
+        if _max_error(uniq_decoded[uniq_inverse]) > tolerance:
+            continue
+
+        num_uniq = len(uniq_ints)
+        frame_bits = max(math.ceil(math.log2(num_uniq)), 1)
+        quantized_size = CHANNEL_HEADER_BITS + 2 * FLOAT_BITS + num_values * bits
+        indirect_size = CHANNEL_HEADER_BITS + 2 * FLOAT_BITS + num_uniq * bits + num_values * frame_bits
+        if indirect_size < quantized_size:
+            channel = ycdxml.ChannelsList.IndirectQuantizeFloat()
+            channel.values = uniq_decoded.astype(np.float64)
+            channel.frames = uniq_inverse.astype(np.uint32)
+            size = indirect_size
+        else:
+            channel = ycdxml.ChannelsList.QuantizeFloat()
+            channel.values = uniq_decoded[uniq_inverse].astype(np.float64)
+            size = quantized_size
+
+        channel.offset = min_value
+        channel.quantum = quantum
+        return EncodedChannel(channel, size)
+
+    channel = ycdxml.ChannelsList.RawFloat()
+    channel.values = values.astype(np.float64)
+    return EncodedChannel(channel, CHANNEL_HEADER_BITS + num_values * FLOAT_BITS)
+
+
+def _new_sequence_data(channels: list[ycdxml.ChannelsList.Channel]) -> ycdxml.Animation.SequenceDataList.SequenceData:
+    sequence_data = ycdxml.Animation.SequenceDataList.SequenceData()
+    sequence_data.channels.extend(channels)
+    return sequence_data
+
+
+def _compress_vector3_track(frames_data: NDArray[np.float32], tolerance: float) -> list[list[EncodedChannel]]:
+    candidates = []
+
+    mid_value = ((frames_data.min(axis=0).astype(np.float64) + frames_data.max(axis=0)) * 0.5).astype(np.float32)
+    if np.all(np.abs(frames_data - mid_value) <= tolerance):
+        channel = ycdxml.ChannelsList.StaticVector3()
+        channel.value = Vector(mid_value)
+        candidates.append([EncodedChannel(channel, CHANNEL_HEADER_BITS + 3 * FLOAT_BITS)])
+
+    candidates.append([encode_float_channel(frames_data[:, i], tolerance) for i in range(3)])
+    return candidates
+
+
+def _compress_quaternion_track(frames_data: NDArray[np.float32], tolerance: float) -> list[list[EncodedChannel]]:
+    candidates = []
+
+    mid_value = Quaternion((frames_data.min(axis=0).astype(np.float64) + frames_data.max(axis=0)) * 0.5).normalized()
+    if np.all(np.abs(frames_data - np.array(mid_value, dtype=np.float32)) <= tolerance):
+        channel = ycdxml.ChannelsList.StaticQuaternion()
+        channel.value = mid_value
+        candidates.append([EncodedChannel(channel, CHANNEL_HEADER_BITS + 3 * FLOAT_BITS)])
+
+    # Channels in XYZW order
+    xyzw = frames_data[:, (1, 2, 3, 0)]
+    candidates.append([encode_float_channel(xyzw[:, i], tolerance) for i in range(4)])
+
+    # Cached quaternions store three components and compute the remaining one, which is always positive, from them.
+    # The whole track can be negated to make the computed component positive, which doesn't change the rotations nor
+    # the dot product of consecutive quaternions
+    for cached_index in range(4):
+        cached_component = xyzw[:, cached_index]
+        if np.all(cached_component >= 0.0):
+            sign = 1.0
+        elif np.all(cached_component <= 0.0):
+            sign = -1.0
+        else:
+            continue
+
+        stored_indices = [i for i in range(4) if i != cached_index]
+        for refinement in range(CACHED_QUATERNION_MAX_REFINEMENTS + 1):
+            channel_tolerance = tolerance / (1 << refinement)
+            channels = [encode_float_channel(sign * xyzw[:, i], channel_tolerance) for i in stored_indices]
+            cached_channel = ycdxml.ChannelsList.CachedQuaternion1()
+            cached_channel.quat_index = cached_index
+            channels.append(EncodedChannel(cached_channel, CHANNEL_HEADER_BITS))
+
+            sequence_data = _new_sequence_data([c.channel for c in channels])
+            decoded = get_frames_data_from_sequence_data(
+                TrackFormat.Quaternion, sequence_data, np.arange(len(frames_data))
+            )
+            if np.all(np.abs(decoded - sign * frames_data) <= tolerance):
+                candidates.append(channels)
+                break
+
+    return candidates
+
+
+def compress_track(track: Track, frames_data: NDArray[np.float32], tolerance: float) -> CompressedTrack:
+    """Builds the sequence data of the track using the smallest encoding whose decoded values differ from
+    ``frames_data`` by at most ``tolerance``. Quaternion tracks may be negated as a whole.
+    """
+    track_format = TrackFormatMap[track]
+    if track_format == TrackFormat.Vector3:
+        candidates = _compress_vector3_track(frames_data, tolerance)
+    elif track_format == TrackFormat.Quaternion:
+        candidates = _compress_quaternion_track(frames_data, tolerance)
+    else:
+        candidates = [[encode_float_channel(frames_data, tolerance)]]
+
+    best_channels = min(candidates, key=lambda channels: sum(c.size_bits for c in channels))
+    sequence_data = _new_sequence_data([c.channel for c in best_channels])
+    size_bits = sum(c.size_bits for c in best_channels)
+
+    num_frames = len(frames_data)
+    num_components = 1 if frames_data.ndim == 1 else frames_data.shape[1]
+    raw_size_bits = num_components * (CHANNEL_HEADER_BITS + num_frames * FLOAT_BITS)
+
+    decoded = get_frames_data_from_sequence_data(track_format, sequence_data, np.arange(num_frames))
+    max_error = float(np.abs(decoded - frames_data).max())
+    if track_format == TrackFormat.Quaternion:
+        max_error = min(max_error, float(np.abs(decoded + frames_data).max()))
+
+    return CompressedTrack(sequence_data, size_bits, raw_size_bits, max_error)
+
+
+class AnimationCompressionStats:
+    """Accumulates the sizes and errors of the compressed tracks of an animation."""
+
+    def __init__(self):
+        self.size_bits = 0
+        self.raw_size_bits = 0
+        self.max_errors: dict[str, float] = {}
+
+    def add(self, track: Track, compressed_track: CompressedTrack):
+        self.size_bits += compressed_track.size_bits
+        self.raw_size_bits += compressed_track.raw_size_bits
+
+        if track in POSITION_TRACKS:
+            group = "position"
+        elif TrackFormatMap[track] == TrackFormat.Quaternion:
+            group = "rotation"
+        else:
+            group = "other"
+        self.max_errors[group] = max(self.max_errors.get(group, 0.0), compressed_track.max_error)
+
+    def describe(self) -> str:
+        size_kib = self.size_bits / 8 / 1024
+        raw_size_kib = self.raw_size_bits / 8 / 1024
+        ratio = self.raw_size_bits / self.size_bits if self.size_bits > 0 else 1.0
+        errors = ", ".join(f"{group} {error:.6g}" for group, error in self.max_errors.items())
+        text = f"{size_kib:.1f} KiB ({raw_size_kib:.1f} KiB uncompressed, {ratio:.1f}x)"
+        if errors:
+            text += f", max error: {errors}"
+        return text
@@ -2,6 +2,8 @@ import bpy
 from mathutils import Vector, Quaternion
 import math
 import struct
+import numpy as np
+from numpy.typing import NDArray
 from typing import Optional
 from ..cwxml import clipdictionary as ycdxml
 from ..sollumz_properties import SollumType
@@ -21,8 +23,10 @@ from ..tools.animationhelper import (
     get_action_export_frame_count,
 )
 from .properties import ClipAttribute, ClipTag, calculate_final_uv_transform_matrix
+from .compression import CompressionTolerances, AnimationCompressionStats, compress_track
+from ..sollumz_preferences import get_export_settings
 
-from .. import logger
+from .. import logger, profiler
 
 
 def parse_uv_transform_data_path(data_path: str) -> tuple[int, str]:
@@ -43,19 +47,82 @@ def parse_uv_transform_data_path(data_path: str) -> tuple[int, str]:
     return index, prop
 
 
-TrackFramesData = list[Vector] | list[Quaternion] | list[float]
+TrackFramesData = NDArray[np.float32]
+"""Values of a track for each exported frame. Shape (N, 3) for vectors, (N, 4) for quaternions, in WXYZ order, and
+(N,) for floats.
+"""
 SequenceItems = dict[int, dict[Track, TrackFramesData]]
 
 
+def sample_fcurve(fcurve: bpy.types.FCurve, frames: NDArray[np.float64]) -> NDArray[np.float32]:
+    """Evaluates the F-curve at each of the given frames."""
+    return np.fromiter(map(fcurve.evaluate, frames), dtype=np.float32, count=len(frames))
+
+
+def quaternions_multiply(a: NDArray, b: NDArray) -> NDArray[np.float64]:
+    """Multiplies quaternion arrays of shape (N, 4) in WXYZ order, element-wise. Either can also be a single
+    quaternion.
+    """
+    aw, ax, ay, az = np.moveaxis(np.asarray(a, dtype=np.float64), -1, 0)
+    bw, bx, by, bz = np.moveaxis(np.asarray(b, dtype=np.float64), -1, 0)
+    return np.stack((
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ), axis=-1)
+
+
+def quaternions_rotate(quats: NDArray[np.float32], rotation: Quaternion, local: bool = False) -> NDArray[np.float32]:
+    """Rotates each quaternion by ``rotation``, given in world space or, if ``local`` is set, in the local space of
+    each quaternion. Same as ``Quaternion.rotate``, keeps the length of the quaternions and returns them with
+    non-negative W.
+    """
+    lengths = np.linalg.norm(quats.astype(np.float64), axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quats_normalized = np.where(lengths > 0.0, quats / lengths, (1.0, 0.0, 0.0, 0.0))
+    rotation = np.array(rotation.normalized(), dtype=np.float64)
+    if local:
+        rotated = quaternions_multiply(quats_normalized, rotation)
+    else:
+        rotated = quaternions_multiply(rotation, quats_normalized)
+    rotated[rotated[:, 0] < 0.0] *= -1.0
+    return (rotated * lengths).astype(np.float32)
+
+
+def quaternions_fix_flickering(quats: NDArray[np.float32]) -> NDArray[np.float32]:
+    """Negates quaternions so the dot product of each pair of consecutive quaternions is not negative. See the
+    "flickering bug" comment in ``sequence_items_from_action``.
+    """
+    # Dot products of the original quaternions, in single precision like `Quaternion.dot`
+    products = quats[:-1] * quats[1:]
+    dots = ((products[:, 0] + products[:, 1]) + products[:, 2]) + products[:, 3]
+
+    # Each quaternion is negated if the previous one was negated XOR their dot product is negative. The chain is reset
+    # when the dot product is zero, as it doesn't change sign when the previous quaternion is negated
+    num_negative_dots = np.cumsum(dots < 0.0)
+    is_reset = ~((dots < 0.0) | (dots > 0.0))
+    reset_indices = np.maximum.accumulate(np.where(is_reset, np.arange(len(dots)), -1))
+    num_negative_dots_at_reset = np.where(reset_indices >= 0, num_negative_dots[reset_indices], 0)
+    negate = np.empty(len(quats), dtype=bool)
+    negate[0] = False
+    negate[1:] = ((num_negative_dots - num_negative_dots_at_reset) % 2) == 1
+
+    quats = quats.copy()
+    quats[negate] *= -1.0
+    return quats
+
+
 def sequence_items_from_action(
         action: bpy.types.Action,
         target_id: bpy.types.ID
 ) -> SequenceItems:
     action_frame_range = action.frame_range
     export_frame_count = get_action_export_frame_count(action)
-    def _export_frame_to_action_frame(frame_index: int) -> float:
-        export_last_frame_index = export_frame_count - 1
-        return action_frame_range[0] + (frame_index / export_last_frame_index) * (action_frame_range[1] - action_frame_range[0])
+    export_last_frame_index = export_frame_count - 1
+    action_frames = (action_frame_range[0] +
+                     (np.arange(export_frame_count) / export_last_frame_index) *
+                     (action_frame_range[1] - action_frame_range[0]))
 
     target = get_target_from_id(target_id)
     target_is_armature = isinstance(target_id, bpy.types.Armature)
@@ -102,19 +169,19 @@ def sequence_items_from_action(
                     default_vec = (0.0, 1.0, 0.0)
                 else:
                     default_vec = (0.0, 0.0, 0.0)
-                bone_sequences[track] = [Vector(default_vec) for _ in range(export_frame_count)]
+                bone_sequences[track] = np.tile(np.array(default_vec, dtype=np.float32), (export_frame_count, 1))
             elif track_format == TrackFormat.Quaternion:
-                bone_sequences[track] = [Quaternion((1.0, 0.0, 0.0, 0.0)) for _ in range(export_frame_count)]
+                bone_sequences[track] = np.tile(np.array((1.0, 0.0, 0.0, 0.0), dtype=np.float32),
+                                                (export_frame_count, 1))
             elif track_format == TrackFormat.Float:
-                bone_sequences[track] = [0.0] * export_frame_count
+                bone_sequences[track] = np.zeros(export_frame_count, dtype=np.float32)
 
         track_sequence = bone_sequences[track]
-        for frame_id in range(export_frame_count):
-            value = fcurve.evaluate(_export_frame_to_action_frame(frame_id))
-            if track_format == TrackFormat.Float:
-                track_sequence[frame_id] = value
-            else:
-                track_sequence[frame_id][comp_index] = value
+        values = sample_fcurve(fcurve, action_frames)
+        if track_format == TrackFormat.Float:
+            track_sequence[:] = values
+        else:
+            track_sequence[:, comp_index] = values
 
     if target_is_armature:
         # transform bones from pose space to local space
@@ -123,24 +190,22 @@ def sequence_items_from_action(
 
             if Track.BonePosition in bone_sequences:
                 vecs = bone_sequences[Track.BonePosition]
-                for i in range(export_frame_count):
-                    vecs[i] = transform_mat @ vecs[i]
+                m = np.array(transform_mat, dtype=np.float64)
+                bone_sequences[Track.BonePosition] = (vecs @ m[:3, :3].T + m[:3, 3]).astype(np.float32)
 
             if Track.BoneRotation in bone_sequences:
                 quats = bone_sequences[Track.BoneRotation]
-                for i in range(export_frame_count):
-                    quats[i].rotate(transform_mat)
+                rotation = transform_mat.to_3x3().normalized().to_quaternion()
+                bone_sequences[Track.BoneRotation] = quaternions_rotate(quats, rotation)
 
     if target_is_camera:
         # see animationhelper.transform_camera_rotation_quaternion
-        angle_delta = math.radians(-90.0)
-        x_axis = Vector((1.0, 0.0, 0.0))
+        # rotating around the local X axis of each quaternion
+        local_rotation = Quaternion((1.0, 0.0, 0.0), math.radians(-90.0))
         for bone_id, bone_sequences in sequence_items.items():
             if Track.CameraRotation in bone_sequences:
                 quats = bone_sequences[Track.CameraRotation]
-                for i in range(export_frame_count):
-                    x_axis_local = quats[i] @ x_axis
-                    quats[i].rotate(Quaternion(x_axis_local, angle_delta))
+                bone_sequences[Track.CameraRotation] = quaternions_rotate(quats, local_rotation, local=True)
 
     if target_id is not None and len(uv_transforms_fcurves) > 0:
         # copy the UV transforms defined by the user to apply f-curves on them without modifying the original ones
@@ -157,31 +222,29 @@ def sequence_items_from_action(
 
             bone_sequences = sequence_items[bone_id]
 
+            fcurves_targets = [(parse_uv_transform_data_path(fcurve.data_path), fcurve.array_index,
+                                sample_fcurve(fcurve, action_frames).tolist())
+                               for fcurve in fcurves]
+
             # compute uv0/uv1 from uv_transform
-            bone_sequences[Track.UV0] = [Vector((0.0, 0.0, 0.0)) for _ in range(export_frame_count)]
-            bone_sequences[Track.UV1] = [Vector((0.0, 0.0, 0.0)) for _ in range(export_frame_count)]
-            uv0_sequence = bone_sequences[Track.UV0]
-            uv1_sequence = bone_sequences[Track.UV1]
+            uv0_sequence = np.zeros((export_frame_count, 3), dtype=np.float32)
+            uv1_sequence = np.zeros((export_frame_count, 3), dtype=np.float32)
+            bone_sequences[Track.UV0] = uv0_sequence
+            bone_sequences[Track.UV1] = uv1_sequence
             for frame_id in range(export_frame_count):
                 # apply f-curves to UV transforms
-                for fcurve in fcurves:
-                    value = fcurve.evaluate(_export_frame_to_action_frame(frame_id))
-                    transform_index, prop_name = parse_uv_transform_data_path(fcurve.data_path)
+                for (transform_index, prop_name), comp_index, values in fcurves_targets:
+                    value = values[frame_id]
 
                     prop = getattr(uv_transforms[transform_index], prop_name)
                     if isinstance(prop, float):
                         setattr(uv_transforms[transform_index], prop_name, value)
                     else:  # Vector
-                        comp_index = fcurve.array_index
                         prop[comp_index] = value
 
                 mat = calculate_final_uv_transform_matrix(uv_transforms)
-                uv0_sequence[frame_id][0] = mat[0][0]
-                uv0_sequence[frame_id][1] = mat[0][1]
-                uv0_sequence[frame_id][2] = mat[0][2]
-                uv1_sequence[frame_id][0] = mat[1][0]
-                uv1_sequence[frame_id][1] = mat[1][1]
-                uv1_sequence[frame_id][2] = mat[1][2]
+                uv0_sequence[frame_id] = mat[0]
+                uv1_sequence[frame_id] = mat[1]
 
         uv_transforms.clear()
 
@@ -214,36 +277,39 @@ def sequence_items_from_action(
             if quats is None:
                 continue
 
-            for i in range(1, export_frame_count):
-                if quats[i - 1].dot(quats[i]) < 0:
-                    quats[i] *= -1
+            bone_sequences[track] = quaternions_fix_flickering(quats)
     # WARNING: ANY OPERATION WITH ROTATION WILL CAUSE SIGN CHANGE. PROCEED ANYTHING BEFORE FIX.
 
     return sequence_items
 
 
 def build_values_channel(
-    values: list[float],
-    uniq_values: list[float],
+    values: NDArray[np.float32],
     indirect_percentage: float = 0.1
 ) -> ycdxml.ChannelsList.Channel:
+    values = values.astype(np.float64)
+    uniq_values, uniq_inverse = np.unique(values, return_inverse=True)
     values_len_percentage = len(uniq_values) / len(values)
 
     if len(uniq_values) == 1:
         channel = ycdxml.ChannelsList.StaticFloat()
 
-        channel.value = uniq_values[0]
+        channel.value = float(values[0])
     elif values_len_percentage <= indirect_percentage:
         channel = ycdxml.ChannelsList.IndirectQuantizeFloat()
 
-        min_value, quantum = get_quantum_and_min_val(uniq_values)
+        # Store the unique values in the iteration order of a set built from the values, as done before `np.unique`
+        # was used. The quantum depends on the order of the values, so this keeps the exported channels the same
+        uniq_values_ordered = list(set(values.tolist()))
+        uniq_value_to_index = {value: index for index, value in enumerate(uniq_values_ordered)}
+        sorted_to_ordered = np.array([uniq_value_to_index[value] for value in uniq_values.tolist()], dtype=np.int64)
+
+        min_value, quantum = get_quantum_and_min_val(uniq_values_ordered)
 
-        channel.values = uniq_values
+        channel.values = np.array(uniq_values_ordered, dtype=np.float64)
         channel.offset = min_value
         channel.quantum = quantum
-
-        for value in values:
-            channel.frames.append(uniq_values.index(value))
+        channel.frames = sorted_to_ordered[uniq_inverse].astype(np.uint32)
     else:
         channel = ycdxml.ChannelsList.QuantizeFloat()
 
@@ -268,78 +334,41 @@ def sequence_data_from_frames_data(
     sequence_data = ycdxml.Animation.SequenceDataList.SequenceData()
 
     track_format = TrackFormatMap[track]
+    is_static = bool(np.all(frames_data == frames_data[0]))
 
     if track_format == TrackFormat.Vector3:
-        values_x = []
-        values_y = []
-        values_z = []
-
-        for vector in frames_data:
-            values_x.append(vector.x)
-            values_y.append(vector.y)
-            values_z.append(vector.z)
-
-        uniq_x = list(set(values_x))
-        len_uniq_x = len(uniq_x)
-
-        uniq_y = list(set(values_y))
-        len_uniq_y = len(uniq_y)
-
-        uniq_z = list(set(values_z))
-        len_uniq_z = len(uniq_z)
-
-        if len_uniq_x == 1 and len_uniq_y == 1 and len_uniq_z == 1:
+        if is_static:
             channel = ycdxml.ChannelsList.StaticVector3()
-            channel.value = frames_data[0]
+            channel.value = Vector(frames_data[0])
 
             sequence_data.channels.append(channel)
         else:
-            sequence_data.channels.append(build_values_channel(values_x, uniq_x))
-            sequence_data.channels.append(build_values_channel(values_y, uniq_y))
-            sequence_data.channels.append(build_values_channel(values_z, uniq_z))
+            sequence_data.channels.append(build_values_channel(frames_data[:, 0]))
+            sequence_data.channels.append(build_values_channel(frames_data[:, 1]))
+            sequence_data.channels.append(build_values_channel(frames_data[:, 2]))
     elif track_format == TrackFormat.Quaternion:
-        values_x = []
-        values_y = []
-        values_z = []
-        values_w = []
-
-        for quat in frames_data:
-            values_x.append(quat.x)
-            values_y.append(quat.y)
-            values_z.append(quat.z)
-            values_w.append(quat.w)
-
-        uniq_x = list(set(values_x))
-        len_uniq_x = len(uniq_x)
-
-        uniq_y = list(set(values_y))
-        len_uniq_y = len(uniq_y)
-
-        uniq_z = list(set(values_z))
-        len_uniq_z = len(uniq_z)
-
-        uniq_w = list(set(values_w))
-        len_uniq_w = len(uniq_w)
-
-        if len_uniq_x == 1 and len_uniq_y == 1 and len_uniq_z == 1 and len_uniq_w == 1:
+        if is_static:
             channel = ycdxml.ChannelsList.StaticQuaternion()
-            channel.value = frames_data[0]
+            channel.value = Quaternion(frames_data[0])
 
             sequence_data.channels.append(channel)
         else:
-            sequence_data.channels.append(build_values_channel(values_x, uniq_x))
-            sequence_data.channels.append(build_values_channel(values_y, uniq_y))
-            sequence_data.channels.append(build_values_channel(values_z, uniq_z))
-            sequence_data.channels.append(build_values_channel(values_w, uniq_w))
+            # Channels in XYZW order
+            sequence_data.channels.append(build_values_channel(frames_data[:, 1]))
+            sequence_data.channels.append(build_values_channel(frames_data[:, 2]))
+            sequence_data.channels.append(build_values_channel(frames_data[:, 3]))
+            sequence_data.channels.append(build_values_channel(frames_data[:, 0]))
     elif track_format == TrackFormat.Float:
-        values = frames_data
-        uniq = list(set(values))
-        sequence_data.channels.append(build_values_channel(values, uniq))
+        sequence_data.channels.append(build_values_channel(frames_data))
 
     return sequence_data
 
 
-def animation_from_object(animation_obj: bpy.types.Object) -> Optional[ycdxml.Animation]:
+@profiler.profiled
+def animation_from_object(
+    animation_obj: bpy.types.Object,
+    compression_tolerances: Optional[CompressionTolerances] = None
+) -> Optional[ycdxml.Animation]:
     animation_properties = animation_obj.animation_properties
     action = animation_properties.action
     export_frame_count = get_action_export_frame_count(action)
@@ -369,11 +398,17 @@ def animation_from_object(animation_obj: bpy.types.Object) -> Optional[ycdxml.An
                       for bone_id, bones_data in sequence_items.items()
                       for track, frames_data in bones_data.items()]
     sequence_datas.sort(key=lambda x: x[0] | (x[1].value << 16))
+    compression_stats = AnimationCompressionStats()
     for bone_id, track, frames_data in sequence_datas:
         if track == Track.MoverPosition or track == Track.MoverRotation:
             animation.unknown10 |= AnimationFlag.RootMotion
 
-        sequence_data = sequence_data_from_frames_data(track, frames_data)
+        if compression_tolerances is None:
+            sequence_data = sequence_data_from_frames_data(track, frames_data)
+        else:
+            compressed_track = compress_track(track, frames_data, compression_tolerances.for_track(track))
+            compression_stats.add(track, compressed_track)
+            sequence_data = compressed_track.sequence_data
 
         seq_bone_id = ycdxml.Animation.BoneIdList.BoneId()
         seq_bone_id.bone_id = bone_id
@@ -385,6 +420,9 @@ def animation_from_object(animation_obj: bpy.types.Object) -> Optional[ycdxml.An
 
     animation.sequences.append(sequence)
 
+    if compression_tolerances is not None:
+        logger.info(f"Animation '{animation_obj.name}' compressed to {compression_stats.describe()}.")
+
     # Get int value from enum, a bit junky...
     animation.unknown10 = animation.unknown10.value
 
@@ -468,6 +506,7 @@ def clip_tag_calc_signature(tag: ClipTag) -> int:
     return signature
 
 
+@profiler.profiled
 def clip_from_object(clip_obj: bpy.types.Object) -> ycdxml.Clip:
     clip_properties = clip_obj.clip_properties
 
@@ -532,7 +571,11 @@ def clip_from_object(clip_obj: bpy.types.Object) -> ycdxml.Clip:
     return xml_clip
 
 
-def clip_dictionary_from_object(obj: bpy.types.Object) -> Optional[ycdxml.ClipDictionary]:
+@profiler.profiled
+def clip_dictionary_from_object(
+    obj: bpy.types.Object,
+    compression_tolerances: Optional[CompressionTolerances] = None
+) -> Optional[ycdxml.ClipDictionary]:
     clip_dictionary = ycdxml.ClipDictionary()
 
     animations_obj = None
@@ -546,7 +589,7 @@ def clip_dictionary_from_object(obj: bpy.types.Object) -> Optional[ycdxml.ClipDi
 
     any_animation_export_failed = False
     for animation_obj in animations_obj.children:
-        animation = animation_from_object(animation_obj)
+        animation = animation_from_object(animation_obj, compression_tolerances)
         if animation is None:
             any_animation_export_failed = True
             continue
@@ -565,8 +608,19 @@ def clip_dictionary_from_object(obj: bpy.types.Object) -> Optional[ycdxml.ClipDi
     return clip_dictionary
 
 
+@profiler.profiled
 def export_ycd(obj: bpy.types.Object, filepath: str) -> bool:
-    clip_dict = clip_dictionary_from_object(obj)
+    export_settings = get_export_settings()
+    if export_settings.ycd_compress_animations:
+        compression_tolerances = CompressionTolerances(
+            position=export_settings.ycd_position_tolerance,
+            rotation=export_settings.ycd_rotation_tolerance,
+            other=export_settings.ycd_other_tolerance,
+        )
+    else:
+        compression_tolerances = None
+
+    clip_dict = clip_dictionary_from_object(obj, compression_tolerances)
     if clip_dict is None:
         return False
 
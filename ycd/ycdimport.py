@@ -1,6 +1,8 @@
 import os
 import bpy
-from mathutils import Vector, Quaternion
+import numpy as np
+from numpy.typing import NDArray
+from typing import Optional
 from ..cwxml import clipdictionary as ycdxml
 from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType
 from ..tools.animationhelper import (
@@ -12,6 +14,7 @@ from ..tools.animationhelper import (
     get_scene_fps
 )
 from ..tools.utils import color_hash
+from .. import profiler
 
 
 def create_anim_obj(sollum_type: SollumType) -> bpy.types.Object:
@@ -22,57 +25,43 @@ def create_anim_obj(sollum_type: SollumType) -> bpy.types.Object:
     return anim_obj
 
 
-ActionData = dict[int, dict[Track, list]]
+ActionData = dict[int, dict[Track, NDArray[np.float32]]]
+"""Decoded values of each track for every frame of the animation, grouped by bone ID. The values are arrays of
+shape (frame_count,) for floats, (frame_count, 3) for vectors and (frame_count, 4) for quaternions, in WXYZ order.
+"""
 
 
-def insert_action_data(action_data: ActionData, bone_id: int, track: Track, data):
-    if bone_id not in action_data:
-        action_data[bone_id] = {}
-
-    if track not in action_data[bone_id]:
-        action_data[bone_id][track] = []
-
-    action_data[bone_id][track].append(data)
-
-
-def get_values_from_sequence_data(sequence_data: ycdxml.Animation.SequenceDataList.SequenceData, frame_id: int) -> list:
+def get_values_from_sequence_data(
+    sequence_data: ycdxml.Animation.SequenceDataList.SequenceData,
+    frame_ids: NDArray[np.int64]
+) -> list[NDArray]:
     channel_values = []
 
-    for i in range(len(sequence_data.channels)):
-        while len(channel_values) <= i:
-            channel_values.append(None)
-
-        channel = sequence_data.channels[i]
-
-        if channel is not None:
-            channel_values[i] = channel.get_value(frame_id, channel_values)
+    for channel in sequence_data.channels:
+        channel_values.append(channel.get_values(frame_ids, channel_values))
 
     return channel_values
 
 
 def get_vector3_from_sequence_data(
     sequence_data: ycdxml.Animation.SequenceDataList.SequenceData,
-    frame_id: int
-) -> Vector:
-    channel_values = get_values_from_sequence_data(sequence_data, frame_id)
+    frame_ids: NDArray[np.int64]
+) -> NDArray[np.float32]:
+    channel_values = get_values_from_sequence_data(sequence_data, frame_ids)
 
     if len(channel_values) == 1:
         location = channel_values[0]
     else:
-        location = Vector([
-            channel_values[0],
-            channel_values[1],
-            channel_values[2],
-        ])
+        location = np.column_stack(channel_values[:3])
 
-    return location
+    return location.astype(np.float32)
 
 
 def get_quaternion_from_sequence_data(
     sequence_data: ycdxml.Animation.SequenceDataList.SequenceData,
-    frame_id: int
-) -> Quaternion:
-    channel_values = get_values_from_sequence_data(sequence_data, frame_id)
+    frame_ids: NDArray[np.int64]
+) -> NDArray[np.float32]:
+    channel_values = get_values_from_sequence_data(sequence_data, frame_ids)
 
     if len(channel_values) == 1:
         rotation = channel_values[0]
@@ -80,32 +69,34 @@ def get_quaternion_from_sequence_data(
         if len(sequence_data.channels) <= 4:
             for channel in sequence_data.channels:
                 if channel.type == "CachedQuaternion1" or channel.type == "CachedQuaternion2":
-                    cached_value = channel.get_value(frame_id, channel_values)
-
-                    if channel.quat_index == 0:
-                        channel_values = [
-                            cached_value, channel_values[0], channel_values[1], channel_values[2]]
-                    elif channel.quat_index == 1:
-                        channel_values = [
-                            channel_values[0], cached_value, channel_values[1], channel_values[2]]
-                    elif channel.quat_index == 2:
-                        channel_values = [
-                            channel_values[0], channel_values[1], cached_value, channel_values[2]]
-                    elif channel.quat_index == 3:
-                        channel_values = [
-                            channel_values[0], channel_values[1], channel_values[2], cached_value]
+                    cached_value = channel.get_values(frame_ids, channel_values)
+
+                    channel_values = channel_values[:3]
+                    channel_values.insert(channel.quat_index, cached_value)
 
             if channel.type == "CachedQuaternion2":
-                rotation = Quaternion(
-                    (channel_values[0], channel_values[1], channel_values[2], channel_values[3]))
+                rotation = np.column_stack(channel_values[:4])
             else:
-                rotation = Quaternion(
-                    (channel_values[3], channel_values[0], channel_values[1], channel_values[2]))
+                rotation = np.column_stack((channel_values[3], channel_values[0], channel_values[1], channel_values[2]))
         else:
-            rotation = Quaternion(
-                (channel_values[3], channel_values[0], channel_values[1], channel_values[2]))
+            rotation = np.column_stack((channel_values[3], channel_values[0], channel_values[1], channel_values[2]))
+
+    return rotation.astype(np.float32)
 
-    return rotation
+
+def get_frames_data_from_sequence_data(
+    track_format: TrackFormat,
+    sequence_data: ycdxml.Animation.SequenceDataList.SequenceData,
+    frame_ids: NDArray[np.int64]
+) -> Optional[NDArray[np.float32]]:
+    if track_format == TrackFormat.Vector3:
+        return get_vector3_from_sequence_data(sequence_data, frame_ids)
+    elif track_format == TrackFormat.Quaternion:
+        return get_quaternion_from_sequence_data(sequence_data, frame_ids)
+    elif track_format == TrackFormat.Float:
+        return get_values_from_sequence_data(sequence_data, frame_ids)[0].astype(np.float32)
+    else:
+        return None
 
 
 def combine_sequences_and_build_action_data(animation: ycdxml.Animation) -> ActionData:
@@ -114,37 +105,35 @@ def combine_sequences_and_build_action_data(animation: ycdxml.Animation) -> Acti
     if len(animation.sequences) <= 1:
         sequence_frame_limit = animation.frame_count + 30
 
-    action_data = {}
-
-    for frame_id in range(0, animation.frame_count):
-        sequence_index = int(frame_id / (sequence_frame_limit))
-        sequence_frame = frame_id % (sequence_frame_limit)
-
-        if sequence_index >= len(animation.sequences):
-            sequence_index = len(animation.sequences) - 1
+    frame_ids = np.arange(animation.frame_count)
+    sequence_indices = np.minimum(frame_ids // sequence_frame_limit, len(animation.sequences) - 1)
+    sequence_frames = frame_ids % sequence_frame_limit
 
-        sequence = animation.sequences[sequence_index]
+    # Decode each sequence for all of its frames at once. Frames are assigned to sequences in order, so concatenating
+    # the values of each sequence gives the values of the whole animation
+    sequences_action_data = {}
+    for sequence_index, sequence in enumerate(animation.sequences):
+        sequence_frame_ids = sequence_frames[sequence_indices == sequence_index]
+        if len(sequence_frame_ids) == 0:
+            continue
 
         for sequence_data_index, sequence_data in enumerate(sequence.sequence_data):
             bone_data = animation.bone_ids[sequence_data_index]
             bone_id = bone_data.bone_id
-
-            if bone_data is None:
-                continue
-
             track = bone_data.track
             format = bone_data.format
             assert TrackFormatMap[track] == format, f"Track format mismatch: {TrackFormatMap[track]} != {format}"
 
-            if format == TrackFormat.Vector3:
-                vec = get_vector3_from_sequence_data(sequence_data, sequence_frame)
-                insert_action_data(action_data, bone_id, track, vec)
-            elif format == TrackFormat.Quaternion:
-                quat = get_quaternion_from_sequence_data(sequence_data, sequence_frame)
-                insert_action_data(action_data, bone_id, track, quat)
-            elif format == TrackFormat.Float:
-                value = get_values_from_sequence_data(sequence_data, sequence_frame)[0]
-                insert_action_data(action_data, bone_id, track, value)
+            values = get_frames_data_from_sequence_data(format, sequence_data, sequence_frame_ids)
+            if values is None:
+                continue
+
+            sequences_action_data.setdefault(bone_id, {}).setdefault(track, []).append(values)
+
+    action_data = {}
+    for bone_id, bone_sequences_data in sequences_action_data.items():
+        action_data[bone_id] = {track: np.concatenate(track_values)
+                                for track, track_values in bone_sequences_data.items()}
 
     return action_data
 
@@ -154,80 +143,34 @@ def apply_action_data_to_action(action_data: ActionData, action: bpy.types.Actio
     # -1 because the anim finishes when it reaches the last frame
     unscaled_duration_secs = (frame_count - 1) / get_scene_fps()
     scale_factor = duration_secs / unscaled_duration_secs
-    scaled_frame_ids = [frame_id * scale_factor for frame_id in range(frame_count)]
+    scaled_frame_ids = np.arange(frame_count) * scale_factor
 
-    def _interleave_frame_ids(track_data: list[float]) -> list[float]:
+    def _interleave_frame_ids(track_data: NDArray[np.float32]) -> NDArray[np.float32]:
         """Converts [data0, data1, ..., dataN] to [frameId0, data0, frameId1, data1, ..., frameIdN, dataN]"""
         assert len(track_data) == len(scaled_frame_ids)
-        return [value for co in zip(scaled_frame_ids, track_data) for value in co]
+        co = np.empty((len(track_data), 2), dtype=np.float32)
+        co[:, 0] = scaled_frame_ids
+        co[:, 1] = track_data
+        return co.ravel()
+
+    def _new_fcurve(data_path: str, index: int, group_item: bpy.types.ActionGroup, track_data: NDArray[np.float32]):
+        fcurve = action.fcurves.new(data_path=data_path, index=index)
+        fcurve.group = group_item
+        fcurve.keyframe_points.add(len(track_data))
+        fcurve.keyframe_points.foreach_set("co", _interleave_frame_ids(track_data))
+        fcurve.update()
 
     for bone_id, bones_data in action_data.items():
         group_item = action.groups.new(f"#{bone_id}")
         for track, frames_data in bones_data.items():
             track_format = TrackFormatMap[track]
             data_path = get_canonical_track_data_path(track, bone_id)
-            if track_format == TrackFormat.Vector3:
-                vec_tracks_x = list(map(lambda vec: vec.x, frames_data))
-                vec_tracks_y = list(map(lambda vec: vec.y, frames_data))
-                vec_tracks_z = list(map(lambda vec: vec.z, frames_data))
-
-                vec_curve_x = action.fcurves.new(data_path=data_path, index=0)
-                vec_curve_y = action.fcurves.new(data_path=data_path, index=1)
-                vec_curve_z = action.fcurves.new(data_path=data_path, index=2)
-
-                vec_curve_x.group = group_item
-                vec_curve_y.group = group_item
-                vec_curve_z.group = group_item
-
-                vec_curve_x.keyframe_points.add(len(frames_data))
-                vec_curve_y.keyframe_points.add(len(frames_data))
-                vec_curve_z.keyframe_points.add(len(frames_data))
-
-                vec_curve_x.keyframe_points.foreach_set("co", _interleave_frame_ids(vec_tracks_x))
-                vec_curve_y.keyframe_points.foreach_set("co", _interleave_frame_ids(vec_tracks_y))
-                vec_curve_z.keyframe_points.foreach_set("co", _interleave_frame_ids(vec_tracks_z))
-
-                vec_curve_x.update()
-                vec_curve_y.update()
-                vec_curve_z.update()
-            elif track_format == TrackFormat.Quaternion:
-                quat_tracks_x = list(map(lambda rotation: rotation.x, frames_data))
-                quat_tracks_y = list(map(lambda rotation: rotation.y, frames_data))
-                quat_tracks_z = list(map(lambda rotation: rotation.z, frames_data))
-                quat_tracks_w = list(map(lambda rotation: rotation.w, frames_data))
-
-                quat_curve_w = action.fcurves.new(data_path=data_path, index=0)
-                quat_curve_x = action.fcurves.new(data_path=data_path, index=1)
-                quat_curve_y = action.fcurves.new(data_path=data_path, index=2)
-                quat_curve_z = action.fcurves.new(data_path=data_path, index=3)
-
-                quat_curve_w.group = group_item
-                quat_curve_x.group = group_item
-                quat_curve_y.group = group_item
-                quat_curve_z.group = group_item
-
-                quat_curve_w.keyframe_points.add(len(frames_data))
-                quat_curve_x.keyframe_points.add(len(frames_data))
-                quat_curve_y.keyframe_points.add(len(frames_data))
-                quat_curve_z.keyframe_points.add(len(frames_data))
-
-                quat_curve_w.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_w))
-                quat_curve_x.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_x))
-                quat_curve_y.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_y))
-                quat_curve_z.keyframe_points.foreach_set("co", _interleave_frame_ids(quat_tracks_z))
-
-                quat_curve_w.update()
-                quat_curve_x.update()
-                quat_curve_y.update()
-                quat_curve_z.update()
+            if track_format == TrackFormat.Vector3 or track_format == TrackFormat.Quaternion:
+                # Quaternions are already in WXYZ order, same as the fcurve indices
+                for index in range(frames_data.shape[1]):
+                    _new_fcurve(data_path, index, group_item, frames_data[:, index])
             elif track_format == TrackFormat.Float:
-                value_curve = action.fcurves.new(data_path=data_path)
-                value_curve.group = group_item
-
-                value_curve.keyframe_points.add(len(frames_data))
-                value_curve.keyframe_points.foreach_set("co", _interleave_frame_ids(frames_data))
-
-                value_curve.update()
+                _new_fcurve(data_path, 0, group_item, frames_data)
 
 
 def action_data_to_action(action_name: str, action_data, frame_count: int, duration_secs: float) -> bpy.types.Action:
@@ -236,6 +179,7 @@ def action_data_to_action(action_name: str, action_data, frame_count: int, durat
     return action
 
 
+@profiler.profiled
 def animation_to_obj(animation: ycdxml.Animation) -> bpy.types.Object:
     animation_obj = create_anim_obj(SollumType.ANIMATION)
 
@@ -249,6 +193,7 @@ def animation_to_obj(animation: ycdxml.Animation) -> bpy.types.Object:
     return animation_obj
 
 
+@profiler.profiled
 def clip_to_obj(
     clip: ycdxml.Clip,
     animations_map: dict[str, ycdxml.Animation],
@@ -342,6 +287,7 @@ def create_clip_dictionary_template(name: str) -> tuple[bpy.types.Object, bpy.ty
     return clip_dictionary_obj, clips_obj, animations_obj
 
 
+@profiler.profiled
 def clip_dictionary_to_obj(clip_dictionary: ycdxml.ClipDictionary, name: str) -> bpy.types.Object:
     clip_dict_obj, clips_obj, animations_obj = create_clip_dictionary_template(name)
 
@@ -364,6 +310,7 @@ def clip_dictionary_to_obj(clip_dictionary: ycdxml.ClipDictionary, name: str) ->
     return clip_dict_obj
 
 
+@profiler.profiled
 def import_ycd(filepath: str) -> bpy.types.Object:
     ycd_xml = ycdxml.YCD.from_xml_file(filepath)
 
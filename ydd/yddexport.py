@@ -11,8 +11,10 @@ from ..ydr.cloth_diagnostics import (
 from ..tools import jenkhash
 from ..sollumz_properties import SollumType
 from ..sollumz_preferences import get_export_settings
+from .. import profiler
 
 
+@profiler.profiled
 def export_ydd(ydd_obj: bpy.types.Object, filepath: Optional[str]) -> bool:
     """If filepath is None, a dry run is done and no files are written."""
     export_settings = get_export_settings()
@@ -36,6 +38,7 @@ def export_ydd(ydd_obj: bpy.types.Object, filepath: Optional[str]) -> bool:
     return True
 
 
+@profiler.profiled
 def create_ydd_xml(
     ydd_obj: bpy.types.Object,
     exclude_skeleton: bool = False,
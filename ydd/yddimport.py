@@ -15,9 +15,10 @@ from ..sollumz_preferences import get_import_settings
 from ..tools.blenderhelper import create_empty_object, create_blender_object, add_child_of_bone_constraint
 from ..tools.utils import get_filename
 
-from .. import logger
+from .. import logger, profiler
 
 
+@profiler.profiled
 def import_ydd(filepath: str):
     import_settings = get_import_settings()
 
@@ -59,6 +60,7 @@ def get_first_yft_path(directory: str) -> Optional[str]:
     return None
 
 
+@profiler.profiled
 def create_ydd_obj(ydd_xml: DrawableDictionary, filepath: str, yld_xml: Optional[ClothDictionary], external_skel: Optional[Fragment]):
     name = get_filename(filepath)
     if external_skel is not None:
@@ -133,10 +135,7 @@ def make_yld_filepath(ydd_filepath: str) -> str:
 def create_character_cloth_mesh(cloth: CharacterCloth, drawable_obj: Object, bones: list[Bone]) -> Object:
     controller = cloth.controller
     vertices = controller.vertices
-    indices = controller.indices
-
-    vertices = np.array(vertices)
-    indices = np.array(indices).reshape((-1, 3))
+    indices = np.array(controller.indices).reshape((-1, 3))
 
     mesh = bpy.data.meshes.new(f"{cloth.name}.cloth")
     mesh.from_pydata(vertices, [], indices)
@@ -231,10 +230,10 @@ def create_character_cloth_mesh(cloth: CharacterCloth, drawable_obj: Object, bon
             vgroup = vertex_groups_by_bone_idx[bone_idx]
             vgroup.add((vert_idx,), weight, "ADD")
 
-    if cloth.poses:
+    if len(cloth.poses) > 0:
         # TODO(cloth): export poses
         num_poses = len(cloth.poses) // 2 // vertices_count
-        poses = np.array(cloth.poses)[::2,:3]
+        poses = cloth.poses[::2,:3]
         obj.show_only_shape_key = True
         obj.shape_key_add(name="Basis")
         for pose_idx in range(num_poses):
@@ -6,6 +6,7 @@ from bpy.types import (
 import gpu
 from gpu_extras.batch import batch_for_shader
 import blf
+import numpy as np
 from mathutils import Vector
 from collections.abc import Sequence
 from typing import NamedTuple
@@ -15,7 +16,12 @@ from .cable import (
     is_cable_mesh_object,
     mesh_get_cable_attribute_values,
 )
-from bpy_extras.view3d_utils import location_3d_to_region_2d
+from .overlay_cache import (
+    MeshOverlayCache,
+    VertexLabels,
+    draw_vertex_labels,
+    timed_draw_callback,
+)
 from bpy_extras.mesh_utils import edge_loops_from_edges
 import bmesh
 
@@ -26,6 +32,8 @@ class CableOverlaysDrawHandler:
     def __init__(self):
         self.handler_text = None
         self.handler_geometry = None
+        self.attribute_labels_cache = MeshOverlayCache("Cable attribute labels", self.build_attribute_labels)
+        self.radius_geometry_cache = MeshOverlayCache("Cable radius", self.build_radius_geometry)
 
     def register(self):
         self.handler_text = SpaceView3D.draw_handler_add(self.draw_text, (), "WINDOW", "POST_PIXEL")
@@ -53,6 +61,7 @@ class CableOverlaysDrawHandler:
 
         return True
 
+    @timed_draw_callback("Cable overlays text")
     def draw_text(self):
         if not self.can_draw_anything():
             return
@@ -74,6 +83,7 @@ class CableOverlaysDrawHandler:
             attrs.append(CableAttr.MATERIAL_INDEX)
         self.draw_attribute_values(obj, attrs)
 
+    @timed_draw_callback("Cable overlays geometry")
     def draw_geometry(self):
         if not self.can_draw_anything():
             return
@@ -89,7 +99,6 @@ class CableOverlaysDrawHandler:
         context = bpy.context
         region = context.region
         rv3d = context.region_data
-        mesh = cable_obj.data
 
         font_id = 0
         blf.size(font_id, 11)
@@ -98,25 +107,31 @@ class CableOverlaysDrawHandler:
         blf.shadow(font_id, 3, 0.0, 0.0, 0.0, 1.0)
         blf.shadow_offset(font_id, 2, -2)
 
-        matrix_world = cable_obj.matrix_world
+        labels = self.attribute_labels_cache.get(cable_obj, tuple(attrs), font_id)
+        draw_vertex_labels(labels, cable_obj.matrix_world, region, rv3d, font_id)
 
-        def _draw_vertex_attributes(pos: Vector, attr_values):
-            pos = matrix_world @ pos
-            pos = location_3d_to_region_2d(region, rv3d, pos)
-            if pos:
-                for i, attr_value in enumerate(attr_values):
-                    attr_type = attrs[i].type
-                    if attr_type == "FLOAT_VECTOR":
-                        attr_str = f"{attr_value[0]:.2f}  {attr_value[1]:.2f}"
-                    elif attr_type == "INT":
-                        attr_str = f"{attr_value}"
-                    else:  # FLOAT
-                        attr_str = f"{attr_value:.2f}"
-                    w, h = blf.dimensions(font_id, attr_str)
-                    attr_pos = pos - Vector((w * 0.5, h * i * 2 - (h * len(attr_values) / 2)))
-                    blf.position(font_id, attr_pos.x, attr_pos.y, 0.0)
-                    blf.draw(font_id, attr_str)
+        blf.disable(font_id, blf.SHADOW)
+
+    @staticmethod
+    def build_attribute_labels(cable_obj: Object, attrs: Sequence[CableAttr], font_id: int) -> VertexLabels:
+        mesh = cable_obj.data
 
+        def _format_attribute_values(attr_values) -> list[tuple[str, float, float]]:
+            lines = []
+            for i, attr_value in enumerate(attr_values):
+                attr_type = attrs[i].type
+                if attr_type == "FLOAT_VECTOR":
+                    attr_str = f"{attr_value[0]:.2f}  {attr_value[1]:.2f}"
+                elif attr_type == "INT":
+                    attr_str = f"{attr_value}"
+                else:  # FLOAT
+                    attr_str = f"{attr_value:.2f}"
+                w, h = blf.dimensions(font_id, attr_str)
+                lines.append((attr_str, w, h))
+            return lines
+
+        positions = []
+        lines = []
         if cable_obj.mode == "EDIT":
             edit_mesh = bmesh.from_edit_mesh(mesh)
             try:
@@ -124,18 +139,30 @@ class CableOverlaysDrawHandler:
                 for v in edit_mesh.verts:
                     attr_values = [attr.default_value if attr_layers[i] is None else v[attr_layers[i]]
                                    for i, attr in enumerate(attrs)]
-                    _draw_vertex_attributes(v.co, attr_values)
+                    positions.append(v.co.copy())
+                    lines.append(_format_attribute_values(attr_values))
             finally:
                 edit_mesh.free()
         else:
             all_attr_values = [mesh_get_cable_attribute_values(mesh, attr) for attr in attrs]
             for v in mesh.vertices:
                 attr_values = [all_attr_values[i][v.index] for i, attr in enumerate(attrs)]
-                _draw_vertex_attributes(v.co, attr_values)
+                positions.append(v.co)
+                lines.append(_format_attribute_values(attr_values))
 
-        blf.disable(font_id, blf.SHADOW)
+        positions = np.array(positions, dtype=np.float32).reshape((-1, 3))
+        return VertexLabels(positions, lines)
 
     def draw_radius_geometry(self, cable_obj: Object):
+        # The radius lines are oriented based on the world up vector, so the geometry also depends on the transform
+        matrix_world_key = tuple(tuple(row) for row in cable_obj.matrix_world)
+        batch = self.radius_geometry_cache.get(cable_obj, matrix_world_key)
+
+        shader = gpu.shader.from_builtin("UNIFORM_COLOR")
+        shader.uniform_float("color", get_theme_settings().cable_overlay_radius)
+        batch.draw(shader)
+
+    def build_radius_geometry(self, cable_obj: Object, matrix_world_key) -> gpu.types.GPUBatch:
         mesh = cable_obj.data
         if cable_obj.mode == "EDIT":
             edit_mesh = bmesh.from_edit_mesh(mesh)
@@ -152,9 +179,7 @@ class CableOverlaysDrawHandler:
             coords.extend(self.build_radius_geometry_for_cable_piece(cable_obj, piece))
 
         shader = gpu.shader.from_builtin("UNIFORM_COLOR")
-        batch = batch_for_shader(shader, "LINES", {"pos": coords})
-        shader.uniform_float("color", get_theme_settings().cable_overlay_radius)
-        batch.draw(shader)
+        return batch_for_shader(shader, "LINES", {"pos": coords})
 
     def build_radius_geometry_for_cable_piece(self, cable_obj: Object, piece: list[int]) -> list[Vector]:
         """Builds the geometry to visualize the radius of this cable piece. The radius is represented with 4 lines
@@ -25,7 +25,6 @@ from ..shared.geometry import (
     tris_normals,
     tris_areas,
     tris_areas_from_verts,
-    distance_signed_point_to_planes,
 )
 from ..sollumz_properties import (
     SollumType,
@@ -189,31 +188,21 @@ def cloth_char_export(
     pinned = np.array(mesh_get_cloth_attribute_values(cloth_mesh, ClothAttr.PINNED)) != 0
     num_pinned = np.sum(pinned)
 
-    mesh_to_cloth_vertex_map = [None] * num_vertices
-    cloth_to_mesh_vertex_map = [None] * num_vertices
-    vertices = [None] * num_vertices
-    normals = [None] * num_vertices
-    for v in cloth_mesh.vertices:
-        vi = v.index
-        vertices[vi] = Vector(v.co)
-        normals[vi] = Vector(v.normal)
-        mesh_to_cloth_vertex_map[vi] = vi
-        cloth_to_mesh_vertex_map[vi] = vi
+    mesh_to_cloth_vertex_map = list(range(num_vertices))
+    cloth_to_mesh_vertex_map = list(range(num_vertices))
+    vertices = np.empty((num_vertices, 3), dtype=np.float32)
+    cloth_mesh.vertices.foreach_get("co", vertices.ravel())
+    normals = np.empty((num_vertices, 3), dtype=np.float32)
+    cloth_mesh.vertices.foreach_get("normal", normals.ravel())
 
     cloth_pin_index = 0
     for v in cloth_mesh.vertices:
         if pinned[v.index]:
             if v.index != cloth_pin_index:
                 # Swap vertices so the pinned vertices are placed at the start of the array
-                vA = vertices[cloth_pin_index]
-                vB = vertices[v.index]
-                nA = normals[cloth_pin_index]
-                nB = normals[v.index]
-
-                vertices[cloth_pin_index] = vB
-                vertices[v.index] = vA
-                normals[cloth_pin_index] = nB
-                normals[v.index] = nA
+                swap = [cloth_pin_index, v.index]
+                vertices[swap] = vertices[swap[::-1]]
+                normals[swap] = normals[swap[::-1]]
 
                 mesh_to_cloth_vertex_map[cloth_to_mesh_vertex_map[cloth_pin_index]] = mesh_to_cloth_vertex_map[v.index]
                 cloth_to_mesh_vertex_map[v.index] = cloth_to_mesh_vertex_map[cloth_pin_index]
@@ -307,8 +296,10 @@ def cloth_char_export(
     del edges_added
 
     from .cloth_env import _cloth_sort_verlet_edges
-    edges = _cloth_sort_verlet_edges(edges)
-    custom_edges = _cloth_sort_verlet_edges(custom_edges)
+    edges = _cloth_sort_verlet_edges(edges, report_label=f"Character cloth '{cloth_obj.name}'")
+    custom_edges = _cloth_sort_verlet_edges(
+        custom_edges, report_label=f"Character cloth '{cloth_obj.name}' custom edges"
+    )
 
     controller.indices = indices
     verlet = controller.cloth_high
@@ -373,7 +364,7 @@ def _cloth_char_get_cloth_to_bone_bindings(
     cloth_obj: Object,
     armature_obj: Object
 ) -> tuple[NDArray[np.float32], NDArray[np.uint32], list[int]]:
-    from .vertex_buffer_builder import normalize_weights, get_sorted_vertex_group_elements, try_get_bone_by_vgroup
+    from .vertex_buffer_builder import normalize_weights, try_get_bone_by_vgroup, VGROUP_INVALID_BONE_ID
 
     bone_by_vgroup = try_get_bone_by_vgroup(cloth_obj, armature_obj)
     assert bone_by_vgroup is not None
@@ -382,24 +373,39 @@ def _cloth_char_get_cloth_to_bone_bindings(
 
     ind_arr = np.zeros((num_verts, 4), dtype=np.uint32)
     weights_arr = np.zeros((num_verts, 4), dtype=np.float32)
-    bone_index_map = {}
-
-    ungrouped_verts = 0
-
-    for i, vert in enumerate(cloth_mesh.vertices):
-        groups = get_sorted_vertex_group_elements(vert, bone_by_vgroup)
-        if not groups:
-            ungrouped_verts += 1
-            continue
-
-        for j, grp in enumerate(groups):
-            if j > 3:
-                break
-
-            weights_arr[i][j] = grp.weight
-            bone_index = bone_by_vgroup[grp.group]
-            ind_arr[i][j] = bone_index_map.setdefault(bone_index, len(bone_index_map))
 
+    # Flatten the vertex group elements of all vertices into (vertex index, bone index, weight) arrays. Vertex groups
+    # are only accessible through the Python API so this is the only per-vertex loop, everything else is done in bulk.
+    elements = [
+        (vert.index, bone_by_vgroup.get(grp.group, VGROUP_INVALID_BONE_ID), grp.weight)
+        for vert in cloth_mesh.vertices
+        for grp in vert.groups
+    ]
+    elements = np.array(elements, dtype=[("vert", np.int64), ("bone", np.int64), ("weight", np.float64)])
+    # Skip the groups that don't have a corresponding bone
+    elements = elements[elements["bone"] != VGROUP_INVALID_BONE_ID]
+
+    # Sort by vertex and then by descending weight, so the groups with less influence are to be ignored. lexsort is
+    # stable, so groups with equal weights keep their order as in `get_sorted_vertex_group_elements`
+    elements = elements[np.lexsort((-elements["weight"], elements["vert"]))]
+    grouped_verts, group_starts = np.unique(elements["vert"], return_index=True)
+    group_sizes = np.diff(np.append(group_starts, len(elements)))
+    ranks = np.arange(len(elements)) - np.repeat(group_starts, group_sizes)
+
+    # Only 4 bones per vertex
+    elements = elements[ranks < 4]
+    ranks = ranks[ranks < 4]
+
+    # Bone indices are assigned in the order the bones are first found
+    bones, bones_first, bones_inverse = np.unique(elements["bone"], return_index=True, return_inverse=True)
+    bones_order = np.argsort(bones_first)
+    bones_local_index = np.empty_like(bones_order)
+    bones_local_index[bones_order] = np.arange(len(bones_order))
+
+    ind_arr[elements["vert"], ranks] = bones_local_index[bones_inverse]
+    weights_arr[elements["vert"], ranks] = elements["weight"]
+
+    ungrouped_verts = num_verts - len(grouped_verts)
     if ungrouped_verts != 0:
         logger.warning(
             f"Character cloth mesh '{cloth_mesh.name}' has {ungrouped_verts} vertices not weighted to any vertex group! "
@@ -409,7 +415,102 @@ def _cloth_char_get_cloth_to_bone_bindings(
         )
 
     weights_arr = normalize_weights(weights_arr)
-    return weights_arr, ind_arr, list(bone_index_map.keys())
+    return weights_arr, ind_arr, [int(b) for b in bones[bones_order]]
+
+
+# Max number of (mesh vertex, cloth triangle) pairs tested at once when calculating the bindings. Limits the memory used
+# by the temporary arrays (a few hundred bytes per pair)
+CLOTH_CHAR_BINDINGS_MAX_PAIRS_PER_CHUNK = 1 << 18
+
+
+class _ClothCharTrisBindings(NamedTuple):
+    tri_indices: NDArray[np.intp]
+    """Index of the cloth triangle each mesh vertex is bound to. Only meaningful where ``valid`` is true."""
+    weights: NDArray[np.float64]
+    """Barycentric weights (w0, w1, w2) of each mesh vertex projected onto its cloth triangle."""
+    distances: NDArray[np.float64]
+    """Signed distance from each mesh vertex to the plane of its cloth triangle."""
+    valid: NDArray[np.bool_]
+    any_projection: NDArray[np.bool_]
+    any_distance: NDArray[np.bool_]
+
+
+def _cloth_char_bind_verts_to_tris(
+    verts: NDArray[np.float32],
+    tris_v0: NDArray,
+    tris_v1: NDArray,
+    tris_v2: NDArray,
+    tris_normals: NDArray,
+    tris_areas: NDArray,
+    max_distance: float,
+) -> _ClothCharTrisBindings:
+    """Find the cloth triangle each vertex binds to. All vertices are tested against all triangles at once (in chunks
+    to limit memory usage) instead of one vertex at a time.
+    """
+    num_verts = len(verts)
+    num_tris = len(tris_v0)
+
+    tri_indices = np.zeros(num_verts, dtype=np.intp)
+    weights = np.zeros((num_verts, 3), dtype=np.float64)
+    distances = np.zeros(num_verts, dtype=np.float64)
+    valid = np.zeros(num_verts, dtype=bool)
+    any_projection = np.zeros(num_verts, dtype=bool)
+    any_distance = np.zeros(num_verts, dtype=bool)
+
+    if num_verts == 0 or num_tris == 0:
+        return _ClothCharTrisBindings(tri_indices, weights, distances, valid, any_projection, any_distance)
+
+    D = -np.sum(tris_normals * tris_v0, axis=1)
+
+    chunk_size = max(1, CLOTH_CHAR_BINDINGS_MAX_PAIRS_PER_CHUNK // num_tris)
+    for chunk_start in range(0, num_verts, chunk_size):
+        chunk = slice(chunk_start, chunk_start + chunk_size)
+        chunk_verts = verts[chunk]
+        n = len(chunk_verts)
+        chunk_verts_b = chunk_verts[:, np.newaxis, :]
+
+        # Calculate the distance from each mesh vertex to every cloth triangle plane, shape (n, num_tris)
+        # Assumes plane normals are already normalized
+        distance_to_tris = np.sum(tris_normals * chunk_verts_b, axis=2) + D
+
+        # Project the mesh vertices onto every cloth triangle plane, shape (n, num_tris, 3)
+        projected_to_tris = chunk_verts_b - tris_normals * distance_to_tris[:, :, np.newaxis]
+
+        # Calculate the barycentric coordinates of each projected vertex
+        tris_areas0 = tris_areas_from_verts(tris_v1, tris_v2, projected_to_tris)
+        tris_areas1 = tris_areas_from_verts(tris_v2, tris_v0, projected_to_tris)
+        tris_areas2 = tris_areas_from_verts(tris_v0, tris_v1, projected_to_tris)
+
+        tris_w0 = tris_areas0 / tris_areas
+        tris_w1 = tris_areas1 / tris_areas
+        tris_w2 = tris_areas2 / tris_areas
+
+        # Use the squared distance between mesh vertex and projected vertex as error measure
+        err_to_tris = np.sum((chunk_verts_b - projected_to_tris) ** 2, axis=2)
+
+        # Triangles are considered valid if:
+        #  1. Projected vertex falls within the triangle, i.e. the barycentric coordinates sum 1 (with some leeway)
+        #  2. They are not too far away from the mesh vertex
+        condition_projection = (tris_w0 + tris_w1 + tris_w2) < 1.05
+        condition_distance = distance_to_tris < max_distance
+        valid_tris_mask = condition_projection & condition_distance
+
+        # Find the triangle to bind each vertex to, the valid triangle with the least error. argmin returns the first
+        # occurrence in case of ties, same as searching the valid triangles in order
+        err_to_tris[~valid_tris_mask] = np.inf
+        bind_tri_indices = np.argmin(err_to_tris, axis=1)
+        rows = np.arange(n)
+
+        tri_indices[chunk] = bind_tri_indices
+        weights[chunk, 0] = tris_w0[rows, bind_tri_indices]
+        weights[chunk, 1] = tris_w1[rows, bind_tri_indices]
+        weights[chunk, 2] = tris_w2[rows, bind_tri_indices]
+        distances[chunk] = distance_to_tris[rows, bind_tri_indices]
+        valid[chunk] = valid_tris_mask.any(axis=1)
+        any_projection[chunk] = condition_projection.any(axis=1)
+        any_distance[chunk] = condition_distance.any(axis=1)
+
+    return _ClothCharTrisBindings(tri_indices, weights, distances, valid, any_projection, any_distance)
 
 
 def cloth_char_get_mesh_to_cloth_bindings(
@@ -421,11 +522,9 @@ def cloth_char_get_mesh_to_cloth_bindings(
     # Max distance from mesh vertex to cloth triangle to be considered
     MAX_DISTANCE_THRESHOLD = 0.05
 
-    errors = []
-
     num_binded_verts = len(mesh_binded_verts)
 
-    cloth_verts = np.array(cloth.controller.vertices)
+    cloth_verts = cloth.controller.vertices.astype(np.float64)
     cloth_tris = np.array(cloth.controller.indices).reshape((-1, 3))
     cloth_tris_verts = cloth_verts[cloth_tris]
     cloth_tris_normals = tris_normals(cloth_tris_verts)
@@ -438,78 +537,52 @@ def cloth_char_get_mesh_to_cloth_bindings(
     mesh_binded_dot_product = np.sum(mesh_binded_verts_normals * (cloth_centroid - mesh_binded_verts), axis=1)
     mesh_binded_verts_facing_inside = mesh_binded_dot_product > 0.0
 
+    # Bind each mesh vertex to a cloth triangle. Vertices facing inside use the triangles with flipped winding order
+    inside_indices = np.where(mesh_binded_verts_facing_inside)[0]
+    outside_indices = np.where(~mesh_binded_verts_facing_inside)[0]
+    inside = _cloth_char_bind_verts_to_tris(
+        mesh_binded_verts[inside_indices],
+        cloth_tris_v1, cloth_tris_v0, cloth_tris_v2, cloth_tris_normals_neg, cloth_tris_areas,
+        MAX_DISTANCE_THRESHOLD
+    )
+    outside = _cloth_char_bind_verts_to_tris(
+        mesh_binded_verts[outside_indices],
+        cloth_tris_v0, cloth_tris_v1, cloth_tris_v2, cloth_tris_normals, cloth_tris_areas,
+        MAX_DISTANCE_THRESHOLD
+    )
+
     ind_arr = np.empty((num_binded_verts, 4), dtype=np.uint32)
     weights_arr = np.empty((num_binded_verts, 4), dtype=np.float32)
-
-    # Bind each mesh vertex to a cloth triangle
-    for mesh_vert_idx in range(num_binded_verts):
-        mesh_vert = mesh_binded_verts[mesh_vert_idx]
-        mesh_vert_facing_inside = mesh_binded_verts_facing_inside[mesh_vert_idx]
-
-        if mesh_vert_facing_inside:
+    valid = np.empty(num_binded_verts, dtype=bool)
+    any_projection = np.empty(num_binded_verts, dtype=bool)
+    any_distance = np.empty(num_binded_verts, dtype=bool)
+    for indices, res, flip in ((inside_indices, inside, True), (outside_indices, outside, False)):
+        b0, b1, b2 = cloth_tris[res.tri_indices].T
+        if flip:
             # Flip winding order
-            this_cloth_tris_normals = cloth_tris_normals_neg
-            this_cloth_tris_v0 = cloth_tris_v1
-            this_cloth_tris_v1 = cloth_tris_v0
-        else:
-            this_cloth_tris_normals = cloth_tris_normals
-            this_cloth_tris_v0 = cloth_tris_v0
-            this_cloth_tris_v1 = cloth_tris_v1
-
-        # Calculate the distance from the mesh vertex to every cloth triangle plane
-        distance_to_tris = distance_signed_point_to_planes(mesh_vert, this_cloth_tris_v0, this_cloth_tris_normals)
-
-        # Project the mesh vertex onto every cloth triangle plane
-        projected_to_tris = mesh_vert - this_cloth_tris_normals * distance_to_tris[:, np.newaxis]
-
-        # Calculate the barycentric coordinates of each projected vertex
-        tris_areas0 = tris_areas_from_verts(this_cloth_tris_v1, cloth_tris_v2, projected_to_tris)
-        tris_areas1 = tris_areas_from_verts(cloth_tris_v2, this_cloth_tris_v0, projected_to_tris)
-        tris_areas2 = tris_areas_from_verts(this_cloth_tris_v0, this_cloth_tris_v1, projected_to_tris)
-
-        tris_w0 = tris_areas0 / cloth_tris_areas
-        tris_w1 = tris_areas1 / cloth_tris_areas
-        tris_w2 = tris_areas2 / cloth_tris_areas
-
-        # Use the squared distance between mesh vertex and projected vertex as error measure
-        err_to_tris = np.sum((mesh_vert - projected_to_tris) ** 2, axis=1)
-
-        # Triangles are considered valid if:
-        #  1. Projected vertex falls within the triangle, i.e. the barycentric coordinates sum 1 (with some leeway)
-        #  2. They are not too far away from the mesh vertex
-        condition_projection = (tris_w0 + tris_w1 + tris_w2) < 1.05
-        condition_distance = distance_to_tris < MAX_DISTANCE_THRESHOLD
-        valid_tris_mask = condition_projection & condition_distance
-        valid_tris_indices = np.where(valid_tris_mask)[0]
-        if not valid_tris_mask.any():
-            errors.append(ClothDiagMeshBindingError(
-                Vector(mesh_vert),
-                error_projection=not condition_projection.any(),
-                error_distance=not condition_distance.any(),
-                error_multiple_matches=False,
-            ))
-            continue
+            b1, b0 = b0, b1
 
-        # Find the triangle to bind this vertex to, the valid triangle with the least error
-        bind_tri_index = valid_tris_indices[np.argmin(err_to_tris[valid_tris_mask])]
+        ind_arr[indices, 0] = b1
+        ind_arr[indices, 1] = b0
+        ind_arr[indices, 2] = 255
+        ind_arr[indices, 3] = b2
 
-        b0, b1, b2 = cloth_tris[bind_tri_index]
-        w0, w1, w2 = tris_w0[bind_tri_index], tris_w1[bind_tri_index], tris_w2[bind_tri_index]
-        d = distance_to_tris[bind_tri_index]
+        weights_arr[indices, :3] = res.weights
+        weights_arr[indices, 3] = res.distances * 10.0 + 0.5
 
-        if mesh_vert_facing_inside:
-            # Flip winding order
-            b1, b0 = b0, b1
+        valid[indices] = res.valid
+        any_projection[indices] = res.any_projection
+        any_distance[indices] = res.any_distance
 
-        ind_arr[mesh_vert_idx, 0] = b1
-        ind_arr[mesh_vert_idx, 1] = b0
-        ind_arr[mesh_vert_idx, 2] = 255
-        ind_arr[mesh_vert_idx, 3] = b2
-
-        weights_arr[mesh_vert_idx, 0] = w0
-        weights_arr[mesh_vert_idx, 1] = w1
-        weights_arr[mesh_vert_idx, 2] = w2
-        weights_arr[mesh_vert_idx, 3] = d * 10.0 + 0.5
+    errors = [
+        ClothDiagMeshBindingError(
+            Vector(mesh_binded_verts[mesh_vert_idx]),
+            error_projection=not any_projection[mesh_vert_idx],
+            error_distance=not any_distance[mesh_vert_idx],
+            error_multiple_matches=False,
+        )
+        for mesh_vert_idx in np.where(~valid)[0]
+    ]
 
     # Make sure weights stay in the [0, 1] range
     weights_arr.clip(0.0, 1.0, out=weights_arr)
@@ -3,7 +3,8 @@ from bpy.types import (
     Object,
     Material,
 )
-from typing import Optional
+from typing import Optional, NamedTuple, Sequence, Iterable
+from collections import defaultdict
 from mathutils import (
     Vector,
     Matrix,
@@ -93,39 +94,145 @@ def cloth_env_find_mesh_objects(frag_obj: Object, silent: bool = False) -> list[
     return mesh_objs
 
 
-def _cloth_sort_verlet_edges(edges: list[VerletClothEdge]) -> list[VerletClothEdge]:
-    """Sort edges such that no vertex is repeated within chunks of 8 edges. Required due to how the cloth physics code
-    is vectorized.
-    """
-    # fairly inefficient algorithm ahead, works for now
-    edge_buckets: list[list[VerletClothEdge]] = []
-    MAX_EDGES_IN_BUCKET = 8
-    for e in edges:
-        for bucket in edge_buckets:
-            if len(bucket) >= MAX_EDGES_IN_BUCKET:
-                continue
+CLOTH_VERLET_EDGES_BATCH_SIZE = 8
+
+
+class VerletEdgesSchedule(NamedTuple):
+    batches: list[list[int]]
+    """Edge indices in each batch. No vertex is repeated within a batch."""
+    num_edges: int
+
+    @property
+    def num_batches(self) -> int:
+        return len(self.batches)
+
+    @property
+    def num_padding_edges(self) -> int:
+        return self.num_batches * CLOTH_VERLET_EDGES_BATCH_SIZE - self.num_edges
+
+    @property
+    def fill_ratio(self) -> float:
+        return self.num_edges / (self.num_batches * CLOTH_VERLET_EDGES_BATCH_SIZE) if self.num_batches > 0 else 1.0
 
-            can_add_to_bucket = True
-            for edge_in_bucket in bucket:
-                if (
-                    e.vertex0 == edge_in_bucket.vertex0 or e.vertex0 == edge_in_bucket.vertex1 or
-                    e.vertex1 == edge_in_bucket.vertex0 or e.vertex1 == edge_in_bucket.vertex1
-                ):
-                    can_add_to_bucket = False
-                    break
-
-            if can_add_to_bucket:
-                bucket.append(e)
+
+def _schedule_edges_first_fit(edges_vertices: Sequence[tuple[int, int]], order: Iterable[int]) -> list[list[int]]:
+    """Places each edge in the first batch where it fits, creating a new batch if it doesn't fit in any."""
+    B = CLOTH_VERLET_EDGES_BATCH_SIZE
+    # Bitsets of the batches each vertex is already in and of the batches already full
+    vertex_batches = defaultdict(int)
+    full_batches = 0
+    batches = []
+    for edge_idx in order:
+        v0, v1 = edges_vertices[edge_idx]
+        candidates = ~(vertex_batches[v0] | vertex_batches[v1] | full_batches) & ((1 << len(batches)) - 1)
+        if candidates:
+            batch_bit = candidates & -candidates
+            batch_idx = batch_bit.bit_length() - 1
+        else:
+            batch_idx = len(batches)
+            batch_bit = 1 << batch_idx
+            batches.append([])
+
+        batch = batches[batch_idx]
+        batch.append(edge_idx)
+        vertex_batches[v0] |= batch_bit
+        vertex_batches[v1] |= batch_bit
+        if len(batch) == B:
+            full_batches |= batch_bit
+
+    return batches
+
+
+def _schedule_edges_least_loaded(
+    edges_vertices: Sequence[tuple[int, int]], order: Iterable[int], num_batches: int
+) -> list[list[int]]:
+    """Starts with ``num_batches`` empty batches and places each edge in the least loaded batch where it fits, creating
+    a new batch if it doesn't fit in any. Spreading the edges evenly leaves room at the end for edges that would
+    otherwise need a new batch, so the number of batches stays close to ``num_batches``.
+    """
+    B = CLOTH_VERLET_EDGES_BATCH_SIZE
+    vertex_batches = defaultdict(int)
+    # Bitsets of the batches with N edges
+    batches_by_size = [0] * B
+    batches_by_size[0] = (1 << num_batches) - 1
+    batches = [[] for _ in range(num_batches)]
+    for edge_idx in order:
+        v0, v1 = edges_vertices[edge_idx]
+        used_batches = vertex_batches[v0] | vertex_batches[v1]
+        for size in range(B):
+            candidates = batches_by_size[size] & ~used_batches
+            if candidates:
+                batch_bit = candidates & -candidates
+                batch_idx = batch_bit.bit_length() - 1
+                batches_by_size[size] ^= batch_bit
                 break
         else:
-            # Could not be added to any existing bucket, create a new bucket
-            edge_buckets.append([e])
+            batch_idx = len(batches)
+            batch_bit = 1 << batch_idx
+            batches.append([])
+
+        batch = batches[batch_idx]
+        batch.append(edge_idx)
+        vertex_batches[v0] |= batch_bit
+        vertex_batches[v1] |= batch_bit
+        if len(batch) < B:
+            batches_by_size[len(batch)] |= batch_bit
+
+    return [batch for batch in batches if batch]
+
+
+def cloth_schedule_verlet_edges(edges_vertices: Sequence[tuple[int, int]]) -> VerletEdgesSchedule:
+    """Split the edges into batches of up to 8 edges such that no vertex is repeated within a batch.
+
+    This is an edge colouring problem where each colour can be used at most 8 times. At least
+    ``max(ceil(num_edges / 8), max_vertex_degree)`` batches are needed, so we try to reach that bound by first placing
+    the edges incident to high-degree vertices (the most constrained ones) in the least loaded batches. First-fit on the
+    original edge order is also tried and the schedule with fewer batches is used.
+
+    Bitsets (Python ints) are used to track the batches each vertex is in, so each edge is placed in near constant time.
+    """
+    num_edges = len(edges_vertices)
+    if num_edges == 0:
+        return VerletEdgesSchedule([], 0)
+
+    edges_vertices_arr = np.asarray(edges_vertices, dtype=np.int64).reshape((-1, 2))
+    vertex_degrees = np.bincount(edges_vertices_arr.ravel())
+    max_degree = int(vertex_degrees.max())
+    min_num_batches = max(-(-num_edges // CLOTH_VERLET_EDGES_BATCH_SIZE), max_degree)
+
+    edges_max_degree = vertex_degrees[edges_vertices_arr].max(axis=1)
+    edges_order = np.argsort(-edges_max_degree, kind="stable").tolist()
+    edges_vertices = edges_vertices_arr.tolist()
+
+    batches = _schedule_edges_least_loaded(edges_vertices, edges_order, min_num_batches)
+    if len(batches) > min_num_batches:
+        batches_first_fit = _schedule_edges_first_fit(edges_vertices, range(num_edges))
+        if len(batches_first_fit) < len(batches):
+            batches = batches_first_fit
+
+    return VerletEdgesSchedule(batches, num_edges)
+
+
+def _cloth_sort_verlet_edges(
+    edges: list[VerletClothEdge],
+    report_label: Optional[str] = None
+) -> list[VerletClothEdge]:
+    """Sort edges such that no vertex is repeated within chunks of 8 edges. Required due to how the cloth physics code
+    is vectorized. Chunks that cannot be filled are padded with dummy edges. If ``report_label`` is given, the achieved
+    batch fill ratio is logged.
+    """
+    schedule = cloth_schedule_verlet_edges([(e.vertex0, e.vertex1) for e in edges])
+    if report_label is not None and schedule.num_edges > 0:
+        logger.info(
+            f"{report_label}: {schedule.num_edges} edges sorted into {schedule.num_batches} batches, "
+            f"{schedule.num_padding_edges} padding edges ({schedule.fill_ratio:.1%} fill ratio)."
+        )
 
     new_edges = []
-    for bucket in edge_buckets:
-        for i in range(MAX_EDGES_IN_BUCKET):
-            if i < len(bucket):
-                new_edges.append(bucket[i])
+    for batch in schedule.batches:
+        for i in range(CLOTH_VERLET_EDGES_BATCH_SIZE):
+            if i < len(batch):
+                new_edges.append(edges[batch[i]])
             else:
                 # insert dummy edge
                 verlet_edge = VerletClothEdge()
@@ -192,25 +299,18 @@ def _cloth_env_export(frag_obj: Object, cloth_obj: Object, drawable_xml: Drawabl
     pinned = np.array(mesh_get_cloth_attribute_values(cloth_mesh, ClothAttr.PINNED)) != 0
     num_pinned = np.sum(pinned)
 
-    mesh_to_cloth_vertex_map = [None] * num_vertices
-    cloth_to_mesh_vertex_map = [None] * num_vertices
-    vertices = [None] * num_vertices
-    for v in cloth_mesh.vertices:
-        vi = v.index
-        vertices[vi] = Vector(v.co)
-        mesh_to_cloth_vertex_map[vi] = vi
-        cloth_to_mesh_vertex_map[vi] = vi
+    mesh_to_cloth_vertex_map = list(range(num_vertices))
+    cloth_to_mesh_vertex_map = list(range(num_vertices))
+    vertices = np.empty((num_vertices, 3), dtype=np.float32)
+    cloth_mesh.vertices.foreach_get("co", vertices.ravel())
 
     cloth_pin_index = 0
     for v in cloth_mesh.vertices:
         if pinned[v.index]:
             if v.index != cloth_pin_index:
                 # Swap vertices so the pinned vertices are placed at the start of the array
-                vA = vertices[cloth_pin_index]
-                vB = vertices[v.index]
-
-                vertices[cloth_pin_index] = vB
-                vertices[v.index] = vA
+                swap = [cloth_pin_index, v.index]
+                vertices[swap] = vertices[swap[::-1]]
 
                 mesh_to_cloth_vertex_map[cloth_to_mesh_vertex_map[cloth_pin_index]] = mesh_to_cloth_vertex_map[v.index]
                 cloth_to_mesh_vertex_map[v.index] = cloth_to_mesh_vertex_map[cloth_pin_index]
@@ -293,8 +393,8 @@ def _cloth_env_export(frag_obj: Object, cloth_obj: Object, drawable_xml: Drawabl
 
     del edges_added
 
-    edges = _cloth_sort_verlet_edges(edges)
-    custom_edges = _cloth_sort_verlet_edges(custom_edges)
+    edges = _cloth_sort_verlet_edges(edges, report_label=f"Cloth '{cloth_obj.name}'")
+    custom_edges = _cloth_sort_verlet_edges(custom_edges, report_label=f"Cloth '{cloth_obj.name}' custom edges")
 
     cloth_props = frag_obj.fragment_properties.cloth
 
@@ -423,7 +523,7 @@ def _cloth_env_export(frag_obj: Object, cloth_obj: Object, drawable_xml: Drawabl
     num_extra_matches_per_mesh_vertex = np.array(num_extra_matches_per_cloth_vertex)
     if (num_extra_matches_per_mesh_vertex > 0).any():
         extra_matches_indices = np.where(num_extra_matches_per_mesh_vertex > 0)[0]
-        extra_matches_positions = np.array(verlet.vertex_positions)[extra_matches_indices]
+        extra_matches_positions = verlet.vertex_positions[extra_matches_indices]
         cloth_export_context().diagnostics.mesh_binding_errors = [
             ClothDiagMeshBindingError(Vector(p), False, False, True)
             for p in extra_matches_positions
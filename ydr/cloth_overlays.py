@@ -6,7 +6,7 @@ from bpy.types import (
 import gpu
 from gpu_extras import batch
 import blf
-from mathutils import Vector
+import numpy as np
 from collections.abc import Sequence
 from ..sollumz_preferences import get_theme_settings
 from .cloth import (
@@ -18,6 +18,12 @@ from .cloth_diagnostics import (
     ClothDiagnosticsOverlayFlags,
     cloth_last_export_contexts,
 )
+from .overlay_cache import (
+    MeshOverlayCache,
+    VertexLabels,
+    draw_vertex_labels,
+    timed_draw_callback,
+)
 import bmesh
 
 if bpy.app.version >= (4, 5, 0):
@@ -32,6 +38,8 @@ class ClothOverlaysDrawHandler:
     def __init__(self):
         self.handler_text = None
         self.handler_geometry = None
+        self.attribute_labels_cache = MeshOverlayCache("Cloth attribute labels", self.build_attribute_labels)
+        self.pinned_geometry_cache = MeshOverlayCache("Cloth pinned vertices", self.build_pinned_geometry)
 
     def register(self):
         self.handler_text = SpaceView3D.draw_handler_add(self.draw_text, (), "WINDOW", "POST_PIXEL")
@@ -59,6 +67,7 @@ class ClothOverlaysDrawHandler:
 
         return True
 
+    @timed_draw_callback("Cloth overlays text")
     def draw_text(self):
         if not self.can_draw_anything():
             return
@@ -80,6 +89,7 @@ class ClothOverlaysDrawHandler:
         if attrs:
             self.draw_attribute_values(obj, attrs)
 
+    @timed_draw_callback("Cloth overlays geometry")
     def draw_geometry(self):
         context = bpy.context
         wm = context.window_manager
@@ -104,7 +114,6 @@ class ClothOverlaysDrawHandler:
         wm = context.window_manager
         region = context.region
         rv3d = context.region_data
-        mesh = cloth_obj.data
 
         font_id = 0
         blf.size(font_id, 11)
@@ -113,32 +122,41 @@ class ClothOverlaysDrawHandler:
         blf.shadow(font_id, 3, 0.0, 0.0, 0.0, 1.0)
         blf.shadow_offset(font_id, 2, -2)
 
-        matrix_world = cloth_obj.matrix_world
-
         pin_radius_set_index = wm.sz_ui_cloth_pin_radius_set - 1
+        labels = self.attribute_labels_cache.get(cloth_obj, tuple(attrs), pin_radius_set_index, font_id)
+        draw_vertex_labels(labels, cloth_obj.matrix_world, region, rv3d, font_id)
 
-        def _draw_vertex_attributes(pos: Vector, attr_values):
-            from bpy_extras.view3d_utils import location_3d_to_region_2d
-            pos = matrix_world @ pos
-            pos = location_3d_to_region_2d(region, rv3d, pos)
-            if pos:
-                for i, attr_value in enumerate(attr_values):
-                    attr_type = attrs[i].type
-                    if attrs[i] == ClothAttr.PIN_RADIUS:
-                        attr_str = f"{attr_value[pin_radius_set_index]:.2g}"
-                    elif attr_type == "FLOAT_VECTOR":
-                        attr_str = f"{attr_value[0]:.2g}  {attr_value[1]:.2g}"
-                    elif attr_type == "FLOAT_COLOR":
-                        attr_str = f"{attr_value[0]:.2g}  {attr_value[1]:.2g}  {attr_value[2]:.2g}  {attr_value[3]:.2g}"
-                    elif attr_type == "INT":
-                        attr_str = f"{attr_value}"
-                    else:  # FLOAT
-                        attr_str = f"{attr_value:.6g}"
-                    w, h = blf.dimensions(font_id, attr_str)
-                    attr_pos = pos - Vector((w * 0.5, h * i * 2 - (h * len(attr_values) / 2)))
-                    blf.position(font_id, attr_pos.x, attr_pos.y, 0.0)
-                    blf.draw(font_id, attr_str)
+        blf.disable(font_id, blf.SHADOW)
 
+    @staticmethod
+    def build_attribute_labels(
+        cloth_obj: Object,
+        attrs: Sequence[ClothAttr],
+        pin_radius_set_index: int,
+        font_id: int
+    ) -> VertexLabels:
+        mesh = cloth_obj.data
+
+        def _format_attribute_values(attr_values) -> list[tuple[str, float, float]]:
+            lines = []
+            for i, attr_value in enumerate(attr_values):
+                attr_type = attrs[i].type
+                if attrs[i] == ClothAttr.PIN_RADIUS:
+                    attr_str = f"{attr_value[pin_radius_set_index]:.2g}"
+                elif attr_type == "FLOAT_VECTOR":
+                    attr_str = f"{attr_value[0]:.2g}  {attr_value[1]:.2g}"
+                elif attr_type == "FLOAT_COLOR":
+                    attr_str = f"{attr_value[0]:.2g}  {attr_value[1]:.2g}  {attr_value[2]:.2g}  {attr_value[3]:.2g}"
+                elif attr_type == "INT":
+                    attr_str = f"{attr_value}"
+                else:  # FLOAT
+                    attr_str = f"{attr_value:.6g}"
+                w, h = blf.dimensions(font_id, attr_str)
+                lines.append((attr_str, w, h))
+            return lines
+
+        positions = []
+        lines = []
         if cloth_obj.mode == "EDIT":
             edit_mesh = bmesh.from_edit_mesh(mesh)
             try:
@@ -151,19 +169,33 @@ class ClothOverlaysDrawHandler:
                 for v in edit_mesh.verts:
                     attr_values = [attr.default_value if attr_layers[i] is None else v[attr_layers[i]]
                                    for i, attr in enumerate(attrs)]
-                    _draw_vertex_attributes(v.co, attr_values)
+                    positions.append(v.co.copy())
+                    lines.append(_format_attribute_values(attr_values))
             finally:
                 edit_mesh.free()
         else:
             all_attr_values = [mesh_get_cloth_attribute_values(mesh, attr) for attr in attrs]
             for v in mesh.vertices:
                 attr_values = [all_attr_values[i][v.index] for i, attr in enumerate(attrs)]
-                _draw_vertex_attributes(v.co, attr_values)
+                positions.append(v.co)
+                lines.append(_format_attribute_values(attr_values))
 
-        blf.disable(font_id, blf.SHADOW)
+        positions = np.array(positions, dtype=np.float32).reshape((-1, 3))
+        return VertexLabels(positions, lines)
 
     def draw_pinned_geometry(self, cloth_obj: Object):
-        transform = cloth_obj.matrix_world
+        theme = get_theme_settings()
+        gpu.state.point_size_set(theme.cloth_overlay_pinned_size)
+        gpu.state.blend_set("ALPHA")
+        shader = gpu.shader.from_builtin(POINT_UNIFORM_COLOR_SHADER_NAME)
+        pinned_verts_batch = self.pinned_geometry_cache.get(cloth_obj)
+        shader.uniform_float("color", theme.cloth_overlay_pinned)
+        with gpu.matrix.push_pop():
+            gpu.matrix.multiply_matrix(cloth_obj.matrix_world)
+            pinned_verts_batch.draw(shader)
+
+    @staticmethod
+    def build_pinned_geometry(cloth_obj: Object) -> gpu.types.GPUBatch:
         mesh = cloth_obj.data
 
         coords = []
@@ -175,23 +207,18 @@ class ClothOverlaysDrawHandler:
                 for v in edit_mesh.verts:
                     is_pinned = ClothAttr.PINNED.default_value if pinned_layer is None else v[pinned_layer]
                     if is_pinned:
-                        coords.append(transform @ v.co)
+                        coords.append(v.co.copy())
             finally:
                 edit_mesh.free()
         else:
+            num_verts = len(mesh.vertices)
             pinned_values = mesh_get_cloth_attribute_values(mesh, ClothAttr.PINNED)
-            for v in mesh.vertices:
-                is_pinned = pinned_values[v.index] != 0
-                if is_pinned:
-                    coords.append(transform @ v.co)
+            positions = np.empty(num_verts * 3, dtype=np.float32)
+            mesh.vertices.foreach_get("co", positions)
+            coords = positions.reshape((num_verts, 3))[pinned_values != 0]
 
-        theme = get_theme_settings()
-        gpu.state.point_size_set(theme.cloth_overlay_pinned_size)
-        gpu.state.blend_set("ALPHA")
         shader = gpu.shader.from_builtin(POINT_UNIFORM_COLOR_SHADER_NAME)
-        pinned_verts_batch = batch.batch_for_shader(shader, "POINTS", {"pos": coords})
-        shader.uniform_float("color", theme.cloth_overlay_pinned)
-        pinned_verts_batch.draw(shader)
+        return batch.batch_for_shader(shader, "POINTS", {"pos": coords})
 
     def draw_diagnostics_overlays(self):
         last = cloth_last_export_contexts()
@@ -8,7 +8,7 @@ from ..tools.meshhelper import (
     flip_uvs,
 )
 from mathutils import Vector
-from .. import logger
+from .. import logger, profiler
 
 
 class MeshBuilder:
@@ -41,6 +41,7 @@ class MeshBuilder:
         self._has_uvs = any("TexCoord" in name for name in vertex_arr.dtype.names)
         self._has_colors = any("Colour" in name for name in vertex_arr.dtype.names)
 
+    @profiler.profiled
     def build(self):
         mesh = bpy.data.meshes.new(self.name)
         vert_pos = self.vertex_arr["Position"]
@@ -66,6 +67,8 @@ class MeshBuilder:
 
         mesh.validate()
 
+        profiler.count("vertices", len(mesh.vertices))
+        profiler.count("triangles", len(mesh.polygons))
         return mesh
 
     def create_mesh_materials(self, mesh: bpy.types.Mesh):
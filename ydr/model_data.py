@@ -270,7 +270,8 @@ def get_model_joined_ind_arr(geoms: list[Geometry]) -> NDArray[np.uint32]:
         ind_arr = geom.index_buffer.data
 
         if num_verts > 0:
-            ind_arr += num_verts
+            # Not in-place, the XML must stay unchanged in case the drawable is imported again
+            ind_arr = ind_arr + num_verts
 
         ind_arrs.append(ind_arr)
         num_verts += len(geom.vertex_buffer.data)
@@ -288,14 +289,14 @@ def get_model_joined_vert_arr(geoms: list[Geometry]) -> NDArray:
         if vert_arr is None:
             continue
 
-        if geom.bone_ids:
-            apply_bone_ids(vert_arr, np.array(geom.bone_ids))
-
         geom_vert_arr = np.zeros(len(vert_arr), dtype=arr_dtype)
 
         for name in vert_arr.dtype.names:
             geom_vert_arr[name] = vert_arr[name]
 
+        if geom.bone_ids:
+            apply_bone_ids(geom_vert_arr, np.array(geom.bone_ids))
+
         vert_arrs.append(geom_vert_arr)
 
     return np.concatenate(vert_arrs)
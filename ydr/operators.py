@@ -1,4 +1,5 @@
 import traceback
+import math
 import bpy
 from bpy.props import (
     IntProperty,
@@ -25,6 +26,7 @@ from ..tools.meshhelper import (
     mesh_rename_color_attrs_by_order,
 )
 from ..shared.shader_nodes import SzShaderNodeParameter
+from ..shared.mesh_simplify import BlenderMeshSimplifier
 from ..cwxml.shader import ShaderParameterFloatVectorDef, ShaderParameterTextureDef, ShaderManager
 
 
@@ -1338,17 +1340,25 @@ class SOLLUMZ_OT_auto_lod(bpy.types.Operator):
     bl_label = "Generate LODs"
     bl_options = {"REGISTER", "UNDO"}
     bl_description = (
-        "Generate drawable model LODs via decimate modifier. Starts from the selected reference mesh, generating a "
-        "new decimated mesh for each selected LOD level"
+        "Generate drawable model LODs by simplifying the selected reference mesh. Each selected LOD level is "
+        "simplified further from the previous one, keeping UV, colour and normal seams, materials and bone weights"
     )
 
+    # Distance at which each LOD level starts being displayed
+    LOD_START_DISTANCE_PROPS = {
+        LODLevel.MEDIUM: "lod_dist_high",
+        LODLevel.LOW: "lod_dist_med",
+        LODLevel.VERYLOW: "lod_dist_low",
+    }
+
     @classmethod
     def poll(self, context):
         return context.active_object is not None and context.active_object.sollum_type == SollumType.DRAWABLE_MODEL
 
     def execute(self, context: Context):
         aobj = context.active_object
-        ref_mesh = context.scene.sollumz_auto_lod_ref_mesh
+        scene = context.scene
+        ref_mesh = scene.sollumz_auto_lod_ref_mesh
 
         if ref_mesh is None:
             self.report(
@@ -1360,32 +1370,39 @@ class SOLLUMZ_OT_auto_lod(bpy.types.Operator):
         if not lods:
             return {"CANCELLED"}
 
-        obj_lods: LODLevels = aobj.sz_lods
-
-        decimate_step = context.scene.sollumz_auto_lod_decimate_step
-        last_mesh = ref_mesh
+        use_screen_error = scene.sollumz_auto_lod_mode == "SCREEN_ERROR"
+        drawable_obj = aobj.parent
+        if use_screen_error and (drawable_obj is None or drawable_obj.sollum_type != SollumType.DRAWABLE):
+            self.report({"INFO"}, "Drawable Model must be parented to a Drawable to use its LOD distances!")
+            return {"CANCELLED"}
 
         previous_mode = aobj.mode
-        previous_lod_level = obj_lods.active_lod_level
+        if previous_mode != "OBJECT":
+            bpy.ops.object.mode_set(mode="OBJECT")
+
+        obj_lods: LODLevels = aobj.sz_lods
+        simplifier = BlenderMeshSimplifier(ref_mesh)
+        decimate_step = scene.sollumz_auto_lod_decimate_step
+        # Size in world units of a pixel at a distance of 1 unit
+        pixel_size = 2.0 * math.tan(scene.sollumz_auto_lod_fov * 0.5) / scene.sollumz_auto_lod_screen_height
 
         for lod_level in lods:
-            bpy.ops.object.mode_set(mode="OBJECT") # make sure we are in object mode before switching LODs
-            mesh = last_mesh.copy()
-            mesh.name = self.get_lod_mesh_name(aobj.name, lod_level)
+            if use_screen_error:
+                prop_name = self.LOD_START_DISTANCE_PROPS.get(lod_level, None)
+                distance = getattr(drawable_obj.drawable_properties, prop_name) if prop_name else 0.0
+                result = simplifier.simplify(max_error=scene.sollumz_auto_lod_pixel_error * pixel_size * distance)
+            else:
+                result = simplifier.simplify(target_tris=int(simplifier.num_tris * (1.0 - decimate_step)))
 
+            mesh = simplifier.create_mesh(self.get_lod_mesh_name(aobj.name, lod_level))
             obj_lods.get_lod(lod_level).mesh = mesh
-            obj_lods.active_lod_level = lod_level
-
-            bpy.ops.object.mode_set(mode="EDIT")
-            bpy.ops.mesh.select_all(action="SELECT")
-            bpy.ops.mesh.decimate(ratio=1.0 - decimate_step)
-
-            last_mesh = mesh
-
-        bpy.ops.object.mode_set(mode="OBJECT")
-        obj_lods.active_lod_level = previous_lod_level
+            self.report(
+                {"INFO"},
+                f"{SOLLUMZ_UI_NAMES[lod_level]}: {result.num_tris} triangles, error {result.error:.4f}"
+            )
 
-        bpy.ops.object.mode_set(mode=previous_mode)
+        if previous_mode != "OBJECT":
+            bpy.ops.object.mode_set(mode=previous_mode)
 
         return {"FINISHED"}
 
@@ -0,0 +1,215 @@
+"""Caching for the data drawn by the cloth and cable overlays. Building the overlay geometry and labels requires going
+through every vertex in Python, so it is only done when the mesh changes instead of on every viewport redraw.
+"""
+
+import bpy
+from bpy.types import (
+    Object,
+    Mesh,
+    Scene,
+    Depsgraph,
+    Operator,
+    Region,
+    RegionView3D,
+)
+from bpy.app.handlers import persistent
+import blf
+import numpy as np
+from numpy.typing import NDArray
+from mathutils import Matrix
+from typing import Callable, Generic, TypeVar, Hashable, NamedTuple, Iterator
+from contextlib import contextmanager
+from time import perf_counter
+
+T = TypeVar("T")
+
+_mesh_update_counters: dict[int, int] = {}
+_overlay_caches: list["MeshOverlayCache"] = []
+
+
+def mesh_update_counter(mesh: Mesh) -> int:
+    """Returns a number that changes each time the geometry or attributes of the mesh are updated."""
+    return _mesh_update_counters.get(mesh.as_pointer(), 0)
+
+
+def _bump_mesh_update_counter(mesh: Mesh):
+    key = mesh.as_pointer()
+    _mesh_update_counters[key] = _mesh_update_counters.get(key, 0) + 1
+
+
+class MeshOverlayCache(Generic[T]):
+    """Stores the overlay data built for a mesh object and only rebuilds it when the mesh, the object mode or the
+    extra key passed to ``get`` change. Only a single entry is kept, the overlays are only drawn for the active object.
+    """
+
+    def __init__(self, name: str, build_fn: Callable[..., T]):
+        self.name = name
+        self._build_fn = build_fn
+        self._key = None
+        self._value = None
+        self.num_builds = 0
+        _overlay_caches.append(self)
+
+    def get(self, obj: Object, *key: Hashable) -> T:
+        """Returns the cached data for ``obj``, calling ``build_fn(obj, *key)`` if it is out of date."""
+        mesh = obj.data
+        full_key = (obj.as_pointer(), mesh.as_pointer(), obj.mode, mesh_update_counter(mesh), key)
+        if self._key != full_key:
+            self._value = self._build_fn(obj, *key)
+            self._key = full_key
+            self.num_builds += 1
+
+        return self._value
+
+    def clear(self):
+        self._key = None
+        self._value = None
+
+
+def clear_overlay_caches():
+    for cache in _overlay_caches:
+        cache.clear()
+    _mesh_update_counters.clear()
+
+
+class VertexLabels(NamedTuple):
+    positions: NDArray[np.float32]
+    """Local position of each vertex, shape (N, 3)."""
+    lines: list[list[tuple[str, float, float]]]
+    """Text lines drawn at each vertex, with the text width and height."""
+
+
+def draw_vertex_labels(
+    labels: VertexLabels,
+    matrix_world: Matrix,
+    region: Region,
+    rv3d: RegionView3D,
+    font_id: int
+):
+    """Draws the labels centered at each vertex. The vertices are projected to the region all at once and the labels
+    outside of the region are skipped.
+    """
+    num_verts = len(labels.positions)
+    if num_verts == 0:
+        return
+
+    # Same projection as `bpy_extras.view3d_utils.location_3d_to_region_2d`, but vectorized
+    m = np.array(rv3d.perspective_matrix @ matrix_world, dtype=np.float64)
+    co = np.empty((num_verts, 4), dtype=np.float64)
+    co[:, :3] = labels.positions
+    co[:, 3] = 1.0
+    prj = co @ m.T
+    visible = prj[:, 3] > 0.0
+    width_half = region.width / 2.0
+    height_half = region.height / 2.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = width_half + width_half * (prj[:, 0] / prj[:, 3])
+        y = height_half + height_half * (prj[:, 1] / prj[:, 3])
+
+    # Leave some margin so labels partially in the region are still drawn
+    margin = 100.0
+    visible &= (x > -margin) & (x < region.width + margin) & (y > -margin) & (y < region.height + margin)
+
+    for vert_idx in np.flatnonzero(visible):
+        lines = labels.lines[vert_idx]
+        num_lines = len(lines)
+        px, py = x[vert_idx], y[vert_idx]
+        for i, (text, w, h) in enumerate(lines):
+            blf.position(font_id, px - w * 0.5, py - (h * i * 2 - (h * num_lines / 2)), 0.0)
+            blf.draw(font_id, text)
+
+
+class DrawCallbackTimings:
+    """Accumulates the time spent in the overlay draw callbacks."""
+
+    def __init__(self):
+        self.num_calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.num_calls if self.num_calls > 0 else 0.0
+
+    def add(self, elapsed: float):
+        self.num_calls += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+
+_draw_callback_timings: dict[str, DrawCallbackTimings] = {}
+
+
+@contextmanager
+def timed_draw_callback(name: str) -> Iterator[None]:
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = perf_counter() - start
+        timings = _draw_callback_timings.get(name, None)
+        if timings is None:
+            timings = _draw_callback_timings[name] = DrawCallbackTimings()
+        timings.add(elapsed)
+
+
+def draw_callback_timings() -> dict[str, DrawCallbackTimings]:
+    return _draw_callback_timings
+
+
+class SOLLUMZ_OT_overlays_report_draw_timings(Operator):
+    """Report the time spent drawing the cloth and cable overlays since the last report"""
+    bl_idname = "sollumz.overlays_report_draw_timings"
+    bl_label = "Report Overlays Draw Timings"
+
+    def execute(self, context):
+        if not _draw_callback_timings:
+            self.report({"INFO"}, "No overlays drawn")
+            return {"FINISHED"}
+
+        for name, timings in sorted(_draw_callback_timings.items()):
+            self.report(
+                {"INFO"},
+                f"{name}: {timings.num_calls} calls, average {timings.average_time * 1000:.3f} ms, "
+                f"max {timings.max_time * 1000:.3f} ms"
+            )
+        for cache in _overlay_caches:
+            if cache.num_builds > 0:
+                self.report({"INFO"}, f"{cache.name}: rebuilt {cache.num_builds} times")
+            cache.num_builds = 0
+        _draw_callback_timings.clear()
+        return {"FINISHED"}
+
+
+@persistent
+def on_depsgraph_update_post(scene: Scene, depsgraph: Depsgraph):
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry:
+            continue
+
+        updated_id = update.id.original
+        if isinstance(updated_id, Mesh):
+            _bump_mesh_update_counter(updated_id)
+        elif isinstance(updated_id, Object) and updated_id.type == "MESH":
+            _bump_mesh_update_counter(updated_id.data)
+
+
+@persistent
+def on_undo_redo_or_load_post(*args):
+    # Mesh data may have been reallocated, just rebuild everything
+    clear_overlay_caches()
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update_post)
+    bpy.app.handlers.undo_post.append(on_undo_redo_or_load_post)
+    bpy.app.handlers.redo_post.append(on_undo_redo_or_load_post)
+    bpy.app.handlers.load_post.append(on_undo_redo_or_load_post)
+
+
+def unregister():
+    bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update_post)
+    bpy.app.handlers.undo_post.remove(on_undo_redo_or_load_post)
+    bpy.app.handlers.redo_post.remove(on_undo_redo_or_load_post)
+    bpy.app.handlers.load_post.remove(on_undo_redo_or_load_post)
+    clear_overlay_caches()
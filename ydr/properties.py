@@ -12,6 +12,7 @@ from bpy.props import (
     PointerProperty,
 )
 import os
+import math
 from typing import Optional
 from ..tools.blenderhelper import lod_level_enum_flag_prop_factory
 from ..sollumz_helper import find_sollumz_parent
@@ -651,8 +652,26 @@ def register():
     bpy.types.Scene.sollumz_auto_lod_ref_mesh = bpy.props.PointerProperty(
         type=bpy.types.Mesh, name="Reference Mesh", description="The mesh to copy and decimate for each LOD level. You'd usually want to set this as the highest LOD then run the tool for all lower LODs")
     bpy.types.Scene.sollumz_auto_lod_levels = lod_level_enum_flag_prop_factory()
+    bpy.types.Scene.sollumz_auto_lod_mode = bpy.props.EnumProperty(
+        name="Mode",
+        items=(
+            ("DECIMATE_STEP", "Decimate Step",
+             "Reduce the triangle count of each LOD level by a fixed ratio of the previous level"),
+            ("SCREEN_ERROR", "Screen Error",
+             "Simplify each LOD level until its error would be visible as the given number of pixels at the distance "
+             "where the LOD level starts being displayed, based on the Drawable LOD distances"),
+        ),
+        default="DECIMATE_STEP",
+    )
     bpy.types.Scene.sollumz_auto_lod_decimate_step = bpy.props.FloatProperty(
         name="Decimate Step", min=0.0, max=0.99, default=0.6)
+    bpy.types.Scene.sollumz_auto_lod_pixel_error = bpy.props.FloatProperty(
+        name="Pixel Error", description="Maximum error of each LOD level in pixels on screen", min=0.0, default=1.0)
+    bpy.types.Scene.sollumz_auto_lod_screen_height = bpy.props.IntProperty(
+        name="Screen Height", description="Vertical resolution of the screen in pixels", min=1, default=1080)
+    bpy.types.Scene.sollumz_auto_lod_fov = bpy.props.FloatProperty(
+        name="Field of View", description="Vertical field of view of the camera", subtype="ANGLE",
+        min=math.radians(1.0), max=math.radians(179.0), default=math.radians(50.0))
 
     bpy.types.WindowManager.sz_light_preset_index = bpy.props.IntProperty(name="Light Preset Index")
     bpy.types.WindowManager.sz_light_presets = bpy.props.CollectionProperty(type=PresetEntry, name="Light Presets")
@@ -806,7 +825,11 @@ def unregister():
     del bpy.types.Scene.center_drawable_to_selection
     del bpy.types.Scene.sollumz_auto_lod_ref_mesh
     del bpy.types.Scene.sollumz_auto_lod_levels
+    del bpy.types.Scene.sollumz_auto_lod_mode
     del bpy.types.Scene.sollumz_auto_lod_decimate_step
+    del bpy.types.Scene.sollumz_auto_lod_pixel_error
+    del bpy.types.Scene.sollumz_auto_lod_screen_height
+    del bpy.types.Scene.sollumz_auto_lod_fov
     del bpy.types.Scene.sollumz_extract_lods_levels
     del bpy.types.Scene.sollumz_extract_lods_parent_type
 
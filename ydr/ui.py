@@ -897,7 +897,13 @@ class SOLLUMZ_PT_AUTO_LOD_PANEL(bpy.types.Panel):
         box.separator(factor=0.25)
         box.prop(context.scene, "sollumz_auto_lod_ref_mesh",
                  text="Reference Mesh")
-        box.prop(context.scene, "sollumz_auto_lod_decimate_step")
+        box.prop(context.scene, "sollumz_auto_lod_mode", expand=True)
+        if context.scene.sollumz_auto_lod_mode == "SCREEN_ERROR":
+            box.prop(context.scene, "sollumz_auto_lod_pixel_error")
+            box.prop(context.scene, "sollumz_auto_lod_screen_height")
+            box.prop(context.scene, "sollumz_auto_lod_fov")
+        else:
+            box.prop(context.scene, "sollumz_auto_lod_decimate_step")
         box.separator()
         box.operator("sollumz.auto_lod", icon="MOD_DECIM")
 
@@ -25,7 +25,7 @@ from .cloth_diagnostics import (
     cloth_export_context,
 )
 
-from .. import logger
+from .. import logger, profiler
 
 VGROUP_INVALID_BONE_ID = -1
 VGROUP_CLOTH_ID = -2
@@ -91,6 +91,7 @@ def remove_unused_uvs(vertex_arr: NDArray, used_texcoords: set[str]) -> NDArray:
     return vertex_arr[new_names]
 
 
+@profiler.profiled
 def dedupe_and_get_indices(vertex_arr: NDArray) -> Tuple[NDArray, NDArray[np.uint32]]:
     """Remove duplicate vertices from the buffer and get the new vertex indices in triangle order (used for IndexBuffer). Returns vertices, indices."""
 
@@ -182,6 +183,7 @@ class VertexBufferBuilder:
         self._char_cloth = char_cloth_xml
         self._bones = bones
 
+    @profiler.profiled
     def build(self):
         if not self.mesh.loop_triangles:
             self.mesh.calc_loop_triangles()
@@ -1,5 +1,4 @@
 import os
-import shutil
 import math
 import bmesh
 import bpy
@@ -11,6 +10,7 @@ from collections import defaultdict
 from mathutils import Quaternion, Vector, Matrix
 
 from ..lods import operates_on_lod_level
+from ..shared.texture_copier import get_active_texture_copier, use_texture_copier
 from .model_data import get_faces_subset
 
 from ..cwxml.drawable import (
@@ -65,9 +65,10 @@ from .cloth_diagnostics import cloth_export_context
 from .lights import create_xml_lights
 from ..cwxml.shader import ShaderManager, ShaderDef, ShaderParameterFloatVectorDef, ShaderParameterType
 
-from .. import logger
+from .. import logger, profiler
 
 
+@profiler.profiled
 def export_ydr(drawable_obj: bpy.types.Object, filepath: str) -> bool:
     export_settings = get_export_settings()
 
@@ -78,6 +79,7 @@ def export_ydr(drawable_obj: bpy.types.Object, filepath: str) -> bool:
     return True
 
 
+@profiler.profiled
 def create_drawable_xml(
     drawable_obj: bpy.types.Object,
     armature_obj: Optional[bpy.types.Object] = None,
@@ -137,6 +139,7 @@ def create_drawable_xml(
     return drawable_xml
 
 
+@profiler.profiled
 def create_model_xmls(
     drawable_xml: Drawable,
     drawable_obj: bpy.types.Object,
@@ -203,6 +206,7 @@ def sort_skinned_models_by_bone(model_objs: list[bpy.types.Object], bones: list[
     return sorted(model_objs, key=get_model_bone_ind)
 
 
+@profiler.profiled
 @operates_on_lod_level
 def create_model_xml(
     model_obj: bpy.types.Object,
@@ -218,12 +222,13 @@ def create_model_xml(
     bones = armature_obj.data.bones if armature_obj is not None else None
     set_model_xml_properties(model_obj, lod_level, bones, model_xml)
 
-    obj_eval = get_evaluated_obj(model_obj)
-    mesh_eval = obj_eval.to_mesh()
-    triangulate_mesh(mesh_eval)
+    with profiler.span("evaluate_mesh"):
+        obj_eval = get_evaluated_obj(model_obj)
+        mesh_eval = obj_eval.to_mesh()
+        triangulate_mesh(mesh_eval)
 
-    if transforms_to_apply is not None:
-        mesh_eval.transform(transforms_to_apply)
+        if transforms_to_apply is not None:
+            mesh_eval.transform(transforms_to_apply)
 
     if char_cloth_xml:
         cloth_export_context().diagnostics.drawable_model_obj_name = model_obj.name
@@ -278,6 +283,7 @@ def set_model_xml_properties(model_obj: bpy.types.Object, lod_level: LODLevel, b
         model_xml.matrix_count = len(bones)
 
 
+@profiler.profiled
 def create_geometries_xml(
     model_obj: bpy.types.Object,
     mesh_eval: bpy.types.Mesh,
@@ -401,6 +407,8 @@ def create_geometries_xml(
         geom_xml.index_buffer.data = ind_buffer
 
         geometries.append(geom_xml)
+        profiler.count("vertices", len(vert_buffer))
+        profiler.count("triangles", len(ind_buffer) // 3)
 
     geometries = sort_geoms_by_shader(geometries)
 
@@ -474,6 +482,7 @@ def append_model_xml(drawable_xml: Drawable, model_xml: DrawableModel, lod_level
         drawable_xml.drawable_models_vlow.append(model_xml)
 
 
+@profiler.profiled
 def join_skinned_models_for_each_lod(drawable_xml: Drawable):
     drawable_xml.drawable_models_high = join_skinned_models(
         drawable_xml.drawable_models_high)
@@ -591,26 +600,36 @@ def join_ind_arrs(ind_arrs: list[NDArray[np.uint32]], vert_counts: list[int]) ->
     return np.concatenate(offset_ind_arrs)
 
 
+@profiler.profiled
 def split_drawable_by_vert_count(drawable_xml: Drawable):
-    split_models_by_vert_count(drawable_xml.drawable_models_high)
-    split_models_by_vert_count(drawable_xml.drawable_models_med)
-    split_models_by_vert_count(drawable_xml.drawable_models_low)
-    split_models_by_vert_count(drawable_xml.drawable_models_vlow)
+    spatial = get_export_settings().split_geometry_spatially
+    split_models_by_vert_count(drawable_xml.drawable_models_high, spatial)
+    split_models_by_vert_count(drawable_xml.drawable_models_med, spatial)
+    split_models_by_vert_count(drawable_xml.drawable_models_low, spatial)
+    split_models_by_vert_count(drawable_xml.drawable_models_vlow, spatial)
 
 
-def split_models_by_vert_count(model_xmls: list[DrawableModel]):
+def split_models_by_vert_count(model_xmls: list[DrawableModel], spatial: bool = False):
     for model_xml in model_xmls:
         geoms_split = [
-            geom_split for geom in model_xml.geometries for geom_split in split_geom_by_vert_count(geom)]
+            geom_split for geom in model_xml.geometries for geom_split in split_geom_by_vert_count(geom, spatial)]
         model_xml.geometries = geoms_split
 
 
-def split_geom_by_vert_count(geom_xml: Geometry):
+def split_geom_by_vert_count(geom_xml: Geometry, spatial: bool = False):
     if geom_xml.vertex_buffer.data is None or geom_xml.index_buffer.data is None:
         raise ValueError(
             "Failed to split Geometry by vertex count. Vertex buffer and index buffer cannot be None!")
 
-    vert_buffers, ind_buffers = split_vert_buffers(geom_xml.vertex_buffer.data, geom_xml.index_buffer.data)
+    vert_buffers, ind_buffers = split_vert_buffers(geom_xml.vertex_buffer.data, geom_xml.index_buffer.data, spatial)
+
+    if len(vert_buffers) > 1:
+        num_verts = len(np.unique(geom_xml.index_buffer.data))
+        num_split_verts = sum(len(vert_buffer) for vert_buffer in vert_buffers)
+        logger.info(
+            f"Split geometry with {num_verts} vertices into {len(vert_buffers)} geometries, "
+            f"{num_split_verts - num_verts} vertices duplicated (duplication ratio {num_split_verts / num_verts:.3f})."
+        )
 
     geoms: list[Geometry] = []
 
@@ -631,51 +650,69 @@ def split_geom_by_vert_count(geom_xml: Geometry):
 
 def split_vert_buffers(
     vert_buffer: NDArray,
-    ind_buffer: NDArray[np.uint32]
+    ind_buffer: NDArray[np.uint32],
+    spatial: bool = False,
 ) -> tuple[tuple[NDArray], tuple[NDArray[np.uint32]]]:
-    """Splits vertex and index buffers on chunks that fit in 16-bit indices.
+    """Splits vertex and index buffers on chunks that fit in 16-bit indices. Each chunk contains consecutive
+    triangles, with its vertices in order of first use.
+
+    If ``spatial`` is true and the buffers need to be split, triangles are first sorted along a Z-order curve so
+    each chunk covers a compact region of the mesh, reducing the vertices duplicated in multiple chunks. This changes
+    the order in which triangles are drawn.
+
     Returns tuple of split vertex buffers and tuple of index buffers"""
-    MAX_INDEX = 65535
+    MAX_INDEX = 65535 // 3 * 3  # chunks end on triangle boundaries
 
-    total_index = 0
     idx_count = len(ind_buffer)
+    if spatial and idx_count > MAX_INDEX:
+        ind_buffer = sort_triangles_spatially(vert_buffer["Position"], ind_buffer)
+
+    # Position in the chunk where each vertex is first used, only valid for the vertices used by the current chunk
+    first_use = np.empty(int(ind_buffer.max()) + 1 if idx_count > 0 else 0, dtype=np.int64)
 
     split_vert_arrs = []
     split_ind_arrs = []
-    while total_index < idx_count:
-        old_index_to_new_index = {}
-        chunk_vertices_indices = []
-        chunk_indices = []
-        chunk_index = 0
-        while total_index < idx_count and len(chunk_indices) < MAX_INDEX:
-            old_index = ind_buffer[total_index]
-            existing_index = old_index_to_new_index.get(old_index, None)
-            if existing_index is not None:
-                # we already have this index vertex addedm simply remap it to new index
-                chunk_indices.append(existing_index)
-            else:
-                # We got new index unseen before, we have to add both vertex and index
-                chunk_indices.append(chunk_index)
-                chunk_vertices_indices.append(old_index)
-                old_index_to_new_index[old_index] = chunk_index
-                chunk_index += 1
-
-            total_index += 1
-
-        chunk_vertices_arr = vert_buffer[chunk_vertices_indices]
-        chunk_indices_arr = np.array(chunk_indices, dtype=np.uint32)
-        split_vert_arrs.append(chunk_vertices_arr)
-        split_ind_arrs.append(chunk_indices_arr)
+    for chunk_start in range(0, idx_count, MAX_INDEX):
+        chunk = ind_buffer[chunk_start:chunk_start + MAX_INDEX]
+        positions = np.arange(len(chunk))
+        # With repeated indices the last assignment wins, so assign in reverse to keep the first use
+        first_use[chunk[::-1]] = positions[::-1]
+        chunk_first_use = first_use[chunk]
+        is_first_use = chunk_first_use == positions
+        new_index = np.cumsum(is_first_use, dtype=np.uint32) - 1
+
+        split_vert_arrs.append(vert_buffer[chunk[is_first_use]])
+        split_ind_arrs.append(new_index[chunk_first_use])
 
     return (tuple(split_vert_arrs), tuple(split_ind_arrs))
 
 
+def sort_triangles_spatially(positions: NDArray[np.float32], ind_buffer: NDArray[np.uint32]) -> NDArray[np.uint32]:
+    """Sorts the triangles of the index buffer by the Morton code of their centroids."""
+    BITS = 10
+    tris = ind_buffer[:len(ind_buffer) // 3 * 3].reshape((-1, 3))
+    centroids = positions[tris].mean(axis=1)
+    bb_min = centroids.min(axis=0)
+    size = np.maximum(centroids.max(axis=0) - bb_min, 1e-6)
+    cells = np.clip(((centroids - bb_min) / size * (1 << BITS)).astype(np.int64), 0, (1 << BITS) - 1)
+
+    codes = np.zeros(len(tris), dtype=np.int64)
+    for bit in range(BITS):
+        for axis in range(3):
+            codes |= ((cells[:, axis] >> bit) & 1) << (3 * bit + axis)
+
+    order = np.argsort(codes, kind="stable")
+    return tris[order].reshape(-1)
+
+
+@profiler.profiled
 def create_shader_group_xml(materials: list[bpy.types.Material], drawable_xml: Drawable):
     shaders = get_shaders_from_blender(materials)
     texture_dictionary = texture_dictionary_from_materials(materials)
 
     drawable_xml.shader_group.shaders = shaders
     drawable_xml.shader_group.texture_dictionary = texture_dictionary
+    profiler.count("materials", len(shaders))
 
 
 def texture_dictionary_from_materials(materials: list[bpy.types.Material]):
@@ -719,6 +756,7 @@ def texture_from_img_node(node: bpy.types.ShaderNodeTexImage):
     return texture
 
 
+@profiler.profiled
 def create_skeleton_xml(armature_obj: bpy.types.Object, apply_transforms: bool = False):
     if armature_obj.type != "ARMATURE" or not armature_obj.pose.bones:
         return None
@@ -949,6 +987,7 @@ def set_drawable_xml_extents(drawable_xml: Drawable):
     drawable_xml.bounding_box_max = bbmax
 
 
+@profiler.profiled
 def create_embedded_collision_xmls(drawable_obj: bpy.types.Object, drawable_xml: Drawable):
     drawable_xml.bounds = None
     bound_objs = [
@@ -991,23 +1030,29 @@ def set_drawable_xml_properties(drawable_obj: bpy.types.Object, drawable_xml: Dr
     drawable_xml.lod_dist_vlow = drawable_obj.drawable_properties.lod_dist_vlow
 
 
+@profiler.profiled
 def write_embedded_textures(drawable_obj: bpy.types.Object, filepath: str):
+    """Copies the embedded textures of ``drawable_obj`` to a folder named after ``filepath``. The copies are queued in
+    the active texture copier of the export operation, if any, otherwise they are finished before returning.
+    """
+    copier = get_active_texture_copier()
+    if copier is None:
+        with use_texture_copier() as copier:
+            write_embedded_textures(drawable_obj, filepath)
+        return
+
     materials = get_sollumz_materials(drawable_obj)
     directory = os.path.dirname(filepath)
     filename = get_filename(filepath)
+    folder_path = os.path.join(directory, filename)
 
     for node in get_embedded_texture_nodes(materials):
-        folder_path = os.path.join(directory, filename)
         texture_path = bpy.path.abspath(node.image.filepath)
 
-        if os.path.isfile(texture_path):
-            if not os.path.isdir(folder_path):
-                os.mkdir(folder_path)
-            dstpath = os.path.join(folder_path, os.path.basename(texture_path))
-            # check if paths are the same because if they are, no need to copy (and would throw an error otherwise)
-            if not os.path.exists(dstpath) or not os.path.samefile(texture_path, dstpath):
-                shutil.copyfile(texture_path, dstpath)
-        elif texture_path:
+        if not texture_path:
+            continue
+
+        if not copier.copy(texture_path, folder_path):
             logger.warning(f"Texture path '{texture_path}' for {node.name} not found! Skipping texture...")
 
 
@@ -22,9 +22,10 @@ from ..lods import LODLevels
 from .lights import create_light_objs
 from .properties import DrawableModelProperties
 from .render_bucket import RenderBucket
-from .. import logger
+from .. import logger, profiler
 
 
+@profiler.profiled
 def import_ydr(filepath: str):
     import_settings = get_import_settings()
 
@@ -37,6 +38,7 @@ def import_ydr(filepath: str):
     return create_drawable_obj(ydr_xml, filepath, name)
 
 
+@profiler.profiled
 def create_drawable_obj(drawable_xml: Drawable, filepath: str, name: Optional[str] = None, split_by_group: bool = False, external_armature: Optional[bpy.types.Object] = None, external_bones: Optional[list[Bone]] = None, materials: Optional[list[bpy.types.Material]] = None):
     """Create a drawable object. ``split_by_group`` will split each Drawable Model by vertex group. ``external_armature`` allows for bones to be rigged to an armature object that is not the parent drawable."""
     name = name or drawable_xml.name
@@ -71,6 +73,7 @@ def create_drawable_obj(drawable_xml: Drawable, filepath: str, name: Optional[st
     return drawable_obj
 
 
+@profiler.profiled
 def create_drawable_models(drawable_xml: Drawable, materials: list[bpy.types.Material], model_names: Optional[str] = None, return_model_data = False):
     model_datas = get_model_data(drawable_xml)
     model_names = model_names or SOLLUMZ_UI_NAMES[SollumType.DRAWABLE_MODEL]
@@ -78,6 +81,7 @@ def create_drawable_models(drawable_xml: Drawable, materials: list[bpy.types.Mat
     return (model_objs, model_datas) if return_model_data else model_objs
 
 
+@profiler.profiled
 def create_rigged_drawable_models(drawable_xml: Drawable, materials: list[bpy.types.Material], drawable_obj: bpy.types.Object, armature_obj: bpy.types.Object, split_by_group: bool = False):
     model_datas = get_model_data(drawable_xml) if not split_by_group else get_model_data_split_by_group(drawable_xml)
 
@@ -188,6 +192,7 @@ def set_drawable_model_properties(model_props: DrawableModelProperties, model_xm
     model_props.render_mask = model_xml.render_mask
 
 
+@profiler.profiled
 def create_drawable_armature(drawable_xml: Drawable, name: str):
     drawable_obj = create_armature_obj_from_skel(
         drawable_xml.skeleton, name, SollumType.DRAWABLE)
@@ -222,6 +227,7 @@ def create_drawable_empty(name: str, drawable_xml: Drawable):
     return drawable_obj
 
 
+@profiler.profiled
 def shadergroup_to_materials(shader_group: ShaderGroup, filepath: str):
     materials = []
 
@@ -230,6 +236,7 @@ def shadergroup_to_materials(shader_group: ShaderGroup, filepath: str):
         material.shader_properties.index = i
         materials.append(material)
 
+    profiler.count("materials", len(materials))
     return materials
 
 
@@ -476,6 +483,7 @@ def create_limit_pos_bone_constraint(trans_limit: BoneLimit, pose_bone: bpy.type
     constraint.min_z = trans_limit.min.z
 
 
+@profiler.profiled
 def create_embedded_collisions(bounds_xml: Bound, drawable_obj: bpy.types.Object):
     if bounds_xml.type == "Composite":
         bound_obj = create_bound_composite(bounds_xml)
@@ -486,6 +494,7 @@ def create_embedded_collisions(bounds_xml: Bound, drawable_obj: bpy.types.Object
     bound_obj.parent = drawable_obj
 
 
+@profiler.profiled
 def create_drawable_lights(drawable_xml: Drawable, drawable_obj: bpy.types.Object, armature_obj: Optional[bpy.types.Object] = None):
     lights = create_light_objs(drawable_xml.lights, armature_obj)
     lights.parent = drawable_obj
@@ -28,7 +28,7 @@ from ..ybn.ybnexport import has_col_mats, bound_geom_has_mats
 from ..ydr.ydrexport import create_drawable_xml, write_embedded_textures, get_bone_index, create_model_xml, append_model_xml, set_drawable_xml_extents
 from ..ydr.lights import create_xml_lights
 from ..ydr.cloth_env import cloth_env_export, cloth_env_find_mesh_objects
-from .. import logger
+from .. import logger, profiler
 from .properties import (
     LODProperties, FragArchetypeProperties, GroupProperties,
     GroupFlagBit, get_glass_type_index,
@@ -36,6 +36,7 @@ from .properties import (
 )
 
 
+@profiler.profiled
 def export_yft(frag_obj: Object, filepath: Optional[str]) -> bool:
     """If filepath is None, a dry run is done and no files are written."""
     export_settings = get_export_settings()
@@ -169,6 +170,7 @@ def locate_fragment_objects(frag: Object) -> Optional[FragmentObjects]:
     return FragmentObjects(frag, drawable, composite, damaged_drawable, damaged_composite)
 
 
+@profiler.profiled
 def create_fragment_xml(frag: FragmentObjects, apply_transforms: bool = False) -> Optional[Fragment]:
     """Create an XML parsable Fragment object. Returns the XML object and the hi XML object (if hi lods are present)."""
     frag_obj = frag.fragment
@@ -409,6 +411,7 @@ def sort_cols_and_children(lod_xml: PhysicsLOD):
         composite.children = sorted_collisions
 
 
+@profiler.profiled
 def create_frag_physics_xml(frag: FragmentObjects, frag_xml: Fragment, materials: list[bpy.types.Material]):
     frag_obj = frag.fragment
     lod_props: LODProperties = frag_obj.fragment_properties.lod_properties
@@ -637,6 +640,7 @@ def calculate_group_masses(lod_xml: PhysicsLOD):
         lod_xml.groups[child.group_index].mass += child.pristine_mass
 
 
+@profiler.profiled
 def calculate_physics_lod_transforms(frag_xml: Fragment):
     """Calculate ``frag_xml.physics.lod1.transforms``. A transformation matrix per physics child that represents
     the offset from the child collision bound to its link center of gravity (aka "link attachment"). A link is
@@ -930,6 +934,7 @@ def create_phys_child_drawable(child_xml: PhysicsChild, materials: list[bpy.type
     return drawable_xml
 
 
+@profiler.profiled
 def create_vehicle_windows_xml(frag_obj: bpy.types.Object, frag_xml: Fragment, materials: list[bpy.types.Material]):
     """Create all the vehicle windows for ``frag_xml``. Must be ran after the drawable and physics children have been created."""
     child_id_by_bone_tag: dict[str, int] = {
@@ -14,11 +14,12 @@ from ..cwxml.fragment import YFT, Fragment, PhysicsLOD, PhysicsGroup, PhysicsChi
 from ..cwxml.drawable import Drawable, Bone
 from ..ydr.ydrimport import apply_translation_limits, create_armature_obj_from_skel, create_drawable_skel, apply_rotation_limits, create_joint_constraints, create_light_objs, create_drawable_obj, create_drawable_as_asset, shadergroup_to_materials, create_drawable_models
 from ..ybn.ybnimport import create_bound_object, create_bound_composite
-from .. import logger
+from .. import logger, profiler
 from .properties import LODProperties, FragArchetypeProperties, GlassTypes, FragmentTemplateAsset
 from ..tools.blenderhelper import get_child_of_bone
 
 
+@profiler.profiled
 def import_yft(filepath: str):
     import_settings = get_import_settings()
 
@@ -73,6 +74,7 @@ def make_non_hi_yft_filepath(yft_filepath: str) -> str:
     return non_hi_path
 
 
+@profiler.profiled
 def create_fragment_obj(frag_xml: Fragment, filepath: str, name: Optional[str] = None, split_by_group: bool = False, hi_xml: Optional[Fragment] = None):
     if hi_xml is not None:
         frag_xml = merge_hi_fragment(frag_xml, hi_xml)
@@ -194,6 +196,7 @@ def merge_hi_fragment(frag_xml: Fragment, hi_xml: Fragment) -> Fragment:
     return frag_xml
 
 
+@profiler.profiled
 def create_phys_lod(frag_xml: Fragment, frag_obj: bpy.types.Object):
     """Create the Fragment.Physics.LOD1 data-block. (Currently LOD1 is only supported)"""
     lod_xml = frag_xml.physics.lod1
@@ -230,6 +233,7 @@ def set_all_bone_physics_properties(armature: bpy.types.Armature, frag_xml: Frag
         set_group_properties(group_xml, bone)
 
 
+@profiler.profiled
 def create_frag_collisions(frag_xml: Fragment, frag_obj: bpy.types.Object, damaged: bool = False) -> Optional[bpy.types.Object]:
     lod1 = frag_xml.physics.lod1
     bounds_xml = lod1.damaged_archetype.bounds if damaged else lod1.archetype.bounds
@@ -322,6 +326,7 @@ def create_phys_child_models(drawable_xml: Drawable, frag_obj: bpy.types.Object,
     return child_objs
 
 
+@profiler.profiled
 def create_env_cloth_meshes(frag_xml: Fragment, frag_obj: bpy.types.Object, drawable_obj: bpy.types.Object, materials: list[bpy.types.Material]):
     if not frag_xml.cloths:
         return
@@ -461,6 +466,7 @@ def create_env_cloth_meshes(frag_xml: Fragment, frag_obj: bpy.types.Object, draw
         cloth_props.world_bounds = cloth_bounds
 
 
+@profiler.profiled
 def create_vehicle_windows(frag_xml: Fragment, frag_obj: bpy.types.Object, materials: list[bpy.types.Material]):
     for window_xml in frag_xml.vehicle_glass_windows:
         window_bone = get_window_bone(window_xml, frag_xml, frag_obj.data.bones)
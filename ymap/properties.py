@@ -144,15 +144,27 @@ class YmapCarGeneratorProperties(bpy.types.PropertyGroup):
     livery: IntProperty(name="Livery", default=-1)
 
 
+class YmapGrassBatchProperties(bpy.types.PropertyGroup):
+    archetype_name: StringProperty(name="Archetype Name", default="")
+    lod_dist: IntProperty(name="Lod Distance", default=120, min=0)
+    lod_fade_start_dist: FloatProperty(name="Lod Fade Start Distance", default=15.0, min=0.0)
+    lod_inst_fade_range: FloatProperty(name="Lod Instance Fade Range", default=0.75, min=0.0)
+    orient_to_terrain: FloatProperty(name="Orient To Terrain", default=1.0, min=0.0, max=1.0)
+    scale_range: FloatVectorProperty(name="Scale Range", default=(0.3, 1.0, 0.5), size=3)
+
+
 def register():
     bpy.types.Object.ymap_properties = PointerProperty(type=YmapProperties)
     bpy.types.Object.ymap_model_occl_properties = PointerProperty(
         type=YmapModelOccluderProperties)
     bpy.types.Object.ymap_cargen_properties = PointerProperty(
         type=YmapCarGeneratorProperties)
+    bpy.types.Object.ymap_grass_batch_properties = PointerProperty(
+        type=YmapGrassBatchProperties)
 
 
 def unregister():
     del bpy.types.Object.ymap_properties
     del bpy.types.Object.ymap_model_occl_properties
     del bpy.types.Object.ymap_cargen_properties
+    del bpy.types.Object.ymap_grass_batch_properties
@@ -78,6 +78,21 @@ def draw_ymap_car_generator_properties(self, context):
         layout.prop(obj.ymap_cargen_properties, 'livery')
 
 
+def draw_ymap_grass_batch_properties(self, context):
+    obj = context.active_object
+    if obj and obj.sollum_type == SollumType.YMAP_GRASS_BATCH:
+        layout = self.layout
+        layout.separator()
+        layout.prop(obj.ymap_grass_batch_properties, "archetype_name")
+        layout.prop(obj.ymap_grass_batch_properties, "lod_dist")
+        layout.prop(obj.ymap_grass_batch_properties, "lod_fade_start_dist")
+        layout.prop(obj.ymap_grass_batch_properties, "lod_inst_fade_range")
+        layout.prop(obj.ymap_grass_batch_properties, "orient_to_terrain")
+        layout.prop(obj.ymap_grass_batch_properties, "scale_range")
+        if obj.type == "MESH":
+            layout.label(text=f"Instances: {len(obj.data.vertices)}")
+
+
 class SOLLUMZ_PT_YMAP_TOOL_PANEL(bpy.types.Panel):
     bl_label = "Map Data"
     bl_idname = "SOLLUMZ_PT_YMAP_TOOL_PANEL"
@@ -153,9 +168,11 @@ def register():
     SOLLUMZ_PT_OBJECT_PANEL.append(draw_ymap_properties)
     SOLLUMZ_PT_OBJECT_PANEL.append(draw_ymap_model_occluder_properties)
     SOLLUMZ_PT_OBJECT_PANEL.append(draw_ymap_car_generator_properties)
+    SOLLUMZ_PT_OBJECT_PANEL.append(draw_ymap_grass_batch_properties)
 
 
 def unregister():
     SOLLUMZ_PT_OBJECT_PANEL.remove(draw_ymap_properties)
     SOLLUMZ_PT_OBJECT_PANEL.remove(draw_ymap_model_occluder_properties)
     SOLLUMZ_PT_OBJECT_PANEL.remove(draw_ymap_car_generator_properties)
+    SOLLUMZ_PT_OBJECT_PANEL.remove(draw_ymap_grass_batch_properties)
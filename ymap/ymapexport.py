@@ -2,6 +2,7 @@ import bpy
 import re
 import math
 import numpy as np
+from numpy.typing import NDArray
 from mathutils import Vector
 from struct import pack
 from ..cwxml.ymap import *
@@ -10,8 +11,15 @@ from ..tools.blenderhelper import remove_number_suffix
 from ..tools.meshhelper import get_bound_center_from_bounds, get_extents
 from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType
 from ..sollumz_preferences import get_export_settings
-from .. import logger
-from ..tools.ymaphelper import generate_ymap_extents
+from .. import logger, profiler
+from ..tools.ymaphelper import (
+    generate_ymap_extents,
+    get_grass_batch_positions,
+    GRASS_NORMAL_ATTRIBUTE,
+    GRASS_COLOR_ATTRIBUTE,
+    GRASS_SCALE_ATTRIBUTE,
+    GRASS_AO_ATTRIBUTE,
+)
 
 
 def box_from_obj(obj):
@@ -126,6 +134,62 @@ def cargen_from_obj(obj):
     return cargen
 
 
+def get_point_attribute_values(
+    mesh: bpy.types.Mesh, name: str, value_prop: str, num_components: int, default_value
+) -> NDArray[np.float32]:
+    """Gets the values of a point attribute as an array of shape (N, num_components), or filled with
+    ``default_value`` if the mesh doesn't have the attribute.
+    """
+    num_points = len(mesh.vertices)
+    attribute = mesh.attributes.get(name, None)
+    if attribute is None or attribute.domain != "POINT":
+        return np.full((num_points, num_components), default_value, dtype=np.float32)
+
+    values = np.empty(num_points * num_components, dtype=np.float32)
+    attribute.data.foreach_get(value_prop, values)
+    return values.reshape((num_points, num_components))
+
+
+def grass_batch_from_obj(obj) -> GrassInstanceBatch:
+    batch = GrassInstanceBatch()
+    batch_props = obj.ymap_grass_batch_properties
+    batch.archetype_name = batch_props.archetype_name or remove_number_suffix(obj.name)
+    batch.lod_dist = batch_props.lod_dist
+    batch.lod_fade_start_dist = batch_props.lod_fade_start_dist
+    batch.lod_inst_fade_range = batch_props.lod_inst_fade_range
+    batch.orient_to_terrain = batch_props.orient_to_terrain
+    batch.scale_range = Vector(batch_props.scale_range)
+
+    mesh = obj.data
+    positions = get_grass_batch_positions(obj)
+    aabb_min = positions.min(axis=0)
+    aabb_max = positions.max(axis=0)
+    batch.batch_aabb.min = Vector((*aabb_min, 0.0))
+    batch.batch_aabb.max = Vector((*aabb_max, 0.0))
+
+    normals = get_point_attribute_values(mesh, GRASS_NORMAL_ATTRIBUTE, "vector", 3, (0.0, 0.0, 1.0))
+    normals = normals @ np.array(obj.matrix_world.to_quaternion().to_matrix(), dtype=np.float32).T
+    normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-6)
+    colors = get_point_attribute_values(mesh, GRASS_COLOR_ATTRIBUTE, "color_srgb", 4, 1.0)
+    scales = get_point_attribute_values(mesh, GRASS_SCALE_ATTRIBUTE, "value", 1, 1.0)
+    aos = get_point_attribute_values(mesh, GRASS_AO_ATTRIBUTE, "value", 1, 1.0)
+
+    def _quantize(values: NDArray, max_value: int, dtype) -> NDArray:
+        return np.rint(np.clip(values, 0.0, 1.0) * max_value).astype(dtype)
+
+    aabb_size = aabb_max - aabb_min
+    aabb_size[aabb_size == 0.0] = 1.0
+    batch.instances = GrassInstanceData(
+        position=_quantize((positions - aabb_min) / aabb_size, 65535, np.uint16),
+        normal=_quantize((normals[:, :2] + 1.0) * 0.5, 255, np.uint8),
+        color=_quantize(colors[:, :3], 255, np.uint8),
+        scale=_quantize(scales[:, 0], 255, np.uint8),
+        ao=_quantize(aos[:, 0], 255, np.uint8),
+    )
+
+    return batch
+
+
 def calculate_cargen_orient(obj):
     # *-1 because GTA likes to invert values
     angle = obj.rotation_euler[2] * -1
@@ -133,6 +197,7 @@ def calculate_cargen_orient(obj):
     return 5 * math.sin(angle), 5 * math.cos(angle)
 
 
+@profiler.profiled
 def ymap_from_object(obj):
     ymap = CMapData()
 
@@ -196,6 +261,21 @@ def ymap_from_object(obj):
                     logger.warning(
                         f"Object {cargen_obj.name} will be skipped because it is not a {SOLLUMZ_UI_NAMES[SollumType.YMAP_CAR_GENERATOR]} type.")
 
+        # Grass
+        if export_settings.ymap_grass == False and child.sollum_type == SollumType.YMAP_GRASS_GROUP:
+            obj.ymap_properties.content_flags_toggle.has_grass = True
+
+            for batch_obj in child.children:
+                if batch_obj.sollum_type != SollumType.YMAP_GRASS_BATCH or batch_obj.type != "MESH":
+                    logger.warning(
+                        f"Object {batch_obj.name} will be skipped because it is not a {SOLLUMZ_UI_NAMES[SollumType.YMAP_GRASS_BATCH]} type.")
+                    continue
+                if len(batch_obj.data.vertices) == 0:
+                    logger.warning(f"Grass batch {batch_obj.name} has no instances and will be skipped.")
+                    continue
+
+                ymap.instanced_data.grass_instance_list.append(grass_batch_from_obj(batch_obj))
+
         # TODO: lod ligths
 
         # TODO: distant lod lights
@@ -221,6 +301,7 @@ def ymap_from_object(obj):
     return ymap
 
 
+@profiler.profiled
 def export_ymap(obj: bpy.types.Object, filepath: str) -> bool:
     ymap = ymap_from_object(obj)
     ymap.write_xml(filepath)
@@ -2,15 +2,25 @@ import math
 import bpy
 import numpy as np
 from numpy.typing import NDArray
-from mathutils import Vector, Euler
+from mathutils import Vector, Euler, Matrix
 from ..sollumz_helper import duplicate_object_with_children, set_object_collection
-from ..tools.ymaphelper import add_occluder_material, get_cargen_mesh
+from ..tools.ymaphelper import (
+    add_occluder_material,
+    get_cargen_mesh,
+    build_archetype_objects_index,
+    get_archetype_instance_collection,
+    add_grass_instancer_modifier,
+    GRASS_NORMAL_ATTRIBUTE,
+    GRASS_COLOR_ATTRIBUTE,
+    GRASS_SCALE_ATTRIBUTE,
+    GRASS_AO_ATTRIBUTE,
+)
 from ..sollumz_properties import SollumType
 from ..sollumz_preferences import get_import_settings
-from ..cwxml.ymap import CMapData, OccludeModel, YMAP
+from ..cwxml.ymap import CMapData, OccludeModel, GrassInstanceBatch, YMAP
 from ..tools.blenderhelper import create_blender_object, create_empty_object
 from ..tools.meshhelper import create_box
-from .. import logger
+from .. import logger, profiler
 
 # TODO: Make better?
 
@@ -28,6 +38,19 @@ def occlude_model_to_mesh_data(model: OccludeModel) -> tuple[NDArray, NDArray]:
     return verts, faces
 
 
+def grass_batch_to_mesh_data(batch: GrassInstanceBatch) -> tuple[NDArray, NDArray]:
+    """Decodes the positions and normals of the instances of a grass batch, as arrays of shape (N, 3)."""
+    instances = batch.instances
+    aabb_min = np.array(batch.batch_aabb.min.xyz, dtype=np.float64)
+    aabb_max = np.array(batch.batch_aabb.max.xyz, dtype=np.float64)
+
+    positions = aabb_min + (instances.position / 65535.0) * (aabb_max - aabb_min)
+    normals_xy = instances.normal / 255.0 * 2.0 - 1.0
+    normals_z = np.sqrt(np.clip(1.0 - np.sum(normals_xy * normals_xy, axis=1), 0.0, 1.0))
+    normals = np.column_stack((normals_xy, normals_z))
+    return positions, normals
+
+
 def apply_entity_properties(obj, entity):
     obj.entity_properties.archetype_name = entity.archetype_name
     obj.entity_properties.flags = entity.flags
@@ -49,6 +72,7 @@ def apply_entity_properties(obj, entity):
     obj.scale = Vector((entity.scale_xy, entity.scale_xy, entity.scale_z))
 
 
+@profiler.profiled
 def entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
     group_obj = bpy.data.objects.new("Entities", None)
     group_obj.sollum_type = SollumType.YMAP_ENTITY_GROUP
@@ -61,11 +85,15 @@ def entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
 
     found = False
     if ymap.entities:
-        for obj in bpy.context.collection.all_objects:
-            for entity in ymap.entities:
-                if entity.archetype_name == obj.name and obj.name in bpy.context.view_layer.objects:
-                    found = True
-                    apply_entity_properties(obj, entity)
+        view_layer_objects = bpy.context.view_layer.objects
+        objects_index = build_archetype_objects_index(
+            obj for obj in bpy.context.collection.all_objects if obj.name in view_layer_objects
+        )
+        for entity in ymap.entities:
+            obj = objects_index.get(entity.archetype_name.lower(), None)
+            if obj is not None:
+                found = True
+                apply_entity_properties(obj, entity)
         if found:
             logger.info(f"Succesfully imported: {ymap.name}.ymap")
             return True
@@ -78,6 +106,7 @@ def entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
         return False
 
 
+@profiler.profiled
 def instanced_entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
     group_obj = bpy.data.objects.new("Entities", None)
     group_obj.sollum_type = SollumType.YMAP_ENTITY_GROUP
@@ -92,8 +121,14 @@ def instanced_entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
         entities_amount = len(ymap.entities)
         count = 0
 
+        import_settings = get_import_settings()
+        use_collection_instances = import_settings.ymap_instance_entities_type == "COLLECTION_INSTANCES"
+
+        # Lookup in the whole .blend (i.e. current scene, other scenes, asset browser)
+        objects_index = build_archetype_objects_index(bpy.data.objects)
+        instance_collections = {}
         for entity in ymap.entities:
-            obj = bpy.data.objects.get(entity.archetype_name, None)
+            obj = objects_index.get(entity.archetype_name.lower(), None)
             if obj is None:
                 # No object with the given archetype name found
                 continue
@@ -101,7 +136,27 @@ def instanced_entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
             # TODO: requiring ymap entities to be drawable or fragment in blender seems like an unnecessary limitation
             # Need to special case assets because their type when imported by sollumz is drawable model
             if obj.sollum_type == SollumType.DRAWABLE or obj.sollum_type == SollumType.FRAGMENT or obj.asset_data is not None:
-                new_obj = duplicate_object_with_children(obj)
+                instance_collection = None
+                if use_collection_instances:
+                    if obj.name not in instance_collections:
+                        instance_collections[obj.name] = get_archetype_instance_collection(obj)
+                        if instance_collections[obj.name] is None:
+                            logger.warning(
+                                f"'{obj.name}' is rotated or scaled, placing copies of it instead of collection "
+                                "instances."
+                            )
+                    instance_collection = instance_collections[obj.name]
+
+                if instance_collection is not None:
+                    new_obj = bpy.data.objects.new(entity.archetype_name, None)
+                    new_obj.sollum_type = (
+                        SollumType.FRAGMENT if obj.sollum_type == SollumType.FRAGMENT else SollumType.DRAWABLE
+                    )
+                    new_obj.instance_type = "COLLECTION"
+                    new_obj.instance_collection = instance_collection
+                    bpy.context.collection.objects.link(new_obj)
+                else:
+                    new_obj = duplicate_object_with_children(obj)
                 apply_entity_properties(new_obj, entity)
                 new_obj.parent = group_obj
                 count += 1
@@ -111,8 +166,6 @@ def instanced_entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
                     f"Cannot use your '{obj.name}' object because it is not a 'Drawable' type!")
 
         # Creating empty entity if no object was found for reference, and notify user
-        import_settings = get_import_settings()
-
         if not import_settings.ymap_skip_missing_entities:
             for entity in ymap.entities:
                 if entity.found is None:
@@ -136,6 +189,7 @@ def instanced_entity_to_obj(ymap_obj: bpy.types.Object, ymap: CMapData):
         return False
 
 
+@profiler.profiled
 def box_to_obj(obj, ymap: CMapData):
     group_obj = create_empty_object(SollumType.YMAP_BOX_OCCLUDER_GROUP, "Box Occluders")
     group_obj.parent = obj
@@ -158,6 +212,7 @@ def box_to_obj(obj, ymap: CMapData):
     return group_obj
 
 
+@profiler.profiled
 def model_to_obj(obj: bpy.types.Object, ymap: CMapData):
     group_obj = create_empty_object(SollumType.YMAP_MODEL_OCCLUDER_GROUP, "Model Occluders")
     group_obj.parent = obj
@@ -182,6 +237,7 @@ def model_to_obj(obj: bpy.types.Object, ymap: CMapData):
         model_obj.lock_scale = (True, True, True)
 
 
+@profiler.profiled
 def cargen_to_obj(obj: bpy.types.Object, ymap: CMapData):
     group_obj = bpy.data.objects.new("Car Generators", None)
     group_obj.sollum_type = SollumType.YMAP_CAR_GENERATOR_GROUP
@@ -216,6 +272,62 @@ def cargen_to_obj(obj: bpy.types.Object, ymap: CMapData):
         cargen_obj.parent = group_obj
 
 
+@profiler.profiled
+def grass_to_obj(obj: bpy.types.Object, ymap: CMapData):
+    group_obj = create_empty_object(SollumType.YMAP_GRASS_GROUP, "Grass")
+    group_obj.parent = obj
+    group_obj.lock_location = (True, True, True)
+    group_obj.lock_rotation = (True, True, True)
+    group_obj.lock_scale = (True, True, True)
+    bpy.context.view_layer.objects.active = group_obj
+
+    obj.ymap_properties.content_flags_toggle.has_grass = True
+
+    objects_index = build_archetype_objects_index(bpy.data.objects)
+    for batch in ymap.instanced_data.grass_instance_list:
+        instances = batch.instances
+        positions, normals = grass_batch_to_mesh_data(batch)
+        # Keep the batch origin at its center, instead of at the world origin with vertices far from it
+        center = (np.array(batch.batch_aabb.min.xyz) + np.array(batch.batch_aabb.max.xyz)) * 0.5
+
+        # Each batch is a point cloud, a mesh with only vertices, with the instance data in point attributes
+        mesh = bpy.data.meshes.new(batch.archetype_name)
+        mesh.vertices.add(instances.num_instances)
+        mesh.vertices.foreach_set("co", (positions - center).astype(np.float32).ravel())
+
+        colors = np.ones((instances.num_instances, 4), dtype=np.float32)
+        colors[:, :3] = instances.color / 255.0
+        attributes = mesh.attributes
+        attributes.new(GRASS_NORMAL_ATTRIBUTE, "FLOAT_VECTOR", "POINT").data.foreach_set(
+            "vector", normals.astype(np.float32).ravel())
+        # Store the colors as they are in the file, without conversion between sRGB and linear
+        attributes.new(GRASS_COLOR_ATTRIBUTE, "BYTE_COLOR", "POINT").data.foreach_set("color_srgb", colors.ravel())
+        attributes.new(GRASS_SCALE_ATTRIBUTE, "FLOAT", "POINT").data.foreach_set(
+            "value", (instances.scale / 255.0).astype(np.float32))
+        attributes.new(GRASS_AO_ATTRIBUTE, "FLOAT", "POINT").data.foreach_set(
+            "value", (instances.ao / 255.0).astype(np.float32))
+        mesh.update()
+
+        batch_obj = create_blender_object(SollumType.YMAP_GRASS_BATCH, batch.archetype_name, mesh)
+        batch_obj.parent = group_obj
+        # Set the world matrix directly, it is used on export and setting the location would only update it on the
+        # next depsgraph evaluation
+        batch_obj.matrix_world = Matrix.Translation(center)
+
+        batch_props = batch_obj.ymap_grass_batch_properties
+        batch_props.archetype_name = batch.archetype_name
+        batch_props.lod_dist = int(batch.lod_dist)
+        batch_props.lod_fade_start_dist = batch.lod_fade_start_dist
+        batch_props.lod_inst_fade_range = batch.lod_inst_fade_range
+        batch_props.orient_to_terrain = batch.orient_to_terrain
+        batch_props.scale_range = batch.scale_range
+
+        archetype_obj = objects_index.get(batch.archetype_name.lower(), None)
+        if archetype_obj is not None:
+            add_grass_instancer_modifier(batch_obj, archetype_obj)
+
+
+@profiler.profiled
 def ymap_to_obj(ymap: CMapData):
     ymap_obj = bpy.data.objects.new(ymap.name, None)
     ymap_obj.sollum_type = SollumType.YMAP
@@ -260,6 +372,10 @@ def ymap_to_obj(ymap: CMapData):
     if import_settings.ymap_car_generators == False and len(ymap.car_generators) > 0:
         cargen_to_obj(ymap_obj, ymap)
 
+    # Grass
+    if import_settings.ymap_grass == False and len(ymap.instanced_data.grass_instance_list) > 0:
+        grass_to_obj(ymap_obj, ymap)
+
     # TODO: lod ligths
 
     # TODO: distant lod lights
@@ -277,6 +393,7 @@ def ymap_to_obj(ymap: CMapData):
     return ymap_obj
 
 
+@profiler.profiled
 def import_ymap(filepath):
     ymap_xml: CMapData = YMAP.from_xml_file(filepath)
     found = False
@@ -287,4 +404,6 @@ def import_ymap(filepath):
             found = True
             break
     if not found:
-        obj = ymap_to_obj(ymap_xml)
+        return ymap_to_obj(ymap_xml)
+
+    return None
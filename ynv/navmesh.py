@@ -0,0 +1,129 @@
+import bpy
+import numpy as np
+from numpy.typing import NDArray
+from enum import Enum
+from ..cwxml.navmesh import NAVMESH_NUM_POLY_FLAGS
+from ..tools.blenderhelper import find_bsdf_and_material_output
+
+NAVMESH_MATERIAL_NAME = "NavMesh"
+NO_ADJACENT_POLY = 65535
+"""Polygon index in the edges of polygons without a neighbour polygon."""
+
+
+class NavMeshAttr(str, Enum):
+    POLY_FLAGS_0 = "navmesh_flags_0"
+    POLY_FLAGS_1 = "navmesh_flags_1"
+    POLY_FLAGS_2 = "navmesh_flags_2"
+    POLY_FLAGS_3 = "navmesh_flags_3"
+    POLY_FLAGS_4 = "navmesh_flags_4"
+    POLY_FLAGS_5 = "navmesh_flags_5"
+    # Preview color computed from the polygon flags, used by the navmesh material
+    POLY_COLOR = "navmesh_color"
+
+    POINT_TYPE = "navmesh_point_type"
+    POINT_ANGLE = "navmesh_point_angle"
+
+    PORTAL_TYPE = "navmesh_portal_type"
+    PORTAL_ANGLE = "navmesh_portal_angle"
+    PORTAL_POLY_FROM = "navmesh_portal_poly_from"
+    PORTAL_POLY_TO = "navmesh_portal_poly_to"
+
+    # Area ID and polygon index of the two links in the edge that starts at each polygon corner. Kept to export the
+    # links to polygons of other navmeshes
+    EDGE_AREA_0 = "navmesh_edge_area_0"
+    EDGE_POLY_0 = "navmesh_edge_poly_0"
+    EDGE_AREA_1 = "navmesh_edge_area_1"
+    EDGE_POLY_1 = "navmesh_edge_poly_1"
+
+    @staticmethod
+    def poly_flags() -> tuple["NavMeshAttr", ...]:
+        return (
+            NavMeshAttr.POLY_FLAGS_0, NavMeshAttr.POLY_FLAGS_1, NavMeshAttr.POLY_FLAGS_2,
+            NavMeshAttr.POLY_FLAGS_3, NavMeshAttr.POLY_FLAGS_4, NavMeshAttr.POLY_FLAGS_5,
+        )
+
+    @staticmethod
+    def edge_links() -> tuple["NavMeshAttr", ...]:
+        """Attributes in the same order as the values of an edge in the XML."""
+        return (NavMeshAttr.EDGE_AREA_0, NavMeshAttr.EDGE_POLY_0, NavMeshAttr.EDGE_AREA_1, NavMeshAttr.EDGE_POLY_1)
+
+    @property
+    def type(self):
+        match self:
+            case NavMeshAttr.POLY_COLOR:
+                return "FLOAT_COLOR"
+            case NavMeshAttr.POINT_ANGLE | NavMeshAttr.PORTAL_ANGLE:
+                return "FLOAT"
+            case _:
+                return "INT"
+
+    @property
+    def domain(self):
+        if self == NavMeshAttr.POLY_COLOR or self.name.startswith("EDGE_"):
+            return "CORNER"
+        elif self.name.startswith("POINT_"):
+            return "POINT"
+        elif self.name.startswith("PORTAL_"):
+            return "EDGE"
+        else:
+            return "FACE"
+
+    @property
+    def value_prop(self) -> str:
+        """Name of the property that holds the value in the attribute data, for ``foreach_get``/``foreach_set``."""
+        return "color" if self.type == "FLOAT_COLOR" else "value"
+
+
+def mesh_add_navmesh_attribute(mesh: bpy.types.Mesh, attr: NavMeshAttr, values: NDArray):
+    attribute = mesh.attributes.new(attr, attr.type, attr.domain)
+    dtype = np.int32 if attr.type == "INT" else np.float32
+    attribute.data.foreach_set(attr.value_prop, np.asarray(values, dtype=dtype).ravel())
+
+
+def get_poly_flags_colors(flags: NDArray[np.int64]) -> NDArray[np.float32]:
+    """Gets the preview colors of polygons from their flags.
+
+    :param flags: Array of shape (N, NAVMESH_NUM_POLY_FLAGS).
+    :return: Array of shape (N, 4), with RGBA colors.
+    """
+    flags0 = flags[:, 0, np.newaxis]
+    flags1 = flags[:, 1, np.newaxis]
+
+    def _add(flags_values: NDArray, mask: int, rgb: tuple[float, float, float]) -> NDArray:
+        return np.where((flags_values & mask) != 0, np.array(rgb, dtype=np.float32), 0.0)
+
+    colors = np.zeros((len(flags), 4), dtype=np.float32)
+    rgb = colors[:, :3]
+    rgb += _add(flags0, 1, (0.01, 0.0, 0.0))        # SmallPoly
+    rgb += _add(flags0, 2, (0.01, 0.0, 0.0))        # LargePoly
+    rgb += _add(flags0, 4, (0.0, 0.25, 0.0))        # IsPavement
+    rgb += _add(flags0, 8, (0.0, 0.02, 0.0))        # IsUnderground
+    rgb += _add(flags0, 64, (0.25, 0.0, 0.0))       # Unused1
+    rgb += _add(flags0, 128, (0.0, 0.0, 0.25))      # Unused2
+    rgb += _add(flags1, 64, (0.0, 0.0, 0.1))        # AudioProperties1
+    rgb += _add(flags1, 512, (0.0, 0.1, 0.0))       # AudioProperties2
+    rgb += _add(flags1, 1024, (0.0, 0.0, 0.03))     # AudioProperties3
+    rgb += _add(flags1, 4096, (0.0, 0.75, 0.0))     # AudioProperties4
+    rgb += _add(flags1, 8192, (0.0, 0.0, 0.75))     # Unused3
+    rgb += _add(flags1, 16384, (0.2, 0.0, 0.0))     # NearCarNode
+    rgb += _add(flags1, 32768, (0.0, 0.0, 0.2))     # IsInterior
+    rgb[:, 1] = np.where((flags1[:, 0] & 65536) != 0, 0.2, rgb[:, 1])  # IsIsolated
+    colors[:, 3] = 0.75
+    return colors
+
+
+def get_navmesh_material() -> bpy.types.Material:
+    """Get the navmesh material or create it if not exist. It displays the preview color of the polygon flags."""
+    mat = bpy.data.materials.get(NAVMESH_MATERIAL_NAME, None)
+    if mat is not None:
+        return mat
+
+    mat = bpy.data.materials.new(NAVMESH_MATERIAL_NAME)
+    mat.use_nodes = True
+    bsdf, _ = find_bsdf_and_material_output(mat)
+    color_attr = mat.node_tree.nodes.new("ShaderNodeAttribute")
+    color_attr.attribute_name = NavMeshAttr.POLY_COLOR
+    color_attr.location = (bsdf.location.x - 300, bsdf.location.y)
+    mat.node_tree.links.new(color_attr.outputs[0], bsdf.inputs[0])
+
+    return mat
@@ -0,0 +1,15 @@
+import bpy
+from bpy.props import IntProperty, PointerProperty, StringProperty
+
+
+class NavMeshProperties(bpy.types.PropertyGroup):
+    area_id: IntProperty(name="Area ID", default=0, min=0)
+    content_flags: StringProperty(name="Content Flags", default="Polygons, Portals")
+
+
+def register():
+    bpy.types.Object.navmesh_properties = PointerProperty(type=NavMeshProperties)
+
+
+def unregister():
+    del bpy.types.Object.navmesh_properties
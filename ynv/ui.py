@@ -0,0 +1,20 @@
+from ..sollumz_properties import SollumType
+from ..sollumz_ui import SOLLUMZ_PT_OBJECT_PANEL
+
+
+def draw_navmesh_properties(self, context):
+    obj = context.active_object
+    if obj and obj.sollum_type == SollumType.NAVMESH:
+        layout = self.layout
+        layout.use_property_split = True
+        layout.use_property_decorate = False
+        layout.prop(obj.navmesh_properties, "area_id")
+        layout.prop(obj.navmesh_properties, "content_flags")
+
+
+def register():
+    SOLLUMZ_PT_OBJECT_PANEL.append(draw_navmesh_properties)
+
+
+def unregister():
+    SOLLUMZ_PT_OBJECT_PANEL.remove(draw_navmesh_properties)
@@ -0,0 +1,318 @@
+import bpy
+import numpy as np
+from numpy.typing import NDArray
+from typing import NamedTuple, Optional
+from mathutils import Vector
+from ..cwxml.navmesh import NAVMESH_NUM_POLY_FLAGS, Navmesh, NavPoint, NavPolygons, NavPortal
+from ..sollumz_properties import SollumType
+from .navmesh import NO_ADJACENT_POLY, NavMeshAttr
+from .. import logger, profiler
+
+SECTOR_TREE_DEPTH = 3
+"""Number of times the navmesh bounds are split in four, CodeWalker uses the same depth for the game navmesh cells."""
+
+
+class NavSector(NamedTuple):
+    bb_min: NDArray[np.float64]
+    bb_max: NDArray[np.float64]
+    poly_start: int
+    """Index of the first polygon in this sector, polygons are sorted by sector."""
+    poly_count: int
+    children: tuple["NavSector", ...]
+    """The four child sectors, empty in leaf sectors."""
+
+
+def _get_mesh_world_positions(obj: bpy.types.Object) -> NDArray[np.float64]:
+    mesh = obj.data
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    positions = positions.reshape((-1, 3)).astype(np.float64)
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    return positions @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def _get_attribute_values(mesh: bpy.types.Mesh, attr: NavMeshAttr, count: int) -> NDArray:
+    dtype = np.int32 if attr.type == "INT" else np.float32
+    values = np.zeros(count, dtype=dtype)
+    attribute = mesh.attributes.get(attr, None)
+    if attribute is None or attribute.domain != attr.domain or len(attribute.data) != count:
+        logger.warning(f"Navmesh mesh '{mesh.name}' has no '{attr}' attribute, defaulting to 0.")
+        return values
+
+    attribute.data.foreach_get(attr.value_prop, values)
+    return values
+
+
+def _get_edge_links(mesh: bpy.types.Mesh, area_id: int) -> NDArray[np.int64]:
+    """Gets the links of the polygon edges stored on import, with shape (num_corners, 4). Corners of meshes created in
+    Blender have no stored links, they are linked to no polygon.
+    """
+    num_corners = len(mesh.loops)
+    links = np.tile(np.array((area_id, NO_ADJACENT_POLY, area_id, NO_ADJACENT_POLY), dtype=np.int64), (num_corners, 1))
+    values = np.empty(num_corners, dtype=np.int32)
+    for links_index, attr in enumerate(NavMeshAttr.edge_links()):
+        attribute = mesh.attributes.get(attr, None)
+        if attribute is None or attribute.domain != attr.domain or attribute.data_type != attr.type:
+            continue
+
+        attribute.data.foreach_get(attr.value_prop, values)
+        links[:, links_index] = values
+
+    return links
+
+
+def get_polygon_adjacency(corner_verts: NDArray[np.int64], poly_sizes: NDArray[np.int64]) -> NDArray[np.int64]:
+    """Finds the polygon on the other side of each polygon edge. The edge of a corner goes from its vertex to the vertex
+    of the next corner of the polygon.
+
+    :return: Array with the index of the adjacent polygon for each corner, or -1 if the edge is not shared by exactly
+             two polygons.
+    """
+    num_corners = len(corner_verts)
+    poly_starts = np.cumsum(poly_sizes) - poly_sizes
+    corner_polys = np.repeat(np.arange(len(poly_sizes)), poly_sizes)
+    next_corners = np.arange(1, num_corners + 1)
+    next_corners[poly_starts + poly_sizes - 1] = poly_starts
+
+    v0 = corner_verts
+    v1 = corner_verts[next_corners]
+    num_verts = int(corner_verts.max()) + 1 if num_corners > 0 else 0
+    edge_keys = np.minimum(v0, v1) * num_verts + np.maximum(v0, v1)
+
+    order = np.argsort(edge_keys, kind="stable")
+    sorted_keys = edge_keys[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, num_corners])
+    # Edges shared by more than two polygons are ambiguous, leave them without neighbours
+    pair_starts = group_starts[group_sizes == 2]
+    corners_a = order[pair_starts]
+    corners_b = order[pair_starts + 1]
+
+    adjacency = np.full(num_corners, -1, dtype=np.int64)
+    adjacency[corners_a] = corner_polys[corners_b]
+    adjacency[corners_b] = corner_polys[corners_a]
+    return adjacency
+
+
+def build_sector_tree(
+    poly_bb_min: NDArray[np.float64], poly_bb_max: NDArray[np.float64], depth: int = SECTOR_TREE_DEPTH
+) -> tuple[NavSector, NDArray[np.int64]]:
+    """Builds a quadtree over the XY bounds of the polygons, assigning each polygon to the leaf sector containing its
+    center.
+
+    :return: A tuple of the root sector and the order in which the polygons have to be written so the polygons of each
+             sector are contiguous.
+    """
+    num_polys = len(poly_bb_min)
+    if num_polys == 0:
+        zero = np.zeros(3)
+        return NavSector(zero, zero, 0, 0, ()), np.zeros(0, dtype=np.int64)
+
+    bb_min = poly_bb_min.min(axis=0)
+    bb_max = poly_bb_max.max(axis=0)
+    num_cells = 1 << depth
+    size = np.maximum(bb_max[:2] - bb_min[:2], 1e-6)
+    centers = (poly_bb_min[:, :2] + poly_bb_max[:, :2]) * 0.5
+    cells = np.clip(((centers - bb_min[:2]) / size * num_cells).astype(np.int64), 0, num_cells - 1)
+
+    # Morton code of the leaf cell, the four children of a sector have consecutive codes
+    codes = np.zeros(num_polys, dtype=np.int64)
+    for bit in range(depth):
+        codes |= ((cells[:, 0] >> bit) & 1) << (2 * bit)
+        codes |= ((cells[:, 1] >> bit) & 1) << (2 * bit + 1)
+
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    num_leaves = num_cells * num_cells
+    leaf_starts = np.searchsorted(sorted_codes, np.arange(num_leaves + 1))
+
+    # Bounds of the leaf sectors from the bounds of their polygons, empty leaves get inverted bounds
+    leaf_bb_min = np.full((num_leaves, 3), np.inf)
+    leaf_bb_max = np.full((num_leaves, 3), -np.inf)
+    occupied = np.flatnonzero(leaf_starts[1:] > leaf_starts[:-1])
+    if len(occupied) > 0:
+        leaf_bb_min[occupied] = np.minimum.reduceat(poly_bb_min[order], leaf_starts[occupied], axis=0)
+        leaf_bb_max[occupied] = np.maximum.reduceat(poly_bb_max[order], leaf_starts[occupied], axis=0)
+
+    def _build(level: int, code: int) -> NavSector:
+        # Sectors at ``level`` cover 4**(depth - level) consecutive leaves
+        num_sector_leaves = 1 << (2 * (depth - level))
+        first_leaf = code * num_sector_leaves
+        last_leaf = first_leaf + num_sector_leaves
+        poly_start = int(leaf_starts[first_leaf])
+        poly_count = int(leaf_starts[last_leaf]) - poly_start
+        sector_bb_min = leaf_bb_min[first_leaf:last_leaf].min(axis=0)
+        sector_bb_max = leaf_bb_max[first_leaf:last_leaf].max(axis=0)
+        if poly_count == 0:
+            sector_bb_min = sector_bb_max = np.zeros(3)
+        children = () if level == depth else tuple(_build(level + 1, code * 4 + i) for i in range(4))
+        return NavSector(sector_bb_min, sector_bb_max, poly_start, poly_count, children)
+
+    return _build(0, 0), order
+
+
+@profiler.profiled
+def polygons_from_obj(obj: bpy.types.Object, area_id: int) -> tuple[NavPolygons, NavSector, NDArray[np.int64]]:
+    """Builds the polygons from the navmesh polygon mesh, sorted by sector.
+
+    :return: A tuple of the polygons, the root of the sector tree, and the index of each mesh polygon in the exported
+             polygons.
+    """
+    mesh = obj.data
+    num_polys = len(mesh.polygons)
+    num_corners = len(mesh.loops)
+
+    positions = _get_mesh_world_positions(obj)
+    corner_verts = np.empty(num_corners, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", corner_verts)
+    corner_verts = corner_verts.astype(np.int64)
+    poly_sizes = np.empty(num_polys, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", poly_sizes)
+    poly_sizes = poly_sizes.astype(np.int64)
+    poly_starts = np.cumsum(poly_sizes) - poly_sizes
+
+    flags = np.zeros((num_polys, NAVMESH_NUM_POLY_FLAGS), dtype=np.int64)
+    for flags_index, attr in enumerate(NavMeshAttr.poly_flags()):
+        flags[:, flags_index] = _get_attribute_values(mesh, attr, num_polys)
+
+    corner_positions = positions[corner_verts]
+    poly_bb_min = np.minimum.reduceat(corner_positions, poly_starts, axis=0) if num_polys else np.zeros((0, 3))
+    poly_bb_max = np.maximum.reduceat(corner_positions, poly_starts, axis=0) if num_polys else np.zeros((0, 3))
+    root_sector, order = build_sector_tree(poly_bb_min, poly_bb_max)
+
+    # Index of each mesh polygon in the sorted polygons
+    poly_indices = np.empty(num_polys, dtype=np.int64)
+    poly_indices[order] = np.arange(num_polys)
+
+    adjacency = get_polygon_adjacency(corner_verts, poly_sizes)
+    adjacency = np.where(adjacency >= 0, poly_indices[np.maximum(adjacency, 0)], -1)
+
+    # Edges without a neighbour in the mesh keep the links from the imported navmesh, which may be to polygons of other
+    # navmeshes. Links to polygons of this navmesh are updated to the sorted order
+    links = _get_edge_links(mesh, area_id)
+    for area_column, poly_column in ((0, 1), (2, 3)):
+        polys = links[:, poly_column]
+        is_own_poly = (links[:, area_column] == area_id) & (polys >= 0) & (polys < num_polys)
+        links[is_own_poly, poly_column] = poly_indices[polys[is_own_poly]]
+
+    # Gather the corners of the polygons in the sorted order
+    sorted_sizes = poly_sizes[order]
+    sorted_corners = np.repeat(poly_starts[order] - (np.cumsum(sorted_sizes) - sorted_sizes), sorted_sizes)
+    sorted_corners += np.arange(num_corners)
+
+    edge_lines = [
+        f"{area_id}:{poly}, {area_id}:{poly}" if poly >= 0 else "{}:{}, {}:{}".format(*corner_links)
+        for poly, corner_links in zip(adjacency[sorted_corners].tolist(), links[sorted_corners].tolist())
+    ]
+    sorted_starts = (np.cumsum(sorted_sizes) - sorted_sizes).tolist()
+    edges = ["\n".join(edge_lines[start:start + size]) for start, size in zip(sorted_starts, sorted_sizes.tolist())]
+
+    polygons = NavPolygons(
+        flags=flags[order],
+        vertices=corner_positions[sorted_corners],
+        sizes=sorted_sizes,
+        edges=edges,
+    )
+    return polygons, root_sector, poly_indices
+
+
+def portals_from_obj(obj: bpy.types.Object, poly_indices: Optional[NDArray[np.int64]]) -> list[NavPortal]:
+    mesh = obj.data
+    num_portals = len(mesh.edges)
+    positions = _get_mesh_world_positions(obj)
+    edge_verts = np.empty(num_portals * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_verts)
+    edge_verts = edge_verts.reshape((-1, 2))
+
+    types = _get_attribute_values(mesh, NavMeshAttr.PORTAL_TYPE, num_portals).tolist()
+    angles = _get_attribute_values(mesh, NavMeshAttr.PORTAL_ANGLE, num_portals).tolist()
+    poly_from = _get_attribute_values(mesh, NavMeshAttr.PORTAL_POLY_FROM, num_portals).astype(np.int64)
+    poly_to = _get_attribute_values(mesh, NavMeshAttr.PORTAL_POLY_TO, num_portals).astype(np.int64)
+    is_valid = np.ones(num_portals, dtype=bool)
+    if poly_indices is not None:
+        # Polygons are reordered on export, update the references to polygons of this navmesh
+        num_polys = len(poly_indices)
+        is_valid = (poly_from >= 0) & (poly_from < num_polys) & (poly_to >= 0) & (poly_to < num_polys)
+        poly_from[is_valid] = poly_indices[poly_from[is_valid]]
+        poly_to[is_valid] = poly_indices[poly_to[is_valid]]
+
+        num_invalid_portals = num_portals - np.count_nonzero(is_valid)
+        if num_invalid_portals > 0:
+            logger.warning(
+                f"Skipped {num_invalid_portals} navmesh portal(s) of '{obj.name}' linked to polygons that do not exist."
+            )
+
+    portals = []
+    positions_from = positions[edge_verts[:, 0]].tolist()
+    positions_to = positions[edge_verts[:, 1]].tolist()
+    for i in np.flatnonzero(is_valid).tolist():
+        portal = NavPortal()
+        portal.type = types[i]
+        portal.angle = angles[i]
+        portal.poly_from = int(poly_from[i])
+        portal.poly_to = int(poly_to[i])
+        portal.position_from = Vector(positions_from[i])
+        portal.position_to = Vector(positions_to[i])
+        portals.append(portal)
+
+    return portals
+
+
+def points_from_obj(obj: bpy.types.Object) -> list[NavPoint]:
+    mesh = obj.data
+    num_points = len(mesh.vertices)
+    positions = _get_mesh_world_positions(obj).tolist()
+    types = _get_attribute_values(mesh, NavMeshAttr.POINT_TYPE, num_points).tolist()
+    angles = _get_attribute_values(mesh, NavMeshAttr.POINT_ANGLE, num_points).tolist()
+
+    points = []
+    for i in range(num_points):
+        point = NavPoint()
+        point.type = types[i]
+        point.angle = angles[i]
+        point.position = Vector(positions[i])
+        points.append(point)
+
+    return points
+
+
+@profiler.profiled
+def navmesh_from_object(obj: bpy.types.Object) -> Navmesh:
+    navmesh = Navmesh()
+    area_id = obj.navmesh_properties.area_id
+    navmesh.area_id = area_id
+    navmesh.content_flags = obj.navmesh_properties.content_flags
+
+    poly_obj = portals_obj = points_obj = None
+    for child in obj.children:
+        if child.type != "MESH":
+            continue
+        if child.sollum_type == SollumType.NAVMESH_POLY_MESH and poly_obj is None:
+            poly_obj = child
+        elif child.sollum_type == SollumType.NAVMESH_PORTAL and portals_obj is None:
+            portals_obj = child
+        elif child.sollum_type == SollumType.NAVMESH_POINT and points_obj is None:
+            points_obj = child
+
+    poly_indices = None
+    if poly_obj is not None:
+        navmesh.polygons, root_sector, poly_indices = polygons_from_obj(poly_obj, area_id)
+        navmesh.bb_min = Vector(root_sector.bb_min)
+        navmesh.bb_max = Vector(root_sector.bb_max)
+        navmesh.bb_size = navmesh.bb_max - navmesh.bb_min
+    else:
+        logger.warning(f"Navmesh '{obj.name}' has no polygon mesh.")
+
+    if portals_obj is not None:
+        navmesh.portals = portals_from_obj(portals_obj, poly_indices)
+    if points_obj is not None:
+        navmesh.points = points_from_obj(points_obj)
+
+    return navmesh
+
+
+@profiler.profiled
+def export_ynv(obj: bpy.types.Object, filepath: str) -> bool:
+    navmesh = navmesh_from_object(obj)
+    navmesh.write_xml(filepath)
+    return True
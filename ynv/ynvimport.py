@@ -1,164 +1,203 @@
-from ..tools.meshhelper import create_box
-from ..cwxml.navmesh import YNV
-from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType
 import os
+import itertools
 import bpy
-from ..tools.blenderhelper import find_bsdf_and_material_output
-
-
-def points_to_obj(points):
-    pobj = bpy.data.objects.new("Points", None)
-    pobj.empty_display_size = 0
-
-    for idx, point in enumerate(points):
-        mesh = bpy.data.meshes.new(SOLLUMZ_UI_NAMES[SollumType.NAVMESH_POINT])
-        obj = bpy.data.objects.new(
-            SOLLUMZ_UI_NAMES[SollumType.NAVMESH_POINT] + " " + str(idx), mesh)
-        obj.sollum_type = SollumType.NAVMESH_POINT
-        obj.parent = pobj
-
-        # properties
-        create_box(mesh, 0.5)
-        obj.location = point.position
-        obj.rotation_euler = (0, 0, point.angle)
-        bpy.context.collection.objects.link(obj)
-
-    return pobj
-
-
-def portals_to_obj(portals):
-    pobj = bpy.data.objects.new("Portals", None)
-    pobj.empty_display_size = 0
-
-    for idx, portal in enumerate(portals):
-        frommesh = bpy.data.meshes.new("from")
-        create_box(frommesh, 0.5)
-        fromobj = bpy.data.objects.new("from", frommesh)
-        fromobj.location = portal.position_from
-        tomesh = bpy.data.meshes.new("to")
-        create_box(tomesh, 0.5)
-        toobj = bpy.data.objects.new("to", tomesh)
-        toobj.location = portal.position_to
-        obj = bpy.data.objects.new(
-            SOLLUMZ_UI_NAMES[SollumType.NAVMESH_PORTAL] + " " + str(idx), tomesh)
-        obj.sollum_type = SollumType.NAVMESH_PORTAL
-        fromobj.parent = obj
-        toobj.parent = obj
-        obj.parent = pobj
-        bpy.context.collection.objects.link(fromobj)
-        bpy.context.collection.objects.link(toobj)
-        bpy.context.collection.objects.link(obj)
-
-    return pobj
-
-
-def get_material(flags, material_cache):
-    if flags in material_cache:
-        return material_cache[flags]
-
-    mat = bpy.data.materials.new(flags)
-    mat.use_nodes = True
-    r, g, b = 0.0, 0.0, 0.0
-
-    sp = flags.split(" ")
-    flags_list = []
-    for part in sp:
-        flags_list.append(int(part))
-
-    flags0 = flags_list[0]
-    if flags0 & 1 > 0:
-        r += 0.01             # SmallPoly
-    if flags0 & 2 > 0:
-        r += 0.01             # LargePoly
-    if flags0 & 4 > 0:
-        g += 0.25             # IsPavement
-    if flags0 & 8 > 0:
-        g += 0.02             # IsUnderground
-    if flags0 & 64 > 0:
-        r += 0.25             # Unused1
-    if flags0 & 128 > 0:
-        b += 0.25             # Unused2
-
-    flags1 = flags_list[1]
-    if flags1 & 64 > 0:
-        b += 0.1              # AudioProperties1
-    if flags1 & 512 > 0:
-        g += 0.1              # AudioProperties2
-    if flags1 & 1024 > 0:
-        b += 0.03             # AudioProperties3
-    if flags1 & 4096 > 0:
-        g += 0.75             # AudioProperties4
-    if flags1 & 8192 > 0:
-        b += 0.75             # Unused3
-    if flags1 & 16384 > 0:
-        r += 0.2              # NearCarNode
-    if flags1 & 32768 > 0:
-        b += 0.2              # IsInterior
-    if flags1 & 65536 > 0:
-        g = 0.2               # IsIsolated
-
-    bsdf, _ = find_bsdf_and_material_output(mat)
-    bsdf.inputs[0].default_value = (r, g, b, 0.75)
-
-    # Cache the material before returning it
-    material_cache[flags] = mat
-    return mat
-
-
-def polygons_to_obj(polygons):
-    material_cache = {}
-    mats = []
-    vertices = {}
-    verts = []
-    indices = []
-    face = []
-    for poly in polygons:
-        mats.append(get_material(poly.flags, material_cache))
-        maxtcount = len(poly.vertices)
-        for vert in poly.vertices:
-            vertex = id(vert)
-            if vertex in vertices:
-                idx = vertices[vertex]
-            else:
-                idx = len(vertices)
-                vertices[vertex] = idx
-                verts.append(vert)
-            face.append(idx)
-            if len(face) == maxtcount:
-                indices.append(face)
-                face = []
+import numpy as np
+from numpy.typing import NDArray
+from ..cwxml.navmesh import YNV, Navmesh, NavPoint, NavPolygons, NavPortal
+from ..sollumz_properties import SOLLUMZ_UI_NAMES, SollumType
+from .navmesh import (
+    NO_ADJACENT_POLY,
+    NavMeshAttr,
+    mesh_add_navmesh_attribute,
+    get_poly_flags_colors,
+    get_navmesh_material,
+)
+from .. import logger, profiler
+
+WELD_DISTANCE = 0.0001
+"""Polygon vertices closer than this are merged into a single mesh vertex."""
+
+
+def _vectors_to_array(vectors, count: int) -> NDArray[np.float32]:
+    return np.fromiter(itertools.chain.from_iterable(vectors), dtype=np.float32, count=count * 3).reshape((count, 3))
+
+
+def points_to_obj(points: list[NavPoint]) -> bpy.types.Object:
+    """Creates a mesh with a vertex for each point, with the point type and angle in vertex attributes."""
+    num_points = len(points)
+    mesh = bpy.data.meshes.new(SOLLUMZ_UI_NAMES[SollumType.NAVMESH_POINT])
+    mesh.vertices.add(num_points)
+    mesh.vertices.foreach_set("co", _vectors_to_array((p.position for p in points), num_points).ravel())
+    mesh_add_navmesh_attribute(mesh, NavMeshAttr.POINT_TYPE, [p.type for p in points])
+    mesh_add_navmesh_attribute(mesh, NavMeshAttr.POINT_ANGLE, [p.angle for p in points])
+    mesh.update()
+
+    obj = bpy.data.objects.new("Points", mesh)
+    obj.sollum_type = SollumType.NAVMESH_POINT
+    return obj
 
-    mesh = bpy.data.meshes.new(SOLLUMZ_UI_NAMES[SollumType.NAVMESH_POLY_MESH])
-    mesh.from_pydata(verts, [], indices)
-    obj = bpy.data.objects.new(
-        SOLLUMZ_UI_NAMES[SollumType.NAVMESH_POLY_MESH], mesh)
-    obj.sollum_type = SollumType.NAVMESH_POLY_MESH
 
-    # Ensure materials are unique in the mesh
-    used_materials = []
-    for mat in mats:
-        if mat not in used_materials:
-            mesh.materials.append(mat)
-            used_materials.append(mat)
+def portals_to_obj(portals: list[NavPortal], poly_indices: NDArray[np.int64]) -> bpy.types.Object:
+    """Creates a mesh with an edge for each portal, from its start to its end position, with the rest of the portal
+    data in edge attributes.
+
+    :param poly_indices: Index of each navmesh polygon in the polygon mesh, -1 for the polygons that were not imported.
+                         Portals linked to these polygons are skipped.
+    """
+    poly_from = remap_polygon_indices(np.array([p.poly_from for p in portals], dtype=np.int64), poly_indices)
+    poly_to = remap_polygon_indices(np.array([p.poly_to for p in portals], dtype=np.int64), poly_indices)
+    valid_portals = (poly_from >= 0) & (poly_to >= 0)
+    num_invalid_portals = len(portals) - np.count_nonzero(valid_portals)
+    if num_invalid_portals > 0:
+        logger.warning(f"Skipped {num_invalid_portals} navmesh portal(s) linked to degenerate polygons.")
+        portals = list(itertools.compress(portals, valid_portals.tolist()))
+        poly_from = poly_from[valid_portals]
+        poly_to = poly_to[valid_portals]
+
+    num_portals = len(portals)
+    positions = _vectors_to_array(
+        itertools.chain.from_iterable((p.position_from, p.position_to) for p in portals), num_portals * 2
+    )
+
+    mesh = bpy.data.meshes.new(SOLLUMZ_UI_NAMES[SollumType.NAVMESH_PORTAL])
+    mesh.vertices.add(num_portals * 2)
+    mesh.vertices.foreach_set("co", positions.ravel())
+    mesh.edges.add(num_portals)
+    mesh.edges.foreach_set("vertices", np.arange(num_portals * 2, dtype=np.int32))
+    mesh_add_navmesh_attribute(mesh, NavMeshAttr.PORTAL_TYPE, [p.type for p in portals])
+    mesh_add_navmesh_attribute(mesh, NavMeshAttr.PORTAL_ANGLE, [p.angle for p in portals])
+    mesh_add_navmesh_attribute(mesh, NavMeshAttr.PORTAL_POLY_FROM, poly_from)
+    mesh_add_navmesh_attribute(mesh, NavMeshAttr.PORTAL_POLY_TO, poly_to)
+    mesh.update()
+
+    obj = bpy.data.objects.new("Portals", mesh)
+    obj.sollum_type = SollumType.NAVMESH_PORTAL
+    return obj
 
-    for idx, poly in enumerate(mesh.polygons):
-        poly.material_index = used_materials.index(mats[idx])
 
-    return obj
+def polygons_to_mesh_data(
+    polygons: NavPolygons
+) -> tuple[NDArray[np.float64], NDArray[np.int64], NDArray[np.bool_]]:
+    """Welds the vertices of the polygons by position.
+
+    :return: A tuple of the vertex positions, the vertex index of each polygon vertex, and a mask of the valid
+             polygons. Polygons with less than 3 vertices or with the same vertex more than once after welding are not
+             valid.
+    """
+    # Quantize the positions so the vertices shared by adjacent polygons get the same key
+    keys = np.rint(polygons.vertices / WELD_DISTANCE).astype(np.int64)
+    _, first_indices, corner_verts = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    corner_verts = corner_verts.reshape(-1)
+    verts = polygons.vertices[first_indices]
+
+    corner_polys = np.repeat(np.arange(polygons.num_polygons), polygons.sizes)
+    order = np.lexsort((corner_verts, corner_polys))
+    sorted_polys = corner_polys[order]
+    sorted_verts = corner_verts[order]
+    repeated = (sorted_polys[1:] == sorted_polys[:-1]) & (sorted_verts[1:] == sorted_verts[:-1])
+    valid_polys = polygons.sizes >= 3
+    valid_polys[sorted_polys[1:][repeated]] = False
+
+    return verts, corner_verts, valid_polys
+
+
+def remap_polygon_indices(polys: NDArray[np.int64], poly_indices: NDArray[np.int64]) -> NDArray[np.int64]:
+    """Updates references to navmesh polygons after skipping the degenerate polygons. References to skipped polygons
+    become -1, values that are not indices of polygons of this navmesh are kept as they are.
+    """
+    is_poly_index = (polys >= 0) & (polys < len(poly_indices))
+    return np.where(is_poly_index, poly_indices[np.where(is_poly_index, polys, 0)], polys)
+
+
+def get_polygon_edge_links(polygons: NavPolygons, area_id: int) -> NDArray[np.int64]:
+    """Parses the edges of the polygons.
+
+    :return: Array of shape (M, 4), with the area ID and polygon index of the two links of the edge that starts at each
+             polygon vertex. Missing edges have no neighbour polygon.
+    """
+    num_corners = int(polygons.sizes.sum())
+    # Each edge line is "area:poly, area:poly"
+    links = np.fromstring(" ".join(polygons.edges).replace(":", " ").replace(",", " "), dtype=np.int64, sep=" ")
+    if links.size == num_corners * 4:
+        return links.reshape((num_corners, 4))
+
+    # Some polygons have an unexpected number of edges, parse them one by one
+    links = np.tile(np.array((area_id, NO_ADJACENT_POLY, area_id, NO_ADJACENT_POLY), dtype=np.int64), (num_corners, 1))
+    poly_starts = np.cumsum(polygons.sizes) - polygons.sizes
+    for start, size, edges in zip(poly_starts.tolist(), polygons.sizes.tolist(), polygons.edges):
+        poly_links = np.fromstring(edges.replace(":", " ").replace(",", " "), dtype=np.int64, sep=" ")
+        num_edges = min(len(poly_links) // 4, size)
+        links[start:start + num_edges] = poly_links[:num_edges * 4].reshape((-1, 4))
+
+    return links
+
+
+@profiler.profiled
+def polygons_to_obj(polygons: NavPolygons, area_id: int) -> tuple[bpy.types.Object, NDArray[np.int64]]:
+    """Creates the polygon mesh. Degenerate polygons are skipped.
+
+    :return: A tuple of the object and the index of each navmesh polygon in the mesh, -1 for the skipped polygons.
+    """
+    verts, corner_verts, valid_polys = polygons_to_mesh_data(polygons)
+    num_invalid_polys = np.count_nonzero(~valid_polys)
+    if num_invalid_polys > 0:
+        logger.warning(f"Skipped {num_invalid_polys} degenerate navmesh polygon(s).")
+
+    poly_indices = np.full(polygons.num_polygons, -1, dtype=np.int64)
+    poly_indices[valid_polys] = np.arange(polygons.num_polygons - num_invalid_polys)
+    valid_corners = np.repeat(valid_polys, polygons.sizes)
+
+    # Links to polygons of this navmesh are updated to the mesh polygon indices, links to skipped polygons are removed
+    links = get_polygon_edge_links(polygons, area_id)[valid_corners]
+    for area_column, poly_column in ((0, 1), (2, 3)):
+        own_area = links[:, area_column] == area_id
+        polys = remap_polygon_indices(links[own_area, poly_column], poly_indices)
+        links[own_area, poly_column] = np.where(polys >= 0, polys, NO_ADJACENT_POLY)
+
+    # Drop the vertices only used by the invalid polygons
+    used_verts, corner_verts = np.unique(corner_verts[valid_corners], return_inverse=True)
+    verts = verts[used_verts]
+    poly_sizes = polygons.sizes[valid_polys]
+    poly_starts = np.cumsum(poly_sizes) - poly_sizes
 
+    mesh = bpy.data.meshes.new(SOLLUMZ_UI_NAMES[SollumType.NAVMESH_POLY_MESH])
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", verts.astype(np.float32).ravel())
+    mesh.loops.add(len(corner_verts))
+    mesh.loops.foreach_set("vertex_index", corner_verts.astype(np.int32))
+    mesh.polygons.add(len(poly_sizes))
+    mesh.polygons.foreach_set("loop_start", poly_starts.astype(np.int32))
+    mesh.update(calc_edges=True)
+
+    flags = polygons.flags[valid_polys]
+    for flags_index, attr in enumerate(NavMeshAttr.poly_flags()):
+        mesh_add_navmesh_attribute(mesh, attr, flags[:, flags_index])
+    colors = np.repeat(get_poly_flags_colors(flags), poly_sizes, axis=0)
+    mesh_add_navmesh_attribute(mesh, NavMeshAttr.POLY_COLOR, colors)
+    for links_index, attr in enumerate(NavMeshAttr.edge_links()):
+        mesh_add_navmesh_attribute(mesh, attr, links[:, links_index])
+    mesh.materials.append(get_navmesh_material())
+
+    obj = bpy.data.objects.new(SOLLUMZ_UI_NAMES[SollumType.NAVMESH_POLY_MESH], mesh)
+    obj.sollum_type = SollumType.NAVMESH_POLY_MESH
+    return obj, poly_indices
 
-def navmesh_to_obj(navmesh, filepath):
+
+@profiler.profiled
+def navmesh_to_obj(navmesh: Navmesh, filepath: str) -> bpy.types.Object:
     name = os.path.basename(filepath.replace(YNV.file_extension, ""))
     nobj = bpy.data.objects.new(name, None)
     nobj.sollum_type = SollumType.NAVMESH
     nobj.empty_display_size = 0
+    nobj.navmesh_properties.area_id = int(navmesh.area_id or 0)
+    nobj.navmesh_properties.content_flags = navmesh.content_flags or ""
     bpy.context.collection.objects.link(nobj)
 
-    nmobj = polygons_to_obj(navmesh.polygons)
+    nmobj, poly_indices = polygons_to_obj(navmesh.polygons, nobj.navmesh_properties.area_id)
     nmobj.parent = nobj
     bpy.context.collection.objects.link(nmobj)
 
-    npobj = portals_to_obj(navmesh.portals)
+    npobj = portals_to_obj(navmesh.portals, poly_indices)
     npobj.parent = nobj
     bpy.context.collection.objects.link(npobj)
 
@@ -166,7 +205,10 @@ def navmesh_to_obj(navmesh, filepath):
     npobj.parent = nobj
     bpy.context.collection.objects.link(npobj)
 
+    return nobj
+
 
-def import_ynv(filepath):
+@profiler.profiled
+def import_ynv(filepath: str) -> bpy.types.Object:
     ynv_xml = YNV.from_xml_file(filepath)
-    navmesh_to_obj(ynv_xml, filepath)
+    return navmesh_to_obj(ynv_xml, filepath)
@@ -3,7 +3,7 @@ import math
 import functools
 from pathlib import Path
 from mathutils import Matrix, Vector, Quaternion
-from typing import Literal, Optional
+from typing import Literal, Optional, NamedTuple
 from collections.abc import Iterator
 from ..utils import get_selected_archetype, get_selected_extension, get_selected_ytyp
 from ...tools.blenderhelper import tag_redraw
@@ -11,6 +11,7 @@ from ...sollumz_properties import ArchetypeType
 from ...shared.obj_reader import obj_read_from_file
 from ..properties.ytyp import ArchetypeProperties
 from ..properties.extensions import ExtensionType, ExtensionProperties
+from .state import GizmoStateCache, gizmos_state_version
 
 
 DEBUG_DRAW = False
@@ -35,12 +36,35 @@ def iter_archetype_extensions(context) -> Iterator[tuple[int, int]]:
             yield (archetype_idx, ext_idx)
 
 
+def get_archetype_extensions_state(context) -> tuple:
+    """Returns the values that decide which extensions are visible, other than the object visibility and properties
+    with update callbacks (tracked by the gizmos state version). These are cheap to read, so they can be checked on
+    every redraw to know if the archetypes have to be iterated again.
+    """
+    state = [gizmos_state_version(), context.scene.as_pointer(), context.scene.ytyp_index]
+    selected_ytyp = get_selected_ytyp(context)
+    if selected_ytyp is not None:
+        state.extend((selected_ytyp.as_pointer(), len(selected_ytyp.archetypes), selected_ytyp.archetypes.active_index))
+        selected_archetype = selected_ytyp.selected_archetype
+        if selected_archetype is not None:
+            state.extend((len(selected_archetype.extensions), selected_archetype.extension_index))
+    return tuple(state)
+
+
+_has_visible_extensions_cache = GizmoStateCache()
+
+
 def can_draw_gizmos(context):
     tool = context.workspace.tools.from_space_view3d_mode(context.mode)
     if tool.idname != "sollumz.archetype_extension":
         return False
 
-    return next(iter_archetype_extensions(context), None) is not None
+    # Only check the archetypes again when something changed, this is called on every redraw
+    return _has_visible_extensions_cache.get(
+        "has_visible_extensions",
+        get_archetype_extensions_state(context),
+        lambda: next(iter_archetype_extensions(context), None) is not None
+    )
 
 
 @functools.cache
@@ -237,6 +261,85 @@ def get_extension_light_shaft_dimensions(ext: ExtensionProperties) -> Vector:
     return Vector((width, height))
 
 
+class ExtensionGizmoMatrices(NamedTuple):
+    gizmo: Matrix
+    light_shaft_size: float = 0.0
+    ladder_bottom: Optional[Matrix] = None
+    ladder_shape: Optional[Matrix] = None
+    light_shaft_frame: Optional[Matrix] = None
+    light_shaft_frame_end: Optional[Matrix] = None
+    light_shaft_lines: tuple[Matrix, ...] = ()
+
+
+def get_extension_gizmo_matrices_key(ext: ExtensionProperties, archetype: ArchetypeProperties) -> tuple:
+    """Returns the values the world matrices of the extension gizmo depend on."""
+    ext_props = ext.get_properties()
+    key = [ext.extension_type, tuple(ext_props.offset_position), tuple(map(tuple, archetype.asset.matrix_world))]
+    if hasattr(ext_props, "offset_rotation"):
+        key.append(tuple(ext_props.offset_rotation))
+    if ext.extension_type == ExtensionType.LADDER:
+        key.extend((tuple(ext_props.top), tuple(ext_props.bottom), tuple(ext_props.normal)))
+    elif ext.extension_type == ExtensionType.LIGHT_SHAFT:
+        key.extend((tuple(ext_props.cornerA), tuple(ext_props.cornerB), tuple(ext_props.cornerC),
+                    tuple(ext_props.cornerD), tuple(ext_props.direction), ext_props.length))
+    return tuple(key)
+
+
+def get_extension_gizmo_matrices(ext: ExtensionProperties, archetype: ArchetypeProperties) -> ExtensionGizmoMatrices:
+    ext_props = ext.get_properties()
+    asset_matrix = archetype.asset.matrix_world
+    gizmo_matrix = asset_matrix @ get_extension_offset_matrix(ext)
+
+    if ext.extension_type == ExtensionType.LADDER:
+        normal = ext_props.normal.normalized()
+        offset_rot_mat = normal.to_track_quat("Y", "Z").to_matrix().to_4x4()
+
+        bottom_matrix = asset_matrix @ Matrix.Translation(ext_props.bottom) @ offset_rot_mat
+        length = (ext_props.top - ext_props.bottom).length
+        return ExtensionGizmoMatrices(
+            gizmo_matrix,
+            ladder_bottom=bottom_matrix @ Matrix.Scale(0.05, 4),
+            ladder_shape=bottom_matrix @ Matrix.Scale(length, 4, (0.0, 0.0, 1.0)),
+        )
+
+    if ext.extension_type == ExtensionType.LIGHT_SHAFT:
+        a = ext_props.cornerA
+        b = ext_props.cornerB
+        c = ext_props.cornerC
+        d = ext_props.cornerD
+
+        rotation_mat = get_extension_offset_rotation(ext).to_matrix().to_4x4()
+
+        o = (a + b + c + d) / 4.0
+        translation_mat = Matrix.Translation(o)
+
+        width = (b - a).length
+        height = (d - a).length
+        scale_mat = Matrix(((width, 0.0, 0.0, 0.0),
+                            (0.0, 1.0, 0.0, 0.0),
+                            (0.0, 0.0, height, 0.0),
+                            (0.0, 0.0, 0.0, 1.0)))
+        light_shaft_frame_matrix = asset_matrix @ translation_mat @ rotation_mat @ scale_mat
+        light_shaft_frame_end_matrix = Matrix.Translation(
+            ext_props.direction * ext_props.length) @ light_shaft_frame_matrix
+
+        direction_rotation_mat = ext_props.direction.to_track_quat("Y", "Z").to_matrix().to_4x4()
+        direction_scale_mat = Matrix.Scale(ext_props.length, 4, (0.0, 1.0, 0.0))
+
+        def _calc_line_matrix(corner: Vector) -> Matrix:
+            return asset_matrix @ Matrix.Translation(corner) @ direction_rotation_mat @ direction_scale_mat
+
+        return ExtensionGizmoMatrices(
+            gizmo_matrix,
+            light_shaft_size=min(width, height),
+            light_shaft_frame=light_shaft_frame_matrix,
+            light_shaft_frame_end=light_shaft_frame_end_matrix,
+            light_shaft_lines=tuple(_calc_line_matrix(corner) for corner in (a, b, c, d)),
+        )
+
+    return ExtensionGizmoMatrices(gizmo_matrix)
+
+
 def get_transform_axis(
     ext: ExtensionProperties,
     archetype: ArchetypeProperties,
@@ -271,6 +374,7 @@ class SOLLUMZ_GT_archetype_extension(bpy.types.Gizmo):
         super().__init__(*args, **kwargs)
         self.linked_archetype_index = -1
         self.linked_extension_index = -1
+        self.state_cache = GizmoStateCache()
 
     def setup(self):
         self.use_event_handle_all = True  # prevent clicks on gizmo from passing through
@@ -320,8 +424,12 @@ class SOLLUMZ_GT_archetype_extension(bpy.types.Gizmo):
         self.alpha = 0.6
         self.alpha_highlight = 0.8
 
-        offset_matrix = get_extension_offset_matrix(ext)
-        gizmo_matrix = asset.matrix_world @ offset_matrix
+        matrices = self.state_cache.get(
+            "matrices",
+            get_extension_gizmo_matrices_key(ext, archetype),
+            lambda: get_extension_gizmo_matrices(ext, archetype)
+        )
+        gizmo_matrix = matrices.gizmo
 
         extension_shape = get_extension_shapes().get(ext.extension_type, None)
 
@@ -343,9 +451,7 @@ class SOLLUMZ_GT_archetype_extension(bpy.types.Gizmo):
             ext_shape_scale = 0.55, 0.55, 0.55
             if is_light_shaft:
                 # Scale based on light shaft size
-                light_shaft_width, light_shaft_height = get_extension_light_shaft_dimensions(ext)
-                size = min(light_shaft_width, light_shaft_height)
-                scale = max(size / 2.0, 0.05)
+                scale = max(matrices.light_shaft_size / 2.0, 0.05)
                 ext_shape_scale = scale, scale, scale
             ext_shape_mat = Matrix.LocRotScale(ext_shape_loc, ext_shape_rot, ext_shape_scale)
 
@@ -356,82 +462,38 @@ class SOLLUMZ_GT_archetype_extension(bpy.types.Gizmo):
                                    axis="POS_Y", select_id=-1 if select_id is None else select_id)
 
         if is_ladder:
-            self.draw_ladder_gizmo(context, select_id)
+            self.draw_ladder_gizmo(context, select_id, matrices)
         elif is_light_shaft:
-            self.draw_light_shaft_gizmo(context, select_id)
-
-    def draw_ladder_gizmo(self, context, select_id):
-        archetype_extension_pair = self.linked_archetype_and_extension
-        if archetype_extension_pair is None:
-            return
-
-        archetype, ext = archetype_extension_pair
-        ext_props = ext.get_properties()
-        asset = archetype.asset
+            self.draw_light_shaft_gizmo(context, select_id, matrices, is_active)
 
+    def draw_ladder_gizmo(self, context, select_id, matrices: ExtensionGizmoMatrices):
         select_id_int = -1 if select_id is None else select_id
 
-        normal = ext_props.normal.normalized()
-        offset_rot_mat = normal.to_track_quat("Y", "Z").to_matrix().to_4x4()
-
-        bottom_matrix = asset.matrix_world @ Matrix.Translation(ext_props.bottom) @ offset_rot_mat
-        self.draw_preset_box(bottom_matrix @ Matrix.Scale(0.05, 4), select_id=select_id_int)
-
-        length = (ext_props.top - ext_props.bottom).length
-        ladder_shape_matrix = bottom_matrix @ Matrix.Scale(length, 4, (0.0, 0.0, 1.0))
-        self.draw_custom_shape(get_ladder_shape(), matrix=ladder_shape_matrix, select_id=select_id)
+        self.draw_preset_box(matrices.ladder_bottom, select_id=select_id_int)
+        self.draw_custom_shape(get_ladder_shape(), matrix=matrices.ladder_shape, select_id=select_id)
 
-    def draw_light_shaft_gizmo(self, context, select_id):
-        archetype_extension_pair = self.linked_archetype_and_extension
-        if archetype_extension_pair is None:
-            return
-
-        archetype, ext = archetype_extension_pair
-        selected_archetype = get_selected_archetype(context)
-        selected_extension = get_selected_extension(context)
-        ext_props = ext.get_properties()
-        asset = archetype.asset
-
-        is_active = selected_archetype == archetype and selected_extension == ext
+    def draw_light_shaft_gizmo(self, context, select_id, matrices: ExtensionGizmoMatrices, is_active: bool):
         select_id_int = -1 if select_id is None else select_id
 
-        a = ext_props.cornerA
-        b = ext_props.cornerB
-        c = ext_props.cornerC
-        d = ext_props.cornerD
-
-        rotation_mat = get_extension_offset_rotation(ext).to_matrix().to_4x4()
-
-        o = (a + b + c + d) / 4.0
-        translation_mat = Matrix.Translation(o)
-
-        width = (b - a).length
-        height = (d - a).length
-        scale_mat = Matrix(((width, 0.0, 0.0, 0.0),
-                            (0.0, 1.0, 0.0, 0.0),
-                            (0.0, 0.0, height, 0.0),
-                            (0.0, 0.0, 0.0, 1.0)))
-        light_shaft_frame_matrix = asset.matrix_world @ translation_mat @ rotation_mat @ scale_mat
-        light_shaft_frame_end_matrix = Matrix.Translation(
-            ext_props.direction * ext_props.length) @ light_shaft_frame_matrix
-
         if not is_active:
-            self.draw_custom_shape(get_square_shape(), matrix=light_shaft_frame_matrix, select_id=select_id)
-            self.draw_custom_shape(get_square_shape(), matrix=light_shaft_frame_end_matrix, select_id=select_id)
-
-        direction_rotation_mat = ext_props.direction.to_track_quat("Y", "Z").to_matrix().to_4x4()
-        direction_scale_mat = Matrix.Scale(ext_props.length, 4, (0.0, 1.0, 0.0))
+            self.draw_custom_shape(get_square_shape(), matrix=matrices.light_shaft_frame, select_id=select_id)
+            self.draw_custom_shape(get_square_shape(), matrix=matrices.light_shaft_frame_end, select_id=select_id)
 
         line_shape = get_line_shape()
-
-        def _calc_line_matrix(corner: Vector) -> Matrix:
-            return asset.matrix_world @  Matrix.Translation(corner) @ direction_rotation_mat @ direction_scale_mat
-        self.draw_custom_shape(line_shape, matrix=_calc_line_matrix(a), select_id=select_id)
-        self.draw_custom_shape(line_shape, matrix=_calc_line_matrix(b), select_id=select_id)
-        self.draw_custom_shape(line_shape, matrix=_calc_line_matrix(c), select_id=select_id)
-        self.draw_custom_shape(line_shape, matrix=_calc_line_matrix(d), select_id=select_id)
+        for line_matrix in matrices.light_shaft_lines:
+            self.draw_custom_shape(line_shape, matrix=line_matrix, select_id=select_id)
 
         if DEBUG_DRAW:
+            archetype, ext = self.linked_archetype_and_extension
+            ext_props = ext.get_properties()
+            asset = archetype.asset
+            a = ext_props.cornerA
+            b = ext_props.cornerB
+            c = ext_props.cornerC
+            d = ext_props.cornerD
+            rotation_mat = get_extension_offset_rotation(ext).to_matrix().to_4x4()
+            translation_mat = Matrix.Translation((a + b + c + d) / 4.0)
+
             self.color = 1.0, 0.0, 0.0
             self.draw_preset_box(asset.matrix_world @  Matrix.Translation(a) @ Matrix.Scale(0.015, 4),
                                  select_id=select_id_int)
@@ -1074,6 +1136,7 @@ class SOLLUMZ_GGT_archetype_extensions(bpy.types.GizmoGroup):
         self.light_shaft_cage_end_snap_origin_transform = None
 
         self.extension_gizmos = []
+        self.refreshed_state = None
 
         # Assign handlers to all interaction gizmos
         arrow_x.target_set_handler("offset", get=self.handler_get_x, set=self.handler_set_x)
@@ -1158,6 +1221,16 @@ class SOLLUMZ_GGT_archetype_extensions(bpy.types.GizmoGroup):
         for i in range(last_used_gizmo + 1, len(self.extension_gizmos)):
             self.extension_gizmos[i].hide = True
 
+        self.refreshed_state = self.get_refresh_state(context)
+
+    def get_refresh_state(self, context) -> tuple:
+        """Returns the state the gizmos were refreshed for. Includes whether an interaction gizmo is in use because
+        ``draw_prepare`` hides the other interaction gizmos while one is in use.
+        """
+        any_modal = any(gz.is_modal for gz in self.translation_gizmos) or any(
+            gz.is_modal for gz in self.rotation_gizmos)
+        return get_archetype_extensions_state(context), any_modal
+
     def draw_prepare(self, context):
         def _prepare_arrow(arrow_gizmo, matrix_basis):
             if arrow_gizmo.is_modal:
@@ -1173,7 +1246,8 @@ class SOLLUMZ_GGT_archetype_extensions(bpy.types.GizmoGroup):
                 dial_gizmo.matrix_basis = matrix_basis
                 dial_gizmo.draw_options = {"CLIP"} if clip else set()
 
-        self.refresh(context)  # in case the selected archetype or extension changed
+        if self.refreshed_state != self.get_refresh_state(context):
+            self.refresh(context)  # in case the selected archetype or extension changed
 
         selected_extension = get_selected_extension(context)
         if selected_extension is None:
@@ -2,8 +2,9 @@ import bpy
 from ...sollumz_properties import ArchetypeType
 from ...sollumz_preferences import get_theme_settings
 from mathutils import Vector, Matrix
-from ..utils import get_selected_archetype, get_selected_ytyp, get_selected_portal, get_selected_tcm
+from ..utils import get_selected_archetype, get_selected_ytyp
 from ...tools.blenderhelper import find_parent
+from .state import GizmoStateCache, gizmos_state_version
 
 
 def can_draw_gizmos(context):
@@ -18,12 +19,43 @@ def can_draw_gizmos(context):
     return False
 
 
+def get_linked_item(collection, index: int):
+    """Gizmos are linked to items by index instead of references to PropertyGroups, the item could have been freed
+    since the gizmo was updated and accessing it would crash Blender.
+    """
+    if index < 0 or index >= len(collection):
+        return None
+    return collection[index]
+
+
+def update_linked_gizmos(group: bpy.types.GizmoGroup, linked_gizmos: list, gizmo_idname: str, num_items: int):
+    """Creates gizmos until there is one for each item and hides the unused ones. Gizmos are reused between updates,
+    only the gizmos of new items are created.
+    """
+    for i in range(len(linked_gizmos), num_items):
+        gz = group.gizmos.new(gizmo_idname)
+        gz.linked_index = i
+        linked_gizmos.append(gz)
+
+    for i, gz in enumerate(linked_gizmos):
+        gz.hide = i >= num_items
+
+
+def get_portal_corners(portal) -> list[Vector]:
+    return [portal.corner1, portal.corner2, portal.corner3, portal.corner4]
+
+
+def get_portal_corners_key(portal) -> tuple:
+    return (tuple(portal.corner1), tuple(portal.corner2), tuple(portal.corner3), tuple(portal.corner4))
+
+
 class RoomGizmo(bpy.types.Gizmo):
     bl_idname = "OBJECT_GT_room"
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.linked_room = None
+        self.linked_index = -1
+        self.state_cache = GizmoStateCache()
 
     @staticmethod
     def get_verts(bbmin, bbmax):
@@ -72,12 +104,11 @@ class RoomGizmo(bpy.types.Gizmo):
         theme = get_theme_settings(context)
         selected_ytyp = get_selected_ytyp(context)
         selected_archetype = selected_ytyp.selected_archetype
-        selected_room = selected_archetype.rooms.active_item
-        room = self.linked_room
+        room = get_linked_item(selected_archetype.rooms, self.linked_index)
 
         self.use_draw_scale = False
 
-        if room == selected_room:
+        if self.linked_index == selected_archetype.rooms.active_index:
             r, g, b, a = theme.mlo_gizmo_room_selected
         else:
             r, g, b, a = theme.mlo_gizmo_room
@@ -87,10 +118,13 @@ class RoomGizmo(bpy.types.Gizmo):
 
         asset = selected_archetype.asset
         if asset and room:
-            self.custom_shape = self.new_custom_shape(
-                "LINES", RoomGizmo.get_verts(room.bb_min, room.bb_max))
+            custom_shape = self.state_cache.get(
+                "shape",
+                (tuple(room.bb_min), tuple(room.bb_max)),
+                lambda: self.new_custom_shape("LINES", RoomGizmo.get_verts(room.bb_min, room.bb_max))
+            )
             self.draw_custom_shape(
-                self.custom_shape, matrix=asset.matrix_world)
+                custom_shape, matrix=asset.matrix_world)
 
 
 class RoomGizmoGroup(bpy.types.GizmoGroup):
@@ -111,15 +145,18 @@ class RoomGizmoGroup(bpy.types.GizmoGroup):
         return False
 
     def setup(self, context):
-        pass
+        self.room_gizmos = []
+        self.prepared_state = None
 
     def draw_prepare(self, context):
-        selected_ytyp = get_selected_ytyp(context)
-        selected_archetype = selected_ytyp.selected_archetype
-        self.gizmos.clear()
-        for room in selected_archetype.rooms:
-            gz = self.gizmos.new(RoomGizmo.bl_idname)
-            gz.linked_room = room
+        selected_archetype = get_selected_archetype(context)
+        num_rooms = len(selected_archetype.rooms)
+        state = (gizmos_state_version(), selected_archetype.as_pointer(), num_rooms)
+        if state == self.prepared_state:
+            return
+
+        self.prepared_state = state
+        update_linked_gizmos(self, self.room_gizmos, RoomGizmo.bl_idname, num_rooms)
 
 
 class PortalGizmo(bpy.types.Gizmo):
@@ -127,7 +164,8 @@ class PortalGizmo(bpy.types.Gizmo):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.linked_portal = None
+        self.linked_index = -1
+        self.state_cache = GizmoStateCache()
 
     @staticmethod
     def get_verts(corners):
@@ -147,11 +185,10 @@ class PortalGizmo(bpy.types.Gizmo):
     def draw_select(self, context, select_id=None):
         theme = get_theme_settings(context)
         selected_archetype = get_selected_archetype(context)
-        selected_portal = get_selected_portal(context)
-        portal = self.linked_portal
+        portal = get_linked_item(selected_archetype.portals, self.linked_index)
         asset = selected_archetype.asset
 
-        if selected_portal == portal:
+        if self.linked_index == selected_archetype.portals.active_index:
             r, g, b, a = theme.mlo_gizmo_portal_selected
         else:
             r, g, b, a = theme.mlo_gizmo_portal
@@ -163,23 +200,22 @@ class PortalGizmo(bpy.types.Gizmo):
         self.alpha_highlight = self.alpha
 
         if portal and asset:
-            corners = [portal.corner1, portal.corner2,
-                       portal.corner3, portal.corner4]
-
-            self.portal_poly = self.new_custom_shape(
-                "TRIS", PortalGizmo.get_verts(corners))
+            portal_poly = self.state_cache.get(
+                "shape",
+                get_portal_corners_key(portal),
+                lambda: self.new_custom_shape("TRIS", PortalGizmo.get_verts(get_portal_corners(portal)))
+            )
 
             self.draw_custom_shape(
-                self.portal_poly, matrix=asset.matrix_world, select_id=select_id)
+                portal_poly, matrix=asset.matrix_world, select_id=select_id)
 
     def invoke(self, context, event):
         selected_archetype = get_selected_archetype(context)
-        portals = list(selected_archetype.portals)
 
-        if self.linked_portal not in portals:
+        if get_linked_item(selected_archetype.portals, self.linked_index) is None:
             return
 
-        selected_archetype.portals.select(portals.index(self.linked_portal))
+        selected_archetype.portals.select(self.linked_index)
 
         return {'PASS_THROUGH'}
 
@@ -192,39 +228,44 @@ class PortalNormalGizmo(bpy.types.Gizmo):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.linked_portal = None
+        self.linked_index = -1
+        self.state_cache = GizmoStateCache()
+
+    @staticmethod
+    def get_arrow_matrix(corners, scale):
+        x = [p[0] for p in corners]
+        y = [p[1] for p in corners]
+        z = [p[2] for p in corners]
+        centroid = Vector(
+            (sum(x) / len(corners), sum(y) / len(corners), sum(z) / len(corners)))
+        normal = -(corners[2] - corners[0]
+                   ).cross(corners[1] - corners[0]).normalized()
+        default_axis = Vector((0, 0, 1))
+        rot = default_axis.rotation_difference(normal)
+        return Matrix.LocRotScale(
+            centroid, rot, Vector((scale, scale, scale)))
 
     def draw(self, context):
         theme = get_theme_settings(context)
         selected_archetype = get_selected_archetype(context)
-        selected_portal = get_selected_portal(context)
-        portal = self.linked_portal
+        portal = get_linked_item(selected_archetype.portals, self.linked_index)
         asset = selected_archetype.asset
 
         r, g, b, a = theme.mlo_gizmo_portal_direction
         self.color = r, g, b
 
-        if selected_portal != portal:
+        if self.linked_index != selected_archetype.portals.active_index:
             self.alpha = 0
-
-        if selected_portal == portal:
+        else:
             self.alpha = a
 
             if portal and asset:
-                corners = [portal.corner1, portal.corner2,
-                           portal.corner3, portal.corner4]
-                x = [p[0] for p in corners]
-                y = [p[1] for p in corners]
-                z = [p[2] for p in corners]
-                centroid = Vector(
-                    (sum(x) / len(corners), sum(y) / len(corners), sum(z) / len(corners)))
-                normal = -(corners[2] - corners[0]
-                           ).cross(corners[1] - corners[0]).normalized()
-                default_axis = Vector((0, 0, 1))
-                rot = default_axis.rotation_difference(normal)
                 scale = theme.mlo_gizmo_portal_direction_size
-                arrow_mat = Matrix.LocRotScale(
-                    centroid, rot, Vector((scale, scale, scale)))
+                arrow_mat = self.state_cache.get(
+                    "arrow_matrix",
+                    (get_portal_corners_key(portal), scale),
+                    lambda: PortalNormalGizmo.get_arrow_matrix(get_portal_corners(portal), scale)
+                )
                 self.draw_preset_arrow(
                     matrix=asset.matrix_world @ arrow_mat)
 
@@ -249,17 +290,26 @@ class PortalGizmoGroup(bpy.types.GizmoGroup):
         return selected_archetype.portals.active_index < len(selected_archetype.portals)
 
     def setup(self, context):
-        pass
+        self.portal_normal_gizmos = []
+        self.portal_gizmos = []
+        self.prepared_state = None
 
     def refresh(self, context):
-        self.gizmos.clear()
+        self.update_gizmos(context)
+
+    def draw_prepare(self, context):
+        self.update_gizmos(context)
+
+    def update_gizmos(self, context):
         selected_archetype = get_selected_archetype(context)
+        num_portals = len(selected_archetype.portals)
+        state = (gizmos_state_version(), selected_archetype.as_pointer(), num_portals)
+        if state == self.prepared_state:
+            return
 
-        for portal in selected_archetype.portals:
-            ngz = self.gizmos.new(PortalNormalGizmo.bl_idname)
-            ngz.linked_portal = portal
-            gz = self.gizmos.new(PortalGizmo.bl_idname)
-            gz.linked_portal = portal
+        self.prepared_state = state
+        update_linked_gizmos(self, self.portal_normal_gizmos, PortalNormalGizmo.bl_idname, num_portals)
+        update_linked_gizmos(self, self.portal_gizmos, PortalGizmo.bl_idname, num_portals)
 
 
 class TimecycleModifierGizmo(bpy.types.Gizmo):
@@ -267,7 +317,13 @@ class TimecycleModifierGizmo(bpy.types.Gizmo):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.linked_tcm = None
+        self.linked_index = -1
+        self.state_cache = GizmoStateCache()
+
+    @staticmethod
+    def get_matrices(sphere_center, sphere_radius, range_radius) -> tuple[Matrix, Matrix]:
+        t = Matrix.Translation(sphere_center)
+        return t @ Matrix.Scale(sphere_radius, 4), t @ Matrix.Scale(range_radius, 4)
 
     def draw(self, context):
         self.draw_select(context)
@@ -275,11 +331,10 @@ class TimecycleModifierGizmo(bpy.types.Gizmo):
     def draw_select(self, context, select_id=None):
         theme = get_theme_settings(context)
         selected_archetype = get_selected_archetype(context)
-        selected_tcm = get_selected_tcm(context)
-        tcm = self.linked_tcm
+        tcm = get_linked_item(selected_archetype.timecycle_modifiers, self.linked_index)
         asset = selected_archetype.asset
 
-        if selected_tcm == tcm:
+        if self.linked_index == selected_archetype.timecycle_modifiers.active_index:
             r, g, b, a = theme.mlo_gizmo_tcm_selected
         else:
             r, g, b, a = theme.mlo_gizmo_tcm
@@ -292,22 +347,25 @@ class TimecycleModifierGizmo(bpy.types.Gizmo):
 
         if tcm and asset:
             select_id = select_id if select_id is not None else -1
-            t = asset.matrix_world @ Matrix.Translation(tcm.sphere_center)
-            m = t @ Matrix.Scale(tcm.sphere_radius, 4)
+            sphere_mat, range_mat = self.state_cache.get(
+                "matrices",
+                (tuple(tcm.sphere_center), tcm.sphere_radius, tcm.range),
+                lambda: TimecycleModifierGizmo.get_matrices(tcm.sphere_center, tcm.sphere_radius, tcm.range)
+            )
+            m = asset.matrix_world @ sphere_mat
             self.draw_preset_circle(m, axis="POS_X", select_id=select_id)
             self.draw_preset_circle(m, axis="POS_Y", select_id=select_id)
             self.draw_preset_circle(m, axis="POS_Z", select_id=select_id)
-            m = t @ Matrix.Scale(tcm.range, 4)
+            m = asset.matrix_world @ range_mat
             self.draw_preset_circle(m, axis="POS_Z", select_id=select_id)
 
     def invoke(self, context, event):
         selected_archetype = get_selected_archetype(context)
-        tcms = list(selected_archetype.timecycle_modifiers)
 
-        if self.linked_tcm not in tcms:
+        if get_linked_item(selected_archetype.timecycle_modifiers, self.linked_index) is None:
             return
 
-        selected_archetype.timecycle_modifiers.select(tcms.index(self.linked_tcm))
+        selected_archetype.timecycle_modifiers.select(self.linked_index)
 
         return {"PASS_THROUGH"}
 
@@ -335,12 +393,21 @@ class TimecycleModifierGizmoGroup(bpy.types.GizmoGroup):
         return selected_archetype.timecycle_modifiers.active_index < len(selected_archetype.timecycle_modifiers)
 
     def setup(self, context):
-        pass
+        self.tcm_gizmos = []
+        self.prepared_state = None
 
     def refresh(self, context):
-        self.gizmos.clear()
+        self.update_gizmos(context)
+
+    def draw_prepare(self, context):
+        self.update_gizmos(context)
+
+    def update_gizmos(self, context):
         selected_archetype = get_selected_archetype(context)
+        num_tcms = len(selected_archetype.timecycle_modifiers)
+        state = (gizmos_state_version(), selected_archetype.as_pointer(), num_tcms)
+        if state == self.prepared_state:
+            return
 
-        for tcm in selected_archetype.timecycle_modifiers:
-            gz = self.gizmos.new(TimecycleModifierGizmo.bl_idname)
-            gz.linked_tcm = tcm
+        self.prepared_state = state
+        update_linked_gizmos(self, self.tcm_gizmos, TimecycleModifierGizmo.bl_idname, num_tcms)
@@ -0,0 +1,79 @@
+"""Tracks when the data shown by the YTYP gizmos may have changed. The gizmo groups compare the state version, along
+with a few values that are cheap to read, with the ones they last prepared their gizmos for, and only walk the
+archetypes, rooms, portals and extensions again when something changed instead of on every viewport redraw.
+"""
+
+import bpy
+from bpy.types import (
+    Scene,
+    Depsgraph,
+    Object,
+)
+from bpy.app.handlers import persistent
+from typing import Callable, TypeVar, Hashable
+
+T = TypeVar("T")
+
+_gizmos_state_version = 0
+
+
+def gizmos_state_version() -> int:
+    """Returns a number that changes each time the depsgraph reports an update to the scene or its objects (transforms,
+    visibility, properties with update callbacks), and after undo, redo or loading a file.
+    """
+    return _gizmos_state_version
+
+
+def invalidate_gizmos_state():
+    global _gizmos_state_version
+    _gizmos_state_version += 1
+
+
+class GizmoStateCache:
+    """Stores values computed from the scene data for a gizmo, such as custom shapes and matrices. A value is only
+    recomputed when the key it was computed for changes.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, tuple[Hashable, object]] = {}
+
+    def get(self, name: str, key: Hashable, build_fn: Callable[[], T]) -> T:
+        entry = self._entries.get(name, None)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        value = build_fn()
+        self._entries[name] = (key, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+
+@persistent
+def on_depsgraph_update_post(scene: Scene, depsgraph: Depsgraph):
+    # Changes to properties with update callbacks are reported as scene updates; transforms and visibility as object
+    # updates
+    for update in depsgraph.updates:
+        if isinstance(update.id, (Scene, Object)):
+            invalidate_gizmos_state()
+            return
+
+
+@persistent
+def on_undo_redo_or_load_post(*args):
+    invalidate_gizmos_state()
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update_post)
+    bpy.app.handlers.undo_post.append(on_undo_redo_or_load_post)
+    bpy.app.handlers.redo_post.append(on_undo_redo_or_load_post)
+    bpy.app.handlers.load_post.append(on_undo_redo_or_load_post)
+
+
+def unregister():
+    bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update_post)
+    bpy.app.handlers.undo_post.remove(on_undo_redo_or_load_post)
+    bpy.app.handlers.redo_post.remove(on_undo_redo_or_load_post)
+    bpy.app.handlers.load_post.remove(on_undo_redo_or_load_post)
@@ -0,0 +1,81 @@
+# Import for type hinting without circular import
+from __future__ import annotations
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .properties.ytyp import ArchetypeProperties
+
+import bpy
+
+
+class MloArchetypeIndex:
+    """Lookup tables between the entities, rooms, portals and entity sets of an MLO archetype.
+
+    Entities only store the IDs of the room, portal and entity set they are attached to, and finding their indices
+    requires searching the archetype collections. The index is built with a single pass over the archetype, so code
+    that needs these relations for every entity doesn't become quadratic with large interiors. It is a snapshot, build
+    a new one after modifying the archetype.
+    """
+
+    def __init__(self, archetype: ArchetypeProperties):
+        room_index_by_id = {str(room.id): i for i, room in enumerate(archetype.rooms)}
+        portal_index_by_id = {str(portal.id): i for i, portal in enumerate(archetype.portals)}
+        entity_set_index_by_id = {str(entity_set.id): i for i, entity_set in enumerate(archetype.entity_sets)}
+
+        self.room_names: list[str] = [room.name for room in archetype.rooms]
+
+        self.entity_room_index: list[int] = []
+        """Index of the room each entity is attached to, or -1."""
+        self.entity_portal_index: list[int] = []
+        """Index of the portal each entity is attached to, or -1."""
+        self.entity_set_index: list[int] = []
+        """Index of the entity set each entity belongs to, or -1."""
+        self.entity_index_by_object: dict[bpy.types.Object, int] = {}
+        """Index of the entity linked to an object."""
+
+        self.non_entity_set_entities: list[int] = []
+        """Indices of the entities not in an entity set, in the order they are exported."""
+        self.room_attached_objects: list[list[int]] = [[] for _ in archetype.rooms]
+        """Indices in ``non_entity_set_entities`` of the entities attached to each room."""
+        self.portal_attached_objects: list[list[int]] = [[] for _ in archetype.portals]
+        """Indices in ``non_entity_set_entities`` of the entities attached to each portal."""
+        self.entity_set_entities: list[list[int]] = [[] for _ in archetype.entity_sets]
+        """Indices of the entities in each entity set."""
+
+        for entity_index, entity in enumerate(archetype.entities):
+            room_index = room_index_by_id.get(entity.attached_room_id, -1)
+            portal_index = portal_index_by_id.get(entity.attached_portal_id, -1)
+            entity_set_index = entity_set_index_by_id.get(entity.attached_entity_set_id, -1)
+            self.entity_room_index.append(room_index)
+            self.entity_portal_index.append(portal_index)
+            self.entity_set_index.append(entity_set_index)
+
+            obj = entity.linked_object
+            if obj is not None and obj not in self.entity_index_by_object:
+                self.entity_index_by_object[obj] = entity_index
+
+            if entity.attached_entity_set_id == "-1":
+                exported_index = len(self.non_entity_set_entities)
+                self.non_entity_set_entities.append(entity_index)
+                if room_index != -1:
+                    self.room_attached_objects[room_index].append(exported_index)
+                if portal_index != -1:
+                    self.portal_attached_objects[portal_index].append(exported_index)
+            elif entity_set_index != -1:
+                self.entity_set_entities[entity_set_index].append(entity_index)
+
+    def get_entity_room_name(self, entity_index: int) -> str:
+        room_index = self.entity_room_index[entity_index]
+        return self.room_names[room_index] if room_index != -1 else ""
+
+    def get_entity_location(self, entity_index: int) -> int:
+        """Gets the location of an entity set entity, the index of its room or, if not attached to a room, the index
+        of its portal with the MSB set.
+        """
+        location = self.entity_room_index[entity_index]
+        if location == -1:
+            location = self.entity_portal_index[entity_index] | (1 << 31)
+        return location
+
+    def get_entity_index_using_object(self, obj: bpy.types.Object) -> Optional[int]:
+        return self.entity_index_by_object.get(obj, None)
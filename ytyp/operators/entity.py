@@ -1,5 +1,4 @@
 import bpy
-from typing import Optional
 from mathutils import Vector
 from ...sollumz_operators import SOLLUMZ_OT_base, SearchEnumHelper
 from ...tools.blenderhelper import remove_number_suffix
@@ -8,7 +7,7 @@ from ..utils import get_selected_archetype, get_selected_entity
 from ..properties.mlo import (
     MloEntityProperties, get_portal_items_for_selected_archetype, get_room_items_for_selected_archetype
 )
-from ..properties.ytyp import ArchetypeProperties
+from ..mlo_index import MloArchetypeIndex
 
 
 def set_entity_properties_from_filter(entity: MloEntityProperties, context: bpy.types.Context):
@@ -55,11 +54,13 @@ class SOLLUMZ_OT_add_obj_as_entity(bpy.types.Operator):
         selected_archetype = get_selected_archetype(context)
 
         first_new_entity_index = len(selected_archetype.entities)
+        mlo_index = MloArchetypeIndex(selected_archetype)
 
         for obj in context.selected_objects:
-            existing_entity = self.get_entity_using_obj(obj, selected_archetype)
+            existing_entity_index = mlo_index.get_entity_index_using_object(obj)
 
-            if existing_entity is not None:
+            if existing_entity_index is not None:
+                existing_entity = selected_archetype.entities[existing_entity_index]
                 self.report(
                     {"INFO"}, f"Object '{obj.name}' already linked to entity '{existing_entity.archetype_name}'! Skipping...")
                 continue
@@ -79,13 +80,6 @@ class SOLLUMZ_OT_add_obj_as_entity(bpy.types.Operator):
 
         return {"FINISHED"}
 
-    def get_entity_using_obj(self, obj: bpy.types.Object, archetype: ArchetypeProperties) -> Optional[MloEntityProperties]:
-        for entity in archetype.entities:
-            if entity.linked_object == obj:
-                return entity
-
-        return None
-
 
 class SOLLUMZ_OT_set_obj_entity_transforms(bpy.types.Operator):
     """Set the transforms of the selected object(s) to that of the Entity"""
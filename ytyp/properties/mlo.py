@@ -379,6 +379,10 @@ class MloEntityProperties(bpy.types.PropertyGroup, EntityProperties, MloArchetyp
 
         return True
 
+    def update_linked_object(self, context):
+        from ..selection_handler import invalidate_selection_sync_index
+        invalidate_selection_sync_index()
+
     # Transforms unused if no linked object
     position: bpy.props.FloatVectorProperty(name="Position")
     rotation: bpy.props.FloatVectorProperty(
@@ -408,7 +412,7 @@ class MloEntityProperties(bpy.types.PropertyGroup, EntityProperties, MloArchetyp
     flags: bpy.props.PointerProperty(type=EntityFlags, name="Flags")
 
     linked_object: bpy.props.PointerProperty(
-        type=bpy.types.Object, name="Linked Object")
+        type=bpy.types.Object, name="Linked Object", update=update_linked_object)
 
     # Blender usage only
     id: bpy.props.IntProperty(name="Id")
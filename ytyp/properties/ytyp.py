@@ -6,6 +6,7 @@ from bpy.types import (
 from bpy.props import (
     BoolProperty,
 )
+import numpy as np
 from enum import IntEnum
 from typing import Union, Optional, Sequence
 from uuid import uuid4
@@ -269,6 +270,9 @@ class ArchetypeProperties(bpy.types.PropertyGroup, ExtensionsContainer):
     __entity_set_enum_items_cache: dict[str, list] = {}
 
     def update_asset(self, context):
+        from ..selection_handler import invalidate_selection_sync_index
+        invalidate_selection_sync_index()
+
         if self.asset:
             self.asset_name = self.asset.name
             # Automatically determine asset type
@@ -311,14 +315,15 @@ class ArchetypeProperties(bpy.types.PropertyGroup, ExtensionsContainer):
         item.id = item_id
         item.uuid = str(uuid4())
 
+        # Set the archetype first, the room enums need it to find the room items
+        item.mlo_archetype_id = self.id
+        item.mlo_archetype_uuid = self.uuid
+
         if len(self.rooms) > 0:
             room_id = self.rooms[0].id
             item.room_to_id = str(room_id)
             item.room_from_id = str(room_id)
 
-        item.mlo_archetype_id = self.id
-        item.mlo_archetype_uuid = self.uuid
-
         preferences = get_addon_preferences(bpy.context)
         if preferences.default_flags_portal:
             item.flags.total = str(preferences.default_flags_portal)
@@ -398,27 +403,17 @@ class ArchetypeProperties(bpy.types.PropertyGroup, ExtensionsContainer):
 
     def get_new_item_id(self, collection: bpy.types.bpy_prop_collection) -> int:
         """Gets unique ID for a new item in ``collection``"""
-        ids = sorted({item.id for item in collection})
+        collection = getattr(collection, "collection", collection)  # unwrap MultiSelectCollection
+        ids = np.empty(len(collection), dtype=np.int32)
+        collection.foreach_get("id", ids)
+        ids = np.unique(ids)
 
-        if not ids:
+        if len(ids) == 0:
             return 1
 
-        for i, item_id in enumerate(ids):
-            new_id = item_id + 1
-
-            if new_id in ids:
-                continue
-
-            if i + 1 >= len(ids):
-                return new_id
-
-            next_item = ids[i + 1]
-
-            if next_item > new_id:
-                return new_id
-
-        # Max id + 1
-        return ids[-1] + 1
+        # First unused ID after an existing one, the max ID + 1 if there are no gaps
+        gaps = np.flatnonzero(np.diff(ids) > 1)
+        return int(ids[gaps[0]] + 1) if len(gaps) > 0 else int(ids[-1] + 1)
 
     def select_entity_linked_object(self):
         if not self.id_data.sz_sync_mlo_entities_selection:
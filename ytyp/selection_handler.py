@@ -4,7 +4,8 @@ from bpy.types import (
     Scene,
     Depsgraph,
 )
-from typing import Sequence
+from typing import Iterable, Optional, Sequence
+from collections import defaultdict
 from contextlib import contextmanager
 from .properties.ytyp import ArchetypeType
 
@@ -27,6 +28,75 @@ def suppress_next_sync_selection():
     _suppress_sync_once = True
 
 
+class SelectionSyncIndex:
+    """Reverse index from objects to the archetypes that use them as asset and the MLO entities linked to them.
+
+    Objects are identified by their ``session_uid``, which doesn't change on undo or rename. The index is rebuilt
+    lazily after it is invalidated, which happens when an archetype asset or entity linked object changes, and on file
+    load and undo/redo. Entries are also checked against the current data on lookup, so stale entries left by removed
+    or reordered items trigger a rebuild too.
+    """
+
+    ARCHETYPE_ASSET = -1
+    """Entity index of the entries for archetype assets."""
+
+    def __init__(self):
+        self.scene_uid: Optional[int] = None
+        self.entries: Optional[dict[int, list[tuple[int, int, int]]]] = None
+        """Lists of (ytyp index, archetype index, entity index) by object ``session_uid``."""
+
+    def invalidate(self):
+        self.entries = None
+
+    def rebuild(self, scene: Scene):
+        entries = defaultdict(list)
+        for ytyp_idx, ytyp in enumerate(scene.ytyps):
+            for arch_idx, arch in enumerate(ytyp.archetypes):
+                if arch_obj := arch.asset:
+                    entries[arch_obj.session_uid].append((ytyp_idx, arch_idx, SelectionSyncIndex.ARCHETYPE_ASSET))
+
+                for entity_idx, entity in enumerate(arch.entities):
+                    if entity_obj := entity.linked_object:
+                        entries[entity_obj.session_uid].append((ytyp_idx, arch_idx, entity_idx))
+
+        self.scene_uid = scene.session_uid
+        self.entries = dict(entries)
+
+    def _is_entry_valid(self, scene: Scene, obj: Object, entry: tuple[int, int, int]) -> bool:
+        ytyp_idx, arch_idx, entity_idx = entry
+        if ytyp_idx >= len(scene.ytyps):
+            return False
+        archetypes = scene.ytyps[ytyp_idx].archetypes
+        if arch_idx >= len(archetypes):
+            return False
+        arch = archetypes[arch_idx]
+        if entity_idx == SelectionSyncIndex.ARCHETYPE_ASSET:
+            return arch.asset == obj
+        return entity_idx < len(arch.entities) and arch.entities[entity_idx].linked_object == obj
+
+    def lookup(self, scene: Scene, objs: Iterable[Object]) -> list[tuple[Object, tuple[int, int, int]]]:
+        """Gets the entries of the given objects, as pairs of object and entry."""
+        for retry in (False, True):
+            if self.entries is None or self.scene_uid != scene.session_uid:
+                self.rebuild(scene)
+
+            results = [(obj, entry) for obj in objs for entry in self.entries.get(obj.session_uid, ())]
+            if all(self._is_entry_valid(scene, obj, entry) for obj, entry in results):
+                return results
+
+            self.invalidate()
+
+        return [(obj, entry) for obj, entry in results if self._is_entry_valid(scene, obj, entry)]
+
+
+_selection_sync_index = SelectionSyncIndex()
+
+
+def invalidate_selection_sync_index():
+    """Marks the selection sync index as outdated. Call it when the objects linked to archetypes or entities change."""
+    _selection_sync_index.invalidate()
+
+
 def sync_selection(scene: Scene, active: Object, selected: Sequence[Object]):
     def _root_parent(obj: Object) -> Object:
         while p := obj.parent:
@@ -40,38 +110,38 @@ def sync_selection(scene: Scene, active: Object, selected: Sequence[Object]):
     sync_archetypes = scene.sz_sync_archetypes_selection
     sync_entities = scene.sz_sync_mlo_entities_selection
 
-    for ytyp_idx, ytyp in enumerate(scene.ytyps):
-        arch_indices = []
-        for arch_idx, arch in enumerate(ytyp.archetypes):
-            arch_obj = arch.asset
-            if sync_archetypes and arch_obj and arch_obj in all_objects:
-                if arch_obj == active_obj:
-                    arch_indices.insert(0, arch_idx)  # first is the active object
-                else:
-                    arch_indices.append(arch_idx)
-
-            if not sync_entities or arch.type != ArchetypeType.MLO:
-                continue
-
-            entity_indices = []
-            for entity_idx, entity in enumerate(arch.entities):
-                entity_obj = entity.linked_object
-                if entity_obj and entity_obj in all_objects:
-                    if entity_obj == active_obj:
-                        entity_indices.insert(0, entity_idx)  # first is the active object
-                    else:
-                        entity_indices.append(entity_idx)
-
-            if entity_indices:
-                scene.ytyp_index = ytyp_idx
-                ytyp.archetypes.select(arch_idx)
-                arch.entities.select_many(entity_indices)
-                arch_indices.clear()  # entities in a MLO have priority for selection
-                return  # assume all selection belong to the same MLO and exit early
-
-        if arch_indices:
+    # Matches keep the same priority as iterating all ytyps and archetypes in order: the first MLO with selected
+    # entities, unless an earlier ytyp has selected archetypes
+    arch_indices_by_ytyp = defaultdict(list)
+    entity_indices_by_arch = defaultdict(list)
+    for obj, (ytyp_idx, arch_idx, entity_idx) in _selection_sync_index.lookup(scene, all_objects):
+        if entity_idx == SelectionSyncIndex.ARCHETYPE_ASSET:
+            if sync_archetypes:
+                arch_indices_by_ytyp[ytyp_idx].append((arch_idx, obj == active_obj))
+        elif sync_entities:
+            entity_indices_by_arch[(ytyp_idx, arch_idx)].append((entity_idx, obj == active_obj))
+
+    def _sorted_indices(indices: list[tuple[int, bool]]) -> list[int]:
+        # Sorted, with the active object first
+        indices = sorted(set(indices))
+        return [i for i, is_active in indices if is_active] + [i for i, is_active in indices if not is_active]
+
+    for ytyp_idx in sorted(arch_indices_by_ytyp.keys() | {y for y, _ in entity_indices_by_arch.keys()}):
+        ytyp = scene.ytyps[ytyp_idx]
+        mlo_keys = sorted(
+            (y, a) for y, a in entity_indices_by_arch.keys()
+            if y == ytyp_idx and ytyp.archetypes[a].type == ArchetypeType.MLO
+        )
+        if mlo_keys:
+            arch_idx = mlo_keys[0][1]
             scene.ytyp_index = ytyp_idx
-            ytyp.archetypes.select_many(arch_indices)
+            ytyp.archetypes.select(arch_idx)
+            ytyp.archetypes[arch_idx].entities.select_many(_sorted_indices(entity_indices_by_arch[mlo_keys[0]]))
+            return  # assume all selection belong to the same MLO and exit early
+
+        if arch_indices := arch_indices_by_ytyp.get(ytyp_idx, None):
+            scene.ytyp_index = ytyp_idx
+            ytyp.archetypes.select_many(_sorted_indices(arch_indices))
             return
 
 
@@ -104,9 +174,20 @@ def depsgraph_update_post_handler(scene: Scene, depsgraph: Depsgraph):
     sync_selection(scene, active, selected)
 
 
+@bpy.app.handlers.persistent
+def invalidate_selection_sync_index_handler(*args):
+    invalidate_selection_sync_index()
+
+
 def register():
     bpy.app.handlers.depsgraph_update_post.append(depsgraph_update_post_handler)
+    bpy.app.handlers.load_post.append(invalidate_selection_sync_index_handler)
+    bpy.app.handlers.undo_post.append(invalidate_selection_sync_index_handler)
+    bpy.app.handlers.redo_post.append(invalidate_selection_sync_index_handler)
 
 
 def unregister():
     bpy.app.handlers.depsgraph_update_post.remove(depsgraph_update_post_handler)
+    bpy.app.handlers.load_post.remove(invalidate_selection_sync_index_handler)
+    bpy.app.handlers.undo_post.remove(invalidate_selection_sync_index_handler)
+    bpy.app.handlers.redo_post.remove(invalidate_selection_sync_index_handler)
@@ -8,21 +8,18 @@ from ..tools import jenkhash
 from ..tools.meshhelper import get_combined_bound_box, get_bound_center_from_bounds, get_sphere_radius
 from .properties.ytyp import ArchetypeProperties, SpecialAttribute, TimecycleModifierProperties, RoomProperties, PortalProperties, MloEntityProperties, EntitySetProperties
 from .properties.extensions import ExtensionProperties, ExtensionType
+from .mlo_index import MloArchetypeIndex
 from ..ydr.light_flashiness import Flashiness
 
 
-def set_room_attached_objects(room_xml: ytypxml.Room, room_index: int, entities: Iterable[MloEntityProperties]):
-    """Set attached objects of room from the mlo archetype entities collection provided."""
-    for i, entity in enumerate(entities):
-        if entity.room_index == room_index:
-            room_xml.attached_objects.append(i)
+def set_room_attached_objects(room_xml: ytypxml.Room, room_index: int, mlo_index: MloArchetypeIndex):
+    """Set attached objects of room from the mlo archetype index provided."""
+    room_xml.attached_objects.extend(mlo_index.room_attached_objects[room_index])
 
 
-def set_portal_attached_objects(portal_xml: ytypxml.Portal, portal_index: int, entities: Iterable[MloEntityProperties]):
-    """Set attached objects of portal from the mlo archetype entities collection provided."""
-    for i, entity in enumerate(entities):
-        if entity.portal_index == portal_index:
-            portal_xml.attached_objects.append(i)
+def set_portal_attached_objects(portal_xml: ytypxml.Portal, portal_index: int, mlo_index: MloArchetypeIndex):
+    """Set attached objects of portal from the mlo archetype index provided."""
+    portal_xml.attached_objects.extend(mlo_index.portal_attached_objects[portal_index])
 
 
 def get_portal_count(room: RoomProperties, portals: Iterable[PortalProperties]) -> int:
@@ -71,23 +68,17 @@ def set_portal_xml_corners(portal: PortalProperties, portal_xml: ytypxml.Portal)
         portal_xml.corners.append(corner_xml)
 
 
-def create_entity_set_xml(entityset: EntitySetProperties, archetype: ArchetypeProperties) -> ytypxml.EntitySet:
+def create_entity_set_xml(
+    entityset: EntitySetProperties, entity_set_index: int, archetype: ArchetypeProperties, mlo_index: MloArchetypeIndex
+) -> ytypxml.EntitySet:
     """Create xml mlo entity sets from an entityset data-block"""
     entity_set = ytypxml.EntitySet()
     entity_set.name = entityset.name
 
-    for entity in archetype.entities:
-        if entity.attached_entity_set_id != str(entityset.id):
-            continue
-
-        entity_set.entities.append(create_entity_xml(entity, archetype))
-
-        location = entity.room_index
-        if location == -1:
-            # If not attached to a room, it should be attached to a portal. Set MSB to indicate this is a portal index
-            location = entity.portal_index | (1 << 31)
-
-        entity_set.locations.append(location)
+    for entity_index in mlo_index.entity_set_entities[entity_set_index]:
+        entity_set.entities.append(create_entity_xml(archetype.entities[entity_index], archetype))
+        # If not attached to a room, it should be attached to a portal, with the MSB set to indicate it
+        entity_set.locations.append(mlo_index.get_entity_location(entity_index))
 
     return entity_set
 
@@ -125,7 +116,9 @@ def create_entity_xml(entity: MloEntityProperties, archetype: ArchetypePropertie
     return entity_xml
 
 
-def create_room_xml(room: RoomProperties, room_index: int, archetype: ArchetypeProperties) -> ytypxml.Room:
+def create_room_xml(
+    room: RoomProperties, room_index: int, archetype: ArchetypeProperties, mlo_index: MloArchetypeIndex
+) -> ytypxml.Room:
     """Create xml room from a room data-block."""
 
     room_xml = ytypxml.Room()
@@ -141,13 +134,12 @@ def create_room_xml(room: RoomProperties, room_index: int, archetype: ArchetypeP
     room_xml.portal_count = get_portal_count(
         room, archetype.portals)
 
-    set_room_attached_objects(room_xml, room_index,
-                              archetype.non_entity_set_entities)
+    set_room_attached_objects(room_xml, room_index, mlo_index)
 
     return room_xml
 
 
-def create_portal_xml(portal: PortalProperties, portal_index: int, archetype: ArchetypeProperties) -> ytypxml.Portal:
+def create_portal_xml(portal: PortalProperties, portal_index: int, mlo_index: MloArchetypeIndex) -> ytypxml.Portal:
     """Create xml portal from a portal data-block."""
 
     portal_xml = ytypxml.Portal()
@@ -162,8 +154,7 @@ def create_portal_xml(portal: PortalProperties, portal_index: int, archetype: Ar
     portal_xml.audio_occlusion = int(
         portal.audio_occlusion)
 
-    set_portal_attached_objects(
-        portal_xml, portal_index, archetype.non_entity_set_entities)
+    set_portal_attached_objects(portal_xml, portal_index, mlo_index)
 
     return portal_xml
 
@@ -300,22 +291,22 @@ def get_xml_asset_type(asset_type: AssetType) -> str:
 
 def create_mlo_archetype_children_xml(archetype: ArchetypeProperties, archetype_xml: ytypxml.MloArchetype):
     """Create all mlo children from an archetype data-block for the provided archetype xml."""
-    for entity in archetype.entities:
-        if entity.attached_entity_set_id != "-1":
-            continue
-        archetype_xml.entities.append(create_entity_xml(entity, archetype))
+    mlo_index = MloArchetypeIndex(archetype)
+
+    for entity_index in mlo_index.non_entity_set_entities:
+        archetype_xml.entities.append(create_entity_xml(archetype.entities[entity_index], archetype))
 
     for room_index, room in enumerate(archetype.rooms):
-        archetype_xml.rooms.append(create_room_xml(room, room_index, archetype))
+        archetype_xml.rooms.append(create_room_xml(room, room_index, archetype, mlo_index))
 
     for portal_index, portal in enumerate(archetype.portals):
-        archetype_xml.portals.append(create_portal_xml(portal, portal_index, archetype))
+        archetype_xml.portals.append(create_portal_xml(portal, portal_index, mlo_index))
 
     for tcm in archetype.timecycle_modifiers:
         archetype_xml.timecycle_modifiers.append(create_tcm_xml(tcm))
 
-    for entityset in archetype.entity_sets:
-        archetype_xml.entity_sets.append(create_entity_set_xml(entityset, archetype))
+    for entity_set_index, entityset in enumerate(archetype.entity_sets):
+        archetype_xml.entity_sets.append(create_entity_set_xml(entityset, entity_set_index, archetype, mlo_index))
 
 
 def create_archetype_xml(archetype: ArchetypeProperties, apply_transforms: bool = False) -> ytypxml.BaseArchetype:
@@ -1,5 +1,7 @@
 import bpy
-from typing import Union
+import itertools
+from collections import defaultdict
+from typing import Optional, Union
 from mathutils import Vector, Quaternion
 from ..cwxml import ytyp as ytypxml, ymap as ymapxml
 from ..sollumz_properties import ArchetypeType, AssetType, EntityLodLevel, EntityPriorityLevel
@@ -8,6 +10,8 @@ from ..sollumz_helper import duplicate_object_with_children
 from .properties.ytyp import CMapTypesProperties, ArchetypeProperties, SpecialAttribute, TimecycleModifierProperties, RoomProperties, PortalProperties, MloEntityProperties, EntitySetProperties
 from .properties.extensions import ExtensionProperties, ExtensionType, ExtensionsContainer
 from ..ydr.light_flashiness import Flashiness
+from .mlo_index import MloArchetypeIndex
+from .. import profiler
 
 
 def create_mlo_entity_set(entity_set_xml: ytypxml.EntitySet, archetype: ArchetypeProperties):
@@ -272,26 +276,45 @@ def create_mlo_archetype_children(archetype_xml: ytypxml.MloArchetype, archetype
         organize_mlo_entities_in_collections(archetype)
 
 
-def organize_mlo_entities_in_collections(archetype: ArchetypeProperties):
+def organize_mlo_entities_in_collections(archetype: ArchetypeProperties, mlo_index: Optional[MloArchetypeIndex] = None):
     """Places all entities linked objects in collections. One collection per room."""
 
+    if mlo_index is None:
+        mlo_index = MloArchetypeIndex(archetype)
+
     base_collection_name = f"{archetype.asset_name}.entities"
     base_collection = bpy.data.collections.new(base_collection_name)
     bpy.context.collection.children.link(base_collection)
     mlo_collections = {base_collection_name: base_collection}
 
+    # ``Object.children_recursive`` and ``Object.users_collection`` iterate all objects or collections in the .blend
+    # on each access, build the hierarchy and collection membership once instead
+    children_by_parent = defaultdict(list)
+    for obj in bpy.data.objects:
+        if obj.parent is not None:
+            children_by_parent[obj.parent].append(obj)
+
+    collections_by_obj = defaultdict(list)
+    all_collections = itertools.chain((scene.collection for scene in bpy.data.scenes), bpy.data.collections)
+    for coll in all_collections:
+        for obj in coll.objects:
+            collections_by_obj[obj].append(coll)
+
     def _link_to_collection(obj, coll):
-        for c in obj.users_collection:
+        for c in collections_by_obj[obj]:
             c.objects.unlink(obj)
         coll.objects.link(obj)
+        collections_by_obj[obj] = [coll]
 
     def _link_to_collection_recursive(obj, coll):
-        _link_to_collection(obj, coll)
-        for child_obj in obj.children_recursive: # could be slow with lots of entities, O(len(bpy.data.objects)) time
-            _link_to_collection(child_obj, coll)
+        objs = [obj]
+        while objs:
+            obj = objs.pop()
+            _link_to_collection(obj, coll)
+            objs.extend(children_by_parent.get(obj, ()))
 
     light_effect_objs = []
-    for entity in archetype.entities:
+    for entity_index, entity in enumerate(archetype.entities):
         for ext in entity.extensions:
             if ext.extension_type == ExtensionType.LIGHT_EFFECT:
                 props = ext.get_properties()
@@ -302,7 +325,7 @@ def organize_mlo_entities_in_collections(archetype: ArchetypeProperties):
         if obj is None:
             continue
 
-        room_name = entity.get_room_name()
+        room_name = mlo_index.get_entity_room_name(entity_index)
         if room_name:
             entity_collection_name = f"{archetype.asset_name}.{room_name}"
         else:
@@ -399,6 +422,7 @@ def ytyp_to_obj(ytyp_xml: ytypxml.CMapTypes):
         create_archetype(arch_xml, ytyp)
 
 
+@profiler.profiled
 def import_ytyp(filepath: str):
     ytyp_xml = ytypxml.YTYP.from_xml_file(filepath)
     ytyp_to_obj(ytyp_xml)